@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+PASTA_DIARIO = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "autosave")
+EXTENSAO_DIARIO = ".diario"
+SNAPSHOT_A_CADA = 50     # Deltas seguidos antes de reescrever o diário com um snapshot
+FRACAO_SNAPSHOT = 0.5    # Delta que troca mais que esta fração das linhas vira snapshot
+
+# --- GRAVAÇÃO ATÔMICA ---
+def _fsync_pasta(pasta):
+    # O rename só fica durável depois do fsync do diretório (no Windows não se abre diretório)
+    if os.name == 'nt':
+        return
+    fd = os.open(pasta, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def gravar_atomico(caminho, texto, encoding="utf-8"):
+    """Grava num temporário ao lado, faz fsync e troca com os.replace.
+
+    Um crash (ou disco cheio) no meio deixa o arquivo antigo intacto: quem lê
+    vê o conteúdo anterior ou o novo inteiro, nunca um arquivo truncado.
+    """
+    caminho = os.path.abspath(caminho)
+    pasta = os.path.dirname(caminho)
+    temp = os.path.join(pasta, f".{os.path.basename(caminho)}.tmp-{os.getpid()}-{threading.get_ident()}")
+    try:
+        with open(temp, "w", encoding=encoding) as f:
+            f.write(texto)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(caminho):
+            shutil.copymode(caminho, temp)  # Mantém as permissões do arquivo original
+        os.replace(temp, caminho)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    _fsync_pasta(pasta)
+    return caminho
+
+# --- DIÁRIO DE AUTOSAVE ---
+def _trecho_alterado(antigas, novas):
+    """(inicio, fim, linhas): troca antigas[inicio:fim] por `linhas` para chegar em `novas`."""
+    limite = min(len(antigas), len(novas))
+    inicio = 0
+    while inicio < limite and antigas[inicio] == novas[inicio]:
+        inicio += 1
+    fim_antigas, fim_novas = len(antigas), len(novas)
+    while fim_antigas > inicio and fim_novas > inicio and antigas[fim_antigas - 1] == novas[fim_novas - 1]:
+        fim_antigas -= 1
+        fim_novas -= 1
+    return inicio, fim_antigas, novas[inicio:fim_novas]
+
+class Diario:
+    """Diário de autosave de um documento: snapshot completo seguido de deltas.
+
+    Cada registro é uma linha JSON acrescentada com fsync. Um delta guarda só o
+    trecho de linhas que mudou desde o registro anterior ({"inicio", "fim",
+    "linhas"}); quando o trecho passa de FRACAO_SNAPSHOT do documento, ou a cada
+    SNAPSHOT_A_CADA deltas, o diário é reescrito (atomicamente) com um snapshot.
+    Um crash no meio de um registro deixa só a última linha truncada, que
+    `recuperar` ignora; o registro seguinte a ela é um snapshot. Não é thread-safe:
+    EditorTabs usa uma única thread de gravação.
+    """
+
+    def __init__(self, caminho_documento=None, pasta=PASTA_DIARIO, arquivo=None):
+        self.caminho_documento = caminho_documento
+        self.pasta = pasta
+        self.arquivo = arquivo or os.path.join(pasta, uuid.uuid4().hex + EXTENSAO_DIARIO)
+        self._linhas = None   # Conteúdo do último registro (None = sem snapshot ainda)
+        self._deltas = 0
+        self.bytes_gravados = 0
+
+    @property
+    def texto(self):
+        return None if self._linhas is None else "\n".join(self._linhas)
+
+    def registrar(self, texto, caminho_documento=None):
+        """Grava o estado atual; devolve o tipo do registro ("snapshot"/"delta") ou None."""
+        linhas = texto.split("\n")
+        if self._linhas is None or self._deltas >= SNAPSHOT_A_CADA or caminho_documento != self.caminho_documento:
+            self.caminho_documento = caminho_documento
+            return self._snapshot(linhas)
+        inicio, fim, trecho = _trecho_alterado(self._linhas, linhas)
+        if fim == inicio and not trecho:
+            return None
+        if max(fim - inicio, len(trecho)) > len(linhas) * FRACAO_SNAPSHOT:
+            return self._snapshot(linhas)
+        self._gravar_linha({"tipo": "delta", "t": time.time(), "inicio": inicio, "fim": fim, "linhas": trecho}, anexar=True)
+        self._linhas = linhas
+        self._deltas += 1
+        return "delta"
+
+    def _snapshot(self, linhas):
+        self._gravar_linha({"tipo": "snapshot", "t": time.time(), "caminho": self.caminho_documento,
+                            "linhas": linhas}, anexar=False)
+        self._linhas = linhas
+        self._deltas = 0
+        return "snapshot"
+
+    def _gravar_linha(self, registro, anexar):
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        os.makedirs(self.pasta, exist_ok=True)
+        if anexar:
+            with open(self.arquivo, "a", encoding="utf-8") as f:
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            gravar_atomico(self.arquivo, linha)
+        self.bytes_gravados += len(linha.encode("utf-8"))
+
+    def descartar(self):
+        """Documento salvo (ou descartado pelo usuário): o diário não é mais necessário."""
+        self._linhas = None
+        self._deltas = 0
+        try:
+            os.remove(self.arquivo)
+        except OSError:
+            pass
+
+    @classmethod
+    def recuperar(cls, arquivo):
+        """Reconstrói o documento a partir do diário; None se não houver snapshot legível."""
+        diario = None
+        truncado = False
+        with open(arquivo, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    truncado = True
+                    break  # Registro truncado por um crash: o estado anterior é o que vale
+                if registro.get("tipo") == "snapshot":
+                    diario = cls(registro.get("caminho"), os.path.dirname(arquivo), arquivo)
+                    diario._linhas = registro["linhas"]
+                elif diario is not None and registro.get("tipo") == "delta":
+                    diario._linhas[registro["inicio"]:registro["fim"]] = registro["linhas"]
+                    diario._deltas += 1
+                truncado = not linha.endswith("\n")
+        if diario is not None and truncado:
+            # O próximo delta cairia na mesma linha do lixo: o próximo registro reescreve tudo num snapshot
+            diario._deltas = SNAPSHOT_A_CADA
+        return diario
+
+def diarios_pendentes(pasta=PASTA_DIARIO):
+    """Diários deixados por uma sessão que não salvou (crash ou janela fechada), mais antigos primeiro."""
+    if not os.path.isdir(pasta):
+        return []
+    arquivos = [os.path.join(pasta, nome) for nome in os.listdir(pasta) if nome.endswith(EXTENSAO_DIARIO)]
+    diarios = []
+    for arquivo in sorted(arquivos, key=os.path.getmtime):
+        try:
+            diario = Diario.recuperar(arquivo)
+        except (OSError, ValueError, KeyError, TypeError):
+            diario = None
+        if diario is not None:
+            diarios.append(diario)
+    return diarios
@@ -0,0 +1,1983 @@
+"""Benchmarks do Wandi Studio.
+
+Uso: python benchmarks.py <nome> [<nome> ...]   (sem nome = lista os disponíveis)
+"""
+import math
+import sys
+import time
+
+BENCHMARKS = {}
+
+def benchmark(func):
+    BENCHMARKS[func.__name__.replace("bench_", "")] = func
+    return func
+
+_app = None
+
+def _qt_app():
+    global _app
+    from PyQt6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication(sys.argv[:1])
+    return _app
+
+def gerar_script(linhas):
+    """Script sintético parecido com os nossos scripts de controle de robôs."""
+    modelo = [
+        "from pyfirmata2 import Arduino, util",
+        "board = Arduino('/dev/ttyACM0')",
+        "@decorador",
+        "def loop(passo, limite=10.5):",
+        "    # leitura dos sensores analógicos",
+        "    valor = board.analog[0].read() or 0",
+        "    if valor is not None and valor > 0.5:",
+        "        board.digital[13].write(True)",
+        "    print(\"valor:\", len(str(valor)), range(3))",
+        "    texto = '''bloco'''",
+        "    return int(float(valor) * 1023)",
+    ]
+    return "\n".join(modelo[i % len(modelo)] for i in range(linhas))
+
+def _formatos_do_documento(doc):
+    saida = []
+    block = doc.begin()
+    while block.isValid():
+        saida.append([(r.start, r.length, r.format.foreground().color().name(),
+                       r.format.fontWeight(), r.format.fontItalic())
+                      for r in block.layout().formats()])
+        block = block.next()
+    return saida
+
+@benchmark
+def bench_highlighter(linhas=5000, repeticoes=3):
+    """Blocos/s do tokenizador combinado vs. o loop antigo por regra."""
+    _qt_app()
+    from PyQt6.QtGui import QTextDocument
+    from highlighter import PythonHighlighter
+
+    texto = gerar_script(linhas)
+    resultados = {}
+    for mode in ("per_rule", "combined"):
+        doc = QTextDocument()
+        doc.setPlainText(texto)
+        h = PythonHighlighter(doc, mode=mode)
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            h.rehighlight()
+            melhor = min(melhor, time.perf_counter() - t0)
+        resultados[mode] = (doc.blockCount() / melhor, _formatos_do_documento(doc))
+        print(f"{mode:>9}: {resultados[mode][0]:10.0f} blocos/s ({len(h.rules)} regras globalMatch)")
+
+    print(f"ganho: {resultados['combined'][0] / resultados['per_rule'][0]:.1f}x")
+    identico = resultados["combined"][1] == resultados["per_rule"][1]
+    print("saída idêntica ao modo por regra" if identico else "ATENÇÃO: formatos divergentes!")
+    return identico
+
+@benchmark
+def bench_digitacao(tamanhos=(1000, 10000, 50000)):
+    """Latência de abrir aspas triplas na linha 1 (cascata) vs. tamanho do arquivo."""
+    _qt_app()
+    from PyQt6.QtGui import QTextCursor
+    from highlighter import CodeEditor
+
+    for linhas in tamanhos:
+        editor = CodeEditor()
+        editor.resize(800, 600)
+        editor.setPlainText(gerar_script(linhas))
+        cursor = QTextCursor(editor.document())
+        t0 = time.perf_counter()
+        cursor.insertText('"""')
+        latencia = (time.perf_counter() - t0) * 1000
+        stats = editor.highlight_scheduler.estatisticas()
+        print(f"{linhas:>7} linhas: {latencia:6.2f} ms, {stats['blocos_ultimo_frame']} blocos no frame, "
+              f"{stats['blocos_adiados']} adiados")
+
+def _rss_pico_mb():
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 1024
+
+@benchmark
+def bench_console(linhas=1_000_000, capacidade=10000, min_linhas_s=100_000, max_mb=64):
+    """1M linhas no ConsoleView: memória limitada e taxa mínima de renderização."""
+    app = _qt_app()
+    from console_ui import ConsoleView
+
+    console = ConsoleView(capacidade=capacidade)
+    console.resize(800, 300)
+    # Aquece o widget até a capacidade para o pico de RSS medir só o crescimento
+    console.escrever("aquecimento\n" * capacidade)
+    console.descarregar()
+    rss_inicial = _rss_pico_mb()
+    t0 = time.perf_counter()
+    for i in range(linhas):
+        console.escrever(f"A0={i % 1024} A1={(i * 7) % 1024} t={i}\n")
+        if i % 2000 == 0:
+            app.processEvents()
+    console.descarregar()
+    duracao = time.perf_counter() - t0
+    crescimento = _rss_pico_mb() - rss_inicial
+
+    taxa = linhas / duracao
+    print(f"{taxa:,.0f} linhas/s, {console.descargas} descargas, "
+          f"{console.document().blockCount()} blocos no widget, RSS +{crescimento:.1f} MB")
+    ok = taxa >= min_linhas_s and crescimento <= max_mb and console.document().blockCount() <= capacidade + 1
+    if not ok:
+        print(f"FALHOU: esperado >= {min_linhas_s:,} linhas/s e <= {max_mb} MB")
+    return ok
+
+_FILHO_LINHAS = """
+import sys, time
+for i in range({n}):
+    sys.stdout.write(f"{{time.perf_counter()}} amostra {{i}}\\n")
+    if i % {rajada} == 0:
+        sys.stdout.flush()
+        time.sleep(0.001)
+sys.stdout.flush()
+"""
+
+# Barra de progresso sem nenhum '\n' até o fim
+_FILHO_PROGRESSO = """
+import sys, time
+for p in range(20):
+    sys.stdout.write("#")
+    sys.stdout.flush()
+    time.sleep(0.02)
+sys.stdout.write("\\n")
+"""
+
+def _latencias(textos, agora):
+    return [agora - float(linha.split()[0]) for linha in textos if linha.strip()]
+
+@benchmark
+def bench_leitor_stdout(linhas=100_000, rajada=100):
+    """Eventos/s e latência: leitor por linha (bufsize=1) vs. ChunkedPipeReader."""
+    import subprocess
+    from stream_reader import ChunkedPipeReader
+
+    codigo = _FILHO_LINHAS.format(n=linhas, rajada=rajada)
+    # perf_counter é CLOCK_MONOTONIC no Linux: comparável entre processos
+    for nome in ("por_linha", "em_lote"):
+        eventos, lat = 0, []
+        t0 = time.perf_counter()
+        if nome == "por_linha":
+            p = subprocess.Popen([sys.executable, "-u", "-c", codigo], stdout=subprocess.PIPE,
+                                 text=True, bufsize=1)
+            for linha in p.stdout:
+                eventos += 1
+                lat.extend(_latencias([linha], time.perf_counter()))
+        else:
+            p = subprocess.Popen([sys.executable, "-u", "-c", codigo], stdout=subprocess.PIPE)
+            for texto, _ in ChunkedPipeReader(p.stdout).lotes():
+                eventos += 1
+                lat.extend(_latencias(texto.splitlines(), time.perf_counter()))
+        p.wait()
+        duracao = time.perf_counter() - t0
+        lat.sort()
+        print(f"{nome:>9}: {eventos:7d} eventos ({eventos / duracao:9.0f}/s) para {len(lat)} linhas, "
+              f"latência p50 {lat[len(lat) // 2] * 1000:.2f} ms, p99 {lat[int(len(lat) * 0.99)] * 1000:.2f} ms")
+
+    # Progresso sem '\n': o leitor antigo só vê algo quando a linha termina
+    p = subprocess.Popen([sys.executable, "-u", "-c", _FILHO_PROGRESSO], stdout=subprocess.PIPE,
+                         text=True, bufsize=1)
+    t0 = time.perf_counter()
+    next(iter(p.stdout))
+    print(f"por_linha: primeira atualização de progresso em {(time.perf_counter() - t0) * 1000:.0f} ms")
+    p.wait()
+    p = subprocess.Popen([sys.executable, "-u", "-c", _FILHO_PROGRESSO], stdout=subprocess.PIPE)
+    t0 = time.perf_counter()
+    lotes = ChunkedPipeReader(p.stdout).lotes()
+    next(lotes)
+    print(f"  em_lote: primeira atualização de progresso em {(time.perf_counter() - t0) * 1000:.0f} ms, "
+          f"{1 + sum(1 for _ in lotes)} atualizações")
+    p.wait()
+
+@benchmark
+def bench_runner_aquecido(execucoes=10):
+    """Tempo do Run até a primeira saída: processo novo vs. WarmPythonRunner."""
+    import subprocess
+    from warm_runner import WarmPythonRunner, MODULOS_PESADOS
+
+    # O script importa os mesmos módulos que o reserva pré-carrega
+    imports = "".join(f"try:\n    import {m}\nexcept ImportError:\n    pass\n" for m in MODULOS_PESADOS)
+    codigo = imports + "print('pronto')\n"
+    runner = WarmPythonRunner()
+    tempos = {"frio": [], "aquecido": []}
+    for _ in range(execucoes):
+        t0 = time.perf_counter()
+        p = subprocess.Popen([sys.executable, "-u", "-c", codigo], stdout=subprocess.PIPE)
+        p.stdout.readline()
+        tempos["frio"].append(time.perf_counter() - t0)
+        p.wait()
+
+        runner.aquecer()
+        time.sleep(0.3)  # o usuário leva mais que isso entre um Run e outro
+        t0 = time.perf_counter()
+        p = runner.executar(codigo)
+        p.stdout.readline()
+        tempos["aquecido"].append(time.perf_counter() - t0)
+        p.wait()
+    runner.encerrar()
+    for nome, valores in tempos.items():
+        valores.sort()
+        print(f"{nome:>9}: mediana {valores[len(valores) // 2] * 1000:7.1f} ms até a primeira saída")
+
+def criar_dev_falso(raiz, portas_usb, seriais_placa_mae=4):
+    """Árvore /dev + /sys mínima imitando o udev: by-id, ttyACM*/ttyUSB* e ttyS*."""
+    import os
+    dev, sysfs = os.path.join(raiz, "dev"), os.path.join(raiz, "sys")
+    os.makedirs(os.path.join(dev, "serial", "by-id"), exist_ok=True)
+    os.makedirs(os.path.join(sysfs, "class", "tty"), exist_ok=True)
+    for i in range(seriais_placa_mae):
+        plugar_dev_falso(raiz, f"ttyS{i}", by_id=False)
+    for nome in portas_usb:
+        plugar_dev_falso(raiz, nome)
+    return dev, sysfs
+
+def plugar_dev_falso(raiz, nome, by_id=True):
+    import os
+    open(os.path.join(raiz, "dev", nome), "w").close()
+    os.makedirs(os.path.join(raiz, "sys", "class", "tty", nome, "device"), exist_ok=True)
+    if by_id:
+        os.symlink(f"../../{nome}", os.path.join(raiz, "dev", "serial", "by-id", f"usb-Arduino_Uno_{nome}-if00"))
+
+@benchmark
+def bench_portas(placas=24):
+    """Custo do scan de portas (µs) e reação a hotplug numa árvore /dev falsa."""
+    import subprocess, tempfile, shutil
+    app = _qt_app()
+    from port_watcher import PortWatcher, listar_portas
+
+    raiz = tempfile.mkdtemp()
+    try:
+        dev, sysfs = criar_dev_falso(raiz, [f"ttyACM{i}" for i in range(placas)])
+        custos = []
+        for _ in range(200):
+            t0 = time.perf_counter_ns()
+            portas = listar_portas(dev, sysfs)
+            custos.append((time.perf_counter_ns() - t0) / 1000)
+        custos.sort()
+        print(f"scan in-process: {len(portas)} portas, mediana {custos[len(custos) // 2]:.0f} µs")
+
+        if shutil.which("arduino-cli"):
+            t0 = time.perf_counter()
+            subprocess.run(["arduino-cli", "board", "list"], capture_output=True)
+            print(f"arduino-cli board list (modo antigo): {(time.perf_counter() - t0) * 1e6:.0f} µs")
+
+        watcher = PortWatcher(raiz_dev=dev, raiz_sys=sysfs)
+        eventos = []
+        watcher.ports_signal.connect(eventos.append)
+        watcher.iniciar()
+        scans_partida = watcher.scans  # Um só: escolhe a estratégia e dá a primeira lista
+        t0 = time.perf_counter()
+        plugar_dev_falso(raiz, "ttyUSB0")
+        while len(eventos) < 2 and time.perf_counter() - t0 < 3:
+            app.processEvents()
+            time.sleep(0.001)
+        ok = len(eventos) == 2 and f"{dev}/ttyUSB0" in eventos[-1]
+        print(f"hotplug detectado em {(time.perf_counter() - t0) * 1000:.0f} ms "
+              f"(último scan {watcher.ultimo_custo_us:.0f} µs, {watcher.scans} scans)" if ok else "FALHOU: hotplug não detectado")
+        print(f"partida: {scans_partida} scan(s) antes da primeira lista")
+        if scans_partida != 1:
+            print("FALHOU: iniciar() escaneou mais de uma vez")
+        ok = ok and scans_partida == 1
+        watcher.parar()
+        return ok
+    finally:
+        shutil.rmtree(raiz)
+
+# arduino-cli falso: guarda o "estado instalado" num JSON ao lado do script e
+# simula o tempo de cada comando (FAKE_CLI_ATRASO segundos, padrão 0.05)
+_CLI_FALSO = r'''#!{python}
+import fcntl, json, os, sys, time
+base = os.path.dirname(os.path.abspath(__file__))
+args = sys.argv[1:]
+if args[:1] == ["daemon"]:
+    # Stub do daemon gRPC: paga o "carregamento do índice" uma vez só
+    sys.path.insert(0, {repo!r})
+    import benchmarks
+    time.sleep(float(os.environ.get("FAKE_CLI_ATRASO", "0.05")))
+    benchmarks.daemon_falso(int(args[args.index("--port") + 1]), base)
+    sys.exit(0)
+time.sleep(float(os.environ.get("FAKE_CLI_ATRASO", "0.05")))
+with open(os.path.join(base, "estado.json"), "r+") as f:
+    fcntl.flock(f, fcntl.LOCK_EX)
+    estado = json.load(f)
+    with open(os.path.join(base, "chamadas.log"), "a") as log:
+        log.write(" ".join(args) + "\n")
+    if args[:2] == ["core", "list"]:
+        print(json.dumps([{{"id": c}} for c in estado["cores"]]))
+    elif args[:2] == ["lib", "list"]:
+        print(json.dumps([{{"library": {{"name": l}}}} for l in estado["libs"]]))
+    elif args[:2] == ["board", "list"]:
+        print("[]" if "--format" in args else "")
+    elif args[1:2] == ["install"]:
+        if os.environ.get("FAKE_CLI_LIB_FALHA") in args[2:]:
+            sys.exit(1)  # Lib que não instala (fora do índice, rede caiu no meio...)
+        estado["cores" if args[0] == "core" else "libs"].extend(args[2:])
+        f.seek(0); f.truncate(); json.dump(estado, f)
+if args[:1] == ["compile"]:
+    time.sleep(float(os.environ.get("FAKE_CLI_COMPILE", "0.5")))
+    saida = args[args.index("--output-dir") + 1] if "--output-dir" in args else None
+    if saida:
+        nome = os.path.basename(args[-1].rstrip("/"))
+        for ext in ("hex", "elf"):
+            with open(os.path.join(saida, f"{{nome}}.ino.{{ext}}"), "wb") as b:
+                b.write(os.urandom(32 * 1024))
+    texto = ("Sketch uses 12046 bytes (37%) of program storage space. Maximum is 32256 bytes.\n"
+             "Global variables use 1220 bytes (59%) of dynamic memory, leaving 828 bytes for local variables. "
+             "Maximum is 2048 bytes.\n")
+    if "--format" in args:
+        secoes = [{{"name": "text", "size": 12046, "max_size": 32256}}, {{"name": "data", "size": 1220, "max_size": 2048}}]
+        print(json.dumps({{"compiler_out": texto, "compiler_err": "", "success": True,
+                          "builder_result": {{"executable_sections_size": secoes}}}}, indent=2))
+    else:
+        print(texto, end="")
+elif args[:1] == ["upload"]:
+    # Porta "/dev/ttyX_<ms>" grava em <ms> milissegundos; "FALHA" no nome simula placa com defeito
+    porta = args[args.index("-p") + 1] if "-p" in args else ""
+    atraso = porta.rsplit("_", 1)[-1]
+    atraso = int(atraso) / 1000 if atraso.isdigit() else float(os.environ.get("FAKE_CLI_UPLOAD", "0.3"))
+    if "--input-dir" in args and not os.path.isdir(args[args.index("--input-dir") + 1]):
+        sys.exit(1)
+    # --verbose: saída do avrdude com ruído (FAKE_CLI_RUIDO linhas) e a barra crescendo sem '\n'
+    verbose = "--verbose" in args
+    if verbose:
+        for i in range(int(os.environ.get("FAKE_CLI_RUIDO", "40"))):
+            print(f"         Using Programmer              : arduino  (linha {{i}})")
+        print("avrdude: writing flash (12046 bytes):\n")
+        sys.stdout.write("Writing | ")
+        sys.stdout.flush()
+    for i in range(50):
+        if "FALHA" in porta and i == 10:
+            print("\navrdude: stk500_recv(): programmer is not responding")
+            sys.exit(1)
+        time.sleep(atraso / 50)
+        if verbose:
+            sys.stdout.write("#")
+            sys.stdout.flush()
+    if verbose:
+        print(f" | 100% {{atraso:.2f}}s\n")
+        print("avrdude: 12046 bytes of flash written")
+'''
+
+def criar_cli_falso(pasta, cores=(), libs=()):
+    import json, os
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, "arduino-cli")
+    with open(caminho, "w") as f:
+        f.write(_CLI_FALSO.format(python=sys.executable, repo=os.path.dirname(os.path.abspath(__file__))))
+    os.chmod(caminho, 0o755)
+    with open(os.path.join(pasta, "estado.json"), "w") as f:
+        json.dump({"cores": list(cores), "libs": list(libs)}, f)
+    return caminho
+
+def _chamadas_cli(pasta):
+    import os
+    caminho = os.path.join(pasta, "chamadas.log")
+    return open(caminho).read().splitlines() if os.path.exists(caminho) else []
+
+def daemon_falso(porta, base):
+    """Stub do `arduino-cli daemon`: mesmo serviço gRPC do cli_daemon, respostas sintéticas."""
+    import os, grpc
+    from concurrent import futures
+    from cli_daemon import SERVICO, codificar, decodificar
+
+    def registrar(linha):
+        with open(os.path.join(base, "chamadas.log"), "a") as log:
+            log.write(f"daemon {linha}\n")
+
+    def create(req, ctx):
+        return codificar((1, codificar((1, 1))))
+
+    def init(req, ctx):
+        yield codificar((1, b""))
+
+    def board_list(req, ctx):
+        registrar("board list")
+        detectada = codificar((1, codificar((1, "Arduino Uno"), (2, "arduino:avr:uno"))),
+                              (2, codificar((1, "/dev/ttyACM0"), (3, "serial"))))
+        return codificar((1, detectada))
+
+    def compilar(req, ctx):
+        campos = decodificar(req)
+        sketch, saida = campos[3][0].decode(), campos[18][0].decode()
+        registrar(f"compile {sketch}")
+        time.sleep(float(os.environ.get("FAKE_CLI_COMPILE", "0.5")))
+        nome = os.path.basename(sketch.rstrip("/"))
+        for ext in ("hex", "elf"):
+            with open(os.path.join(saida, f"{nome}.ino.{ext}"), "wb") as b:
+                b.write(os.urandom(32 * 1024))
+        yield codificar((1, b"Sketch uses 12046 "), (1, b"bytes (37%) of program storage space.\n"))
+
+    def upload(req, ctx):
+        campos = decodificar(req)
+        registrar("upload")
+        time.sleep(float(os.environ.get("FAKE_CLI_UPLOAD", "0.3")))
+        if not os.path.isdir(campos[8][0].decode()):
+            ctx.abort(grpc.StatusCode.NOT_FOUND, "input dir não existe")
+        yield codificar((1, b"avrdude done.  Thank you.\n"))
+
+    def lib_install(req, ctx):
+        registrar(f"lib install {decodificar(req)[2][0].decode()}")
+        yield b""
+
+    metodos = {
+        "Create": grpc.unary_unary_rpc_method_handler(create),
+        "Init": grpc.unary_stream_rpc_method_handler(init),
+        "BoardList": grpc.unary_unary_rpc_method_handler(board_list),
+        "Compile": grpc.unary_stream_rpc_method_handler(compilar),
+        "Upload": grpc.unary_stream_rpc_method_handler(upload),
+        "LibraryInstall": grpc.unary_stream_rpc_method_handler(lib_install),
+    }
+    servidor = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    servidor.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(SERVICO.strip("/"), metodos),))
+    servidor.add_insecure_port(f"127.0.0.1:{porta}")
+    servidor.start()
+    servidor.wait_for_termination()
+
+class _SocketFalso:
+    """Substitui socket.create_connection: conecta na hora (ou após `atraso`)."""
+    atraso = 0.0
+
+    def __init__(self, host, timeout=None):
+        time.sleep(min(self.atraso, timeout or self.atraso))
+        if self.atraso:
+            raise OSError("timeout simulado")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+@benchmark
+def bench_build_cache(compilacoes=3):
+    """Compile/upload do Firmata com BuildCache: hits, misses, tempo e despejo LRU."""
+    import os, tempfile, shutil
+    _qt_app()
+    from build_cache import BuildCache
+    from firmata_manager import CachedBuildThread
+
+    pasta = tempfile.mkdtemp()
+    try:
+        cli = criar_cli_falso(os.path.join(pasta, "cli"), ["arduino:avr"], ["Firmata"])
+        sketch = os.path.join(pasta, "StandardFirmata")
+        os.makedirs(sketch)
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "w") as f:
+            f.write("void setup() {}\nvoid loop() {}\n")
+        cache = BuildCache(os.path.join(pasta, "cache"), tamanho_max=100 * 1024)
+        for i in range(compilacoes):
+            porta = "/dev/ttyACM0" if i else None
+            t0 = time.perf_counter()
+            thread = CachedBuildThread(cli, "arduino:avr:uno", sketch, cache, porta)
+            fim = []
+            thread.finished_signal.connect(fim.append)
+            thread.run()
+            print(f"{'upload' if porta else 'compile'} #{i + 1}: {(time.perf_counter() - t0) * 1000:5.0f} ms {fim[0]}")
+        # Sketch alterado: nova chave; o limite de 100 KB força o despejo da entrada antiga
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "a") as f:
+            f.write("// alterado\n")
+        CachedBuildThread(cli, "arduino:avr:uno", sketch, cache).run()
+        stats = cache.estatisticas()
+        print(f"stats: {stats}")
+        chamadas = [c for c in _chamadas_cli(os.path.join(pasta, "cli")) if c.startswith("compile")]
+        print(f"arduino-cli compile chamado {len(chamadas)}x para {compilacoes + 1} builds")
+        return stats["hits"] == compilacoes - 1 and stats["despejos"] >= 1
+    finally:
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_upload_lote(placas=12, max_paralelo=4):
+    """Grava o Firmata em várias placas falsas (tempos variados, algumas com falha)."""
+    import os, random, tempfile, shutil
+    _qt_app()
+    from build_cache import BuildCache
+    from firmata_manager import BatchUploadThread
+
+    pasta = tempfile.mkdtemp()
+    try:
+        cli = criar_cli_falso(os.path.join(pasta, "cli"), ["arduino:avr"], ["Firmata"])
+        sketch = os.path.join(pasta, "StandardFirmata")
+        os.makedirs(sketch)
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "w") as f:
+            f.write("void setup() {}\nvoid loop() {}\n")
+        aleatorio = random.Random(42)
+        portas = [f"/dev/ttyACM{i}{'FALHA' if i % 5 == 4 else ''}_{aleatorio.randint(100, 400)}"
+                  for i in range(placas)]
+        thread = BatchUploadThread(cli, "arduino:avr:uno", sketch, BuildCache(os.path.join(pasta, "cache")),
+                                   portas, max_paralelo)
+        fim = []
+        thread.finished_signal.connect(fim.append)
+        t0 = time.perf_counter()
+        thread.run()
+        duracao = time.perf_counter() - t0
+        soma = sum(d for _, d in thread.resultados.values())
+        for porta in portas:
+            ok, d = thread.resultados[porta]
+            print(f"  {porta:<22} {'ok   ' if ok else 'falha'} {d * 1000:5.0f} ms")
+        print(f"{fim[0]} em {duracao:.2f} s (sequencial seria ~{soma:.2f} s + compile)")
+        compiles = [c for c in _chamadas_cli(os.path.join(pasta, "cli")) if c.startswith("compile")]
+        esperado = {p: "FALHA" not in p for p in portas}
+        ok = len(compiles) == 1 and {p: r[0] for p, r in thread.resultados.items()} == esperado
+        if not ok:
+            print(f"FALHOU: {len(compiles)} compiles ou resultado por porta incorreto")
+        return ok
+    finally:
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_progresso(ruido=5000):
+    """Compile + upload verbose: eventos de progresso tipados x linhas cruas enviadas à UI."""
+    import os, tempfile, shutil
+    _qt_app()
+    from build_cache import BuildCache
+    from firmata_manager import CachedBuildThread
+
+    pasta = tempfile.mkdtemp()
+    antes = os.environ.get("FAKE_CLI_RUIDO")
+    os.environ["FAKE_CLI_RUIDO"] = str(ruido)
+    try:
+        cli = criar_cli_falso(os.path.join(pasta, "cli"), ["arduino:avr"], ["Firmata"])
+        sketch = os.path.join(pasta, "StandardFirmata")
+        os.makedirs(sketch)
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "w") as f:
+            f.write("void setup() {}\nvoid loop() {}\n")
+        ok = True
+        for bruto in (True, False):
+            for porta in ("/dev/ttyACM0_1000", "/dev/ttyACM1FALHA_500"):
+                cache = BuildCache(os.path.join(pasta, f"cache-{bruto}"))
+                thread = CachedBuildThread(cli, "arduino:avr:uno", sketch, cache, porta)
+                thread.texto_bruto = bruto
+                logs, eventos, fim = [], [], []
+                thread.log_signal.connect(logs.append)
+                thread.progresso_signal.connect(lambda origem, e: eventos.append(e))
+                thread.finished_signal.connect(fim.append)
+                thread.run()
+                etapas = {}
+                for e in eventos:
+                    etapas[e.etapa] = etapas.get(e.etapa, 0) + 1
+                modo = "bruto " if bruto else "parser"
+                print(f"{modo} {porta:<22}: {len(logs) + len(eventos):5d} eventos de UI "
+                      f"({len(logs)} linhas de log, {len(eventos)} de progresso {etapas}) {fim[0]}")
+                if not bruto and "FALHA" not in porta:
+                    compilado = [e for e in eventos if e.etapa == "compilado"][-1].como_dict()
+                    ultimo = eventos[-1].como_dict()
+                    print(f"       compile: {compilado}\n       upload : {ultimo}")
+                    ok = ok and len(logs) < 10 and len(eventos) <= 40 and ultimo.get("bytes_gravados") == 12046 \
+                        and compilado.get("flash_usada") == 12046 and compilado.get("ram_max") == 2048
+                if not bruto and "FALHA" in porta:
+                    ok = ok and any("not responding" in l for l in logs) and fim[0].startswith("❌")
+        if not ok:
+            print("FALHOU: eventos de progresso incompletos ou log sem o erro do avrdude")
+        return ok
+    finally:
+        if antes is None:
+            os.environ.pop("FAKE_CLI_RUIDO", None)
+        else:
+            os.environ["FAKE_CLI_RUIDO"] = antes
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_bootstrap(max_quente_s=1.0):
+    """Bootstrap da engine a frio (tudo faltando) e a quente (tudo instalado), com CLI falso."""
+    import os, tempfile, shutil
+    _qt_app()
+    from arduino_engine import EngineWorker
+    from connectivity import ConnectivityProbe
+
+    pasta = tempfile.mkdtemp()
+    try:
+        cli = criar_cli_falso(pasta)
+        for nome in ("frio", "quente"):
+            worker = EngineWorker(cli, pasta, conectividade=ConnectivityProbe(conector=_SocketFalso))
+            logs = []
+            worker.log_signal.connect(lambda texto, status: logs.append(texto))
+            t0 = time.perf_counter()
+            worker.run()
+            duracao = time.perf_counter() - t0
+            etapas = ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in worker.tempos_etapas.items())
+            print(f"{nome:>6}: {duracao * 1000:6.0f} ms, {len(_chamadas_cli(pasta))} chamadas ao CLI ({etapas})")
+            open(f"{pasta}/chamadas.log", "w").close()
+        ok = duracao < max_quente_s
+        if not ok:
+            print(f"FALHOU: bootstrap a quente acima de {max_quente_s} s")
+
+        # Uma lib que não instala: o bootstrap não pode dizer que ficou pronto
+        from engine_bootstrap import EngineBootstrap
+        criar_cli_falso(pasta)
+        os.environ["FAKE_CLI_LIB_FALHA"] = "NewPing"
+        logs = []
+        try:
+            pronto = EngineBootstrap(cli, conectividade=ConnectivityProbe(conector=_SocketFalso),
+                                     log=lambda texto, status: logs.append(texto)).executar()
+        finally:
+            os.environ.pop("FAKE_CLI_LIB_FALHA")
+        incompleto = not pronto and not any("PRONTO" in l for l in logs) and any("NewPing" in l and "faltam" in l for l in logs)
+        print(f"lib quebrada: executar() -> {pronto}; {logs[-1].split('] ', 1)[1]}")
+        if not incompleto:
+            print("FALHOU: bootstrap deu PRONTO com uma lib faltando")
+        return ok and incompleto
+    finally:
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_offline(max_local_s=1.0):
+    """Partida a frio com a rede travada: a fase local nunca espera o probe."""
+    import tempfile, shutil
+    _qt_app()
+    from arduino_engine import EngineWorker, CORES, BIBLIOTECAS_HELPER, BIBLIOTECAS_FIRMATA
+    from connectivity import ConnectivityProbe
+
+    class _RedeTravada(_SocketFalso):
+        atraso = 2.0  # Igual ao timeout antigo do check_internet
+
+    pasta = tempfile.mkdtemp()
+    try:
+        ok = True
+        cenarios = [("tudo instalado", CORES, BIBLIOTECAS_HELPER + BIBLIOTECAS_FIRMATA, None),
+                    ("faltando libs, offline forçado", CORES, [], True)]
+        for nome, cores, libs, forcar in cenarios:
+            cli = criar_cli_falso(pasta, cores, libs)
+            probe = ConnectivityProbe(conector=_RedeTravada, forcar_offline=forcar)
+            worker = EngineWorker(cli, pasta, conectividade=probe)
+            marcas = {}
+            t0 = time.perf_counter()
+            worker.pronto_local_signal.connect(lambda: marcas.setdefault("local", time.perf_counter() - t0))
+            worker.run()
+            total = time.perf_counter() - t0
+            print(f"{nome}: pronto local em {marcas.get('local', float('nan')) * 1000:.0f} ms, "
+                  f"bootstrap em {total * 1000:.0f} ms, probes concluídos: {probe.probes}")
+            ok = ok and marcas.get("local", 99) < max_local_s and total < max_local_s
+        if not ok:
+            print(f"FALHOU: partida bloqueou na rede (> {max_local_s} s)")
+        return ok
+    finally:
+        shutil.rmtree(pasta)
+
+def servidor_downloads(arquivos, queda_a_cada=2, queda_apos=300 * 1024, sem_range=False, curtos=None):
+    """Servidor HTTP local com Range que derruba 1 de cada `queda_a_cada` respostas
+    grandes depois de `queda_apos` bytes. /arduino-cli_latest_<resto> redireciona para a versão.
+    `sem_range`: ignora o Range; `curtos`: nome -> bytes que o GET entrega (o HEAD anuncia tudo).
+    Devolve (servidor, url_base, contadores)."""
+    curtos = curtos or {}
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    contadores = {"gets": 0, "grandes": 0, "quedas": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _cabecalhos(self, get=False):
+            nome = self.path.lstrip("/")
+            if nome.startswith("arduino-cli_latest_"):
+                versao = next(n for n in arquivos if n.endswith(nome[len("arduino-cli_latest_"):]))
+                self.send_response(302)
+                self.send_header("Location", "/" + versao)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            if nome not in arquivos:
+                self.send_error(404)
+                return None
+            dados = arquivos[nome]
+            if get and nome in curtos:
+                dados = dados[:curtos[nome]]
+            inicio, fim = 0, len(dados) - 1
+            faixa = None if sem_range else self.headers.get("Range")
+            if faixa:
+                a, b = faixa.split("=", 1)[1].split("-")
+                inicio, fim = int(a), int(b) if b else len(dados) - 1
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(dados)}")
+            else:
+                self.send_response(200)
+            if not sem_range:
+                self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(fim - inicio + 1))
+            self.end_headers()
+            return dados[inicio:fim + 1]
+
+        def do_HEAD(self):
+            self._cabecalhos()
+
+        def do_GET(self):
+            corpo = self._cabecalhos(get=True)
+            if corpo is None:
+                return
+            with lock:
+                contadores["gets"] += 1
+                if len(corpo) > queda_apos:
+                    contadores["grandes"] += 1
+                cair = queda_a_cada and len(corpo) > queda_apos and contadores["grandes"] % queda_a_cada == 1
+            if cair:
+                corpo = corpo[:queda_apos]
+                self.close_connection = True
+                with lock:
+                    contadores["quedas"] += 1
+            self.wfile.write(corpo)
+            with lock:
+                contadores["bytes"] += len(corpo)
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}", contadores
+
+@benchmark
+def bench_download(tamanho_mb=8):
+    """Download da engine com quedas de conexão: retomada, partes paralelas, sha256 e extração."""
+    import hashlib, io, os, tarfile, tempfile, shutil, zipfile
+    from downloader import Downloader, ErroDownload, extrair_binario
+
+    binario = os.urandom(tamanho_mb * 1024 * 1024)
+    lixo = os.urandom(2 * 1024 * 1024)
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as t:
+        for nome, dados in (("LICENSE.txt", lixo), ("arduino-cli", binario)):
+            info = tarfile.TarInfo(nome)
+            info.size = len(dados)
+            t.addfile(info, io.BytesIO(dados))
+    tar = buf.getvalue()
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("LICENSE.txt", lixo)
+        z.writestr("arduino-cli.exe", binario)
+    arquivos = {"arduino-cli_1.2.3_Linux_64bit.tar.gz": tar, "arduino-cli_1.2.3_Windows_64bit.zip": buf.getvalue()}
+    checks = "".join(f"{hashlib.sha256(d).hexdigest()}  {n}\n" for n, d in arquivos.items())
+    arquivos["arduino-cli_1.2.3_checksums.txt"] = checks.encode()
+
+    servidor, base, contadores = servidor_downloads(arquivos)
+    pasta = tempfile.mkdtemp()
+    ok = True
+    try:
+        for nome, artefato, binario_nome, partes in (("tar.gz, 4 partes", "Linux_64bit.tar.gz", "arduino-cli", 4),
+                                                     ("zip, 1 parte", "Windows_64bit.zip", "arduino-cli.exe", 1)):
+            destino = os.path.join(pasta, "engine.tmp")
+            inicio = dict(contadores)
+            d = Downloader(partes=partes)
+            t0 = time.perf_counter()
+            d.baixar_verificado(f"{base}/arduino-cli_latest_{artefato}", destino)
+            caminho = extrair_binario(destino, binario_nome, pasta)
+            duracao = time.perf_counter() - t0
+            certo = open(caminho, "rb").read() == binario and sorted(os.listdir(pasta)) == sorted([binario_nome, "engine.tmp"])
+            print(f"{nome:<17}: {duracao * 1000:5.0f} ms, {contadores['quedas'] - inicio['quedas']} quedas, "
+                  f"{d.reconexoes} retomadas, {d.bytes_rede / 1e6:.1f} MB pela rede, binário {'ok' if certo else 'ERRADO'}")
+            ok = ok and certo and d.reconexoes > 0
+            os.remove(destino)
+            os.remove(caminho)
+
+        # Programa fechado no meio do download: a próxima execução continua das partes no disco
+        destino = os.path.join(pasta, "engine.tmp")
+        url = f"{base}/arduino-cli_latest_Linux_64bit.tar.gz"
+        class Fechado(Exception):
+            pass
+        def fechar(baixados, total):
+            if baixados > total // 2:
+                raise Fechado()
+        try:
+            Downloader(partes=2, progresso=fechar).baixar(url, destino)
+        except Fechado:
+            pass
+        no_disco = sum(os.path.getsize(os.path.join(pasta, n)) for n in os.listdir(pasta) if ".part" in n and not n.endswith(".partes"))
+        d = Downloader(partes=2)
+        d.baixar_verificado(url, destino)
+        print(f"retomada entre execuções: {no_disco / 1e6:.1f} MB reaproveitados, "
+              f"{d.bytes_rede / 1e6:.1f} MB baixados na segunda execução (arquivo {len(tar) / 1e6:.1f} MB)")
+        ok = ok and no_disco > 0 and d.bytes_rede < len(tar) * 0.75
+        os.remove(destino)
+
+        # Arquivo adulterado no servidor: o checksum recusa e nada fica no disco
+        arquivos["arduino-cli_1.2.3_Linux_64bit.tar.gz"] = tar[:1000] + bytes([tar[1000] ^ 0xFF]) + tar[1001:]
+        try:
+            Downloader().baixar_verificado(url, destino)
+            recusado = False
+        except ErroDownload as e:
+            recusado = not os.listdir(pasta)
+            print(f"adulterado: {e}")
+        ok = ok and recusado
+    finally:
+        servidor.shutdown()
+
+    # Servidor sem Range: cada queda recomeça do zero e o progresso não passa do total
+    artefato = "arduino-cli_1.2.3_Linux_64bit.tar.gz"
+    servidor, base, contadores = servidor_downloads({artefato: tar}, sem_range=True)
+    try:
+        progresso = []
+        d = Downloader(progresso=lambda baixados, total: progresso.append((baixados, total)))
+        d.baixar(f"{base}/{artefato}", destino)
+        certo = open(destino, "rb").read() == tar and max(b for b, _ in progresso) <= len(tar)
+        print(f"sem Range: {contadores['quedas']} quedas, {d.bytes_rede / 1e6:.1f} MB pela rede, "
+              f"progresso máximo {max(b for b, _ in progresso) / len(tar):.0%}")
+        ok = ok and certo and contadores["quedas"] > 0
+        os.remove(destino)
+    finally:
+        servidor.shutdown()
+
+    # Sem Range e o GET entrega menos do que o HEAD anunciou: erro de tamanho, nada no disco
+    servidor, base, _ = servidor_downloads({artefato: tar}, queda_a_cada=0, sem_range=True,
+                                           curtos={artefato: len(tar) - 1000})
+    try:
+        try:
+            Downloader().baixar(f"{base}/{artefato}", destino)
+            erro = None
+        except ErroDownload as e:
+            erro = str(e)
+        print(f"corpo curto: {erro}")
+        ok = ok and erro is not None and "Tamanho incorreto" in erro and not os.listdir(pasta)
+        if not ok:
+            print("FALHOU: download, retomada ou verificação incorreta")
+        return ok
+    finally:
+        servidor.shutdown()
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_engine(instancias=3):
+    """Resolver da engine: artefato por plataforma, custo memoizado e instalações simultâneas na loja."""
+    import hashlib, io, os, tarfile, tempfile, shutil, threading
+    import engine_resolver
+    from downloader import Downloader
+
+    for plataforma in (("Windows", "AMD64"), ("Linux", "x86_64"), ("Linux", "aarch64"),
+                       ("Linux", "armv7l"), ("Darwin", "arm64")):
+        print(f"{'/'.join(plataforma):<16} -> {engine_resolver.artefato_engine(*plataforma).rsplit('/', 1)[-1]}")
+
+    binario = os.urandom(4 * 1024 * 1024)
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as t:
+        info = tarfile.TarInfo("arduino-cli")
+        info.size = len(binario)
+        t.addfile(info, io.BytesIO(binario))
+    sistema, maquina = engine_resolver.plataforma_atual()
+    artefato = engine_resolver.artefato_engine(sistema, maquina).rsplit("/", 1)[-1].replace("latest", "1.2.3")
+    arquivos = {artefato: buf.getvalue()}
+    arquivos["arduino-cli_1.2.3_checksums.txt"] = f"{hashlib.sha256(buf.getvalue()).hexdigest()}  {artefato}\n".encode()
+
+    servidor, base, contadores = servidor_downloads(arquivos, queda_a_cada=0)
+    loja = tempfile.mkdtemp()
+    antes = (engine_resolver.URL_BASE_ENGINE, os.environ.get("WANDI_TOOLCHAIN_DIR"), os.environ.get("PATH"))
+    engine_resolver.URL_BASE_ENGINE = base
+    os.environ["WANDI_TOOLCHAIN_DIR"] = loja
+    os.environ["PATH"] = ""
+    engine_resolver.invalidar()
+    try:
+        t0 = time.perf_counter_ns()
+        ausente = engine_resolver.caminho_arduino_cli()
+        frio = (time.perf_counter_ns() - t0) / 1000
+        caminhos = []
+        threads = [threading.Thread(target=lambda: caminhos.append(engine_resolver.instalar_engine(Downloader())))
+                   for _ in range(instancias)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        t0 = time.perf_counter_ns()
+        for _ in range(1000):
+            resolvido = engine_resolver.caminho_arduino_cli()
+        memo = (time.perf_counter_ns() - t0) / 1000 / 1000
+        pastas = [n for n in os.listdir(os.path.join(loja, "arduino-cli")) if n.startswith("1.2.3-")]
+        print(f"sem engine: {ausente} ({frio:.0f} us); {instancias} instalações simultâneas -> "
+              f"{len(set(caminhos))} caminho(s), {len(pastas)} pasta(s), "
+              f"{contadores['bytes'] / len(arquivos[artefato]):.2f}x o pacote servido")
+        print(f"resolvido: {os.path.relpath(resolvido, loja)} ({memo:.2f} us por chamada memoizada)")
+        ok = (ausente is None and set(caminhos) == {resolvido} and len(pastas) == 1
+              and open(resolvido, "rb").read() == binario)
+        if not ok:
+            print("FALHOU: instalação concorrente ou resolução incorreta")
+        return ok
+    finally:
+        engine_resolver.URL_BASE_ENGINE = antes[0]
+        for chave, valor in (("WANDI_TOOLCHAIN_DIR", antes[1]), ("PATH", antes[2])):
+            if valor is None:
+                os.environ.pop(chave, None)
+            else:
+                os.environ[chave] = valor
+        engine_resolver.invalidar()
+        servidor.shutdown()
+        shutil.rmtree(loja)
+
+@benchmark
+def bench_daemon(repeticoes=5, atraso_indice=0.3):
+    """Latência de board list e compile: daemon gRPC (stub) x um arduino-cli por comando."""
+    import os, statistics, subprocess, tempfile, shutil
+    _qt_app()
+    import cli_daemon
+    from build_cache import BuildCache
+    from firmata_manager import CachedBuildThread
+
+    pasta = tempfile.mkdtemp()
+    antes = {k: os.environ.get(k) for k in ("FAKE_CLI_ATRASO", "FAKE_CLI_COMPILE", "FAKE_CLI_UPLOAD")}
+    # Cada spawn "relê o índice" (FAKE_CLI_ATRASO); o daemon só na partida
+    os.environ.update(FAKE_CLI_ATRASO=str(atraso_indice), FAKE_CLI_COMPILE="0.1", FAKE_CLI_UPLOAD="0.05")
+    try:
+        cli = criar_cli_falso(os.path.join(pasta, "cli"), ["arduino:avr"], ["Firmata"])
+        sketch = os.path.join(pasta, "StandardFirmata")
+        os.makedirs(sketch)
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "w") as f:
+            f.write("void setup() {}\nvoid loop() {}\n")
+
+        def medir(func):
+            tempos = []
+            for _ in range(repeticoes):
+                t0 = time.perf_counter()
+                func()
+                tempos.append((time.perf_counter() - t0) * 1000)
+            return statistics.median(tempos)
+
+        def compilar_spawn():
+            with tempfile.TemporaryDirectory() as saida:
+                subprocess.run([cli, "compile", "--fqbn", "arduino:avr:uno", "--output-dir", saida, sketch],
+                               capture_output=True)
+        spawn = (medir(lambda: subprocess.run([cli, "board", "list", "--format", "json"], capture_output=True)),
+                 medir(compilar_spawn))
+        print(f"spawn : board list {spawn[0]:6.0f} ms, compile {spawn[1]:6.0f} ms (mediana de {repeticoes})")
+
+        # Formato no fio, conferido com os números de campo dos .proto do arduino-cli 1.x
+        # (compile.proto / upload.proto / port.proto), escritos aqui de forma independente
+        compile_proto = {"instance": 1, "fqbn": 2, "sketch_path": 3, "build_path": 7, "export_dir": 18}
+        upload_proto = {"instance": 1, "fqbn": 2, "sketch_path": 3, "port": 4, "import_dir": 8}
+        port_proto = {"address": 1, "protocol": 3}
+        instancia = cli_daemon.codificar((1, 7))
+        requisicao = cli_daemon.decodificar(cli_daemon.requisicao_compilar(instancia, "arduino:avr:uno", sketch, "/tmp/saida"))
+        formato_ok = requisicao == {compile_proto["instance"]: [instancia], compile_proto["fqbn"]: [b"arduino:avr:uno"],
+                                    compile_proto["sketch_path"]: [sketch.encode()], compile_proto["export_dir"]: [b"/tmp/saida"]}
+        requisicao = cli_daemon.decodificar(cli_daemon.requisicao_upload(instancia, "arduino:avr:uno", sketch, "/dev/ttyACM0", "/tmp/bin"))
+        porta = cli_daemon.decodificar(requisicao.pop(upload_proto["port"])[0])
+        formato_ok &= requisicao == {upload_proto["instance"]: [instancia], upload_proto["fqbn"]: [b"arduino:avr:uno"],
+                                     upload_proto["sketch_path"]: [sketch.encode()], upload_proto["import_dir"]: [b"/tmp/bin"]} \
+            and porta == {port_proto["address"]: [b"/dev/ttyACM0"], port_proto["protocol"]: [b"serial"]}
+        print(f"CompileRequest/UploadRequest com os números de campo do arduino-cli: {formato_ok}")
+        if not formato_ok:
+            print("FALHOU: requisição gRPC com campo errado")
+            return False
+
+        try:
+            import grpc
+        except ImportError:
+            print("grpcio não instalado: backend daemon indisponível, o IDE usa só o spawn")
+            return True
+
+        t0 = time.perf_counter()
+        daemon = cli_daemon.DaemonCli(cli).iniciar()
+        partida = (time.perf_counter() - t0) * 1000
+        try:
+            def compilar_daemon():
+                with tempfile.TemporaryDirectory() as saida:
+                    assert daemon.compilar("arduino:avr:uno", sketch, saida, saida=lambda l: None) == 0
+            fqbns = daemon.board_list()
+            rapido = (medir(daemon.board_list), medir(compilar_daemon))
+            print(f"daemon: board list {rapido[0]:6.0f} ms, compile {rapido[1]:6.0f} ms (partida única {partida:.0f} ms)")
+            print(f"board list {fqbns}")
+        finally:
+            daemon.encerrar()
+
+        # Ponta a ponta: CachedBuildThread compila e grava pelo daemon compartilhado
+        cli_daemon.ATIVO = True
+        compiles_antes = len([c for c in _chamadas_cli(os.path.join(pasta, "cli")) if c.startswith("daemon compile")])
+        logs = []
+        thread = CachedBuildThread(cli, "arduino:avr:uno", sketch, BuildCache(os.path.join(pasta, "cache")), "/dev/ttyACM0")
+        thread.log_signal.connect(logs.append)
+        fim = []
+        thread.finished_signal.connect(fim.append)
+        thread.run()
+        pelo_daemon = len([c for c in _chamadas_cli(os.path.join(pasta, "cli")) if c.startswith("daemon compile")]) - compiles_antes
+        print(f"CachedBuildThread: {fim[0]} ({pelo_daemon} compile pelo daemon) {logs[-2:]}")
+        ok = rapido[0] < spawn[0] and rapido[1] < spawn[1] and fim[0].startswith("✅") and pelo_daemon \
+            and fqbns == {"/dev/ttyACM0": "arduino:avr:uno"}
+        if not ok:
+            print("FALHOU: daemon não foi mais rápido ou a compilação ponta a ponta falhou")
+        return ok
+    finally:
+        cli_daemon.ATIVO = False
+        cli_daemon.encerrar_todos()
+        for chave, valor in antes.items():
+            if valor is None:
+                os.environ.pop(chave, None)
+            else:
+                os.environ[chave] = valor
+        shutil.rmtree(pasta)
+
+@benchmark
+def bench_cli_partida(repeticoes=10):
+    """Partida do `python -m wandi_cli` (sem Qt) contra o orçamento, e códigos de saída/JSON."""
+    import json, os, statistics, subprocess, tempfile, shutil
+    from wandi_cli import ORCAMENTO_PARTIDA_MS, SAIDA_OK, SAIDA_FALHA, SAIDA_USO, SAIDA_SEM_ENGINE
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    def medir(cmd):
+        t0 = time.perf_counter()
+        r = subprocess.run(cmd, cwd=repo, capture_output=True, text=True)
+        return r, (time.perf_counter() - t0) * 1000
+
+    def rodar(*args):
+        return medir([sys.executable, "-m", "wandi_cli", *args])
+
+    vazio = statistics.median(medir([sys.executable, "-c", "pass"])[1] for _ in range(3))
+    tempos = [rodar("--json", "portas")[1] for _ in range(repeticoes)]
+    mediana = statistics.median(tempos)
+    print(f"portas --json: mediana {mediana:.0f} ms (python vazio {vazio:.0f} ms, orçamento {ORCAMENTO_PARTIDA_MS} ms)")
+
+    # Nenhum módulo do caminho headless pode puxar Qt (nem requests, que só o download usa)
+    codigo = ("import sys, wandi_cli, firmata_core, engine_bootstrap, serial_ports, stream_reader; "
+              "print(sorted(m for m in sys.modules if m.split('.')[0] in ('PyQt6', 'requests')))")
+    pesados = subprocess.run([sys.executable, "-c", codigo], cwd=repo, capture_output=True, text=True).stdout.strip()
+    print(f"módulos pesados importados: {pesados}")
+
+    pasta = tempfile.mkdtemp()
+    try:
+        cli = criar_cli_falso(os.path.join(pasta, "cli"), ["arduino:avr"], ["Firmata"])
+        sketch = os.path.join(pasta, "StandardFirmata")
+        os.makedirs(sketch)
+        with open(os.path.join(sketch, "StandardFirmata.ino"), "w") as f:
+            f.write("void setup() {}\nvoid loop() {}\n")
+        comum = ["--json", "--cli", cli]
+        build = ["--sketch", sketch, "--cache", os.path.join(pasta, "cache")]
+        casos = [
+            ("compile", [*comum, "compile", *build], SAIDA_OK),
+            ("upload lote", [*comum, "upload", *build, "--porta", "/dev/ttyACM0_100",
+                             "--porta", "/dev/ttyACM1FALHA_100"], SAIDA_FALHA),
+            ("engine ausente", ["--json", "--cli", os.path.join(pasta, "nada"), "compile", *build], SAIDA_SEM_ENGINE),
+            ("uso incorreto", ["upload", "--sketch", sketch], SAIDA_USO),
+        ]
+        ok = mediana <= ORCAMENTO_PARTIDA_MS and pesados == "[]"
+        for nome, args, esperado in casos:
+            r, ms = rodar(*args)
+            linhas = [json.loads(l) for l in r.stdout.splitlines()] if esperado != SAIDA_USO else []
+            final = linhas[-1] if linhas else {}
+            tipos = sorted({l["tipo"] for l in linhas})
+            print(f"  {nome:<15} saída {r.returncode} (esperado {esperado}) {ms:5.0f} ms tipos={tipos} "
+                  f"{ {k: v for k, v in final.items() if k in ('ok', 'portas', 'codigo')} }")
+            ok = ok and r.returncode == esperado and (esperado == SAIDA_USO or final.get("tipo") == "resultado")
+        compiles = [c for c in _chamadas_cli(os.path.join(pasta, "cli")) if c.startswith("compile")]
+        ok = ok and len(compiles) == 1  # O upload reaproveitou o build do compile pelo cache
+        if not ok:
+            print("FALHOU: partida acima do orçamento, Qt importado ou código de saída/JSON incorreto")
+        return ok
+    finally:
+        shutil.rmtree(pasta)
+
+_PARTIDA_IDE = r"""
+import json, sys, time
+sys.path.insert(0, {repo!r})
+import interface
+from startup_profile import PERFIL
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+PESADOS = ("arduino_engine", "firmata_manager", "port_watcher", "firmata_ui", "engine_bootstrap")
+app = QApplication(sys.argv[:1])
+janela = interface.MeuEditor()
+na_pintura = []
+
+class Espiao(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not na_pintura:
+            na_pintura.append(sorted(m for m in PESADOS if m in sys.modules))
+        return False
+
+espiao = Espiao()
+janela.centralWidget().installEventFilter(espiao)
+
+def fim():
+    worker = janela.engine_overlay.worker
+    worker.wait(5000)
+    print(json.dumps(dict(PERFIL.como_dict(), na_pintura=na_pintura[0] if na_pintura else None)))
+    app.quit()
+
+janela.partida_concluida.connect(lambda: QTimer.singleShot(0, fim))
+janela.show()
+app.exec()
+janela.port_watcher.parar()
+"""
+
+@benchmark
+def bench_partida(max_pintura_ms=1500):
+    """Primeira pintura da IDE sem engine/portas/Firmata carregados; subsistemas sobem depois."""
+    import json, os, subprocess, tempfile, shutil
+
+    pasta = tempfile.mkdtemp()
+    try:
+        env = dict(os.environ, HOME=pasta, WANDI_OFFLINE="1", QT_QPA_PLATFORM="offscreen",
+                   WANDI_TOOLCHAIN_DIR=os.path.join(pasta, "toolchains"))
+        env.pop("WANDI_ARDUINO_CLI", None)
+        repo = os.path.dirname(os.path.abspath(__file__))
+        r = subprocess.run([sys.executable, "-c", _PARTIDA_IDE.format(repo=repo)], env=env, cwd=pasta,
+                           capture_output=True, text=True, timeout=60)
+        linhas = [l for l in r.stdout.splitlines() if l.startswith("{")]
+        if not linhas:
+            print(f"FALHOU: a IDE não terminou a partida\n{r.stderr[-2000:]}")
+            return False
+        perfil = json.loads(linhas[-1])
+        marcas = perfil["marcas"]
+        adiados = {e["nome"]: e["ms"] for e in perfil["etapas"] if e["grupo"] == "subsistemas"}
+        imports = {e["nome"]: e["ms"] for e in perfil["etapas"] if e["grupo"] == "import"}
+        print(f"primeira pintura: {marcas['primeira pintura']:.0f} ms; "
+              f"subsistemas iniciados: {marcas['subsistemas iniciados']:.0f} ms")
+        print(f"fora do caminho crítico: {sum(adiados.values()):.0f} ms {adiados}")
+        print(f"imports: {imports}")
+        print(f"módulos pesados carregados antes da primeira pintura: {perfil['na_pintura']}")
+        ok = perfil["na_pintura"] == [] and marcas["primeira pintura"] < marcas["subsistemas iniciados"] \
+            and marcas["primeira pintura"] <= max_pintura_ms and len(adiados) >= 3
+        if not ok:
+            print("FALHOU: algo pesado subiu antes da primeira pintura (ou a pintura passou do limite)")
+        return ok
+    finally:
+        shutil.rmtree(pasta)
+
+def _rss_atual_mb():
+    """RSS de agora (Linux); em outros sistemas cai no pico."""
+    try:
+        with open("/proc/self/statm") as f:
+            import os
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return _rss_pico_mb()
+
+_ABAS_IDE = r"""
+import json, sys, time
+sys.path.insert(0, {repo!r})
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+import benchmarks
+from highlighter import CodeEditor, RegrasHighlight
+from editor_tabs import EditorTabs
+
+if sys.argv[1] == "manter":
+    CodeEditor.hibernar = lambda self: None  # Comportamento sem hibernação (referência)
+
+def ocioso(editor):
+    # Roda o event loop até o highlight em fatias terminar (usuário olhou a aba)
+    while editor.highlight_scheduler.sujo_desde is not None or not editor.highlight_scheduler.contadores["frames"]:
+        app.processEvents()
+        time.sleep(0.001)
+
+abas = EditorTabs()
+abas.resize(900, 700); abas.show(); app.processEvents()
+texto = benchmarks.gerar_script({linhas})
+compilacoes = RegrasHighlight.compilacoes
+rss = [benchmarks._rss_atual_mb()]
+for i in range({n}):
+    editor = abas.novo(texto, f"/tmp/robo{{i}}.py")
+    ocioso(editor)
+    rss.append(benchmarks._rss_atual_mb())
+# Volta à primeira aba: tem que ser destacada de novo
+abas.setCurrentIndex(0)
+t0 = time.perf_counter()
+app.processEvents()
+volta_ms = (time.perf_counter() - t0) * 1000
+primeiro = abas.widget(0).document().firstBlock()
+print(json.dumps({{"rss": rss, "compilacoes": RegrasHighlight.compilacoes - compilacoes,
+                  "volta_ms": volta_ms, "formatos_na_volta": len(primeiro.layout().formats()),
+                  "hibernadas": sum(e.hibernando for e in abas.editores())}}))
+"""
+
+@benchmark
+def bench_abas(abas=12, linhas=3000):
+    """Memória por aba aberta com e sem hibernação das abas inativas; regras compiladas uma vez."""
+    import json, os, subprocess
+    repo = os.path.dirname(os.path.abspath(__file__))
+    codigo = _ABAS_IDE.format(repo=repo, n=abas, linhas=linhas)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    dados = {}
+    for modo in ("manter", "hibernar"):
+        r = subprocess.run([sys.executable, "-c", codigo, modo], env=env, capture_output=True, text=True, timeout=300)
+        linhas_json = [l for l in r.stdout.splitlines() if l.startswith("{")]
+        if not linhas_json:
+            print(f"FALHOU ({modo}):\n{r.stderr[-2000:]}")
+            return False
+        d = dados[modo] = json.loads(linhas_json[-1])
+        # A 1ª aba paga a criação de caches do Qt; a média vem das seguintes
+        por_aba = (d["rss"][-1] - d["rss"][1]) / (abas - 1)
+        d["por_aba"] = por_aba
+        print(f"{modo:<9}: {por_aba:6.2f} MB/aba ({linhas} linhas), total {d['rss'][-1] - d['rss'][0]:6.1f} MB "
+              f"para {abas} abas; regras compiladas {d['compilacoes']}x; "
+              f"volta à 1ª aba {d['volta_ms']:.1f} ms ({d['formatos_na_volta']} formatos no 1º bloco); "
+              f"{d['hibernadas']} hibernadas")
+    h, m = dados["hibernar"], dados["manter"]
+    ok = h["compilacoes"] <= 1 and m["compilacoes"] <= 1 and h["hibernadas"] == abas - 1 \
+        and h["formatos_na_volta"] > 0 and h["por_aba"] < m["por_aba"]
+    if not ok:
+        print("FALHOU: regras recompiladas, aba não hibernou/reacordou ou sem ganho de memória")
+    return ok
+
+_ARQUIVO_GRANDE_IDE = r"""
+import json, random, sys, time
+sys.path.insert(0, {repo!r})
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+import benchmarks
+from editor_tabs import EditorTabs
+
+abas = EditorTabs()
+abas.resize(900, 700); abas.show(); app.processEvents()
+rss0 = benchmarks._rss_atual_mb()
+t0 = time.perf_counter()
+visao = abas.abrir({caminho!r})
+app.processEvents()
+abertura_ms = (time.perf_counter() - t0) * 1000
+primeira = visao.document().firstBlock().text()
+visao.arquivo.pronto.wait()
+indice_s = time.perf_counter() - t0
+app.processEvents(); visao._indice_cresceu()
+erros, rss_max, saltos_ms = 0, benchmarks._rss_atual_mb(), []
+sorteio = random.Random(7)
+for n in [visao.barra.maximum()] + [sorteio.randrange(visao.barra.maximum()) for _ in range({saltos})]:
+    t = time.perf_counter()
+    visao.barra.setValue(n)
+    app.processEvents()
+    saltos_ms.append((time.perf_counter() - t) * 1000)
+    erros += visao.document().firstBlock().text() != benchmarks.linha_arquivo_grande(n)
+    rss_max = max(rss_max, benchmarks._rss_atual_mb())
+# Teclado: 30 setas para baixo a partir da última linha inteira da tela (coluna 5) e de volta ao topo
+from PyQt6.QtCore import Qt
+from PyQt6.QtTest import QTest
+visao.barra.setValue(0); app.processEvents()
+inteiras = visao.linhas_inteiras()
+visao.posicionar_cursor(inteiras - 1, 5)
+def linha_coluna():
+    cursor = visao.textCursor()
+    return visao.deslocamento_linhas + cursor.blockNumber(), cursor.positionInBlock()
+for _ in range(30):
+    QTest.keyClick(visao, Qt.Key.Key_Down)
+abaixo = (visao.barra.value(), *linha_coluna())
+for _ in range(inteiras - 1 + 30):
+    QTest.keyClick(visao, Qt.Key.Key_Up)
+teclado = {{"abaixo": abaixo, "acima": (visao.barra.value(), *linha_coluna()), "inteiras": inteiras}}
+print(json.dumps({{"teclado": teclado, "abertura_ms": abertura_ms, "indice_s": indice_s, "rss": rss_max - rss0,
+                  "linhas": visao.arquivo.linhas_indexadas, "blocos": visao.blockCount(),
+                  "primeira_ok": primeira == benchmarks.linha_arquivo_grande(0),
+                  "erros": erros, "salto_max_ms": max(saltos_ms), "somente_leitura": visao.isReadOnly(),
+                  "highlight_medio": abas.abrir({medio!r}).highlight_ligado}}))
+"""
+
+def linha_arquivo_grande(n):
+    # Largura fixa (32 bytes com o \n): a linha n começa no byte 32 * n
+    return f"{n:012d};sensor;{n % 9973:05d};ok"
+
+def criar_arquivo_grande(caminho, tamanho_mb):
+    linhas = tamanho_mb * 1024 * 1024 // 32
+    with open(caminho, "w", encoding="utf-8") as f:
+        for inicio in range(0, linhas, 100_000):
+            f.write("".join(linha_arquivo_grande(n) + "\n" for n in range(inicio, min(linhas, inicio + 100_000))))
+    return linhas
+
+@benchmark
+def bench_arquivo_grande(tamanho_mb=1024, saltos=50, max_rss_mb=32, max_abertura_ms=500):
+    """Arquivo de 1 GB aberto por mmap: abertura sem bloquear, RSS limitado e saltos para linhas aleatórias."""
+    import json, os, subprocess, tempfile
+    repo = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "captura.csv")
+        t0 = time.perf_counter()
+        linhas = criar_arquivo_grande(caminho, tamanho_mb)
+        print(f"arquivo de {tamanho_mb} MB ({linhas} linhas) gerado em {time.perf_counter() - t0:.1f} s")
+        # Entre LIMITE_HIGHLIGHT e LIMITE_ARQUIVO_GRANDE: editor normal, sem highlight
+        medio = os.path.join(pasta, "medio.py")
+        with open(medio, "w", encoding="utf-8") as f:
+            f.write(gerar_script(80_000))
+        codigo = _ARQUIVO_GRANDE_IDE.format(repo=repo, caminho=caminho, medio=medio, saltos=saltos)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        r = subprocess.run([sys.executable, "-c", codigo], env=env, capture_output=True, text=True, timeout=600)
+    linhas_json = [l for l in r.stdout.splitlines() if l.startswith("{")]
+    if not linhas_json:
+        print(f"FALHOU:\n{r.stderr[-2000:]}")
+        return False
+    d = json.loads(linhas_json[-1])
+    print(f"abertura {d['abertura_ms']:.1f} ms; índice completo em {d['indice_s']:.2f} s ({d['linhas']} linhas); "
+          f"RSS +{d['rss']:.1f} MB; {d['blocos']} linhas no documento; "
+          f"{saltos + 1} saltos, pior {d['salto_max_ms']:.1f} ms, {d['erros']} erros; "
+          f"highlight no arquivo médio: {d['highlight_medio']}")
+    teclado = d["teclado"]
+    print(f"30 setas para baixo da borda: barra em {teclado['abaixo'][0]}, cursor na linha {teclado['abaixo'][1]} "
+          f"coluna {teclado['abaixo'][2]}; de volta ao topo: {teclado['acima']} ({teclado['inteiras']} linhas na tela)")
+    teclado_ok = teclado["abaixo"] == [30, teclado["inteiras"] - 1 + 30, 5] and teclado["acima"] == [0, 0, 5]
+    # O índice conta a linha vazia depois do último '\n'
+    ok = d["primeira_ok"] and d["somente_leitura"] and not d["erros"] and d["linhas"] == linhas + 1 \
+        and not d["highlight_medio"] and teclado_ok \
+        and d["rss"] < max_rss_mb and d["abertura_ms"] < max_abertura_ms
+    if not ok:
+        print("FALHOU: conteúdo errado, RSS acima do limite ou abertura lenta")
+    return ok
+
+_SALVAR_IDE = r"""
+import json, os, sys, time
+sys.path.insert(0, {repo!r})
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+import benchmarks
+from editor_tabs import EditorTabs
+
+# Disco lento (ex.: home em NFS): cada fsync custa ATRASO segundos
+ATRASO = {atraso}
+fsync_real = os.fsync
+def fsync_lento(fd):
+    time.sleep(ATRASO)
+    fsync_real(fd)
+os.fsync = fsync_lento
+
+pasta = {pasta!r}
+abas = EditorTabs(pasta_diario=os.path.join(pasta, "autosave"))
+abas.timer_autosave.stop()  # O benchmark chama autosave() na hora certa
+abas.resize(900, 700); abas.show(); app.processEvents()
+caminho = os.path.join(pasta, "robo.py")
+
+def medir_travadas(acao):
+    # Maior intervalo entre dois ticks de um timer de 5 ms enquanto `acao` acontece
+    ticks = [time.perf_counter()]
+    timer = QTimer(); timer.timeout.connect(lambda: ticks.append(time.perf_counter())); timer.start(5)
+    t0 = time.perf_counter()
+    acao()
+    bloqueio = (time.perf_counter() - t0) * 1000
+    return ticks, timer, bloqueio
+
+if sys.argv[1] == "salvar":
+    texto = benchmarks.gerar_script({linhas})
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("conteúdo original\n")
+    # Referência: o salvar antigo, síncrono na thread da interface
+    t0 = time.perf_counter()
+    with open(caminho + ".sinc", "w", encoding="utf-8") as f:
+        f.write(texto); f.flush(); os.fsync(f.fileno())
+    sincrono_ms = (time.perf_counter() - t0) * 1000
+
+    editor = abas.novo(texto, caminho)
+    editor.insertPlainText("# alterado\n")
+    resultado = []
+    abas.salvo.connect(lambda *a: resultado.append(a))
+    ticks, timer, bloqueio_ms = medir_travadas(lambda: abas.salvar(editor))
+    while not resultado:
+        app.processEvents(); time.sleep(0.001)
+    timer.stop()
+    travada_ms = max(b - a for a, b in zip(ticks, ticks[1:])) * 1000
+    with open(caminho, encoding="utf-8") as f:
+        salvo_ok = f.read() == editor.toPlainText()
+    latencia_ms = resultado[0][3]
+
+    # Falha no meio da gravação (disco cheio): o arquivo anterior tem que sobreviver
+    def fsync_falha(fd):
+        raise OSError(28, "No space left on device")
+    os.fsync = fsync_falha
+    editor.insertPlainText("# nunca gravado\n")
+    resultado.clear()
+    abas.salvar(editor)
+    while not resultado:
+        app.processEvents(); time.sleep(0.001)
+    os.fsync = fsync_lento
+    with open(caminho, encoding="utf-8") as f:
+        intacto = f.read() != editor.toPlainText()
+    sobras = [n for n in os.listdir(pasta) if ".tmp-" in n]
+    print(json.dumps({{"sincrono_ms": sincrono_ms, "bloqueio_ms": bloqueio_ms, "travada_ms": travada_ms,
+                      "latencia_ms": latencia_ms, "salvo_ok": salvo_ok, "erro_reportado": bool(resultado[0][2]),
+                      "intacto": intacto, "ainda_modificado": editor.document().isModified(), "sobras": sobras}}))
+
+elif sys.argv[1] == "editar":
+    # Edições espalhadas entre autosaves e depois um crash (os._exit) sem salvar
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(benchmarks.gerar_script({linhas}))
+    editor = abas.abrir(caminho)
+    sem_titulo = abas.novo()
+    sem_titulo.insertPlainText("rascunho sem título\n")
+    cursor = editor.textCursor()
+    for i in range({ciclos}):
+        bloco = editor.document().findBlockByNumber((i * 37) % editor.blockCount())
+        cursor.setPosition(bloco.position())
+        editor.setTextCursor(cursor)
+        editor.insertPlainText(f"# edição {{i}}\n")
+        abas.autosave()
+    abas.aguardar_gravacoes()
+    diario = editor.diario
+    with open(os.path.join(pasta, "esperado.txt"), "w", encoding="utf-8") as f:
+        json.dump([editor.toPlainText(), sem_titulo.toPlainText()], f)
+    print(json.dumps({{"bytes_diario": diario.bytes_gravados, "bytes_documento": len(editor.toPlainText().encode()),
+                      "ciclos": {ciclos}}}), flush=True)
+    os._exit(1)
+
+else:
+    t0 = time.perf_counter()
+    recuperados = abas.recuperar()
+    recuperacao_ms = (time.perf_counter() - t0) * 1000
+    with open(os.path.join(pasta, "esperado.txt"), encoding="utf-8") as f:
+        esperado = json.load(f)
+    textos = [e.toPlainText() for e in abas.editores()]
+    editor = abas.widget(abas.indice_do_caminho(caminho))
+    abas.salvar(editor)
+    abas.aguardar_gravacoes(); app.processEvents()
+    print(json.dumps({{"recuperados": recuperados, "recuperacao_ms": recuperacao_ms,
+                      "iguais": sorted(textos) == sorted(esperado),
+                      "diarios_apos_salvar": len(os.listdir(os.path.join(pasta, "autosave")))}}))
+"""
+
+@benchmark
+def bench_salvar(linhas=20_000, atraso=0.3, ciclos=200):
+    """Salvar atômico fora da thread da interface em disco lento; diário de autosave e recuperação após crash."""
+    import json, os, subprocess, tempfile
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    dados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        codigo = _SALVAR_IDE.format(repo=repo, pasta=pasta, atraso=atraso, linhas=linhas, ciclos=ciclos)
+        for modo in ("salvar", "editar", "recuperar"):
+            r = subprocess.run([sys.executable, "-c", codigo, modo], env=env, capture_output=True, text=True, timeout=300)
+            linhas_json = [l for l in r.stdout.splitlines() if l.startswith("{")]
+            if not linhas_json:
+                print(f"FALHOU ({modo}):\n{r.stderr[-2000:]}")
+                return False
+            dados[modo] = json.loads(linhas_json[-1])
+        # Crash no meio de um delta, recuperação e mais edições: a segunda recuperação vê as edições novas
+        from autosave import Diario
+        diario = Diario(pasta=os.path.join(pasta, "truncado"))
+        diario.registrar("a\nb\nc\nd")
+        diario.registrar("a\nB\nc\nd")
+        with open(diario.arquivo, "a", encoding="utf-8") as f:
+            f.write('{"tipo": "delta", "t": 1, "ini')
+        diario = Diario.recuperar(diario.arquivo)
+        primeira = diario.texto
+        diario.registrar("a\nB\nC\nd")
+        diario.registrar("a\nB\nC\nD")
+        apos_truncado = primeira == "a\nB\nc\nd" and Diario.recuperar(diario.arquivo).texto == "a\nB\nC\nD"
+    s, e, r = dados["salvar"], dados["editar"], dados["recuperar"]
+    print(f"disco lento ({atraso * 1000:.0f} ms por fsync), {linhas} linhas: salvar síncrono {s['sincrono_ms']:.0f} ms "
+          f"na interface -> assíncrono {s['bloqueio_ms']:.1f} ms (maior travada do event loop {s['travada_ms']:.1f} ms); "
+          f"gravado em {s['latencia_ms']:.0f} ms")
+    print(f"falha no meio: arquivo anterior intacto={s['intacto']}, erro reportado={s['erro_reportado']}, "
+          f"aba continua modificada={s['ainda_modificado']}, temporários sobrando={len(s['sobras'])}")
+    print(f"diário: {e['bytes_diario'] / 1024:.0f} KB para {e['ciclos']} autosaves de um documento de "
+          f"{e['bytes_documento'] / 1024:.0f} KB ({e['bytes_documento'] * e['ciclos'] / 1024 / 1024:.0f} MB com snapshots)")
+    print(f"crash: {r['recuperados']} abas recuperadas em {r['recuperacao_ms']:.1f} ms, conteúdo igual={r['iguais']}, "
+          f"diários após salvar {r['diarios_apos_salvar']}; edições após um registro truncado recuperadas={apos_truncado}")
+    ok = apos_truncado and s["salvo_ok"] and s["intacto"] and s["erro_reportado"] and s["ainda_modificado"] and not s["sobras"] \
+        and s["travada_ms"] < atraso * 1000 / 2 and r["iguais"] and r["recuperados"] == 2 \
+        and r["diarios_apos_salvar"] == 1 and e["bytes_diario"] < e["bytes_documento"] * e["ciclos"] / 4
+    if not ok:
+        print("FALHOU: gravação não atômica, interface travada ou recuperação incompleta")
+    return ok
+
+# Fonte Firmata simulada: 6 canais analógicos de 10 bits, lidos como no pyfirmata2
+# (round(valor / 1023, 4)), enviados amostra a amostra pelo wandi_amostras
+_FONTE_FIRMATA = r"""
+import json, math, sys, time
+import wandi_amostras
+n = int(sys.argv[1])
+ondas = [[round(int(511.5 + 511.5 * math.sin(2 * math.pi * (i + 97 * c) / 1000)) / 1023, 4) for i in range(1000)]
+         for c in range(6)]
+canal = wandi_amostras.abrir(["A0", "A1", "A2", "A3", "A4", "A5"])
+a0, a1, a2, a3, a4, a5 = ondas
+t0 = time.perf_counter()
+for i in range(n):
+    j = i % 1000
+    canal.amostra(a0[j], a1[j], a2[j], a3[j], a4[j], a5[j], t=i / 50000)
+canal.fechar()
+print(json.dumps({"ativo": canal.enviadas == n, "segundos": time.perf_counter() - t0}))
+"""
+
+def valor_firmata(i, c):
+    return round(int(511.5 + 511.5 * math.sin(2 * math.pi * ((i % 1000) + 97 * c) / 1000)) / 1023, 4)
+
+@benchmark
+def bench_captura(amostras=1_000_000, min_taxa=50_000):
+    """Gravação binária de amostras (6 canais Firmata simulados): taxa sustentada, arquivo colunar e visão decimada."""
+    import json, os, subprocess, tempfile, threading
+    from array import array
+    from sample_capture import ReceptorAmostras, ler_gravacao
+    from warm_runner import ambiente_script
+    with tempfile.TemporaryDirectory() as pasta:
+        baldes = []
+        receptor = ReceptorAmostras(pasta, ao_balde=baldes.append)
+        thread = threading.Thread(target=receptor.servir, daemon=True)
+        thread.start()
+        env = ambiente_script(extra=receptor.ambiente())
+        r = subprocess.run([sys.executable, "-c", _FONTE_FIRMATA, str(amostras)], env=env,
+                           capture_output=True, text=True, timeout=300)
+        fonte = json.loads(r.stdout.strip().splitlines()[-1]) if r.returncode == 0 else None
+        # O receptor termina a gravação quando a conexão fecha
+        while receptor.estatisticas["segundos"] == 0 and thread.is_alive():
+            time.sleep(0.01)
+        receptor.parar()
+        thread.join()
+        if fonte is None or not receptor.gravacoes:
+            print(f"FALHOU:\n{r.stderr[-2000:]}")
+            return False
+        meta, tempos, canais = ler_gravacao(receptor.gravacoes[0])
+        tamanho = sum(os.path.getsize(os.path.join(receptor.gravacoes[0], n)) for n in os.listdir(receptor.gravacoes[0]))
+    e = receptor.estatisticas
+    taxa = e["amostras"] / e["segundos"]
+    # Confere uma amostra a cada 997 (float32, como no arquivo)
+    indices = range(0, amostras, 997)
+    erros = sum(array("f", [valor_firmata(i, c)])[0] != canais[f"A{c}"][i] for i in indices for c in range(6))
+    erros += sum(tempos[i] != i / 50000 for i in indices)
+    amostras_baldes = sum(b[2] for b in baldes)
+    faixas_ok = all(0.0 <= f[0] <= f[1] <= 1.0 for b in baldes for f in b[1])
+    print(f"{amostras} amostras x 6 canais: {taxa:,.0f} amostras/s recebidas e gravadas "
+          f"(fonte enviou a {amostras / fonte['segundos']:,.0f}/s), {e['lotes']} lotes, "
+          f"{e['bytes'] / 1024 / 1024:.1f} MB no canal; {tamanho / 1024 / 1024:.1f} MB em disco "
+          f"(texto equivalente ~{amostras * 6 * 7 / 1024 / 1024:.0f} MB)")
+    print(f"arquivo: {meta['amostras']} amostras, {len(meta['canais'])} colunas, concluída={meta['concluida']}, "
+          f"{erros} divergências; visão decimada: {len(baldes)} baldes cobrindo {amostras_baldes} amostras")
+    ok = taxa >= min_taxa and meta["concluida"] and meta["amostras"] == amostras and len(tempos) == amostras \
+        and not erros and amostras_baldes == amostras and faixas_ok and len(baldes) < amostras / 100
+    if not ok:
+        print(f"FALHOU: taxa abaixo de {min_taxa}/s, amostras perdidas ou visão decimada inconsistente")
+
+    # `amostras` com colunas faltando ou de outro tamanho: ValueError e nada entra no lote
+    import wandi_amostras
+
+    class _Conexao:
+        enviados = 0
+        def sendall(self, dados):
+            self.enviados += len(dados)
+        def close(self):
+            pass
+
+    canal = wandi_amostras.Canal(["A0", "A1"], _Conexao())
+    recusados = 0
+    for tempos_lote, *colunas in ([0.0, 0.1], [1.0, 2.0]), ([0.0, 0.1], [1.0, 2.0], [3.0]):
+        try:
+            canal.amostras(tempos_lote, *colunas)
+        except ValueError as e:
+            recusados += 1
+            print(f"recusado: {e}")
+    canal.amostras([0.0, 0.1], [1.0, 2.0], [3.0, 4.0])
+    validacao_ok = recusados == 2 and canal.enviadas == 2 and not canal._tempos
+    if not validacao_ok:
+        print("FALHOU: amostras() aceitou colunas desalinhadas")
+    return ok and validacao_ok
+
+@benchmark
+def bench_serial(megabytes=32, pings=200, max_p99_ms=50):
+    """Serial Monitor direto num par pty: vazão, latência até o console, TX com final de linha e liberação da porta."""
+    import os, statistics, threading, tty
+    from serial_transport import TransporteSerial
+    mestre, escravo = os.openpty()
+    tty.setraw(mestre)
+    porta = os.ttyname(escravo)
+    recebido = []
+    chegou = threading.Event()
+    estado = {"esperando": None, "bytes": 0}
+    def ao_lote(texto):
+        estado["bytes"] += len(texto)
+        recebido.append(texto)
+        if estado["esperando"] and estado["esperando"] in texto:
+            chegou.set()
+    transporte = TransporteSerial(porta, 115200, "\r\n", ao_lote=ao_lote)
+    leitor = threading.Thread(target=transporte.executar, daemon=True)
+    leitor.start()
+    # Latência: uma linha por vez, do "firmware" (lado mestre) até o ao_lote
+    latencias = []
+    for i in range(pings):
+        linha = f"ping {i}\n"
+        estado["esperando"] = linha
+        chegou.clear()
+        inicio = time.perf_counter()
+        os.write(mestre, linha.encode())
+        if not chegou.wait(2):
+            break
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    estado["esperando"] = None
+    # UTF-8 partido entre duas leituras
+    recebido.clear()
+    os.write(mestre, "ação: 1".encode()[:3])
+    time.sleep(0.05)
+    os.write(mestre, "ação: 1\n".encode()[3:])
+    time.sleep(0.05)
+    utf8_ok = "".join(recebido) == "ação: 1\n"
+    # Vazão: o mestre escreve o mais rápido que o pty aceita
+    bloco = (b"A0=0.5123 A1=0.9876 A2=0.0001\n" * 2048)[:64 * 1024]
+    total = megabytes * 1024 * 1024 // len(bloco) * len(bloco)
+    estado["bytes"] = 0
+    inicio = time.perf_counter()
+    escritor = threading.Thread(target=lambda: [os.write(mestre, bloco) for _ in range(total // len(bloco))])
+    escritor.start()
+    while estado["bytes"] < total and time.perf_counter() - inicio < 60:
+        time.sleep(0.005)
+    segundos = time.perf_counter() - inicio
+    escritor.join()
+    vazao_ok = estado["bytes"] == total
+    # TX: o comando chega à placa com o final de linha configurado
+    transporte.enviar("LED 13 ON")
+    time.sleep(0.05)
+    tx = os.read(mestre, 1024)
+    # Liberação: depois de parar, a porta está fechada e pode ser aberta de novo (upload/script)
+    transporte.parar()
+    leitor.join(1)
+    liberada = not leitor.is_alive() and not transporte.aberta
+    try:
+        TransporteSerial(porta).serial.close()
+        reaberta = True
+    except Exception as e:
+        print(f"reabrir: {e}")
+        reaberta = False
+    os.close(mestre); os.close(escravo)
+    mediana = statistics.median(latencias) if latencias else float("inf")
+    p99 = sorted(latencias)[int(len(latencias) * 0.99) - 1] if latencias else float("inf")
+    print(f"vazão: {total / segundos / 1024 / 1024:.1f} MB/s ({transporte.estatisticas['lotes']} lotes); "
+          f"latência linha->console: mediana {mediana:.2f} ms, p99 {p99:.2f} ms em {len(latencias)}/{pings} linhas")
+    print(f"TX={tx!r}, UTF-8 partido ok={utf8_ok}, porta liberada={liberada}, reaberta={reaberta}")
+    ok = vazao_ok and len(latencias) == pings and p99 <= max_p99_ms and tx == b"LED 13 ON\r\n" \
+        and utf8_ok and liberada and reaberta
+    if not ok:
+        print("FALHOU: bytes perdidos, latência alta, TX errado ou porta presa")
+    return ok
+
+def linhas_plotter(inicio, n, canais=8):
+    """Leituras como os scripts imprimem: valores soltos, e às vezes rotulados ou com texto no meio."""
+    linhas = []
+    for i in range(inicio, inicio + n):
+        valores = [512 + 511 * math.sin(2 * math.pi * (i / 1000 + c / canais)) for c in range(canais)]
+        if i % 997 == 0:
+            linhas.append(f"leitura {i}: ok")
+        elif i % 10 == 0:
+            linhas.append(",".join(f"{c + 1}:{v:.1f}" for c, v in enumerate(valores)))
+        else:
+            linhas.append(" ".join(f"{v:.1f}" for v in valores))
+    return "\n".join(linhas) + "\n"
+
+@benchmark
+def bench_plotter(pontos_s=10_000, canais=8, segundos=5, largura=1200, max_frame_ms=1000 / 60, max_rss_mb=16):
+    """Plotter: fluxo sintético de 10k linhas/s x 8 canais, tempo de frame (análise + desenho) e memória."""
+    import resource, statistics
+    import numpy as np
+    from plotter import ParserColunas, decimar_min_max, rasterizar_faixas
+    app = _qt_app()
+    from plotter_ui import PlotterView
+    # Formatos aceitos pelo parser
+    parser = ParserColunas()
+    m = parser.analisar("1 2,3\nA:4 B=5\nC: 6\nTraceback (most recent call last):\n7\t8\n9")
+    formatos_ok = parser.nomes == ["1", "2", "3", "A", "B", "C"] and m.shape == (4, 6) \
+        and m[0, :3].tolist() == [1, 2, 3] and m[1, 3:5].tolist() == [4, 5] and m[2, 5] == 6 \
+        and m[3, :2].tolist() == [7, 8] and parser.parcial == "9" and parser.linhas_ignoradas == 1
+    # Decimação: igual à força bruta e um pico de uma amostra continua visível
+    dados = np.random.default_rng(1).normal(size=(3, 100_000)).astype(np.float32)
+    dados[1, 54_321] = 100
+    dados[2, :5000] = np.nan
+    minimos, maximos = decimar_min_max(dados, largura)
+    grupo = -(-dados.shape[1] // largura)
+    cauda = dados[:, dados.shape[1] - minimos.shape[1] * grupo:].reshape(3, -1, grupo)
+    decimacao_ok = np.array_equal(maximos[:2], cauda[:2].max(axis=2)) and np.array_equal(minimos[:2], cauda[:2].min(axis=2)) \
+        and maximos[1].max() == 100 and np.isnan(maximos[2, 0]) and not np.isnan(maximos[2, -1])
+    # Raster: degrau ligado por uma coluna cheia, coluna NaN em branco
+    imagem = np.zeros((100, 5), np.uint32)
+    degrau = np.array([0, 0, 1, 1, np.nan], np.float32)
+    rasterizar_faixas(imagem, degrau, degrau, 0.0, 99.0, 7)
+    raster_ok = imagem[:, 2].all() and imagem[:, 0].tolist().count(7) == 1 and imagem[99, 0] == 7 \
+        and imagem[0, 3] == 7 and imagem[:, 3].sum() == 7 and not imagem[:, 4].any()
+
+    vista = PlotterView()
+    vista.resize(largura + 52, 300)
+    vista.show()
+    app.processEvents()
+    por_frame = pontos_s * PlotterView.FRAME_MS // 1000
+    frames = segundos * 1000 // PlotterView.FRAME_MS
+    lotes = [linhas_plotter(f * por_frame, por_frame, canais) for f in range(frames)]
+    def rodar(lista):
+        tempos = []
+        for texto in lista:
+            # O lote de um frame chega em pedaços (como do ChunkedPipeReader), cortando linhas no meio
+            for k in range(0, len(texto), 4096):
+                vista.escrever(texto[k:k + 4096])
+            inicio = time.perf_counter()
+            vista._frame()
+            vista.repaint()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return tempos
+    rodar(lotes[:30])  # Aquece (e enche o começo do anel)
+    rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    tempos = rodar(lotes) + rodar(lotes)  # Duas passadas: o anel dá a volta
+    rss_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    esperado = (30 + 2 * frames) * por_frame
+    dados_ok = vista.anel.total == esperado - sum(1 for i in range(por_frame * 30) if i % 997 == 0) \
+        - 2 * sum(1 for i in range(por_frame * frames) if i % 997 == 0) and len(vista.parser.nomes) == canais
+    p50, p99 = statistics.median(tempos), sorted(tempos)[int(len(tempos) * 0.99)]
+    analise = vista.tempo_analise / (vista.anel.total / pontos_s)
+    print(f"{len(tempos)} frames de {por_frame} linhas x {canais} canais, {largura} px: "
+          f"frame p50 {p50:.2f} ms, p99 {p99:.2f} ms, pior {max(tempos):.2f} ms (orçamento {max_frame_ms:.1f} ms)")
+    print(f"análise: {analise * 100:.1f}% de um núcleo a {pontos_s} linhas/s; anel {vista.anel.valores.nbytes / 1024 / 1024:.0f} MB "
+          f"pré-alocado, RSS máximo +{rss_depois - rss_antes:.1f} MB durante {2 * segundos} s de fluxo")
+    print(f"formatos ok={formatos_ok}, decimação ok={decimacao_ok}, raster ok={raster_ok}, pontos ok={dados_ok}")
+    ok = p99 <= max_frame_ms and rss_depois - rss_antes <= max_rss_mb and formatos_ok and decimacao_ok \
+        and raster_ok and dados_ok
+    if not ok:
+        print("FALHOU: frame acima de 1/60 s, memória crescendo ou parser/decimação errados")
+    return ok
+
+@benchmark
+def bench_log_disco(gigabytes=1, segmento_mb=64, max_rss_mb=64):
+    """Log em disco: 1 GB de saída por LogRotativo (gzip, segmentos de 64 MB), vazão, memória e conteúdo íntegro."""
+    import glob, gzip, hashlib, os, resource, tempfile, threading
+    from output_log import LogRotativo
+    # Lotes como os do ChunkedPipeReader: linhas de script de robô com contador, 64 KB por vez
+    modelos = []
+    for m in range(16):
+        linhas = []
+        while sum(map(len, linhas)) < 64 * 1024 - 200:
+            i = len(linhas) + m * 10_000
+            linhas.append(f"[{i:08d}] A0={valor_firmata(i, 0):.4f} A1={valor_firmata(i, 1):.4f} motor={i % 255} ok\n")
+        modelos.append("".join(linhas))
+    total = gigabytes * 1024 ** 3
+    with tempfile.TemporaryDirectory() as pasta:
+        log = LogRotativo(pasta, "output", max_bytes=segmento_mb * 1024 * 1024, compressao="gzip")
+        rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        resumo = hashlib.md5()
+        def produzir():
+            enviado, n = 0, 0
+            while enviado < total:
+                texto = f"#lote {n}\n" + modelos[n % len(modelos)]
+                log.escrever(texto)
+                resumo.update(texto.encode())
+                enviado += len(texto)
+                n += 1
+        inicio = time.perf_counter()
+        produtor = threading.Thread(target=produzir)
+        produtor.start()
+        produtor.join()
+        escrito = time.perf_counter() - inicio
+        log.fechar()
+        fechado = time.perf_counter() - inicio
+        rss_depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        segmentos = sorted(glob.glob(os.path.join(pasta, "output-*")))
+        conferencia = hashlib.md5()
+        maior = 0
+        terminam_em_linha = True
+        for caminho in segmentos:
+            with (gzip.open(caminho, "rb") if caminho.endswith(".gz") else open(caminho, "rb")) as f:
+                tamanho = 0
+                while bloco := f.read(4 * 1024 * 1024):
+                    conferencia.update(bloco)
+                    tamanho += len(bloco)
+                    ultimo = bloco
+            maior = max(maior, tamanho)
+            terminam_em_linha &= ultimo.endswith(b"\n")
+        em_disco = sum(os.path.getsize(c) for c in segmentos)
+        comprimidos = sum(c.endswith(".gz") for c in segmentos)
+
+        # Rotação por tempo e retenção dos últimos N segmentos
+        pasta_tempo = os.path.join(pasta, "tempo")
+        log_tempo = LogRotativo(pasta_tempo, "serial", max_segundos=0.3, compressao="nenhuma", max_segmentos=2)
+        for i in range(10):
+            log_tempo.escrever(f"leitura {i}\n")
+            time.sleep(0.12)
+        log_tempo.fechar()
+        por_tempo = sorted(os.listdir(pasta_tempo))
+
+        # Disco cheio no meio da sessão: o log para, avisa uma vez, e quem escreve não fica preso
+        class DiscoCheio:
+            def write(self, dados):
+                raise OSError(28, "No space left on device")
+            flush = close = lambda self: None
+        avisos = []
+        log_cheio = LogRotativo(os.path.join(pasta, "cheio"), "output", limite_pendente=64 * 1024, ao_erro=avisos.append)
+        log_cheio._arquivo = DiscoCheio()
+        produtor = threading.Thread(target=lambda: [log_cheio.escrever(modelos[0]) for _ in range(200)], daemon=True)
+        produtor.start()
+        produtor.join(5)
+        log_cheio.fechar()
+        disco_cheio_ok = not produtor.is_alive() and len(avisos) == 1 and getattr(log_cheio.erro, "errno", None) == 28
+    e = log.estatisticas
+    print(f"{e['bytes'] / 1024 ** 3:.2f} GB: escrita {e['bytes'] / 1024 ** 2 / escrito:.0f} MB/s "
+          f"(produtor esperou o disco {e['espera_s']:.1f} s), com compressão {e['bytes'] / 1024 ** 2 / fechado:.0f} MB/s; "
+          f"RSS máximo +{rss_depois - rss_antes:.1f} MB")
+    print(f"{len(segmentos)} segmentos ({comprimidos} gzip), maior {maior / 1024 ** 2:.1f} MB, {em_disco / 1024 ** 2:.0f} MB em disco; "
+          f"conteúdo íntegro={conferencia.digest() == resumo.digest()}, cortes em fim de linha={terminam_em_linha}")
+    print(f"rotação por tempo com max_segmentos=2: {por_tempo}")
+    print(f"disco cheio: produtor liberado e erro avisado uma vez={disco_cheio_ok} {avisos[:1]}")
+    ok = conferencia.digest() == resumo.digest() and terminam_em_linha and maior <= segmento_mb * 1024 * 1024 \
+        and comprimidos == len(segmentos) - 1 and rss_depois - rss_antes <= max_rss_mb \
+        and len(por_tempo) == 3 and por_tempo[-1] > por_tempo[0] and disco_cheio_ok
+    if not ok:
+        print("FALHOU: conteúdo divergente, segmento grande demais, memória sem limite ou rotação errada")
+    return ok
+
+def linhas_console(inicio, n):
+    """Saída de um Run longo: telemetria repetitiva com um erro raro a cada 100 mil linhas."""
+    linhas = []
+    for i in range(inicio, inicio + n):
+        if i % 100_000 == 99_999:
+            linhas.append(f"ERRO: timeout no sensor ultrassônico (tentativa {i // 100_000 % 7})")
+        else:
+            linhas.append(f"[{i:08d}] A0={i * 7919 % 10000 / 10000:.4f} motor={i % 255} estado=RODANDO")
+    return "\n".join(linhas) + "\n"
+
+@benchmark
+def bench_historico(tamanhos=(1_000_000, 10_000_000), lote=2000, max_raro_ms=100):
+    """Histórico do console: ingestão e latência de busca (texto, regex, salto) com 1M e 10M linhas."""
+    import re, resource, statistics
+    from console_history import HistoricoConsole, Consulta, LINHAS_POR_BLOCO
+    def medir(funcao, repeticoes=5):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tempos), resultado
+    ok = True
+    for tamanho in tamanhos:
+        rss_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        historico = HistoricoConsole()
+        ingestao = 0.0
+        for inicio in range(0, tamanho, lote):
+            texto = linhas_console(inicio, lote)
+            t0 = time.perf_counter()
+            historico.anexar(texto)
+            ingestao += time.perf_counter() - t0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - rss_antes
+        erros = tamanho // 100_000
+        consultas = {
+            "raro (texto)": (Consulta("timeout no sensor"), erros),
+            "linha única": (Consulta(f"[{tamanho // 2 + 3:08d}]", maiusculas=True), 1),
+            "ausente": (Consulta("xyzzy"), 0),
+            "regex c/ literal": (Consulta(r"ERRO: .* \(tentativa [3-5]\)", regex=True), None),
+            "regex sem literal": (Consulta(r"=0\.99\d\d m", regex=True), None),
+            "comum (1000 1ºs)": (Consulta("motor=17 "), None),
+        }
+        print(f"{tamanho:,} linhas: ingestão {tamanho / ingestao:,.0f} linhas/s, {len(historico.blocos)} blocos, "
+              f"RSS +{rss:.0f} MB ({rss * 1024 * 1024 / tamanho:.0f} B/linha)")
+        for nome, (consulta, esperado) in consultas.items():
+            limite = 1000 if nome.startswith("comum") else 100_000
+            ms, achadas = medir(lambda: historico.buscar(consulta, limite=limite))
+            candidatos = sum(1 for _ in historico._candidatos(consulta))
+            certo = esperado is None or len(achadas) == esperado
+            if nome == "regex c/ literal":
+                certo = len(achadas) == sum(1 for i in range(99_999, tamanho, 100_000) if 3 <= i // 100_000 % 7 <= 5)
+            if nome == "regex sem literal" and tamanho <= 1_000_000:
+                # Confere com força bruta, linha a linha
+                padrao = re.compile(consulta.texto, re.I)
+                certo = list(achadas) == [n for n in range(tamanho) if padrao.search(historico.linha(n))]
+            ok &= certo
+            print(f"  {nome:<18} {ms:8.2f} ms  {len(achadas):>7} linhas  {candidatos}/{len(historico.blocos) + 1} blocos varridos"
+                  + ("" if certo else "  ERRADO"))
+            if nome == "raro (texto)":
+                ok &= ms <= max_raro_ms
+        rara = consultas["raro (texto)"][0]
+        meio = tamanho // 2
+        ms_prox, proxima = medir(lambda: historico.proxima(rara, meio))
+        ms_ant, anterior = medir(lambda: historico.proxima(rara, meio, para_tras=True))
+        ms_linha, _ = medir(lambda: [historico.linha(n) for n in range(meio, meio + 1000)])
+        saltos_ok = proxima == (meio // 100_000) * 100_000 + 99_999 and anterior == proxima - 100_000 \
+            and historico.linha(proxima).startswith("ERRO")
+        ok &= saltos_ok
+        print(f"  salto ▼ {ms_prox:.2f} ms, ▲ {ms_ant:.2f} ms (linha {proxima + 1}); 1000 linhas lidas em {ms_linha:.2f} ms; "
+              f"saltos ok={saltos_ok}")
+        del historico
+    # Quantificadores e escapes com argumento não podem virar texto obrigatório no filtro de blocos
+    pequeno = HistoricoConsole()
+    pequeno.anexar(linhas_console(0, 3 * LINHAS_POR_BLOCO) + "temp=AAA\nval axyz\n" + linhas_console(0, LINHAS_POR_BLOCO))
+    alvo = 3 * LINHAS_POR_BLOCO
+    for padrao in (r"A{2,3}", r"\x41AA", r"temp=\u0041{3}", r"\N{LATIN CAPITAL LETTER A}AA$", r"(A)\1A", r"=\101{2}",
+                   r"[\]abc]xyz"):
+        achadas = list(pequeno.buscar(Consulta(padrao, regex=True, maiusculas=True)))
+        if padrao.startswith("["):   # Classe com ']' escapado: o resto dela não é texto obrigatório
+            alvo = 3 * LINHAS_POR_BLOCO + 1
+        certo = achadas == [alvo]
+        ok &= certo
+        print(f"  regex {padrao:<34} linhas {achadas}" + ("" if certo else f"  ERRADO (esperado [{alvo}])"))
+    if not ok:
+        print(f"FALHOU: resultado errado ou busca rara acima de {max_raro_ms} ms")
+    return ok
+
+# Script que se defende: pai e filho ignoram SIGTERM e seguram o stdout (como um board.exit() travado)
+SCRIPT_TEIMOSO = """
+import os, signal, sys, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+filho = os.fork()
+if filho == 0:
+    os.write(1, f"filho {os.getpid()}\\n".encode())  # Uma escrita só: não se mistura com a do pai
+    while True:
+        time.sleep(1)
+os.write(1, f"pai {os.getpid()}\\n".encode())
+while True:
+    time.sleep(1)
+"""
+SCRIPT_ORFAO = "import os, time\nif os.fork() == 0:\n    time.sleep(60)\nprint('pai saiu', flush=True)\n"
+SCRIPT_FORK_OBEDIENTE = "import os, time\nos.fork()\nprint('rodando', flush=True)\ntime.sleep(60)\n"
+
+def _rodar_supervisionado(codigo, limites=None, prazo=0.5, parar_apos=None):
+    """(relatório, linhas da saída, segundos do parar/início até o EOF e o grupo vazio, grupo ainda vivo?)."""
+    import subprocess, threading
+    from process_supervisor import Supervisor, comando_python, opcoes_popen, grupo_vivo
+    p = subprocess.Popen(comando_python(codigo, limites), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                         **opcoes_popen())
+    supervisor = Supervisor(p, limites, prazo=prazo)
+    linhas = []
+    while parar_apos and len(linhas) < parar_apos and (linha := p.stdout.readline()):
+        linhas.append(linha.decode().strip())
+    leitor = threading.Thread(target=lambda: linhas.extend(p.stdout.read().decode(errors="replace").splitlines()))
+    leitor.start()
+    t0 = time.perf_counter()
+    if parar_apos:
+        supervisor.parar()
+    leitor.join(30)
+    relatorio = supervisor.esperar()
+    return relatorio, linhas, time.perf_counter() - t0, grupo_vivo(supervisor.grupo)
+
+@benchmark
+def bench_supervisor(prazo=0.5):
+    """Supervisor de Run: árvore que ignora SIGTERM, órfãos, limites de CPU/memória/tempo e o ExecutorWorker."""
+    from process_supervisor import Limites, grupo_vivo, resumo
+    ok = True
+
+    def conferir(nome, certo, relatorio, segundos):
+        nonlocal ok
+        ok &= bool(certo)
+        print(f"  {nome:<26} {segundos * 1000:7.0f} ms  {resumo(relatorio)}" + ("" if certo else "  ERRADO"))
+
+    rel, linhas, s, vivo = _rodar_supervisionado(SCRIPT_TEIMOSO, prazo=prazo, parar_apos=2)
+    conferir("fork + ignora SIGTERM", rel["codigo"] == -9 and not vivo and prazo <= s < prazo + 1, rel, s)
+    rel, _, s, vivo = _rodar_supervisionado(SCRIPT_FORK_OBEDIENTE, prazo=prazo, parar_apos=1)
+    conferir("fork obediente", rel["codigo"] == -15 and not vivo and s < 0.2, rel, s)
+    rel, linhas, s, vivo = _rodar_supervisionado(SCRIPT_ORFAO, prazo=prazo)
+    conferir("filho órfão no fim", rel["codigo"] == 0 and rel["restos"] and not vivo and s < prazo, rel, s)
+
+    limites = Limites(cpu_s=1)
+    rel, _, s, _ = _rodar_supervisionado("while True:\n    pass\n", limites)
+    conferir("limite de CPU 1 s", rel["motivo"] == "limite de CPU" and 0.9 <= rel["cpu_s"] < 2.5, rel, s)
+    limites = Limites(memoria_mb=256)
+    rel, linhas, s, _ = _rodar_supervisionado("x = bytearray(512 * 1024 * 1024)\n", limites)
+    conferir("limite de memória 256 MB", rel["codigo"] == 1 and any("MemoryError" in l for l in linhas), rel, s)
+    limites = Limites(tempo_s=0.5)
+    rel, _, s, _ = _rodar_supervisionado("import time\ntime.sleep(60)\n", limites)
+    conferir("limite de tempo 0.5 s", rel["motivo"] == "limite de tempo" and 0.5 <= rel["duracao_s"] < 1.0, rel, s)
+    rel, _, s, _ = _rodar_supervisionado("x = bytearray(100 * 1024 * 1024)\nx[::4096] = b'1' * len(x[::4096])\n")
+    conferir("pico de RSS (100 MB)", rel["codigo"] == 0 and rel["pico_rss"] >= 100 * 1024 ** 2, rel, s)
+
+    # Pela IDE: ExecutorWorker no runner aquecido, Parar com o prazo padrão, e o Run seguinte esperando o anterior
+    app = _qt_app()
+    from interface import ExecutorWorker
+    from process_supervisor import PRAZO_TERMINO_S
+    from warm_runner import WarmPythonRunner
+    runner = WarmPythonRunner()
+    runner.aquecer()
+    relatorios, saida = [], []
+    worker = ExecutorWorker(SCRIPT_TEIMOSO, runner)
+    worker.lote_recebido.connect(lambda texto, previa: saida.append(texto))
+    worker.relatorio.connect(relatorios.append)
+    worker.start()
+    while sum(l.startswith(("pai", "filho")) for l in "".join(saida).splitlines()) < 2:
+        app.processEvents()
+        time.sleep(0.005)
+    t0 = time.perf_counter()
+    worker.stop()
+    terminou = worker.wait(int((PRAZO_TERMINO_S + 1) * 1000))
+    s = time.perf_counter() - t0
+    app.processEvents()
+    grupo = worker.supervisor.grupo
+    certo = terminou and relatorios and relatorios[0]["codigo"] == -9 and not grupo_vivo(grupo)
+    conferir("ExecutorWorker (aquecido)", certo, relatorios[0] if relatorios else {"motivo": "sem relatório",
+             "duracao_s": s, "cpu_s": None, "pico_rss": None, "restos": False}, s)
+    runner.encerrar()
+    if not ok:
+        print("FALHOU: processo sobrou, teardown lento ou limite não aplicado")
+    return ok
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:]
+    if not nomes:
+        for nome, func in BENCHMARKS.items():
+            print(f"{nome:<20} {func.__doc__}")
+        sys.exit(0)
+    ok = True
+    for nome in nomes:
+        print(f"== {nome}")
+        ok = BENCHMARKS[nome]() is not False and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+# Onde ficam os .hex/.elf já compilados (um diretório por chave)
+PASTA_CACHE_PADRAO = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "Engine", "build-cache")
+# Limite total do cache; o menos usado recentemente sai primeiro
+TAMANHO_MAX_PADRAO = 256 * 1024 * 1024
+
+_versoes_memo = {}
+_versoes_lock = threading.Lock()
+
+def versoes_toolchain(cli_path):
+    """Versões dos cores e libs instalados, numa string estável (memoizada por processo)."""
+    with _versoes_lock:
+        if cli_path in _versoes_memo:
+            return _versoes_memo[cli_path]
+    flags = 0x08000000 if os.name == 'nt' else 0
+    partes = []
+    try:
+        for args, chave_lista in ((["core", "list"], "platforms"), (["lib", "list"], "installed_libraries")):
+            saida = subprocess.run([cli_path, *args, "--format", "json"], capture_output=True,
+                                   text=True, creationflags=flags).stdout
+            dados = json.loads(saida or "[]")
+            if isinstance(dados, dict):
+                dados = dados.get(chave_lista) or []
+            for item in dados:
+                if "library" in item:
+                    item = item["library"]
+                    partes.append(f"lib:{item.get('name')}@{item.get('version')}")
+                else:
+                    versao = item.get("installed_version") or item.get("installed") or item.get("Installed")
+                    partes.append(f"core:{item.get('id') or item.get('ID')}@{versao}")
+    except (OSError, ValueError):
+        pass  # Sem CLI/JSON válido: a chave depende só do sketch, FQBN e flags
+    resultado = "\n".join(sorted(partes))
+    with _versoes_lock:
+        _versoes_memo[cli_path] = resultado
+    return resultado
+
+def invalidar_versoes():
+    """Esquece as versões memoizadas (chamar depois de instalar cores/libs)."""
+    with _versoes_lock:
+        _versoes_memo.clear()
+
+class BuildCache:
+    """Cache de builds endereçado por conteúdo.
+
+    Chave = sha256(arquivos do sketch, FQBN, versões de cores/libs, flags).
+    Cada entrada é o --output-dir de um `arduino-cli compile`, reaproveitado
+    no upload com --input-dir. Tamanho limitado com despejo LRU.
+    """
+
+    def __init__(self, pasta=PASTA_CACHE_PADRAO, tamanho_max=TAMANHO_MAX_PADRAO):
+        self.pasta = pasta
+        self.tamanho_max = tamanho_max
+        self._lock = threading.RLock()
+        os.makedirs(self.pasta, exist_ok=True)
+
+    # --- CHAVE ---
+    def chave(self, sketch_dir, fqbn, versoes="", flags=()):
+        h = hashlib.sha256()
+        for campo in (fqbn, versoes, "\0".join(flags)):
+            h.update(campo.encode("utf-8") + b"\0")
+        for raiz, pastas, arquivos in os.walk(sketch_dir):
+            pastas.sort()
+            for nome in sorted(arquivos):
+                caminho = os.path.join(raiz, nome)
+                h.update(os.path.relpath(caminho, sketch_dir).replace(os.sep, "/").encode("utf-8") + b"\0")
+                with open(caminho, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+        return h.hexdigest()
+
+    # --- ENTRADAS ---
+    def _entrada(self, chave):
+        return os.path.join(self.pasta, chave)
+
+    def obter(self, chave):
+        """Diretório do build em cache (e marca como usado) ou None."""
+        entrada = self._entrada(chave)
+        if os.path.isdir(entrada):
+            os.utime(entrada)
+            self._contar("hits")
+            return entrada
+        self._contar("misses")
+        return None
+
+    def guardar(self, chave, diretorio_build):
+        """Copia o --output-dir para o cache de forma atômica e aplica o limite."""
+        entrada = self._entrada(chave)
+        temp = f"{entrada}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.copytree(diretorio_build, temp)
+        try:
+            os.replace(temp, entrada)
+        except OSError:
+            shutil.rmtree(temp, ignore_errors=True)  # Outro build igual chegou primeiro
+        self.despejar()
+        return entrada
+
+    def _entradas(self):
+        entradas = []
+        for nome in os.listdir(self.pasta):
+            caminho = os.path.join(self.pasta, nome)
+            if not os.path.isdir(caminho) or ".tmp-" in nome:
+                continue
+            tamanho = sum(os.path.getsize(os.path.join(r, a)) for r, _, arqs in os.walk(caminho) for a in arqs)
+            entradas.append((os.path.getmtime(caminho), tamanho, caminho))
+        return entradas
+
+    def despejar(self):
+        """Remove as entradas menos usadas até caber em tamanho_max."""
+        with self._lock:
+            entradas = sorted(self._entradas())
+            total = sum(t for _, t, _ in entradas)
+            removidas = 0
+            while entradas and total > self.tamanho_max:
+                _, tamanho, caminho = entradas.pop(0)
+                shutil.rmtree(caminho, ignore_errors=True)
+                total -= tamanho
+                removidas += 1
+            if removidas:
+                self._contar("despejos", removidas)
+            return removidas
+
+    def limpar(self):
+        """Invalida tudo (comando 'Limpar cache de compilação')."""
+        with self._lock:
+            for _, _, caminho in self._entradas():
+                shutil.rmtree(caminho, ignore_errors=True)
+        invalidar_versoes()
+
+    # --- ESTATÍSTICAS ---
+    def _contar(self, campo, n=1):
+        with self._lock:
+            stats = self._ler_stats()
+            stats[campo] = stats.get(campo, 0) + n
+            with open(os.path.join(self.pasta, "stats.json"), "w") as f:
+                json.dump(stats, f)
+
+    def _ler_stats(self):
+        try:
+            with open(os.path.join(self.pasta, "stats.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def estatisticas(self):
+        with self._lock:
+            stats = {"hits": 0, "misses": 0, "despejos": 0, **self._ler_stats()}
+            entradas = self._entradas()
+        stats["entradas"] = len(entradas)
+        stats["bytes"] = sum(t for _, t, _ in entradas)
+        return stats
+
+if __name__ == "__main__":
+    cache = BuildCache()
+    if sys.argv[1:] == ["limpar"]:
+        cache.limpar()
+        print(f"Cache de compilação limpo: {cache.pasta}")
+    else:
+        print(json.dumps(cache.estatisticas(), indent=2))
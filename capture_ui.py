@@ -0,0 +1,116 @@
+from collections import deque
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal, Qt
+from PyQt6.QtGui import QPainter, QColor, QPen, QFont
+
+from sample_capture import PASTA_CAPTURAS, ReceptorAmostras
+
+CORES_CANAIS = ["#00ff41", "#00ffdd", "#f1c40f", "#e67e22", "#e74c3c", "#9b59b6", "#3498db", "#ecf0f1"]
+
+class CapturaThread(QThread):
+    """Roda o ReceptorAmostras; cada Run com a gravação ligada vira uma pasta em `pasta_base`."""
+    gravacao_iniciada = pyqtSignal(str, list)
+    balde = pyqtSignal(object)
+    log_signal = pyqtSignal(str, str)
+
+    def __init__(self, pasta_base=PASTA_CAPTURAS):
+        super().__init__()
+        self.receptor = ReceptorAmostras(pasta_base, ao_inicio=self.gravacao_iniciada.emit,
+                                         ao_balde=self.balde.emit, ao_log=self.log_signal.emit)
+
+    def ambiente(self):
+        """Variáveis que o próximo Run precisa para enviar amostras a esta gravação."""
+        return self.receptor.ambiente()
+
+    def run(self):
+        self.receptor.servir()
+
+    def parar(self):
+        self.receptor.parar()
+        self.wait()
+
+class VistaCaptura(QWidget):
+    """Visão ao vivo decimada: uma faixa por canal, uma coluna de pixel por balde (min..max).
+
+    Só guarda os últimos MAX_BALDES baldes do Decimador e redesenha no máximo a
+    cada FRAME_MS; a taxa de amostragem não muda o custo do desenho.
+    """
+    MAX_BALDES = 1200
+    FRAME_MS = 33
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.baldes = deque(maxlen=self.MAX_BALDES)
+        self.canais = []
+        self.pasta = ""
+        self._sujo = False
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._frame)
+        self.timer.start(self.FRAME_MS)
+
+    def iniciar(self, pasta, canais):
+        self.pasta = pasta
+        self.canais = list(canais)
+        self.baldes.clear()
+        self._sujo = True
+
+    def adicionar_balde(self, balde):
+        self.baldes.append(balde)
+        self._sujo = True
+
+    def taxa(self):
+        """Amostras por segundo nos baldes do último ~1 s."""
+        if len(self.baldes) < 2:
+            return 0.0
+        fim = self.baldes[-1][0]
+        recentes = [b for b in self.baldes if fim - b[0] <= 1.0]
+        duracao = fim - recentes[0][0]
+        return sum(b[2] for b in recentes[:-1]) / duracao if duracao > 0 else 0.0
+
+    def _frame(self):
+        if self._sujo and self.isVisible():
+            self._sujo = False
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#050a0f"))
+        painter.setFont(QFont("Consolas", 8))
+        if not self.canais:
+            painter.setPen(QColor("#5c6370"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter,
+                             "Gravação ligada: use wandi_amostras no script e clique Run.")
+            return
+        largura, altura = self.width(), self.height()
+        visiveis = list(self.baldes)[-largura:]
+        faixa_h = altura / len(self.canais)
+        x0 = largura - len(visiveis)
+        for c, nome in enumerate(self.canais):
+            topo = c * faixa_h
+            faixas = [b[1][c] for b in visiveis if c < len(b[1]) and b[1][c] is not None]
+            cor = QColor(CORES_CANAIS[c % len(CORES_CANAIS)])
+            painter.setPen(QColor("#1c2b3d"))
+            painter.drawLine(0, int(topo + faixa_h), largura, int(topo + faixa_h))
+            if faixas:
+                minimo = min(f[0] for f in faixas)
+                maximo = max(f[1] for f in faixas)
+                escala = (faixa_h - 6) / ((maximo - minimo) or 1.0)
+                base = topo + faixa_h - 3
+                painter.setPen(QPen(cor, 1))
+                for i, balde in enumerate(visiveis):
+                    faixa = balde[1][c] if c < len(balde[1]) else None
+                    if faixa is None:
+                        continue
+                    x = x0 + i
+                    painter.drawLine(x, int(base - (faixa[0] - minimo) * escala),
+                                     x, int(base - (faixa[1] - minimo) * escala))
+                legenda = f"{nome}  [{minimo:.3g} .. {maximo:.3g}]"
+            else:
+                legenda = nome
+            painter.setPen(cor)
+            painter.drawText(4, int(topo + 11), legenda)
+        painter.setPen(QColor("#5c6370"))
+        painter.drawText(self.rect().adjusted(0, 0, -6, 0), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+                         f"{self.taxa():,.0f} amostras/s".replace(",", "."))
@@ -0,0 +1,282 @@
+import itertools
+import os
+import socket
+import subprocess
+import threading
+
+from stream_reader import LineAssembler
+
+# Backend opcional: WANDI_CLI_DAEMON=1 (ou o menu Run) liga; sem grpcio cai no spawn
+ATIVO = os.environ.get("WANDI_CLI_DAEMON", "").strip() == "1"
+# Quantos canais HTTP/2 manter abertos com o daemon (compile e upload em paralelo)
+CANAIS_PADRAO = 2
+TIMEOUT_INICIO = 15.0
+
+SERVICO = "/cc.arduino.cli.commands.v1.ArduinoCoreService/"
+
+class ErroDaemon(Exception):
+    pass
+
+class DaemonIndisponivel(ErroDaemon):
+    """O daemon sumiu (processo morreu / canal caiu): vale cair no spawn."""
+
+# --- PROTOBUF MÍNIMO ---
+# Só o necessário para as mensagens abaixo, sem depender de stubs gerados.
+# Números de campo de rpc/cc/arduino/cli/commands/v1/*.proto do arduino-cli 1.x:
+#   Instance{id=1}  CreateResponse{instance=1}  InitRequest{instance=1}
+#   InitResponse{init_progress=1, error=2}  Status{code=1, message=2}
+#   BoardListRequest{instance=1, timeout=2}  BoardListResponse{ports=1}
+#   DetectedPort{matching_boards=1, port=2}  BoardListItem{name=1, fqbn=2}
+#   Port{address=1, protocol=3}
+#   CompileRequest{instance=1, fqbn=2, sketch_path=3, build_path=7, export_dir=18}
+#   (export_dir é o --output-dir do spawn; build_path é a árvore de build temporária)
+#   UploadRequest{instance=1, fqbn=2, sketch_path=3, port=4, import_dir=8}
+#   CompileResponse/UploadResponse{out_stream=1, err_stream=2}
+#   LibraryInstallRequest{instance=1, name=2, version=3}
+def _varint(n):
+    n &= (1 << 64) - 1
+    saida = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            saida.append(byte | 0x80)
+        else:
+            saida.append(byte)
+            return bytes(saida)
+
+def _ler_varint(dados, i):
+    n = deslocamento = 0
+    while True:
+        byte = dados[i]
+        i += 1
+        n |= (byte & 0x7F) << deslocamento
+        if not byte & 0x80:
+            return n, i
+        deslocamento += 7
+
+def codificar(*campos):
+    """(número, valor) -> bytes. int/bool viram varint; str/bytes (e mensagens já
+    codificadas) viram length-delimited. Valores None são omitidos."""
+    saida = bytearray()
+    for numero, valor in campos:
+        if valor is None:
+            continue
+        if isinstance(valor, (bool, int)):
+            saida += _varint(numero << 3) + _varint(int(valor))
+        else:
+            if isinstance(valor, str):
+                valor = valor.encode("utf-8")
+            saida += _varint(numero << 3 | 2) + _varint(len(valor)) + valor
+    return bytes(saida)
+
+def decodificar(dados):
+    """bytes -> {número: [valores]} (varints como int, o resto como bytes)."""
+    campos = {}
+    i = 0
+    while i < len(dados):
+        chave, i = _ler_varint(dados, i)
+        numero, tipo = chave >> 3, chave & 7
+        if tipo == 0:
+            valor, i = _ler_varint(dados, i)
+        elif tipo == 2:
+            tamanho, i = _ler_varint(dados, i)
+            valor, i = dados[i:i + tamanho], i + tamanho
+        elif tipo in (1, 5):
+            tamanho = 8 if tipo == 1 else 4
+            valor, i = dados[i:i + tamanho], i + tamanho
+        else:
+            raise ErroDaemon(f"Tipo de campo protobuf não suportado: {tipo}")
+        campos.setdefault(numero, []).append(valor)
+    return campos
+
+def _texto(campos, numero):
+    return campos.get(numero, [b""])[0].decode("utf-8", "replace")
+
+def requisicao_compilar(instancia, fqbn, sketch, pasta_saida):
+    """CompileRequest equivalente a `compile --fqbn F --output-dir P sketch`."""
+    return codificar((1, instancia), (2, fqbn), (3, sketch), (18, pasta_saida))
+
+def requisicao_upload(instancia, fqbn, sketch, porta, pasta_binarios):
+    """UploadRequest equivalente a `upload -p porta --fqbn F --input-dir P sketch`."""
+    return codificar((1, instancia), (2, fqbn), (3, sketch),
+                     (4, codificar((1, porta), (3, "serial"))), (8, pasta_binarios))
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class DaemonCli:
+    """Um `arduino-cli daemon` por processo, falando gRPC por canais reaproveitados.
+
+    O índice de placas e bibliotecas é lido uma vez só, na criação da instância,
+    em vez de a cada comando. Os métodos têm o mesmo contrato do caminho por
+    subprocess (código de saída, linhas de saída via `saida`) e levantam
+    ErroDaemon para que o chamador possa cair no spawn.
+    """
+
+    def __init__(self, cli_path, endereco=None, canais=CANAIS_PADRAO):
+        self.cli_path = cli_path
+        self.endereco = endereco  # "host:porta" de um daemon já rodando (não inicia processo)
+        self.n_canais = max(1, canais)
+        self.processo = None
+        self.canais = []
+        self.instancia = None
+        self._ciclo = None
+        self._lock = threading.Lock()
+        self._metodos = {}
+
+    def iniciar(self, timeout=TIMEOUT_INICIO):
+        try:
+            import grpc
+        except ImportError:
+            raise ErroDaemon("grpcio não está instalado")
+        if not self.endereco:
+            porta = _porta_livre()
+            flags = 0x08000000 if os.name == 'nt' else 0
+            self.processo = subprocess.Popen(
+                [self.cli_path, "daemon", "--port", str(porta)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                creationflags=flags)
+            self.endereco = f"127.0.0.1:{porta}"
+        self.canais = [grpc.insecure_channel(self.endereco) for _ in range(self.n_canais)]
+        self._ciclo = itertools.cycle(self.canais)
+        try:
+            for canal in self.canais:
+                grpc.channel_ready_future(canal).result(timeout=timeout)
+        except grpc.FutureTimeoutError:
+            self.encerrar()
+            raise ErroDaemon(f"daemon não respondeu em {self.endereco}")
+
+        try:
+            resposta = decodificar(self._chamar("Create", b""))
+            self.instancia = codificar((1, decodificar(resposta[1][0])[1][0]))
+            for msg in self._stream("Init", codificar((1, self.instancia))):
+                erro = decodificar(msg).get(2)
+                if erro:
+                    raise ErroDaemon(f"Init: {_texto(decodificar(erro[0]), 2)}")
+        except (ErroDaemon, KeyError, IndexError) as e:
+            self.encerrar()
+            raise ErroDaemon(f"daemon sem instância: {e}")
+        return self
+
+    # --- CHAMADAS ---
+    def _metodo(self, nome, stream):
+        with self._lock:
+            canal = next(self._ciclo)
+            chave = (id(canal), nome)
+            if chave not in self._metodos:
+                fabrica = canal.unary_stream if stream else canal.unary_unary
+                self._metodos[chave] = fabrica(SERVICO + nome)
+            return self._metodos[chave]
+
+    @staticmethod
+    def _erro(nome, e):
+        import grpc
+        classe = DaemonIndisponivel if e.code() == grpc.StatusCode.UNAVAILABLE else ErroDaemon
+        return classe(f"{nome}: {e.details()}")
+
+    def _chamar(self, nome, requisicao):
+        import grpc
+        try:
+            return self._metodo(nome, False)(requisicao)
+        except grpc.RpcError as e:
+            raise self._erro(nome, e)
+
+    def _stream(self, nome, requisicao):
+        import grpc
+        try:
+            yield from self._metodo(nome, True)(requisicao)
+        except grpc.RpcError as e:
+            raise self._erro(nome, e)
+
+    def _executar(self, nome, requisicao, saida):
+        """Repassa out_stream/err_stream linha a linha; 0 se o RPC terminou bem."""
+        montador = LineAssembler()
+        try:
+            for msg in self._stream(nome, requisicao):
+                campos = decodificar(msg)
+                for numero in (1, 2):
+                    for bloco in campos.get(numero, []):
+                        for linha in montador.alimentar(bloco):
+                            saida(linha.rstrip("\n"))
+        except DaemonIndisponivel:
+            raise
+        except ErroDaemon as e:
+            # Erro de compilação/upload é resultado normal (código 1), não falha do daemon
+            for linha in montador.finalizar():
+                saida(linha)
+            saida(str(e))
+            return 1
+        for linha in montador.finalizar():
+            saida(linha)
+        return 0
+
+    # --- OPERAÇÕES ---
+    def board_list(self, timeout_ms=1000):
+        """{endereço: fqbn} das placas detectadas (mesmo formato de serial_ports.ler_fqbns)."""
+        resposta = decodificar(self._chamar("BoardList", codificar((1, self.instancia), (2, timeout_ms))))
+        fqbns = {}
+        for bruto in resposta.get(1, []):
+            detectada = decodificar(bruto)
+            endereco = _texto(decodificar(detectada.get(2, [b""])[0]), 1)
+            placas = [decodificar(p) for p in detectada.get(1, [])]
+            if endereco and placas and _texto(placas[0], 2):
+                fqbns[endereco] = _texto(placas[0], 2)
+        return fqbns
+
+    def compilar(self, fqbn, sketch, pasta_saida, saida=print):
+        return self._executar("Compile", requisicao_compilar(self.instancia, fqbn, sketch, pasta_saida), saida)
+
+    def upload(self, fqbn, sketch, porta, pasta_binarios, saida=print):
+        return self._executar("Upload", requisicao_upload(self.instancia, fqbn, sketch, porta, pasta_binarios), saida)
+
+    def instalar_lib(self, nome, saida=print):
+        return self._executar("LibraryInstall", codificar((1, self.instancia), (2, nome)), saida)
+
+    def encerrar(self):
+        for canal in self.canais:
+            canal.close()
+        self.canais = []
+        if self.processo and self.processo.poll() is None:
+            self.processo.terminate()
+            try:
+                self.processo.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.processo.kill()
+                self.processo.wait()
+        self.processo = None
+
+_daemons = {}
+_falhas = set()
+_daemons_lock = threading.Lock()
+
+def daemon_para(cli_path):
+    """Daemon compartilhado do `cli_path` (iniciado na primeira chamada) ou None.
+
+    None quando o backend está desligado ou não conseguiu subir; nesse caso o
+    chamador usa o spawn de sempre e não tentamos de novo neste processo.
+    """
+    if not ATIVO or not cli_path:
+        return None
+    with _daemons_lock:
+        daemon = _daemons.get(cli_path)
+        if daemon and daemon.processo and daemon.processo.poll() is not None:
+            daemon.encerrar()  # Morreu: tenta subir outro
+            del _daemons[cli_path]
+            daemon = None
+        if daemon or cli_path in _falhas:
+            return daemon
+        try:
+            daemon = _daemons[cli_path] = DaemonCli(cli_path).iniciar()
+        except (ErroDaemon, OSError):
+            _falhas.add(cli_path)
+        return daemon
+
+def encerrar_todos():
+    with _daemons_lock:
+        for daemon in _daemons.values():
+            daemon.encerrar()
+        _daemons.clear()
+        _falhas.clear()
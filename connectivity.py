@@ -0,0 +1,95 @@
+import os
+import socket
+import threading
+import time
+
+# Servidores DNS públicos: basta um responder para considerarmos "online"
+HOSTS_PADRAO = (("8.8.8.8", 53), ("1.1.1.1", 53))
+# Por quanto tempo um resultado do probe vale antes de testar de novo
+TTL_PADRAO = 60.0
+
+def offline_forcado_no_ambiente():
+    """WANDI_OFFLINE=1 força o modo offline (laboratório sem rede)."""
+    return os.environ.get("WANDI_OFFLINE", "").strip().lower() not in ("", "0", "false", "nao", "não")
+
+class ConnectivityProbe:
+    """Testa a conexão UMA vez, em segundo plano, e guarda o resultado por `ttl`.
+
+    Quem só quer saber se já existe resposta usa `ultimo_resultado()`, que nunca
+    bloqueia; quem precisa da rede de fato chama `online()`, que espera o probe
+    em andamento em vez de abrir outro.
+    """
+
+    def __init__(self, hosts=HOSTS_PADRAO, timeout=2.0, ttl=TTL_PADRAO, forcar_offline=None,
+                 conector=None, relogio=time.monotonic):
+        self.hosts = tuple(hosts)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.forcar_offline = offline_forcado_no_ambiente() if forcar_offline is None else forcar_offline
+        self.conector = conector or socket.create_connection  # Trocável nos testes
+        self.relogio = relogio
+        self.probes = 0
+        self._lock = threading.Lock()
+        self._evento = None
+        self._resultado = None
+        self._quando = None
+
+    def _valido(self):
+        return self._quando is not None and self.relogio() - self._quando < self.ttl
+
+    def _executar(self, evento):
+        resultado = False
+        for host in self.hosts:
+            try:
+                with self.conector(host, timeout=self.timeout):
+                    resultado = True
+                    break
+            except OSError:
+                continue
+        with self._lock:
+            self._resultado = resultado
+            self._quando = self.relogio()
+            self.probes += 1
+        evento.set()
+
+    def sondar(self):
+        """Dispara o probe em segundo plano (se preciso) e devolve o Event dele."""
+        with self._lock:
+            if self._evento is not None and (not self._evento.is_set() or self._valido()):
+                return self._evento
+            self._evento = threading.Event()
+            evento = self._evento
+        if self.forcar_offline:
+            with self._lock:
+                self._resultado, self._quando = False, self.relogio()
+            evento.set()
+        else:
+            threading.Thread(target=self._executar, args=(evento,), daemon=True).start()
+        return evento
+
+    def online(self, timeout=None):
+        """True/False; None se o probe não terminou dentro de `timeout` segundos."""
+        evento = self.sondar()
+        if not evento.wait(timeout):
+            return None
+        return self._resultado
+
+    def ultimo_resultado(self):
+        """Resultado em cache (True/False) ou None, sem bloquear nem sondar."""
+        if self.forcar_offline:
+            return False
+        with self._lock:
+            return self._resultado if self._valido() else None
+
+    def invalidar(self):
+        with self._lock:
+            self._quando = None
+
+_probe_padrao = None
+
+def conectividade_padrao():
+    """Probe compartilhado pelo processo inteiro (um único cache)."""
+    global _probe_padrao
+    if _probe_padrao is None:
+        _probe_padrao = ConnectivityProbe()
+    return _probe_padrao
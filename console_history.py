@@ -0,0 +1,315 @@
+import re
+import time
+from array import array
+from bisect import bisect_right
+
+LINHAS_POR_BLOCO = 512           # Linhas por bloco selado (texto contíguo + mapa de trigramas)
+BITS_MAPA = 1 << 13              # Mapa de trigramas por bloco: 8 Kbit = 1 KB
+MAX_LINHAS_HISTORICO = 20_000_000  # Acima disso os blocos mais antigos saem (o log em disco guarda tudo)
+MAX_RESULTADOS = 100_000
+
+_np = None
+
+def _numpy():
+    """NumPy se instalado (importado só ao selar o primeiro bloco, não na partida da IDE)."""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # Sem NumPy o mapa sai igual, só que mais devagar
+            _np = False
+    return _np
+
+def _hash(trigrama):
+    # Multiplicativo de Knuth sobre os 3 bytes: os mesmos bits no índice (NumPy ou não) e na consulta
+    return ((trigrama * 2654435761) & 0xFFFFFFFF) >> (32 - BITS_MAPA.bit_length() + 1)
+
+def mapa_trigramas(dados):
+    """int com um bit ligado por trigrama (hash) dos bytes `dados` (já em minúsculas)."""
+    if len(dados) < 3:
+        return 0
+    np = _numpy()
+    if np:
+        b = np.frombuffer(dados, np.uint8).astype(np.uint32)
+        trigramas = (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+        bits = np.zeros(BITS_MAPA, np.bool_)
+        bits[(trigramas * np.uint32(2654435761)) >> np.uint32(32 - BITS_MAPA.bit_length() + 1)] = True
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+    mapa = 0
+    for a, b, c in set(zip(dados, dados[1:], dados[2:])):
+        mapa |= 1 << _hash(a << 16 | b << 8 | c)
+    return mapa
+
+_META = set(".^$*+?{}[]|()")
+_ESCAPES_CLASSE = set("dDwWsSbBAZz0123456789")
+_DIGITOS_ESCAPE = {"x": 2, "u": 4, "U": 8}   # \xHH, \uHHHH, \UHHHHHHHH
+
+def _fim_escape(padrao, i):
+    """Posição logo depois do escape que começa em padrao[i] (o '\\'), com os argumentos dele."""
+    letra, j = padrao[i + 1], i + 2
+    if letra in _DIGITOS_ESCAPE:
+        j += _DIGITOS_ESCAPE[letra]
+    elif letra in "Ng":   # \N{NOME}, \g<grupo>
+        fim = padrao.find("}" if letra == "N" else ">", j)
+        j = len(padrao) if fim < 0 else fim + 1
+    elif letra.isdigit():   # Octal \0nn ou referência \nn
+        while j < len(padrao) and j < i + 4 and padrao[j].isdigit():
+            j += 1
+    return min(j, len(padrao))
+
+def _fim_classe(padrao, i):
+    """Posição logo depois da classe que começa em padrao[i] (o '['); escapes dentro dela são pulados."""
+    j = i + 1
+    if j < len(padrao) and padrao[j] == "^":
+        j += 1
+    if j < len(padrao) and padrao[j] == "]":   # ']' logo no início é literal
+        j += 1
+    while j < len(padrao):
+        if padrao[j] == "\\":
+            j += 2
+        elif padrao[j] == "]":
+            return j + 1
+        else:
+            j += 1
+    return len(padrao)
+
+def literais_obrigatorios(padrao):
+    """Trechos literais que todo match de `padrao` precisa conter (só os seguros).
+
+    Olha apenas o nível de fora dos grupos e das classes; um caractere seguido
+    de quantificador sai do trecho; um quantificador {m,n} e um escape com
+    argumento (\\xHH, \\uHHHH, \\N{...}, \\g<...>) só quebram o trecho, inteiros.
+    Com '|' no nível de fora não há nada obrigatório. Serve só para descartar
+    blocos: na dúvida, devolve menos.
+    """
+    literais, atual = [], []
+    profundidade = 0
+    i = 0
+    while i < len(padrao):
+        c = padrao[i]
+        proximo = padrao[i + 1] if i + 1 < len(padrao) else ""
+        if c == "\\" and proximo:
+            if profundidade == 0 and proximo not in _ESCAPES_CLASSE and not proximo.isalpha():
+                caractere, i = proximo, i + 2
+            else:
+                literais.append("".join(atual)); atual = []
+                i = _fim_escape(padrao, i)
+                continue
+        elif c == "[":
+            literais.append("".join(atual)); atual = []
+            i = _fim_classe(padrao, i)
+            continue
+        elif c == "{":   # Quantificador {m,n}: os dígitos não são texto
+            fim = padrao.find("}", i)
+            literais.append("".join(atual)); atual = []
+            i = len(padrao) if fim < 0 else fim + 1
+            continue
+        elif c in "()":
+            profundidade += 1 if c == "(" else -1
+            literais.append("".join(atual)); atual = []
+            i += 1
+            continue
+        elif c == "|" and profundidade == 0:
+            return []
+        elif c in _META or profundidade:
+            literais.append("".join(atual)); atual = []
+            i += 1
+            continue
+        else:
+            caractere, i = c, i + 1
+        if i < len(padrao) and padrao[i] in "?*{":
+            literais.append("".join(atual)); atual = []   # Caractere opcional
+            continue
+        atual.append(caractere)
+    literais.append("".join(atual))
+    return [l for l in literais if l]
+
+class Consulta:
+    """Texto ou regex já compilado + máscara de trigramas para pular blocos."""
+
+    def __init__(self, texto, regex=False, maiusculas=False):
+        self.texto = texto
+        bandeiras = re.MULTILINE | (0 if maiusculas else re.IGNORECASE)
+        # Literal: str.find (no texto em minúsculas, se não diferencia maiúsculas) é bem mais
+        # rápido que o regex com IGNORECASE; o regex fica de reserva para texto não ASCII
+        self.agulha = None if regex else (texto if maiusculas else texto.lower())
+        self.minusculas = not regex and not maiusculas
+        if regex:
+            self.padrao = re.compile(texto, bandeiras)   # re.error sobe para quem chamou
+            literais = literais_obrigatorios(texto)
+        else:
+            self.padrao = None if maiusculas else re.compile(re.escape(texto), bandeiras)
+            literais = [texto]
+        self.mascara = 0
+        for literal in literais:
+            self.mascara |= mapa_trigramas(literal.lower().encode("utf-8"))
+
+    def procurador(self, texto):
+        """(alvo, procurar): `procurar(alvo, inicio)` dá o (início, fim) do próximo match ou None."""
+        if self.minusculas:
+            baixo = texto.lower()
+            if len(baixo) == len(texto):   # Mesmas posições (quase sempre; 'İ' é a exceção)
+                return baixo, self._procurar_agulha
+        elif self.padrao is None:
+            return texto, self._procurar_agulha
+        return texto, self._procurar_padrao
+
+    def _procurar_agulha(self, alvo, inicio):
+        pos = alvo.find(self.agulha, inicio)
+        return (pos, pos + len(self.agulha)) if pos >= 0 else None
+
+    def _procurar_padrao(self, alvo, inicio):
+        m = self.padrao.search(alvo, inicio)
+        return m.span() if m else None
+
+class _Bloco:
+    __slots__ = ("primeira", "texto", "inicios", "mapa")
+
+    def __init__(self, primeira, linhas):
+        self.primeira = primeira
+        self.texto = "\n".join(linhas) + "\n"
+        self.inicios = array("I", [0])
+        pos = 0
+        for linha in linhas[:-1]:
+            pos += len(linha) + 1
+            self.inicios.append(pos)
+        self.mapa = mapa_trigramas(self.texto.lower().encode("utf-8", "replace"))
+
+    def linha(self, i):
+        inicio = self.inicios[i]
+        return self.texto[inicio:self.texto.index("\n", inicio)]
+
+    def ocorrencias(self, consulta):
+        """Índices (globais) das linhas do bloco com pelo menos um match."""
+        inicios, texto = self.inicios, self.texto
+        alvo, procurar = consulta.procurador(texto)
+        pos = 0
+        while (achado := procurar(alvo, pos)) is not None:
+            inicio, fim = achado
+            if texto.find("\n", inicio, fim) >= 0:
+                pos = inicio + 1   # Regex que atravessou o fim da linha (\s, [^x]...) não conta
+                continue
+            i = bisect_right(inicios, inicio) - 1
+            yield self.primeira + i
+            # Um match por linha basta: a próxima procura começa na linha seguinte
+            pos = inicios[i + 1] if i + 1 < len(inicios) else len(texto)
+
+class HistoricoConsole:
+    """Todas as linhas de um console, só de acréscimo, com busca indexada.
+
+    As linhas vão para um bloco aberto; a cada LINHAS_POR_BLOCO o bloco é
+    selado: vira um único str com os inícios de linha num array e ganha um
+    mapa de trigramas (bitmap de 1 KB). A busca só varre os blocos cujo mapa
+    tem todos os trigramas da consulta, então termos raros saem em
+    milissegundos mesmo com milhões de linhas. O horário é guardado por lote
+    recebido (início do lote + horário), não por linha.
+    """
+
+    def __init__(self, max_linhas=MAX_LINHAS_HISTORICO, relogio=time.time):
+        self.max_linhas = max_linhas
+        self.relogio = relogio
+        self.limpar()
+
+    def limpar(self):
+        self.geracao = getattr(self, "geracao", 0) + 1   # Quem guarda números de linha percebe o limpar
+        self.blocos = []
+        self.aberto = []          # Linhas do bloco ainda não selado
+        self.parcial = ""
+        self.descartadas = 0      # Linhas que saíram pelo limite (os números das outras não mudam)
+        self._lotes_inicio = array("Q")
+        self._lotes_horario = array("d")
+
+    @property
+    def total(self):
+        """Número da próxima linha (linhas completas recebidas desde o último limpar)."""
+        return self._primeira_aberta + len(self.aberto)
+
+    @property
+    def _primeira_aberta(self):
+        return self.blocos[-1].primeira + len(self.blocos[-1].inicios) if self.blocos else self.descartadas
+
+    def anexar(self, texto, horario=None):
+        if "\r" in texto:
+            texto = texto.replace("\r\n", "\n")
+        linhas = (self.parcial + texto).split("\n")
+        self.parcial = linhas.pop()
+        if not linhas:
+            return
+        horario = self.relogio() if horario is None else horario
+        if not self._lotes_horario or horario - self._lotes_horario[-1] >= 0.001:
+            self._lotes_inicio.append(self.total)
+            self._lotes_horario.append(horario)
+        while linhas:
+            cabe = LINHAS_POR_BLOCO - len(self.aberto)
+            self.aberto.extend(linhas[:cabe])
+            linhas = linhas[cabe:]
+            if len(self.aberto) == LINHAS_POR_BLOCO:
+                self.blocos.append(_Bloco(self._primeira_aberta, self.aberto))
+                self.aberto = []
+        while self.blocos and self.total - self.descartadas > self.max_linhas:
+            self.descartadas += len(self.blocos.pop(0).inicios)
+
+    def linha(self, n):
+        if n < self.descartadas or n >= self.total:
+            raise IndexError(n)
+        if n >= self._primeira_aberta:
+            return self.aberto[n - self._primeira_aberta]
+        bloco = self.blocos[(n - self.descartadas) // LINHAS_POR_BLOCO]
+        return bloco.linha(n - bloco.primeira)
+
+    def horario(self, n):
+        """Quando a linha `n` chegou (time.time() do lote)."""
+        i = bisect_right(self._lotes_inicio, n) - 1
+        return self._lotes_horario[max(i, 0)] if self._lotes_horario else 0.0
+
+    def _aberto_como_bloco(self):
+        if not self.aberto:
+            return None
+        bloco = _Bloco.__new__(_Bloco)
+        bloco.primeira = self._primeira_aberta
+        bloco.texto = "\n".join(self.aberto) + "\n"
+        bloco.inicios = array("I", [0])
+        for linha in self.aberto[:-1]:
+            bloco.inicios.append(bloco.inicios[-1] + len(linha) + 1)
+        bloco.mapa = -1   # Todos os bits: sempre varre
+        return bloco
+
+    def _candidatos(self, consulta, reverso=False):
+        blocos = self.blocos + [b for b in [self._aberto_como_bloco()] if b]
+        mascara = consulta.mascara
+        for bloco in reversed(blocos) if reverso else blocos:
+            if bloco.mapa & mascara == mascara:
+                yield bloco
+
+    def buscar(self, consulta, limite=MAX_RESULTADOS, inicio=0):
+        """array('Q') com as linhas >= `inicio` (em ordem) que batem com a Consulta, até `limite`."""
+        achadas = array("Q")
+        for bloco in self._candidatos(consulta):
+            if bloco.primeira + len(bloco.inicios) <= inicio:
+                continue
+            for n in bloco.ocorrencias(consulta):
+                if n < inicio:
+                    continue
+                achadas.append(n)
+                if len(achadas) >= limite:
+                    return achadas
+        return achadas
+
+    def proxima(self, consulta, linha, para_tras=False):
+        """Primeira linha com match depois de `linha` (ou a última antes dela); None se não há."""
+        for bloco in self._candidatos(consulta, reverso=para_tras):
+            fim_bloco = bloco.primeira + len(bloco.inicios)
+            if para_tras:
+                if bloco.primeira >= linha:
+                    continue
+                anteriores = [n for n in bloco.ocorrencias(consulta) if n < linha]
+                if anteriores:
+                    return anteriores[-1]
+            else:
+                if fim_bloco <= linha + 1:
+                    continue
+                for n in bloco.ocorrencias(consulta):
+                    if n > linha:
+                        return n
+        return None
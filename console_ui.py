@@ -0,0 +1,187 @@
+import time
+from collections import deque
+
+from PyQt6.QtWidgets import QPlainTextEdit, QTextEdit
+from PyQt6.QtGui import QTextCursor, QTextFormat, QColor
+from PyQt6.QtCore import QTimer
+
+# Limite padrão de linhas mantidas em cada console (OUTPUT / SERIAL MONITOR)
+CONSOLE_MAX_LINHAS = 10000
+# Intervalo do "frame" de renderização (~60 fps)
+CONSOLE_FRAME_MS = 16
+
+class LineRingBuffer:
+    """Guarda no máximo `capacidade` linhas; as mais antigas são descartadas."""
+
+    def __init__(self, capacidade=CONSOLE_MAX_LINHAS):
+        self.linhas = deque(maxlen=capacidade)
+        self.parcial = ""       # Última linha, ainda sem '\n'
+        self.total = 0          # Linhas completas recebidas desde o último clear
+        self.descartadas = 0    # Linhas que já saíram do buffer
+
+    @property
+    def capacidade(self):
+        return self.linhas.maxlen
+
+    def escrever(self, texto):
+        """Acrescenta texto cru (pode conter vários '\n'); retorna nº de linhas completas novas."""
+        partes = texto.split("\n")
+        if len(partes) == 1:
+            self.parcial += texto
+            return 0
+        partes[0] = self.parcial + partes[0]
+        self.parcial = partes.pop()
+        novas = len(partes)
+        cheias = len(self.linhas) + novas - self.capacidade
+        if cheias > 0:
+            self.descartadas += cheias
+        # Só as últimas `capacidade` linhas importam; o deque descarta o resto
+        self.linhas.extend(partes[-self.capacidade:])
+        self.total += novas
+        return novas
+
+    def texto(self):
+        return "".join(linha + "\n" for linha in self.linhas) + self.parcial
+
+    def clear(self):
+        self.linhas.clear()
+        self.parcial = ""
+        self.total = 0
+        self.descartadas = 0
+
+class ConsoleView(QPlainTextEdit):
+    """Console somente leitura com limite de linhas e escrita em lote.
+
+    As linhas recebidas vão para um LineRingBuffer e só são desenhadas a cada
+    CONSOLE_FRAME_MS, num único insertText, em vez de uma vez por linha. Se o
+    desenho ficar caro (enxurrada de linhas), o intervalo do frame cresce para
+    que o console nunca ocupe mais que ~1/3 do event loop. Com um `historico`
+    (HistoricoConsole), todas as linhas ficam pesquisáveis, mesmo as que já
+    saíram do widget.
+    """
+
+    def __init__(self, parent=None, capacidade=CONSOLE_MAX_LINHAS, frame_ms=CONSOLE_FRAME_MS, historico=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.historico = historico
+        self.seguir = True   # Autoscroll; desligado enquanto uma linha achada na busca está em foco
+        self.buffer = LineRingBuffer(capacidade)
+        self.setMaximumBlockCount(capacidade + 1)
+        self._pendente = []
+        self._pendente_linhas = 0
+        self._recarregar = False
+        self._previa = ""             # Linha parcial viva (ex.: progresso com '\r')
+        self._previa_exibida = 0      # Tamanho (UTF-16) da prévia que está no widget
+        self._previa_alterada = False
+        self.descargas = 0
+        self.frame_ms = frame_ms
+
+        self._timer_frame = QTimer(self)
+        self._timer_frame.setSingleShot(True)
+        self._timer_frame.setInterval(frame_ms)
+        self._timer_frame.timeout.connect(self.descarregar)
+
+    def definir_capacidade(self, capacidade):
+        antigo = self.buffer
+        self.buffer = LineRingBuffer(capacidade)
+        self.buffer.escrever(antigo.texto())
+        self.setMaximumBlockCount(capacidade + 1)
+        self._recarregar = True
+        self._timer_frame.start()
+
+    def escrever(self, texto):
+        """Substitui o antigo moveCursor + insertPlainText por linha."""
+        if self.historico is not None:
+            self.historico.anexar(texto)
+        novas = self.buffer.escrever(texto)
+        if self._recarregar:
+            return
+        self._pendente_linhas += novas
+        if self._pendente_linhas >= self.buffer.capacidade // 2:
+            # Inserir + aparar metade do buffer custa mais que redesenhar tudo a partir dele
+            self._pendente.clear()
+            self._recarregar = True
+        else:
+            self._pendente.append(texto)
+        if not self._timer_frame.isActive():
+            self._timer_frame.start()
+
+    def escrever_lote(self, texto, previa=""):
+        """Linhas completas + linha parcial atual, que substitui a prévia anterior."""
+        if texto:
+            self.escrever(texto)
+        if previa != self._previa:
+            self._previa = previa
+            self._previa_alterada = True
+            if not self._timer_frame.isActive():
+                self._timer_frame.start()
+
+    def descarregar(self):
+        if not (self._recarregar or self._pendente or self._previa_alterada):
+            return
+        barra = self.verticalScrollBar()
+        inicio = time.perf_counter()
+        if self._recarregar:
+            self.setPlainText(self.buffer.texto() + self._previa)
+        else:
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            if self._previa_exibida:
+                # Seleciona a prévia antiga para o insertText substituí-la
+                cursor.movePosition(QTextCursor.MoveOperation.Left,
+                                    QTextCursor.MoveMode.KeepAnchor, self._previa_exibida)
+            cursor.insertText("".join(self._pendente) + self._previa)
+        self._previa_exibida = len(self._previa.encode("utf-16-le")) // 2
+        self._pendente.clear()
+        self._pendente_linhas = 0
+        self._recarregar = False
+        self._previa_alterada = False
+        self.descargas += 1
+        custo_ms = (time.perf_counter() - inicio) * 1000
+        self._timer_frame.setInterval(max(self.frame_ms, int(custo_ms * 2)))
+        # Mantém o autoscroll que o console sempre teve
+        if self.seguir:
+            barra.setValue(barra.maximum())
+
+    def ir_para_linha(self, n):
+        """Destaca a linha `n` (numeração do histórico) se ela ainda está no widget; False se já saiu."""
+        self.descarregar()
+        indice = n - self.buffer.descartadas
+        if not 0 <= indice < len(self.buffer.linhas):
+            return False
+        # O widget tem as linhas do buffer + o bloco da prévia no fim
+        indice += self.document().blockCount() - 1 - len(self.buffer.linhas)
+        bloco = self.document().findBlockByNumber(indice)
+        if not bloco.isValid():
+            return False
+        self.seguir = False
+        cursor = QTextCursor(bloco)
+        self.setTextCursor(cursor)
+        self.centerCursor()
+        destaque = QTextEdit.ExtraSelection()
+        destaque.format.setBackground(QColor("#2c3e50"))
+        destaque.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        destaque.cursor = cursor
+        self.setExtraSelections([destaque])
+        return True
+
+    def retomar(self):
+        """Volta ao autoscroll depois de uma busca."""
+        self.seguir = True
+        self.setExtraSelections([])
+        barra = self.verticalScrollBar()
+        barra.setValue(barra.maximum())
+
+    def clear(self):
+        self._timer_frame.stop()
+        self._pendente.clear()
+        self._pendente_linhas = 0
+        self._recarregar = False
+        self._previa = ""
+        self._previa_exibida = 0
+        self._previa_alterada = False
+        self.buffer.clear()
+        if self.historico is not None:
+            self.historico.limpar()
+        self.setExtraSelections([])
+        super().clear()
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import re
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Tamanho de cada pedaço lido do socket
+BLOCO_DOWNLOAD = 256 * 1024
+# Quantos trechos (Range) baixar ao mesmo tempo quando o servidor permite
+PARTES_PADRAO = 4
+# Arquivos menores que isso por parte não compensam a divisão
+MIN_PARTE = 1024 * 1024
+# Falhas seguidas SEM progresso antes de desistir (qualquer byte novo zera a conta)
+TENTATIVAS_PADRAO = 6
+# (conexão, leitura) em segundos: sem timeout um Wi-Fi travado prende a thread para sempre
+TIMEOUT_PADRAO = (5, 30)
+
+class ErroDownload(Exception):
+    pass
+
+# --- CHECKSUM ---
+def sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(BLOCO_DOWNLOAD), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def ler_checksums(texto):
+    """Lê um arquivo no formato do sha256sum ("<hash>  <nome>") -> {nome: hash}."""
+    checksums = {}
+    for linha in texto.splitlines():
+        partes = linha.split()
+        if len(partes) == 2 and re.fullmatch(r"[0-9a-fA-F]{64}", partes[0]):
+            checksums[partes[1].lstrip("*")] = partes[0].lower()
+    return checksums
+
+def url_checksums(url_artefato):
+    """URL do checksums.txt publicado junto com um artefato do arduino-cli.
+
+    ".../arduino-cli_1.1.1_Linux_64bit.tar.gz" -> ".../arduino-cli_1.1.1_checksums.txt"
+    (o link "latest" precisa ser resolvido antes, seguindo o redirecionamento).
+    """
+    base, nome = url_artefato.rsplit("/", 1)
+    m = re.match(r"(arduino-cli_[^_]+)_", nome)
+    if not m or "latest" in m.group(1):
+        return None
+    return f"{base}/{m.group(1)}_checksums.txt"
+
+# --- EXTRAÇÃO ---
+def _gravar_executavel(origem, destino):
+    temp = f"{destino}.tmp-{os.getpid()}"
+    with open(temp, "wb") as f:
+        shutil.copyfileobj(origem, f, BLOCO_DOWNLOAD)
+    os.chmod(temp, 0o755)
+    os.replace(temp, destino)
+    return destino
+
+def extrair_binario(arquivo, nome_binario, pasta_destino):
+    """Extrai SÓ o executável `nome_binario` de um .zip ou .tar.gz.
+
+    O tar é lido em modo stream (r|*): para no primeiro membro com esse nome,
+    sem descompactar o resto. O zip precisa do índice no fim do arquivo, então
+    abre só a entrada do binário. A gravação é atômica (temp + rename).
+    """
+    destino = os.path.join(pasta_destino, nome_binario)
+    if zipfile.is_zipfile(arquivo):
+        with zipfile.ZipFile(arquivo) as z:
+            for info in z.infolist():
+                if not info.is_dir() and os.path.basename(info.filename) == nome_binario:
+                    with z.open(info) as origem:
+                        return _gravar_executavel(origem, destino)
+    else:
+        with tarfile.open(arquivo, "r|*") as t:
+            for membro in t:
+                if membro.isfile() and os.path.basename(membro.name) == nome_binario:
+                    return _gravar_executavel(t.extractfile(membro), destino)
+    raise ErroDownload(f"{nome_binario} não encontrado em {os.path.basename(arquivo)}")
+
+# --- DOWNLOAD ---
+class Downloader:
+    """Download resiliente: retoma com Range, divide em partes paralelas e confere o sha256.
+
+    Cada parte grava em "<destino>.partN"; se a conexão cair, a próxima
+    tentativa (ou a próxima execução do programa) continua do tamanho que já
+    está no disco em vez de recomeçar do zero.
+    """
+
+    def __init__(self, sessao=None, partes=PARTES_PADRAO, tentativas=TENTATIVAS_PADRAO,
+                 timeout=TIMEOUT_PADRAO, progresso=None):
+        self.sessao = sessao or requests.Session()
+        self.partes = max(1, partes)
+        self.tentativas = tentativas
+        self.timeout = timeout
+        self.progresso = progresso  # progresso(baixados, total) — total 0 se desconhecido
+        self.reconexoes = 0
+        self.bytes_rede = 0
+        self._lock = threading.Lock()
+        self._baixados = 0
+        self._total = 0
+
+    def informacoes(self, url):
+        """(url_final, tamanho, aceita_range) seguindo redirecionamentos."""
+        r = self.sessao.head(url, allow_redirects=True, timeout=self.timeout)
+        r.raise_for_status()
+        tamanho = int(r.headers.get("Content-Length") or 0)
+        aceita_range = r.headers.get("Accept-Ranges", "").lower() == "bytes" and tamanho > 0
+        return r.url, tamanho, aceita_range
+
+    def _avancar(self, n):
+        with self._lock:
+            self._baixados += n
+            self.bytes_rede += n
+            baixados = self._baixados
+        if self.progresso:
+            self.progresso(baixados, self._total)
+
+    def _baixar_parte(self, url, arquivo_parte, inicio, fim, aceita_range):
+        """Baixa os bytes [inicio, fim] (fim=None: até o final) para `arquivo_parte`."""
+        falhas = 0
+        while True:
+            ja_tem = os.path.getsize(arquivo_parte) if os.path.exists(arquivo_parte) else 0
+            if fim is not None and inicio + ja_tem > fim:
+                return
+            headers = {}
+            if aceita_range:
+                headers["Range"] = f"bytes={inicio + ja_tem}-{'' if fim is None else fim}"
+            elif ja_tem:
+                # Servidor sem Range: só dá para recomeçar, e o que já tinha sai do progresso
+                with self._lock:
+                    self._baixados -= ja_tem
+                ja_tem = 0
+            recebidos = 0
+            try:
+                with self.sessao.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+                    r.raise_for_status()
+                    if aceita_range and r.status_code != 206:
+                        raise ErroDownload(f"Servidor ignorou o Range (HTTP {r.status_code})")
+                    with open(arquivo_parte, "ab" if ja_tem else "wb") as f:
+                        for bloco in r.iter_content(BLOCO_DOWNLOAD):
+                            f.write(bloco)
+                            recebidos += len(bloco)
+                            self._avancar(len(bloco))
+                esperado = None if fim is None else fim - inicio + 1
+                # Sem Range a resposta veio inteira: se faltou algo, `baixar` acusa o tamanho
+                if esperado is None or not aceita_range or os.path.getsize(arquivo_parte) >= esperado:
+                    return
+                raise requests.exceptions.ChunkedEncodingError("conexão encerrada antes do fim")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                falhas = 0 if recebidos else falhas + 1
+                with self._lock:
+                    self.reconexoes += 1
+                if falhas >= self.tentativas:
+                    raise ErroDownload(f"Download interrompido após {falhas} tentativas sem progresso")
+                time.sleep(min(0.2 * 2 ** falhas, 5.0))
+
+    def baixar(self, url, destino):
+        """Baixa `url` para `destino` (retomando partes existentes) e devolve a URL final."""
+        url_final, tamanho, aceita_range = self.informacoes(url)
+        n = self.partes if aceita_range else 1
+        n = max(1, min(n, tamanho // MIN_PARTE)) if tamanho else 1
+        limites = [(i * tamanho // n, (i + 1) * tamanho // n - 1 if tamanho else None) for i in range(n)]
+
+        # Partes de um download anterior com outra divisão não servem
+        divisao = f"{url_final} {tamanho} {n}"
+        arquivo_divisao = f"{destino}.partes"
+        if os.path.exists(arquivo_divisao):
+            with open(arquivo_divisao) as f:
+                mesma_divisao = f.read() == divisao
+        else:
+            mesma_divisao = False
+        if not mesma_divisao:
+            self._remover_partes(destino)
+            with open(arquivo_divisao, "w") as f:
+                f.write(divisao)
+
+        arquivos = [f"{destino}.part{i}" for i in range(n)]
+        self._total = tamanho
+        # Sem Range a parte no disco é descontada quando `_baixar_parte` recomeça do zero
+        self._baixados = sum(os.path.getsize(a) for a in arquivos if os.path.exists(a))
+
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            tarefas = [pool.submit(self._baixar_parte, url_final, arq, inicio, fim, aceita_range)
+                       for arq, (inicio, fim) in zip(arquivos, limites)]
+            for tarefa in tarefas:
+                tarefa.result()
+
+        temp = f"{destino}.tmp-{os.getpid()}"
+        with open(temp, "wb") as saida:
+            for arq in arquivos:
+                with open(arq, "rb") as f:
+                    shutil.copyfileobj(f, saida, BLOCO_DOWNLOAD)
+        obtido = os.path.getsize(temp)
+        if tamanho and obtido != tamanho:
+            os.remove(temp)
+            self._remover_partes(destino)
+            raise ErroDownload(f"Tamanho incorreto: {obtido} de {tamanho} bytes")
+        os.replace(temp, destino)
+        self._remover_partes(destino)
+        return url_final
+
+    def baixar_verificado(self, url, destino, url_checks=None):
+        """Baixa e confere com o checksums.txt publicado; arquivo corrompido é apagado."""
+        url_final = self.baixar(url, destino)
+        url_checks = url_checks or url_checksums(url_final)
+        if not url_checks:
+            raise ErroDownload(f"Sem arquivo de checksums para {url_final}")
+        r = self.sessao.get(url_checks, timeout=self.timeout)
+        r.raise_for_status()
+        nome = url_final.rsplit("/", 1)[-1]
+        esperado = ler_checksums(r.text).get(nome)
+        if not esperado:
+            raise ErroDownload(f"{nome} não consta em {url_checks}")
+        obtido = sha256_arquivo(destino)
+        if obtido != esperado:
+            os.remove(destino)
+            raise ErroDownload(f"Checksum não confere para {nome}: {obtido[:12]}… != {esperado[:12]}…")
+        return url_final
+
+    @staticmethod
+    def _remover_partes(destino):
+        pasta = os.path.dirname(destino) or "."
+        prefixo = os.path.basename(destino) + ".part"
+        for nome in os.listdir(pasta):
+            if nome.startswith(prefixo):
+                os.remove(os.path.join(pasta, nome))
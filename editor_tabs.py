@@ -0,0 +1,375 @@
+import os
+import time
+from PyQt6.QtWidgets import QTabWidget, QMessageBox, QPlainTextEdit, QScrollBar
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+
+from highlighter import CodeEditor
+from large_file import ArquivoMapeado
+from autosave import PASTA_DIARIO, Diario, diarios_pendentes, gravar_atomico
+
+class VisaoArquivoGrande(CodeEditor):
+    """Arquivo grande (log, CSV de captura...) aberto só para leitura.
+
+    O arquivo fica num ArquivoMapeado (mmap + índice de linhas em segundo plano)
+    e o documento guarda só as linhas da tela: a barra de rolagem é própria e
+    cobre o arquivo inteiro; rolar troca a janela. Sem highlight e sem desfazer.
+    """
+    INTERVALO_INDICE_MS = 200  # Atualização da barra enquanto o índice cresce
+    LINHAS_POR_PASSO = 3       # Linhas por passo da roda do mouse
+
+    def __init__(self, caminho, parent=None):
+        super().__init__(parent)
+        self.caminho_arquivo = caminho
+        self.desligar_highlight()
+        self.setReadOnly(True)
+        # Só leitura, mas com cursor de teclado: as setas movem o cursor em vez de rolar o documento
+        self.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse
+                                     | Qt.TextInteractionFlag.TextSelectableByKeyboard)
+        self.setUndoRedoEnabled(False)
+        self.arquivo = ArquivoMapeado(caminho).indexar_em_segundo_plano()
+
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.barra = QScrollBar(Qt.Orientation.Vertical, self)
+        self.barra.valueChanged.connect(self.materializar)
+        self.update_line_number_area_width(0)
+
+        self.timer_indice = QTimer(self)
+        self.timer_indice.timeout.connect(self._indice_cresceu)
+        self.timer_indice.start(self.INTERVALO_INDICE_MS)
+        self.materializar()  # A primeira tela não espera o índice
+
+    def linhas_na_tela(self):
+        return self.linhas_inteiras() + 1
+
+    def linhas_inteiras(self):
+        """Linhas que cabem inteiras na tela (a última do documento pode aparecer cortada)."""
+        return max(1, self.viewport().height() // max(1, self.fontMetrics().lineSpacing()))
+
+    def total_linhas(self):
+        # Também chamado pelo CodeEditor.__init__, antes do arquivo ser aberto
+        indexadas = self.arquivo.linhas_indexadas if hasattr(self, "arquivo") else 0
+        return max(indexadas, super().total_linhas())
+
+    def _indice_cresceu(self):
+        self.barra.setRange(0, max(0, self.arquivo.linhas_indexadas - self.linhas_na_tela() + 1))
+        self.barra.setPageStep(self.linhas_na_tela() - 1)
+        self.update_line_number_area_width(0)
+        if self.arquivo.pronto.is_set():
+            self.timer_indice.stop()
+
+    def materializar(self, *_):
+        """Troca o conteúdo do documento pelas linhas visíveis a partir da barra."""
+        cursor = self.textCursor()
+        linha = getattr(self, "deslocamento_linhas", 0) + cursor.blockNumber()
+        coluna = cursor.positionInBlock()
+        inicio = self.barra.value()
+        self.deslocamento_linhas = inicio
+        self.setPlainText("\n".join(self.arquivo.linhas(inicio, self.linhas_na_tela())))
+        # setPlainText leva o cursor ao início: volta para a mesma linha do arquivo
+        self.posicionar_cursor(linha, coluna)
+        self.line_number_area.update()
+
+    def posicionar_cursor(self, linha, coluna):
+        """Cursor na linha `linha` do arquivo, presa às linhas inteiras da janela atual."""
+        maximo = min(self.linhas_inteiras(), self.blockCount()) - 1
+        bloco = self.document().findBlockByNumber(min(max(0, linha - self.deslocamento_linhas), maximo))
+        cursor = QTextCursor(bloco)
+        cursor.setPosition(bloco.position() + min(coluna, bloco.length() - 1))
+        self.setTextCursor(cursor)
+
+    def fechar_arquivo(self):
+        self.timer_indice.stop()
+        self.arquivo.fechar()
+
+    # --- ROLAGEM ---
+    def wheelEvent(self, event):
+        passos = event.angleDelta().y() // 120
+        if passos:
+            self.barra.setValue(self.barra.value() - passos * self.LINHAS_POR_PASSO)
+        if event.angleDelta().x():
+            super().wheelEvent(event)
+
+    def keyPressEvent(self, event):
+        tecla, barra = event.key(), self.barra
+        ctrl = event.modifiers() & Qt.KeyboardModifier.ControlModifier
+        if tecla in (Qt.Key.Key_Up, Qt.Key.Key_Down):
+            # Linhas do arquivo: a janela rola quando o cursor passa da borda visível
+            cursor = self.textCursor()
+            coluna = cursor.positionInBlock()
+            topo = self.deslocamento_linhas + self.firstVisibleBlock().blockNumber()
+            alvo = self.deslocamento_linhas + cursor.blockNumber() + (-1 if tecla == Qt.Key.Key_Up else 1)
+            if alvo < topo:
+                barra.setValue(alvo)
+            elif alvo >= topo + self.linhas_inteiras():
+                barra.setValue(alvo - self.linhas_inteiras() + 1)
+            else:
+                QPlainTextEdit.keyPressEvent(self, event)
+                return
+            self.posicionar_cursor(alvo, coluna)
+        elif tecla == Qt.Key.Key_PageUp:
+            barra.setValue(barra.value() - barra.pageStep())
+        elif tecla == Qt.Key.Key_PageDown:
+            barra.setValue(barra.value() + barra.pageStep())
+        elif tecla == Qt.Key.Key_Home and ctrl:
+            barra.setValue(barra.minimum())
+        elif tecla == Qt.Key.Key_End and ctrl:
+            barra.setValue(barra.maximum())
+        else:
+            # Sem o auto-fechamento/indentação do CodeEditor: só navegação e cópia
+            QPlainTextEdit.keyPressEvent(self, event)
+
+    # --- LAYOUT ---
+    def update_line_number_area_width(self, _):
+        barra = getattr(self, "barra", None)
+        self.setViewportMargins(self.line_number_area_width(), 0, barra.sizeHint().width() if barra else 0, 0)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        cr = self.contentsRect()
+        largura = self.barra.sizeHint().width()
+        self.barra.setGeometry(cr.right() - largura + 1, cr.top(), largura, cr.height())
+        self._indice_cresceu()
+        if self.blockCount() < self.linhas_na_tela():
+            self.materializar()
+
+class EditorTabs(QTabWidget):
+    """Vários scripts abertos na mesma janela, um CodeEditor por aba.
+
+    Todos os editores usam o mesmo conjunto de regras do highlighter
+    (RegrasHighlight.compartilhadas). Ao trocar de aba, a anterior hiberna:
+    solta layout e formatos e só os refaz quando volta a ficar visível.
+    Arquivos grandes abrem sem highlight ou, acima de LIMITE_ARQUIVO_GRANDE,
+    numa VisaoArquivoGrande só de leitura.
+
+    Salvar e o autosave rodam numa única thread de gravação, em ordem: a
+    interface só copia o texto. O autosave grava um Diario por aba modificada
+    e `recuperar` reabre o que ficou sem salvar na sessão anterior.
+    """
+    # Editor que ficou ativo (troca de aba, aba nova ou aba fechada)
+    editor_alterado = pyqtSignal(object)
+    # (editor, caminho, erro ou "", ms): resultado de salvar(), já na thread da interface
+    salvo = pyqtSignal(object, str, str, float)
+    # Emitido pela thread de gravação; conexão enfileirada para a thread da interface
+    _gravacao_terminada = pyqtSignal(object, str, int, str, float)
+
+    TITULO_NOVO = "sem título"
+    # Acima disto o arquivo abre em VisaoArquivoGrande (mmap, só leitura)
+    LIMITE_ARQUIVO_GRANDE = 16 * 1024 * 1024
+    # Acima disto o arquivo abre num CodeEditor normal, mas sem highlight
+    LIMITE_HIGHLIGHT = 2 * 1024 * 1024
+    INTERVALO_AUTOSAVE_MS = 5000
+
+    def __init__(self, configurar_editor=None, pasta_diario=PASTA_DIARIO, parent=None):
+        super().__init__(parent)
+        self.configurar_editor = configurar_editor  # Fonte/estilo aplicados a cada editor novo
+        self.pasta_diario = pasta_diario
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setDocumentMode(True)
+        self._ativo = None
+        self.tabCloseRequested.connect(self.fechar)
+        self.currentChanged.connect(self._aba_trocada)
+
+        self._gravador = None  # Criado na primeira gravação (fora do caminho da partida)
+        self._gravacao_terminada.connect(self._gravacao_concluida)
+        self.timer_autosave = QTimer(self)
+        self.timer_autosave.timeout.connect(self.autosave)
+        self.timer_autosave.start(self.INTERVALO_AUTOSAVE_MS)
+
+    # --- ACESSO ---
+    def editor_atual(self):
+        return self.currentWidget()
+
+    def editores(self):
+        return [self.widget(i) for i in range(self.count())]
+
+    def indice_do_caminho(self, caminho):
+        alvo = os.path.normcase(os.path.abspath(caminho))
+        for i, editor in enumerate(self.editores()):
+            if editor.caminho_arquivo and os.path.normcase(os.path.abspath(editor.caminho_arquivo)) == alvo:
+                return i
+        return -1
+
+    # --- ABRIR / FECHAR ---
+    def novo(self, texto="", caminho=None, highlight=True):
+        editor = CodeEditor()
+        editor.caminho_arquivo = caminho
+        self._configurar(editor)
+        if not highlight:
+            editor.desligar_highlight()  # Antes do setPlainText: nada é destacado
+        if texto:
+            editor.setPlainText(texto)
+        editor.document().setModified(False)
+        return self._adicionar(editor)
+
+    def _configurar(self, editor):
+        if self.configurar_editor:
+            self.configurar_editor(editor)
+
+    def _adicionar(self, editor):
+        editor.document().modificationChanged.connect(lambda _: self._atualizar_titulo(editor))
+        indice = self.addTab(editor, "")
+        self._atualizar_titulo(editor)
+        self.setCurrentIndex(indice)
+        return editor
+
+    def _aba_vazia(self):
+        # Aba "sem título" vazia e intocada: é substituída em vez de ficar sobrando
+        atual = self.editor_atual()
+        if atual is None or atual.caminho_arquivo or atual.document().isModified() \
+                or not atual.document().isEmpty():
+            return None
+        return atual
+
+    def abrir(self, caminho):
+        """Abre `caminho` numa aba nova ou só mostra a aba dele, se já estiver aberto."""
+        indice = self.indice_do_caminho(caminho)
+        if indice >= 0:
+            self.setCurrentIndex(indice)
+            return self.widget(indice)
+        atual = self._aba_vazia()
+        tamanho = os.path.getsize(caminho)
+        if tamanho >= self.LIMITE_ARQUIVO_GRANDE:
+            editor = VisaoArquivoGrande(caminho)
+            self._configurar(editor)
+            self._adicionar(editor)
+        else:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                texto = f.read()
+            editor = self.novo(texto, caminho, highlight=tamanho < self.LIMITE_HIGHLIGHT)
+        if atual is not None:
+            self.fechar(self.indexOf(atual))
+        return editor
+
+    def fechar(self, indice):
+        editor = self.widget(indice)
+        if editor is None:
+            return False
+        if editor.document().isModified():
+            nome = self.tabText(indice).rstrip(" •")
+            resposta = QMessageBox.question(self, "Fechar aba", f"'{nome}' tem alterações não salvas. Fechar mesmo assim?")
+            if resposta != QMessageBox.StandardButton.Yes:
+                return False
+        diario = getattr(editor, "diario", None)
+        if diario is not None:
+            self._enfileirar(diario.descartar)  # Alterações descartadas de propósito
+        if editor is self._ativo:
+            self._ativo = None
+        self.removeTab(indice)
+        if isinstance(editor, VisaoArquivoGrande):
+            editor.fechar_arquivo()
+        editor.deleteLater()
+        if self.count() == 0:
+            self.novo()  # Sempre há um editor para o Run/Salvar
+        return True
+
+    def definir_caminho(self, editor, caminho):
+        editor.caminho_arquivo = caminho
+        self._atualizar_titulo(editor)
+
+    def _atualizar_titulo(self, editor):
+        indice = self.indexOf(editor)
+        if indice < 0:
+            return
+        nome = os.path.basename(editor.caminho_arquivo) if editor.caminho_arquivo else self.TITULO_NOVO
+        self.setTabText(indice, nome + (" •" if editor.document().isModified() else ""))
+        self.setTabToolTip(indice, editor.caminho_arquivo or "")
+
+    # --- SALVAR / AUTOSAVE ---
+    def salvar(self, editor, caminho=None):
+        """Grava o editor em segundo plano (temp + fsync + rename); o resultado sai em `salvo`."""
+        if caminho:
+            self.definir_caminho(editor, caminho)
+        caminho = editor.caminho_arquivo
+        # Na thread da interface só a cópia do texto; o disco (talvez de rede) fica com o gravador
+        texto = editor.toPlainText()
+        revisao = editor.document().revision()
+        diario = getattr(editor, "diario", None)
+        self._enfileirar(self._gravar, editor, caminho, texto, revisao, diario)
+
+    def _gravar(self, editor, caminho, texto, revisao, diario):
+        inicio = time.perf_counter()
+        erro = ""
+        try:
+            gravar_atomico(caminho, texto)
+            if diario is not None:
+                diario.descartar()
+        except OSError as e:
+            erro = str(e)
+        self._gravacao_terminada.emit(editor, caminho, revisao, erro, (time.perf_counter() - inicio) * 1000)
+
+    def _gravacao_concluida(self, editor, caminho, revisao, erro, ms):
+        if editor not in self.editores():
+            return  # Aba fechada enquanto gravava
+        # Digitou durante a gravação: o que está na tela ainda não foi salvo
+        if not erro and editor.document().revision() == revisao:
+            editor.document().setModified(False)
+        if not erro:
+            editor.revisao_diario = None
+        self.salvo.emit(editor, caminho, erro, ms)
+
+    def autosave(self):
+        """Registra no diário as abas modificadas desde o último autosave."""
+        for editor in self.editores():
+            documento = editor.document()
+            if editor.isReadOnly() or not documento.isModified() \
+                    or documento.revision() == getattr(editor, "revisao_diario", None):
+                continue
+            editor.revisao_diario = documento.revision()
+            if getattr(editor, "diario", None) is None:
+                editor.diario = Diario(editor.caminho_arquivo, self.pasta_diario)
+            self._enfileirar(self._registrar, editor.diario, editor.toPlainText(), editor.caminho_arquivo)
+
+    def _registrar(self, diario, texto, caminho):
+        try:
+            diario.registrar(texto, caminho)
+        except OSError:
+            pass  # Autosave é o melhor esforço: o próximo ciclo tenta de novo
+
+    def _enfileirar(self, funcao, *args):
+        if self._gravador is None:
+            from concurrent.futures import ThreadPoolExecutor
+            # Uma só thread: um salvar nunca passa na frente do autosave anterior (nem o contrário)
+            self._gravador = ThreadPoolExecutor(max_workers=1)
+        return self._gravador.submit(funcao, *args)
+
+    def aguardar_gravacoes(self):
+        """Bloqueia até a fila de gravação esvaziar (benchmarks)."""
+        self._enfileirar(lambda: None).result()
+
+    def recuperar(self):
+        """Reabre, como abas modificadas, os diários deixados pela sessão anterior."""
+        recuperados = 0
+        for diario in diarios_pendentes(self.pasta_diario):
+            caminho = diario.caminho_documento
+            indice = self.indice_do_caminho(caminho) if caminho else -1
+            if indice >= 0:
+                editor = self.widget(indice)
+                editor.setPlainText(diario.texto)
+            else:
+                vazia = self._aba_vazia()
+                editor = self.novo(diario.texto, caminho)
+                if vazia is not None:
+                    self.fechar(self.indexOf(vazia))
+            editor.diario = diario
+            editor.document().setModified(True)
+            editor.revisao_diario = editor.document().revision()
+            recuperados += 1
+        return recuperados
+
+    def encerrar(self):
+        """Termina as gravações pendentes. Os diários ficam para a próxima partida."""
+        self.timer_autosave.stop()
+        if self._gravador is not None:
+            self._gravador.shutdown(wait=True)
+
+    # --- HIBERNAÇÃO ---
+    def _aba_trocada(self, indice):
+        editor = self.widget(indice)
+        if self._ativo is not None and self._ativo is not editor:
+            self._ativo.hibernar()
+        self._ativo = editor
+        if editor is not None:
+            editor.acordar()
+            self.editor_alterado.emit(editor)
@@ -0,0 +1,205 @@
+import datetime
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cli_daemon
+import engine_resolver
+from build_cache import invalidar_versoes
+from connectivity import conectividade_padrao
+
+# --- DEPENDÊNCIAS DA ENGINE ---
+CORES = ["arduino:avr"]
+# Estas libs evitam erros de "No such file" em Standard e Plus
+BIBLIOTECAS_HELPER = ["Servo", "Wire", "Stepper", "LiquidCrystal",
+                      "Adafruit Unified Sensor", "DHT sensor library", "NewPing"]
+# Firmatas do card + protocolos para WiFi Firmata
+BIBLIOTECAS_FIRMATA = ["Firmata", "FirmataPlus", "ConfigurableFirmata", "WiFi", "Ethernet"]
+
+def ler_cores_instalados(saida_json):
+    """IDs das plataformas no `core list --format json` (formatos 0.x e 1.x)."""
+    dados = json.loads(saida_json or "[]")
+    if isinstance(dados, dict):
+        dados = dados.get("platforms") or []
+    return {p.get("id") or p.get("ID") for p in dados}
+
+def ler_libs_instaladas(saida_json):
+    """Nomes (minúsculos) das libs no `lib list --all --format json` (formatos 0.x e 1.x)."""
+    dados = json.loads(saida_json or "[]")
+    if isinstance(dados, dict):
+        dados = dados.get("installed_libraries") or []
+    return {item.get("library", {}).get("name", "").lower() for item in dados}
+
+class EngineBootstrap:
+    """Verifica/instala a engine, os cores e as bibliotecas (sem Qt).
+
+    `log(texto, status)`, `progresso(pct)` e `pronto_local()` são callbacks: o
+    EngineWorker os liga aos seus sinais, o wandi_cli imprime.
+    """
+
+    def __init__(self, cli_path=None, loja=None, conectividade=None, log=None, progresso=None, pronto_local=None):
+        # Sem caminho explícito: o resolver acha a engine desta plataforma (ou None)
+        self.cli_path = cli_path or engine_resolver.caminho_arduino_cli()
+        self.loja = loja  # None: primeira loja de toolchain gravável
+        self.conectividade = conectividade or conectividade_padrao()
+        self.tempos_etapas = {}  # etapa -> segundos, para acompanhar o bootstrap
+        self._log = log or (lambda texto, status: print(texto))
+        self.progresso = progresso or (lambda pct: None)
+        self.pronto_local = pronto_local or (lambda: None)
+
+    def check_internet(self):
+        return bool(self.conectividade.online())
+
+    def log(self, text, status="info"):
+        t = datetime.datetime.now().strftime("%H:%M:%S")
+        self._log(f"[{t}] {text}", status)
+
+    def cli(self, *args):
+        # Flag para silenciar janelas de console no Windows
+        flags = 0x08000000 if os.name == 'nt' else 0
+        return subprocess.run([self.cli_path, *args], capture_output=True, text=True, creationflags=flags)
+
+    def etapa(self, nome, func, *args):
+        """Executa uma etapa e registra quanto tempo ela levou."""
+        inicio = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.tempos_etapas[nome] = time.perf_counter() - inicio
+            self.log(f"{nome}: {self.tempos_etapas[nome] * 1000:.0f} ms", "info")
+
+    def estado_instalado(self):
+        """Uma chamada de `core list` e uma de `lib list`, em paralelo."""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            cores = pool.submit(self.cli, "core", "list", "--format", "json")
+            libs = pool.submit(self.cli, "lib", "list", "--all", "--format", "json")
+            return ler_cores_instalados(cores.result().stdout), ler_libs_instaladas(libs.result().stdout)
+
+    def instalar_cores(self, cores):
+        self.cli("core", "update-index")
+        for core in cores:
+            r = self.cli("core", "install", core)
+            self.log(f"Core {core}: {'OK' if r.returncode == 0 else 'FALHOU'}", "ok" if r.returncode == 0 else "err")
+
+    def instalar_libs(self, libs):
+        daemon = cli_daemon.daemon_para(self.cli_path)
+        if daemon:
+            try:
+                # Mesma instância (índice já carregado) para todas as libs
+                for lib in libs:
+                    codigo = daemon.instalar_lib(lib, saida=lambda linha: None)
+                    self.log(f"Lib {lib}: {'OK' if codigo == 0 else 'FALHOU'}", "ok" if codigo == 0 else "err")
+                return
+            except cli_daemon.DaemonIndisponivel:
+                pass
+        self.cli("lib", "update-index")
+        # Um único `lib install a b c`; se o lote falhar, descobre qual lib quebrou
+        if self.cli("lib", "install", *libs).returncode == 0:
+            self.log(f"Instaladas: {', '.join(libs)}", "ok")
+            return
+        # Uma de cada vez: installs em paralelo disputariam a mesma pasta de bibliotecas
+        for lib in libs:
+            codigo = self.cli("lib", "install", lib).returncode
+            self.log(f"Lib {lib}: {'OK' if codigo == 0 else 'FALHOU'}", "ok" if codigo == 0 else "err")
+
+    def dependencias_faltando(self):
+        """Só disco: compara o estado instalado com o que a engine precisa."""
+        self.log("Verificando dependências instaladas...", "proc")
+        cores, libs = self.etapa("Leitura do estado instalado", self.estado_instalado)
+        faltando_cores = [c for c in CORES if c not in cores]
+        faltando_libs = [l for l in BIBLIOTECAS_HELPER + BIBLIOTECAS_FIRMATA if l.lower() not in libs]
+        return faltando_cores, faltando_libs
+
+    def instalar_faltando(self, faltando_cores, faltando_libs):
+        self.log(f"Instalando: {', '.join(faltando_cores + faltando_libs)}...", "proc")
+        # Core e bibliotecas são independentes: rodam ao mesmo tempo
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tarefas = []
+            if faltando_cores:
+                tarefas.append(pool.submit(self.etapa, "Instalação de cores", self.instalar_cores, faltando_cores))
+            if faltando_libs:
+                tarefas.append(pool.submit(self.etapa, "Instalação de bibliotecas", self.instalar_libs, faltando_libs))
+            for tarefa in tarefas:
+                tarefa.result()
+        # Versões mudaram: a chave do cache de compilação precisa ser recalculada
+        invalidar_versoes()
+
+    def baixar_engine(self):
+        self.log(f"Engine Ausente. Baixando Core ({'/'.join(engine_resolver.plataforma_atual())})...", "proc")
+        ultimo = [-1]
+        def progresso(baixados, total):
+            pct = int(baixados * 100 / total) if total else 0
+            if pct != ultimo[0]:
+                ultimo[0] = pct
+                self.progresso(pct)
+
+        # Importado aqui: requests só é carregado quando falta a engine
+        from downloader import Downloader
+        # Retoma de onde parou se a rede cair (as partes ficam na loja de toolchain)
+        downloader = Downloader(progresso=progresso)
+        self.cli_path = engine_resolver.instalar_engine(downloader, self.loja)
+        if downloader.reconexoes:
+            self.log(f"Download retomado após {downloader.reconexoes} quedas de conexão.", "info")
+        self.log(f"Instalação do binário finalizada: {self.cli_path}", "ok")
+
+    def executar(self):
+        """Bootstrap completo. True quando a engine ficou pronta (nada faltando)."""
+        inicio = time.perf_counter()
+        # O probe de rede roda em paralelo; a fase local nunca espera por ele
+        self.conectividade.sondar()
+
+        try:
+            self.log("Iniciando Verificação de Engine...", "proc")
+            faltando_cores, faltando_libs = [], []
+
+            # 1. FASE LOCAL: só disco
+            engine_presente = bool(self.cli_path) and os.path.exists(self.cli_path)
+            if engine_presente:
+                self.log("Engine carregada com sucesso.", "ok")
+                self.progresso(20)
+                faltando_cores, faltando_libs = self.dependencias_faltando()
+                self.progresso(40)
+                if not faltando_cores and not faltando_libs:
+                    self.log("Placas e bibliotecas já instaladas.", "ok")
+                    self.pronto_local()
+                    self.log(f"WANDI STUDIO PRONTO em {(time.perf_counter() - inicio) * 1000:.0f} ms.", "ok")
+                    self.progresso(100)
+                    return True
+                self.pronto_local()
+
+            # 2. FASE DE REDE: só chega aqui se faltar algo
+            if not self.check_internet():
+                if self.conectividade.forcar_offline:
+                    self.log("Modo Offline forçado pela configuração.", "info")
+                else:
+                    self.log("AVISO: Sem conexão com a internet.", "err")
+                if not engine_presente:
+                    self.log("ERRO CRÍTICO: Engine não encontrada.", "err")
+                else:
+                    self.log(f"Modo Offline: faltam {', '.join(faltando_cores + faltando_libs)}.", "err")
+                return False
+            self.log("Conexão com a rede: OK", "ok")
+
+            if not engine_presente:
+                self.etapa("Download da engine", self.baixar_engine)
+                self.progresso(20)
+                faltando_cores, faltando_libs = self.dependencias_faltando()
+                self.pronto_local()
+            if faltando_cores or faltando_libs:
+                self.instalar_faltando(faltando_cores, faltando_libs)
+                # Um install que falhou não pode virar "pronto": confere de novo no disco
+                faltando_cores, faltando_libs = self.dependencias_faltando()
+                if faltando_cores or faltando_libs:
+                    self.log(f"Instalação incompleta: faltam {', '.join(faltando_cores + faltando_libs)}.", "err")
+                    return False
+
+            # 3. FINALIZAÇÃO
+            self.log(f"WANDI STUDIO PRONTO em {(time.perf_counter() - inicio) * 1000:.0f} ms.", "ok")
+            self.progresso(100)
+            return True
+        except Exception as e:
+            self.log(f"ERRO DE SISTEMA: {str(e)}", "err")
+        return False
+
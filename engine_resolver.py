@@ -0,0 +1,198 @@
+import os
+import platform
+import shutil
+import threading
+from contextlib import contextmanager
+
+URL_BASE_ENGINE = "https://downloads.arduino.cc/arduino-cli"
+VERSAO_ENGINE = "latest"
+
+# Onde o IDE instalava a engine antes da loja versionada (só leitura, para não baixar de novo)
+PASTA_ENGINE_ANTIGA = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "Engine", "arduino")
+
+# (sistema, máquina) -> sufixo do artefato publicado pelo arduino-cli
+_ARTEFATOS = {
+    ("windows", "x86_64"): "Windows_64bit.zip",
+    ("windows", "arm64"): "Windows_64bit.zip",  # Roda emulado no Windows ARM
+    ("windows", "x86"): "Windows_32bit.zip",
+    ("linux", "x86_64"): "Linux_64bit.tar.gz",
+    ("linux", "x86"): "Linux_32bit.tar.gz",
+    ("linux", "arm64"): "Linux_ARM64.tar.gz",
+    ("linux", "armv7"): "Linux_ARMv7.tar.gz",
+    ("linux", "armv6"): "Linux_ARMv6.tar.gz",
+    ("darwin", "x86_64"): "macOS_64bit.tar.gz",
+    ("darwin", "arm64"): "macOS_ARM64.tar.gz",
+}
+
+_MAQUINAS = {"amd64": "x86_64", "x64": "x86_64", "i386": "x86", "i686": "x86", "x86": "x86",
+             "aarch64": "arm64", "armv8l": "arm64", "armv7l": "armv7", "armv6l": "armv6"}
+
+def plataforma_atual(sistema=None, maquina=None):
+    """("linux" | "windows" | "darwin", "x86_64" | "x86" | "arm64" | "armv7" | "armv6")."""
+    sistema = (sistema or platform.system()).lower()
+    maquina = (maquina or platform.machine()).lower()
+    return sistema, _MAQUINAS.get(maquina, maquina)
+
+def nome_binario(sistema=None):
+    sistema = sistema or plataforma_atual()[0]
+    return "arduino-cli.exe" if sistema == "windows" else "arduino-cli"
+
+def artefato_engine(sistema=None, maquina=None, versao=VERSAO_ENGINE):
+    """URL do pacote do arduino-cli para esta plataforma (ValueError se não existir)."""
+    sistema, maquina = plataforma_atual(sistema, maquina)
+    sufixo = _ARTEFATOS.get((sistema, maquina))
+    if not sufixo:
+        raise ValueError(f"arduino-cli não é distribuído para {sistema}/{maquina}")
+    return f"{URL_BASE_ENGINE}/arduino-cli_{versao}_{sufixo}"
+
+def lojas_toolchain():
+    """Lojas de toolchain em ordem de preferência: a compartilhada e a do usuário.
+
+    WANDI_TOOLCHAIN_DIR substitui as duas (agentes de build, testes).
+    """
+    forcada = os.environ.get("WANDI_TOOLCHAIN_DIR")
+    if forcada:
+        return [forcada]
+    if os.name == "nt":
+        compartilhada = os.path.join(os.environ.get("PROGRAMDATA", r"C:\ProgramData"), "Wandi Studio", "toolchains")
+    else:
+        compartilhada = "/opt/wandi-studio/toolchains"
+    usuario = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "Engine", "toolchains")
+    return [compartilhada, usuario]
+
+def _ponteiro(loja, plataforma):
+    return os.path.join(loja, "arduino-cli", f"atual-{plataforma[0]}-{plataforma[1]}")
+
+def _ler_ponteiro(loja, plataforma):
+    """Binário apontado por "atual-<so>-<arq>" na loja, ou None."""
+    try:
+        with open(_ponteiro(loja, plataforma)) as f:
+            pasta = f.read().strip()
+    except OSError:
+        return None
+    binario = os.path.join(loja, "arduino-cli", pasta, nome_binario(plataforma[0]))
+    return binario if os.path.isfile(binario) else None
+
+def _procurar_arduino_cli(lojas, plataforma):
+    explicito = os.environ.get("WANDI_ARDUINO_CLI")
+    if explicito and os.path.isfile(explicito):
+        return explicito
+    for loja in lojas:
+        binario = _ler_ponteiro(loja, plataforma)
+        if binario:
+            return binario
+    antigo = os.path.join(PASTA_ENGINE_ANTIGA, nome_binario(plataforma[0]))
+    if os.path.isfile(antigo):
+        return antigo
+    return shutil.which("arduino-cli")
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+def caminho_arduino_cli(lojas=None):
+    """Caminho do arduino-cli desta plataforma ou None (memoizado por processo).
+
+    Ordem: WANDI_ARDUINO_CLI, lojas versionadas, pasta antiga do IDE, PATH.
+    """
+    lojas = tuple(lojas or lojas_toolchain())
+    with _memo_lock:
+        if lojas not in _memo:
+            _memo[lojas] = _procurar_arduino_cli(lojas, plataforma_atual())
+        return _memo[lojas]
+
+def invalidar():
+    """Esquece o caminho memoizado (chamar depois de instalar uma engine)."""
+    with _memo_lock:
+        _memo.clear()
+
+def loja_gravavel(lojas=None):
+    """Primeira loja em que este usuário consegue instalar."""
+    lojas = list(lojas or lojas_toolchain())
+    for loja in lojas:
+        try:
+            os.makedirs(os.path.join(loja, "arduino-cli"), exist_ok=True)
+        except OSError:
+            continue
+        if os.access(os.path.join(loja, "arduino-cli"), os.W_OK):
+            return loja
+    raise OSError(f"Nenhuma loja de toolchain gravável: {', '.join(lojas)}")
+
+@contextmanager
+def _trava(caminho):
+    """Trava entre processos (instâncias e usuários diferentes usando a mesma loja)."""
+    with open(caminho, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK desiste após ~10 s; continua esperando
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def instalar_engine(downloader, loja=None, versao=VERSAO_ENGINE, forcar=False):
+    """Baixa, verifica e instala o arduino-cli na loja; devolve o caminho do binário.
+
+    Cada versão fica em "arduino-cli/<versão>-<so>-<arq>-<sha256[:16]>/"; a pasta é
+    montada num temporário e renomeada de uma vez, e só então o ponteiro
+    "atual-<so>-<arq>" é trocado (também por rename). Duas instâncias instalando ao
+    mesmo tempo: a segunda espera a trava e reaproveita o que a primeira instalou.
+    """
+    plataforma = plataforma_atual()
+    loja = loja or loja_gravavel()
+    raiz = os.path.join(loja, "arduino-cli")
+    downloads = os.path.join(raiz, "downloads")
+    os.makedirs(downloads, exist_ok=True)
+    with _trava(os.path.join(raiz, ".instalando")):
+        if not forcar:
+            existente = _ler_ponteiro(loja, plataforma)
+            if existente:
+                invalidar()
+                return existente
+        return _instalar(downloader, loja, raiz, downloads, plataforma, versao)
+
+def _instalar(downloader, loja, raiz, downloads, plataforma, versao):
+    from downloader import extrair_binario, sha256_arquivo
+
+    url = artefato_engine(*plataforma, versao=versao)
+    # O arquivo parcial fica na loja: outra instância (ou a próxima execução) retoma dele
+    arquivo = os.path.join(downloads, url.rsplit("/", 1)[-1])
+    url_final = downloader.baixar_verificado(url, arquivo)
+    versao_real = url_final.rsplit("/", 1)[-1].split("_")[1]
+    digest = sha256_arquivo(arquivo)
+
+    pasta = f"{versao_real}-{plataforma[0]}-{plataforma[1]}-{digest[:16]}"
+    destino = os.path.join(raiz, pasta)
+    if not os.path.isfile(os.path.join(destino, nome_binario(plataforma[0]))):
+        temp = os.path.join(raiz, f".tmp-{os.getpid()}-{threading.get_ident()}")
+        os.makedirs(temp, exist_ok=True)
+        extrair_binario(arquivo, nome_binario(plataforma[0]), temp)
+        try:
+            os.replace(temp, destino)
+        except OSError:
+            shutil.rmtree(temp, ignore_errors=True)  # Outra instância instalou primeiro
+    try:
+        os.remove(arquivo)
+    except OSError:
+        pass
+
+    ponteiro = _ponteiro(loja, plataforma)
+    temp = f"{ponteiro}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(temp, "w") as f:
+        f.write(pasta)
+    os.replace(temp, ponteiro)
+    invalidar()
+    return os.path.join(destino, nome_binario(plataforma[0]))
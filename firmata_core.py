@@ -0,0 +1,176 @@
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cli_daemon
+from build_cache import versoes_toolchain
+from progress_parser import ProgressParser
+from stream_reader import ChunkedPipeReader
+
+# Sem Qt aqui: este módulo é usado tanto pelas threads da IDE quanto pelo wandi_cli
+
+PASTA_LIBRARIES = os.path.expanduser("~/Documents/Arduino/libraries")
+
+# MAPEAMENTO CORRIGIDO PARA EVITAR "MAIN FILE MISSING"
+# Agora apontamos para a pasta que contém o .ino de mesmo nome
+SKETCHES_FIRMATA = {
+    "Standard": ("Firmata", "examples/StandardFirmata"),
+    "Plus": ("Firmata", "examples/StandardFirmataPlus"),
+    "Configurable": ("ConfigurableFirmata", "examples/ConfigurableFirmata"), # Pasta de exemplo tem o nome correto
+    "Wifi": ("Firmata", "examples/StandardFirmataWiFi")
+}
+
+def caminho_sketch_firmata(tipo, log=print, libraries_path=PASTA_LIBRARIES):
+    """Pasta do exemplo de Firmata `tipo` nas libs instaladas, ou None."""
+    if tipo not in SKETCHES_FIRMATA: return None
+    pasta_lib, sub = SKETCHES_FIRMATA[tipo]
+
+    caminho_completo = os.path.join(libraries_path, pasta_lib, sub)
+
+    if not os.path.exists(caminho_completo):
+        # Fallback caso a estrutura da lib Configurable seja diferente
+        if tipo == "Configurable":
+            caminho_completo = os.path.join(libraries_path, pasta_lib)
+
+        if not os.path.exists(caminho_completo):
+            log(f"⚠️ Erro: Pasta '{tipo}' não encontrada.\n")
+            return None
+
+    return caminho_completo
+
+def preparar_config_wifi(caminho_sketch, log=print):
+    config_file = os.path.join(caminho_sketch, "wifiConfig.h")
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r') as f:
+                lines = f.readlines()
+            with open(config_file, 'w') as f:
+                for line in lines:
+                    if "define ARDUINO_WIFI_SHIELD" in line and "//" in line[:10]:
+                        f.write(line.replace("//", "", 1))
+                    else:
+                        f.write(line)
+            log("[SISTEMA] Configuração WiFi ajustada.\n")
+        except: pass
+
+class AcaoHardware:
+    """Compile/upload pelo arduino-cli (ou pelo daemon), com o BuildCache.
+
+    Não sabe nada de Qt: `log(texto)` e `progresso(origem, evento)` são
+    callbacks — sinais nas threads da IDE, print/JSON no CLI headless.
+    """
+
+    def __init__(self, cli_path, board, cache=None, flags_compilacao=(), texto_bruto=False,
+                 log=print, progresso=None):
+        self.cli_path = cli_path
+        self.board = board
+        self.cache = cache
+        self.flags_compilacao = list(flags_compilacao)
+        # False: só erros/avisos vão ao log; o resto sai como eventos de progresso
+        self.texto_bruto = texto_bruto
+        self.log = log
+        self.progresso = progresso or (lambda origem, evento: None)
+
+    # --- SAÍDA DO ARDUINO-CLI ---
+    def _publicar(self, eventos, linhas, prefixo, origem):
+        for evento in eventos:
+            self.progresso(origem, evento)
+        for linha in linhas:
+            self.log(prefixo + linha.strip())
+
+    def _consumir(self, parser, linha, prefixo, origem):
+        self._publicar(*parser.linha(linha), prefixo, origem)
+
+    def _encerrar_parser(self, parser, codigo, prefixo, origem):
+        self._publicar(*parser.finalizar(), prefixo, origem)
+        if codigo != 0 and parser.cauda:
+            # A saída omitida pode explicar a falha
+            self.log(f"{prefixo}--- últimas linhas do arduino-cli ---")
+            for linha in parser.cauda:
+                self.log(prefixo + linha.strip())
+        return codigo
+
+    def executar_comando(self, comando, prefixo="", origem="", parser=None):
+        parser = parser or ProgressParser(bruto=self.texto_bruto)
+        flags = 0x08000000 if os.name == 'nt' else 0
+        p = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             creationflags=flags)
+        # Blocos grandes + prévia da linha incompleta (a barra do avrdude cresce sem '\n')
+        for texto, previa in ChunkedPipeReader(p.stdout).lotes():
+            for linha in texto.splitlines():
+                self._consumir(parser, linha, prefixo, origem)
+            if previa:
+                self._publicar(parser.parcial(previa), [], prefixo, origem)
+        p.wait()
+        return self._encerrar_parser(parser, p.returncode, prefixo, origem)
+
+    def executar_acao(self, acao, comando, *args, prefixo="", origem="", parser=None):
+        """Roda `acao` (compilar/upload) no daemon gRPC, se ativo; senão — ou se ele
+        cair — faz o spawn de `comando` como sempre."""
+        # Flags extras de compilação só existem na linha de comando
+        daemon = None if self.flags_compilacao else cli_daemon.daemon_para(self.cli_path)
+        if daemon:
+            parser_daemon = parser or ProgressParser(bruto=self.texto_bruto)
+            try:
+                codigo = getattr(daemon, acao)(
+                    *args, saida=lambda linha: self._consumir(parser_daemon, linha, prefixo, origem))
+                return self._encerrar_parser(parser_daemon, codigo, prefixo, origem)
+            except cli_daemon.DaemonIndisponivel as e:
+                self.log(f"{prefixo}[DAEMON] {e}; usando o arduino-cli direto")
+        return self.executar_comando(comando, prefixo, origem, parser)
+
+    # --- OPERAÇÕES ---
+    def compilar(self, caminho_sketch):
+        """Devolve o diretório com os binários (do cache ou recém-compilados) ou None."""
+        versoes = versoes_toolchain(self.cli_path)
+        chave = self.cache.chave(caminho_sketch, self.board, versoes, self.flags_compilacao)
+        entrada = self.cache.obter(chave)
+        if entrada:
+            self.log(f"[CACHE] Build reaproveitado ({chave[:12]})")
+            return entrada
+        with tempfile.TemporaryDirectory() as saida:
+            # JSON: tamanhos de flash/RAM estruturados em vez de texto para raspar
+            cmd = [self.cli_path, "compile", "--fqbn", self.board, "--output-dir", saida, "--format", "json",
+                   *self.flags_compilacao, caminho_sketch]
+            if self.executar_acao("compilar", cmd, self.board, caminho_sketch, saida) != 0:
+                return None
+            return self.cache.guardar(chave, saida)
+
+    def upload(self, caminho_sketch, entrada, porta, prefixo="", origem="", parser=None):
+        """Grava os binários de `entrada` (--input-dir) em `porta`; devolve o código de saída."""
+        # --verbose traz as barras do avrdude, que viram eventos de progresso
+        cmd = [self.cli_path, "upload", "-p", porta, "--fqbn", self.board, "--verbose",
+               "--input-dir", entrada, caminho_sketch]
+        return self.executar_acao("upload", cmd, self.board, caminho_sketch, porta, entrada,
+                                  prefixo=prefixo, origem=origem, parser=parser)
+
+    def gravar_lote(self, caminho_sketch, entrada, portas, max_paralelo=4, status=None):
+        """Grava `entrada` em várias portas, `max_paralelo` por vez.
+
+        `status(porta, estado, duracao)` recebe "enviando", "ok" ou "falha".
+        Devolve (resultados, metricas): porta -> (ok, duração) e porta -> números do avrdude.
+        """
+        status = status or (lambda porta, estado, duracao: None)
+        resultados, metricas = {}, {}
+
+        def gravar(porta):
+            status(porta, "enviando", 0.0)
+            inicio = time.perf_counter()
+            parser = ProgressParser(bruto=self.texto_bruto)
+            try:
+                ok = self.upload(caminho_sketch, entrada, porta, prefixo=f"[{porta}] ",
+                                 origem=porta, parser=parser) == 0
+            except Exception as e:
+                self.log(f"[{porta}] Erro: {str(e)}")
+                ok = False
+            duracao = time.perf_counter() - inicio
+            resultados[porta] = (ok, duracao)
+            metricas[porta] = dict(parser.resumo, duracao=duracao)
+            status(porta, "ok" if ok else "falha", duracao)
+            return ok
+
+        with ThreadPoolExecutor(max_workers=max(1, max_paralelo)) as pool:
+            list(pool.map(gravar, portas))
+        return resultados, metricas
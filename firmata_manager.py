@@ -1,87 +1,121 @@
-import os
-import shutil
-import subprocess
 from PyQt6.QtCore import QObject, QThread, pyqtSignal
 
+import engine_resolver
+from build_cache import BuildCache
+from firmata_core import AcaoHardware, caminho_sketch_firmata, preparar_config_wifi
+
+# A lógica de compile/upload mora em firmata_core (sem Qt, usada também pelo wandi_cli);
+# as threads abaixo só a executam fora da UI e traduzem os callbacks em sinais.
+
 class HardwareActionThread(QThread):
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(str)
+    # origem (porta, ou "" quando só há uma) e o EventoProgresso
+    progresso_signal = pyqtSignal(str, object)
 
-    def __init__(self, comando):
+    def __init__(self, comando, texto_bruto=False, cli_path=None, board=None, cache=None, flags_compilacao=()):
         super().__init__()
         self.comando = comando
+        self.acao = AcaoHardware(cli_path, board, cache, flags_compilacao, texto_bruto,
+                                 log=self.log_signal.emit, progresso=self.progresso_signal.emit)
+
+    @property
+    def texto_bruto(self):
+        # False: só erros/avisos vão ao log; o progresso sai pelo progresso_signal
+        return self.acao.texto_bruto
+
+    @texto_bruto.setter
+    def texto_bruto(self, valor):
+        self.acao.texto_bruto = valor
+
+    def executar_comando(self, comando, prefixo="", origem="", parser=None):
+        return self.acao.executar_comando(comando, prefixo, origem, parser)
+
+    def run(self):
+        try:
+            codigo = self.executar_comando(self.comando)
+            self.finished_signal.emit("✅ Operação concluída" if codigo == 0 else "❌ Falha na operação")
+        except Exception as e:
+            self.finished_signal.emit(f"❌ Erro: {str(e)}")
+
+class CachedBuildThread(HardwareActionThread):
+    """Compila via BuildCache (só roda o compile num miss) e, se houver porta, faz
+    o upload direto dos binários com --input-dir, sem compilar de novo."""
+
+    def __init__(self, cli_path, board, caminho_sketch, cache, porta=None, flags_compilacao=()):
+        super().__init__(None, cli_path=cli_path, board=board, cache=cache, flags_compilacao=flags_compilacao)
+        self.cli_path = cli_path
+        self.board = board
+        self.caminho_sketch = caminho_sketch
+        self.cache = cache
+        self.porta = porta
+
+    def compilar(self):
+        """Devolve o diretório com os binários (do cache ou recém-compilados) ou None."""
+        return self.acao.compilar(self.caminho_sketch)
+
+    def run(self):
+        try:
+            entrada = self.compilar()
+            if entrada and self.porta:
+                codigo = self.acao.upload(self.caminho_sketch, entrada, self.porta)
+                entrada = entrada if codigo == 0 else None
+            self.finished_signal.emit("✅ Operação concluída" if entrada else "❌ Falha na operação")
+        except Exception as e:
+            self.finished_signal.emit(f"❌ Erro: {str(e)}")
+
+class BatchUploadThread(CachedBuildThread):
+    """Compila uma vez (via cache) e grava o mesmo binário em N portas em paralelo."""
+    # porta, estado ("aguardando", "enviando", "ok", "falha"), duração em segundos
+    porta_status = pyqtSignal(str, str, float)
+
+    def __init__(self, cli_path, board, caminho_sketch, cache, portas, max_paralelo=4, flags_compilacao=()):
+        super().__init__(cli_path, board, caminho_sketch, cache, None, flags_compilacao)
+        self.portas = list(portas)
+        self.max_paralelo = max(1, max_paralelo)
+        self.resultados = {}  # porta -> (ok, duração)
+        self.metricas = {}    # porta -> números do avrdude (bytes_gravados, segundos...)
 
     def run(self):
         try:
-            flags = 0x08000000 if os.name == 'nt' else 0
-            p = subprocess.Popen(self.comando, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                                 text=True, creationflags=flags)
-            for line in p.stdout:
-                self.log_signal.emit(line.strip())
-            p.wait()
-            self.finished_signal.emit("✅ Operação concluída" if p.returncode == 0 else "❌ Falha na operação")
+            for porta in self.portas:
+                self.porta_status.emit(porta, "aguardando", 0.0)
+            entrada = self.compilar()
+            if not entrada:
+                for porta in self.portas:
+                    self.porta_status.emit(porta, "falha", 0.0)
+                self.finished_signal.emit("❌ Falha na compilação; nenhuma placa gravada")
+                return
+            self.resultados, self.metricas = self.acao.gravar_lote(
+                self.caminho_sketch, entrada, self.portas, self.max_paralelo, status=self.porta_status.emit)
+            oks = [ok for ok, _ in self.resultados.values()]
+            self.finished_signal.emit(f"{'✅' if all(oks) else '❌'} Lote concluído: "
+                                      f"{sum(oks)}/{len(oks)} placas gravadas")
         except Exception as e:
             self.finished_signal.emit(f"❌ Erro: {str(e)}")
 
 class FirmataManager(QObject):
     log_received = pyqtSignal(str)
+    progress_received = pyqtSignal(str, object)
     
-    def __init__(self, board="arduino:avr:uno"):
+    def __init__(self, board="arduino:avr:uno", cache=None):
         super().__init__()
         self.board = board
-        self.cli_path = self._find_arduino_cli()
+        self.cache = cache or BuildCache()
+        self.flags_compilacao = []  # Entram na chave do cache
+        self.threads = set()        # Várias operações podem estar em andamento ao mesmo tempo
+        self.texto_bruto = False    # True: toda a saída do arduino-cli no log (modo verbose)
 
-    def _find_arduino_cli(self):
-        cli = shutil.which("arduino-cli")
-        if cli: return cli
-        home = os.path.expanduser("~")
-        possible = [os.path.join(home, "Documents", "Wandi Studio", "Engine", "arduino", "arduino-cli.exe")]
-        for p in possible:
-            if os.path.exists(p): return p
-        return "arduino-cli"
+    @property
+    def cli_path(self):
+        # Memoizado no resolver; muda sozinho depois que a engine é instalada
+        return engine_resolver.caminho_arduino_cli() or "arduino-cli"
 
     def _preparar_config_wifi(self, caminho_sketch):
-        config_file = os.path.join(caminho_sketch, "wifiConfig.h")
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    lines = f.readlines()
-                with open(config_file, 'w') as f:
-                    for line in lines:
-                        if "define ARDUINO_WIFI_SHIELD" in line and "//" in line[:10]:
-                            f.write(line.replace("//", "", 1))
-                        else:
-                            f.write(line)
-                self.log_received.emit("[SISTEMA] Configuração WiFi ajustada.\n")
-            except: pass
+        preparar_config_wifi(caminho_sketch, self.log_received.emit)
 
     def _get_sketch_path(self, tipo):
-        libraries_path = os.path.expanduser("~/Documents/Arduino/libraries")
-        
-        # MAPEAMENTO CORRIGIDO PARA EVITAR "MAIN FILE MISSING"
-        # Agora apontamos para a pasta que contém o .ino de mesmo nome
-        mapeamento = {
-            "Standard": ("Firmata", "examples/StandardFirmata"),
-            "Plus": ("Firmata", "examples/StandardFirmataPlus"),
-            "Configurable": ("ConfigurableFirmata", "examples/ConfigurableFirmata"), # Pasta de exemplo tem o nome correto
-            "Wifi": ("Firmata", "examples/StandardFirmataWiFi")
-        }
-        
-        if tipo not in mapeamento: return None
-        pasta_lib, sub = mapeamento[tipo]
-        
-        caminho_completo = os.path.join(libraries_path, pasta_lib, sub)
-
-        if not os.path.exists(caminho_completo):
-            # Fallback caso a estrutura da lib Configurable seja diferente
-            if tipo == "Configurable":
-                caminho_completo = os.path.join(libraries_path, pasta_lib)
-            
-            if not os.path.exists(caminho_completo):
-                self.log_received.emit(f"⚠️ Erro: Pasta '{tipo}' não encontrada.\n")
-                return None
-            
-        return caminho_completo
+        return caminho_sketch_firmata(tipo, self.log_received.emit)
 
     def compile_firmata(self, tipo="Standard"):
         caminho_sketch = self._get_sketch_path(tipo)
@@ -91,21 +125,56 @@ class FirmataManager(QObject):
             self._preparar_config_wifi(caminho_sketch)
 
         self.log_received.emit(f"\n[SISTEMA] Iniciando Compilação do {tipo}...\n")
-        cmd = [self.cli_path, "compile", "--fqbn", self.board, caminho_sketch]
-        
-        self.thread = HardwareActionThread(cmd)
-        self.thread.log_signal.connect(lambda t: self.log_received.emit(t + "\n"))
-        self.thread.finished_signal.connect(lambda m: self.log_received.emit(m + "\n"))
-        self.thread.start()
+        self._iniciar_build(caminho_sketch)
 
     def upload_firmata(self, porta, tipo="Standard"):
+        """Grava o Firmata em `porta`; devolve a thread (ou None se o sketch não existe)."""
         caminho_sketch = self._get_sketch_path(tipo)
-        if not caminho_sketch: return 
+        if not caminho_sketch: return None
 
         self.log_received.emit(f"\n[SISTEMA] Realizando Upload do {tipo} na porta {porta}...\n")
-        cmd = [self.cli_path, "upload", "-p", porta, "--fqbn", self.board, caminho_sketch]
-        
-        self.thread = HardwareActionThread(cmd)
-        self.thread.log_signal.connect(lambda t: self.log_received.emit(t + "\n"))
-        self.thread.finished_signal.connect(lambda m: self.log_received.emit(m + "\n"))
-        self.thread.start()
\ No newline at end of file
+        self._iniciar_build(caminho_sketch, porta)
+        return self.thread
+
+    def upload_firmata_lote(self, portas, tipo="Standard", max_paralelo=4, ao_status=None, ao_concluir=None,
+                            ao_progresso=None):
+        """Compila uma vez e grava em todas as `portas`, no máximo `max_paralelo` por vez.
+
+        `ao_status(porta, estado, duracao)`, `ao_concluir(mensagem)` e
+        `ao_progresso(porta, evento)` são conectados antes da thread começar, para
+        não perder nenhum evento.
+        """
+        caminho_sketch = self._get_sketch_path(tipo)
+        if not caminho_sketch: return None
+
+        self.log_received.emit(f"\n[SISTEMA] Upload em lote do {tipo} em {len(portas)} placas "
+                               f"({max_paralelo} por vez)...\n")
+        thread = BatchUploadThread(self.cli_path, self.board, caminho_sketch, self.cache,
+                                   portas, max_paralelo, self.flags_compilacao)
+        if ao_status: thread.porta_status.connect(ao_status)
+        if ao_concluir: thread.finished_signal.connect(ao_concluir)
+        if ao_progresso: thread.progresso_signal.connect(ao_progresso)
+        self._iniciar_thread(thread)
+        return thread
+
+    def _iniciar_build(self, caminho_sketch, porta=None):
+        self.thread = CachedBuildThread(self.cli_path, self.board, caminho_sketch, self.cache,
+                                        porta, self.flags_compilacao)
+        self._iniciar_thread(self.thread)
+
+    def _iniciar_thread(self, thread):
+        # Guarda a referência até a thread terminar (antes um upload novo descartava o anterior)
+        self.threads.add(thread)
+        thread.texto_bruto = self.texto_bruto
+        thread.log_signal.connect(lambda t: self.log_received.emit(t + "\n"))
+        thread.progresso_signal.connect(self.progress_received)
+        thread.finished_signal.connect(lambda m: self.log_received.emit(m + "\n"))
+        thread.finished.connect(lambda: self.threads.discard(thread))
+        thread.start()
+
+    def estatisticas_cache(self):
+        return self.cache.estatisticas()
+
+    def limpar_cache(self):
+        self.cache.limpar()
+        self.log_received.emit("[SISTEMA] Cache de compilação invalidado.\n")
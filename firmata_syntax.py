@@ -4,38 +4,49 @@ from PyQt6.QtGui import QColor, QTextCharFormat, QFont
 COLOR_HARDWARE = "#e5c07b"  # Dourado/Amarelo
 COLOR_PORT = "#d19a66"      # Laranja para portas (COM1, /dev/tty)
 
-def get_firmata_rules():
-    """Retorna as regras de sintaxe específicas para pyFirmata2"""
-    rules = []
-
-    # Formatos
+# 1. Termos de Configuração e Modos
+HW_KEYWORDS = [
+    "Arduino", "util", "pyfirmata2", "STRING_DATA",
+    "INPUT", "OUTPUT", "ANALOG", "PWM", "SERVO", "HIGH", "LOW"
+]
+
+# 2. Métodos de Ação (Escrita e Leitura)
+HW_METHODS = [
+    "get_pin", "write", "read", "enable_reporting", "disable_reporting",
+    "digital", "analog", "exit", "iterator", "Iterator"
+]
+
+def _formatos():
     fmt_hw = QTextCharFormat()
     fmt_hw.setForeground(QColor(COLOR_HARDWARE))
     fmt_hw.setFontWeight(QFont.Weight.Bold)
 
     fmt_port = QTextCharFormat()
     fmt_port.setForeground(QColor(COLOR_PORT))
+    return fmt_hw, fmt_port
 
-    # 1. Termos de Configuração e Modos
-    hw_keywords = [
-        "Arduino", "util", "pyfirmata2", "STRING_DATA",
-        "INPUT", "OUTPUT", "ANALOG", "PWM", "SERVO", "HIGH", "LOW"
-    ]
-    
-    # 2. Métodos de Ação (Escrita e Leitura)
-    hw_methods = [
-        "get_pin", "write", "read", "enable_reporting", "disable_reporting",
-        "digital", "analog", "exit", "iterator", "Iterator"
+def get_firmata_words():
+    """Retorna pares (palavra, formato) para o tokenizador combinado do highlighter"""
+    fmt_hw, _ = _formatos()
+    return [(word, fmt_hw) for word in HW_KEYWORDS + HW_METHODS]
+
+def get_firmata_port_rules():
+    """Retorna apenas as regras de portas COM / caminhos USB"""
+    from PyQt6.QtCore import QRegularExpression
+    _, fmt_port = _formatos()
+    return [
+        (QRegularExpression(r"'(COM[0-9]+|/dev/tty[a-zA-Z0-9]+)'"), fmt_port),
+        (QRegularExpression(r'"(COM[0-9]+|/dev/tty[a-zA-Z0-9]+)"'), fmt_port),
     ]
 
+def get_firmata_rules():
+    """Retorna as regras de sintaxe específicas para pyFirmata2"""
     from PyQt6.QtCore import QRegularExpression
 
-    # Adicionando termos à lista de regras
-    for word in hw_keywords + hw_methods:
-        rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_hw))
+    # Adicionando termos à lista de regras (uma regex por palavra)
+    rules = [(QRegularExpression(f"\\b{word}\\b"), fmt) for word, fmt in get_firmata_words()]
 
     # Regra para capturar Portas COM ou caminhos USB
-    rules.append((QRegularExpression(r"'(COM[0-9]+|/dev/tty[a-zA-Z0-9]+)'"), fmt_port))
-    rules.append((QRegularExpression(r'"(COM[0-9]+|/dev/tty[a-zA-Z0-9]+)"'), fmt_port))
+    rules.extend(get_firmata_port_rules())
 
-    return rules
\ No newline at end of file
+    return rules
@@ -1,4 +1,5 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QFrame, QLabel, QPushButton
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QPushButton,
+                             QDialog, QListWidget, QListWidgetItem, QSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
 from PyQt6.QtGui import QFont
 
@@ -97,4 +98,90 @@ class FirmataCardOverlay(QWidget):
             self.setGeometry(self.parent().rect())
         self.raise_()
         self.show()
-        self.setFocus()
\ No newline at end of file
+        self.setFocus()
+
+class BatchUploadDialog(QDialog):
+    """Escolha das portas para o upload em lote e andamento de cada placa."""
+    # Lista de portas marcadas e quantas gravar ao mesmo tempo
+    upload_solicitado = pyqtSignal(list, int)
+
+    ICONES = {"aguardando": "⏳", "enviando": "⬆️", "ok": "✅", "falha": "❌"}
+
+    def __init__(self, portas, parent=None, cores=None):
+        super().__init__(parent)
+        self.colors = cores or {
+            "bg": "#0d1b2a",
+            "accent": "#3498db",
+            "text": "#00ffdd"
+        }
+        self.setWindowTitle("Upload em lote")
+        self.setMinimumSize(420, 360)
+        self.setStyleSheet(f"""
+            QDialog {{ background-color: {self.colors['bg']}; }}
+            QLabel {{ color: white; }}
+            QListWidget, QSpinBox {{
+                background-color: rgba(255, 255, 255, 0.05);
+                color: {self.colors['text']};
+                border: 1px solid rgba(255, 255, 255, 0.1);
+            }}
+            QPushButton {{
+                background-color: {self.colors['accent']}; color: white;
+                border: none; border-radius: 6px; padding: 8px 16px;
+            }}
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Marque as placas que vão receber o Firmata:"))
+
+        self.lista = QListWidget()
+        self.itens = {}
+        for porta in portas:
+            item = QListWidgetItem(porta)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            self.lista.addItem(item)
+            self.itens[porta] = item
+        layout.addWidget(self.lista)
+
+        linha = QHBoxLayout()
+        linha.addWidget(QLabel("Placas ao mesmo tempo:"))
+        self.spin_paralelo = QSpinBox()
+        self.spin_paralelo.setRange(1, 32)
+        self.spin_paralelo.setValue(4)
+        linha.addWidget(self.spin_paralelo)
+        linha.addStretch()
+        self.btn_gravar = QPushButton("Gravar")
+        self.btn_gravar.clicked.connect(self.confirmar)
+        linha.addWidget(self.btn_gravar)
+        layout.addLayout(linha)
+
+    def portas_marcadas(self):
+        return [p for p, item in self.itens.items() if item.checkState() == Qt.CheckState.Checked]
+
+    def confirmar(self):
+        portas = self.portas_marcadas()
+        if not portas:
+            return
+        self.btn_gravar.setEnabled(False)
+        self.upload_solicitado.emit(portas, self.spin_paralelo.value())
+
+    def atualizar_porta(self, porta, estado, duracao):
+        """Conectado ao porta_status do BatchUploadThread."""
+        item = self.itens.get(porta)
+        if item is None:
+            return
+        texto = f"{self.ICONES.get(estado, '')} {porta}"
+        if estado in ("ok", "falha") and duracao:
+            texto += f"  —  {duracao:.1f} s"
+        item.setText(texto)
+
+    def atualizar_progresso(self, porta, evento):
+        """Conectado ao progresso_signal: percentual do avrdude enquanto grava."""
+        item = self.itens.get(porta)
+        if item is None or evento.etapa not in ("gravando", "verificando"):
+            return
+        item.setText(f"{self.ICONES['enviando']} {porta}  —  {evento.etapa} {evento.percentual}%")
+
+    def lote_concluido(self, mensagem):
+        self.setWindowTitle(f"Upload em lote: {mensagem}")
+        self.btn_gravar.setEnabled(True)
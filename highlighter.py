@@ -1,61 +1,139 @@
+import time
 from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit, QApplication
-from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QPainter, QTextCursor
-from PyQt6.QtCore import Qt, QRect, QSize, QRegularExpression, QTimer
+from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont, QPainter, QTextCursor, QTextBlockUserData
+from PyQt6.QtCore import Qt, QRect, QSize, QRegularExpression, QTimer, QObject, pyqtSignal
 
-# --- 1. CLASSE DO HIGHLIGHTER ---
-class PythonHighlighter(QSyntaxHighlighter):
+# --- 1. REGRAS COMPILADAS (COMPARTILHADAS) ---
+def criar_formato(color, bold=False, italic=False):
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    if bold: fmt.setFontWeight(QFont.Weight.Bold)
+    if italic: fmt.setFontItalic(True)
+    return fmt
 
-    def __init__(self, document):
-        super().__init__(document)
+class RegrasHighlight:
+    """Regexes compiladas e tabela de formatos de um modo de highlight.
+
+    Compiladas uma vez por processo (`compartilhadas`) e usadas por todos os
+    PythonHighlighter: abrir mais uma aba não recompila nada nem chama o
+    firmata_syntax de novo. Só são lidas, nunca alteradas, depois de prontas.
+    """
+    _cache = {}
+    compilacoes = 0  # Quantas vezes um conjunto foi montado (benchmark de abas)
+
+    @classmethod
+    def compartilhadas(cls, mode="combined"):
+        if mode not in cls._cache:
+            cls._cache[mode] = cls(mode)
+        return cls._cache[mode]
+
+    def __init__(self, mode="combined"):
+        RegrasHighlight.compilacoes += 1
+        self.mode = mode
         # 1. Primeiro criamos a lista para ela estar pronta
         self.rules = [] 
 
-        # 2. Agora injetamos as regras do Firmata (importando aqui mesmo)
+        # 2. Definição das Cores e Formatos
+        fmt_keyword = criar_formato("#c678dd", bold=True)
+        fmt_value = criar_formato("#d19a66") # Laranja
+        fmt_builtin = criar_formato("#56b6c2", italic=True)
+        fmt_function = criar_formato("#61afef")
+        fmt_string = criar_formato("#98c379")
+        fmt_comment = criar_formato("#5c6370")
+        fmt_decorator = criar_formato("#e5c07b")
+
+        # 3. Palavras na MESMA ordem das regras antigas: quem vem depois
+        #    sobrescreve o formato (igual ao setFormat sobreposto do modo por regra)
         import firmata_syntax
-        self.rules.extend(firmata_syntax.get_firmata_rules())
-
-        # 3. Definição das Cores e Formatos
-        fmt_keyword = self.create_format("#c678dd", bold=True)
-        fmt_value = self.create_format("#d19a66") # Laranja
-        fmt_builtin = self.create_format("#56b6c2", italic=True)
-        fmt_function = self.create_format("#61afef")
-        fmt_string = self.create_format("#98c379")
-        fmt_comment = self.create_format("#5c6370")
-        fmt_decorator = self.create_format("#e5c07b")
-
-        # 4. Regras de Sintaxe Padrão (Python)
         keywords = ["and", "as", "assert", "break", "class", "continue", "def", "del", "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in", "is", "lambda", "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with", "yield", "self"]
-        for word in keywords:
-            self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_keyword))
-        
         values = ["True", "False", "None"]
-        for word in values:
-            self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_value))
-        
-        self.rules.append((QRegularExpression(r"\b[0-9]+\.?[0-9]*\b"), fmt_value))
-
-        # ... (segue o restante do seu código)
-        
         builtins = ["print", "input", "len", "range", "list", "dict", "int", "str", "float", "bool"]
-        for word in builtins: self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_builtin))
+        number_pattern = r"[0-9]+\.?[0-9]*"
+
+        if mode == "per_rule":
+            # 4a. Uma QRegularExpression por palavra (comportamento original)
+            self.rules.extend(firmata_syntax.get_firmata_rules())
+            for word in keywords:
+                self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_keyword))
+            for word in values:
+                self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_value))
+            self.rules.append((QRegularExpression(f"\\b{number_pattern}\\b"), fmt_value))
+            for word in builtins:
+                self.rules.append((QRegularExpression(f"\\b{word}\\b"), fmt_builtin))
+        else:
+            # 4b. Tabela palavra -> formato + uma única alternação
+            self.word_formats = dict(firmata_syntax.get_firmata_words())
+            self.word_formats.update((word, fmt_keyword) for word in keywords)
+            self.word_formats.update((word, fmt_value) for word in values)
+            self.word_formats.update((word, fmt_builtin) for word in builtins)
+            self.fmt_number = fmt_value
+            # Palavras maiores primeiro para o motor testar "assert" antes de "as"
+            alternation = "|".join(QRegularExpression.escape(w) for w in
+                                   sorted(self.word_formats, key=len, reverse=True))
+            self.word_regex = QRegularExpression(f"\\b(?:({alternation})|{number_pattern})\\b")
+            self.word_regex.optimize()
+            # Portas não se sobrepõem a palavras, então podem rodar depois delas
+            self.rules.extend(firmata_syntax.get_firmata_port_rules())
 
+        # 5. Regras estruturais (sempre uma por padrão, são poucas)
         self.rules.append((QRegularExpression(r"@[a-zA-Z_]\w*"), fmt_decorator))
         self.rules.append((QRegularExpression(r"\b\w+(?=\()"), fmt_function))
         self.rules.append((QRegularExpression(r"(?<=def\s)\w+"), fmt_function))
         self.rules.append((QRegularExpression(r"\".*\""), fmt_string))
         self.rules.append((QRegularExpression(r"'.*'"), fmt_string))
         self.rules.append((QRegularExpression(r"#.*"), fmt_comment))
+        for pattern, _ in self.rules:
+            pattern.optimize()
         
         self.tri_double = (QRegularExpression(r'"""'), fmt_string)
 
+# --- 2. CLASSE DO HIGHLIGHTER ---
+class PythonHighlighter(QSyntaxHighlighter):
+    # "combined": todas as palavras (keywords, builtins, valores, números e termos
+    #             Firmata) compiladas numa única regex -> uma varredura por bloco
+    # "per_rule": modo antigo, um globalMatch por palavra (mantido para benchmark)
+    MODES = ("combined", "per_rule")
+
+    def __init__(self, document, mode="combined"):
+        super().__init__(document)
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de highlight desconhecido: {mode}")
+        self.mode = mode
+        # Quando um HighlightScheduler está ligado, blocos fora da tela são adiados
+        self.scheduler = None
+
+        # Regras e formatos vêm do conjunto compartilhado (compilado uma vez por modo)
+        regras = RegrasHighlight.compartilhadas(mode)
+        self.rules = regras.rules
+        self.tri_double = regras.tri_double
+        if mode == "combined":
+            self.word_formats = regras.word_formats
+            self.word_regex = regras.word_regex
+            self.fmt_number = regras.fmt_number
+
     def create_format(self, color, bold=False, italic=False):
-        fmt = QTextCharFormat()
-        fmt.setForeground(QColor(color))
-        if bold: fmt.setFontWeight(QFont.Weight.Bold)
-        if italic: fmt.setFontItalic(True)
-        return fmt
+        return criar_formato(color, bold, italic)
 
     def highlightBlock(self, text):
+        if self.scheduler is not None:
+            if not self.scheduler.permitir(self.currentBlock()):
+                # Fora do viewport: NÃO mexe no estado (isso corta a cascata das aspas triplas)
+                # e deixa o bloco marcado para o processamento em segundo plano
+                self.setCurrentBlockUserData(_BlocoPendente())
+                return
+            if isinstance(self.currentBlockUserData(), _BlocoPendente):
+                self.setCurrentBlockUserData(None)
+
+        if self.mode == "combined":
+            it = self.word_regex.globalMatch(text)
+            while it.hasNext():
+                match = it.next()
+                if match.lastCapturedIndex() == 1:
+                    fmt = self.word_formats[match.captured(1)]
+                else:
+                    fmt = self.fmt_number
+                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+
         for pattern, fmt in self.rules:
             it = pattern.globalMatch(text)
             while it.hasNext():
@@ -79,7 +157,137 @@ class PythonHighlighter(QSyntaxHighlighter):
             self.setFormat(start_index, comment_len, self.tri_double[1])
             start_index = self.tri_double[0].match(text, start_index + comment_len).capturedStart()
 
-# --- 2. ÁREA DOS NÚMEROS DE LINHA ---
+class _BlocoPendente(QTextBlockUserData):
+    """Marca um bloco cujo highlight foi adiado pelo HighlightScheduler."""
+
+# --- 3. AGENDADOR DE HIGHLIGHT (VIEWPORT PRIMEIRO) ---
+class HighlightScheduler(QObject):
+    """Destaca primeiro os blocos visíveis e termina o resto em fatias de tempo ocioso.
+
+    Uma edição que muda o estado de um bloco (ex.: abrir aspas triplas na linha 1) só
+    recolore o que está na tela; os blocos de fora ficam pendentes e são
+    processados em fatias de FATIA_MS, canceladas sempre que o usuário digita.
+    """
+    # Emite quantos blocos foram destacados no "frame" (edição ou fatia) que terminou
+    frame_concluido = pyqtSignal(int)
+
+    MARGEM_BLOCOS = 10       # Blocos extras acima/abaixo do viewport tratados na hora
+    FATIA_MS = 8             # Orçamento de cada fatia em segundo plano
+    ATRASO_OCIOSO_MS = 150   # Espera após a última tecla antes de retomar as fatias
+
+    def __init__(self, editor, highlighter):
+        super().__init__(editor)
+        self.editor = editor
+        self.highlighter = highlighter
+        self.sujo_desde = None    # Menor número de bloco que pode estar pendente
+        self.prazo_fatia = 0.0    # Deadline (perf_counter) da fatia em andamento
+        self.processando = False
+        self.visiveis = (0, 0)
+        self.blocos_no_frame = 0
+        self.contadores = {"frames": 0, "blocos_ultimo_frame": 0, "max_blocos_por_frame": 0,
+                           "blocos_destacados": 0, "blocos_adiados": 0, "fatias": 0}
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.processar_fatia)
+
+        # Conectado DEPOIS do highlighter: roda quando a cascata síncrona já terminou
+        editor.document().contentsChange.connect(self._conteudo_alterado)
+        editor.updateRequest.connect(self._viewport_alterado)
+        self.atualizar_visiveis()
+        highlighter.scheduler = self
+
+    def estatisticas(self):
+        """Cópia dos contadores (blocos por frame, adiados, fatias...)."""
+        dados = dict(self.contadores)
+        dados["pendente"] = self.sujo_desde is not None
+        return dados
+
+    def atualizar_visiveis(self):
+        # Estimativa pela altura da linha: não depende do layout do documento (NoWrap)
+        primeiro = self.editor.firstVisibleBlock().blockNumber()
+        linhas = self.editor.viewport().height() // max(1, self.editor.fontMetrics().lineSpacing())
+        ultimo = primeiro + linhas + 1
+        self.visiveis = (max(0, primeiro - self.MARGEM_BLOCOS), ultimo + self.MARGEM_BLOCOS)
+
+    def permitir(self, block):
+        """Chamado pelo highlighter: True = destacar agora, False = adiar."""
+        numero = block.blockNumber()
+        if self.visiveis[0] <= numero <= self.visiveis[1] or \
+                (self.processando and time.perf_counter() < self.prazo_fatia):
+            self.blocos_no_frame += 1
+            return True
+        self.contadores["blocos_adiados"] += 1
+        if self.sujo_desde is None or numero < self.sujo_desde:
+            self.sujo_desde = numero
+        if not self.processando:
+            self.timer.start(self.ATRASO_OCIOSO_MS)
+        return False
+
+    def _fechar_frame(self):
+        if not self.blocos_no_frame:
+            return
+        c = self.contadores
+        c["frames"] += 1
+        c["blocos_ultimo_frame"] = self.blocos_no_frame
+        c["max_blocos_por_frame"] = max(c["max_blocos_por_frame"], self.blocos_no_frame)
+        c["blocos_destacados"] += self.blocos_no_frame
+        self.frame_concluido.emit(self.blocos_no_frame)
+        self.blocos_no_frame = 0
+
+    def _conteudo_alterado(self, pos, removidos, adicionados):
+        if self.processando:
+            return
+        self._fechar_frame()
+        if self.sujo_desde is not None:
+            # Linhas removidas acima podem ter "puxado" blocos pendentes para cima
+            numero = self.editor.document().findBlock(pos).blockNumber()
+            self.sujo_desde = min(self.sujo_desde, max(0, numero))
+            # Usuário digitou: cancela a fatia agendada e espera ficar ocioso de novo
+            self.timer.start(self.ATRASO_OCIOSO_MS)
+
+    def _viewport_alterado(self, rect, dy):
+        if self.processando:
+            return
+        self.atualizar_visiveis()
+        self._fechar_frame()
+        if dy and self.sujo_desde is not None:
+            # Rolou para uma região talvez pendente: prioriza o que ficou visível
+            self.timer.start(0)
+
+    def _rehighlight(self, block):
+        if isinstance(block.userData(), _BlocoPendente):
+            self.highlighter.rehighlightBlock(block)
+
+    def processar_fatia(self):
+        if self.sujo_desde is None:
+            return
+        doc = self.editor.document()
+        self.processando = True
+        self.prazo_fatia = time.perf_counter() + self.FATIA_MS / 1000
+        inicio, self.sujo_desde = self.sujo_desde, None
+        try:
+            # 1. Viewport primeiro
+            block = doc.findBlockByNumber(self.visiveis[0])
+            while block.isValid() and block.blockNumber() <= self.visiveis[1]:
+                self._rehighlight(block)
+                block = block.next()
+            # 2. Depois o resto, em ordem, até estourar o orçamento
+            block = doc.findBlockByNumber(inicio)
+            while block.isValid() and time.perf_counter() < self.prazo_fatia:
+                self._rehighlight(block)
+                block = block.next()
+        finally:
+            self.processando = False
+        if block.isValid():
+            numero = block.blockNumber()
+            self.sujo_desde = numero if self.sujo_desde is None else min(self.sujo_desde, numero)
+        self.contadores["fatias"] += 1
+        self._fechar_frame()
+        if self.sujo_desde is not None:
+            self.timer.start(0)
+
+# --- 4. ÁREA DOS NÚMEROS DE LINHA ---
 class LineNumberArea(QWidget):
     def __init__(self, editor):
         super().__init__(editor)
@@ -87,12 +295,14 @@ class LineNumberArea(QWidget):
     def sizeHint(self): return QSize(self.code_editor.line_number_area_width(), 0)
     def paintEvent(self, event): self.code_editor.lineNumberAreaPaintEvent(event)
 
-# --- 3. CLASSE DO EDITOR ---
+# --- 5. CLASSE DO EDITOR ---
 class CodeEditor(QPlainTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         self.line_number_area = LineNumberArea(self)
+        # Número da primeira linha do documento no arquivo (janela de um arquivo grande)
+        self.deslocamento_linhas = 0
         
         # Timer para o efeito do cursor (estilo VS Code)
         self.cursor_timer = QTimer(self)
@@ -105,8 +315,41 @@ class CodeEditor(QPlainTextEdit):
         
         self.update_line_number_area_width(0)
         self.highlighter = PythonHighlighter(self.document())
+        # Viewport primeiro; o resto do documento é destacado em fatias ociosas
+        self.highlight_scheduler = HighlightScheduler(self, self.highlighter)
+        self.hibernando = False
+        self.highlight_ligado = True
         self.highlight_current_line()
 
+    def desligar_highlight(self):
+        """Sem highlighter neste editor (arquivos acima do limite de EditorTabs)."""
+        self.highlight_ligado = False
+        self.highlighter.setDocument(None)
+
+    # --- ABAS INATIVAS ---
+    def hibernar(self):
+        """Solta os formatos do highlight e o layout de cada bloco (aba em segundo plano).
+
+        O texto, o cursor e o histórico de desfazer ficam no documento; acordar()
+        religa o highlighter, que refaz o viewport na hora e o resto em fatias.
+        """
+        if self.hibernando:
+            return
+        self.hibernando = True
+        self.highlighter.setDocument(None)  # Limpa os formatos de todos os blocos
+        block = self.document().begin()
+        while block.isValid():
+            block.clearLayout()
+            block = block.next()
+
+    def acordar(self):
+        if not self.hibernando:
+            return
+        self.hibernando = False
+        if self.highlight_ligado:
+            self.highlight_scheduler.atualizar_visiveis()
+            self.highlighter.setDocument(self.document())
+
     def reset_cursor_blink(self):
         # Volta ao tempo padrão de piscar (500ms)
         QApplication.setCursorFlashTime(500)
@@ -179,9 +422,12 @@ class CodeEditor(QPlainTextEdit):
         selection.cursor.clearSelection()
         self.setExtraSelections([selection])
 
+    def total_linhas(self):
+        return self.deslocamento_linhas + self.blockCount()
+
     def line_number_area_width(self):
         digits = 1
-        max_val = max(1, self.blockCount())
+        max_val = max(1, self.total_linhas())
         while max_val >= 10: max_val /= 10; digits += 1
         return 15 + self.fontMetrics().horizontalAdvance('9') * digits
 
@@ -207,7 +453,7 @@ class CodeEditor(QPlainTextEdit):
         bottom = top + round(self.blockBoundingRect(block).height())
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
+                number = str(self.deslocamento_linhas + block_number + 1)
                 is_curr = self.textCursor().blockNumber() == block_number
                 painter.setPen(QColor("#ffffff") if is_curr else QColor("#5c6370"))
                 painter.drawText(0, top, self.line_number_area.width()-8, self.fontMetrics().height(), Qt.AlignmentFlag.AlignRight, number)
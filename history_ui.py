@@ -0,0 +1,200 @@
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QPushButton, QLabel, QListView
+from PyQt6.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QFont
+
+from console_history import Consulta, MAX_RESULTADOS
+
+LINHAS_CONTEXTO = 100        # Linhas antes/depois da escolhida no modo contexto
+ATUALIZAR_MS = 500           # Com a busca aberta, linhas novas entram no filtro a cada intervalo
+
+class ModeloLinhas(QAbstractListModel):
+    """Lista virtual de números de linha do histórico: só as linhas visíveis são formatadas."""
+
+    def __init__(self, historico, parent=None):
+        super().__init__(parent)
+        self.historico = historico
+        self.linhas = array("Q")
+
+    def definir(self, linhas):
+        self.beginResetModel()
+        self.linhas = linhas
+        self.endResetModel()
+
+    def anexar(self, linhas):
+        if linhas:
+            self.beginInsertRows(QModelIndex(), len(self.linhas), len(self.linhas) + len(linhas) - 1)
+            self.linhas.extend(linhas)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.linhas)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        n = self.linhas[index.row()]
+        try:
+            texto = self.historico.linha(n)
+        except IndexError:
+            texto = "(linha descartada)"
+        horario = self.historico.horario(n)
+        return f"{time.strftime('%H:%M:%S', time.localtime(horario))}.{int(horario * 1000) % 1000:03d}  {n + 1:>8}  {texto}"
+
+class PainelBusca(QWidget):
+    """Busca no histórico inteiro de um ConsoleView (não só no que está desenhado).
+
+    Enquanto se digita, o filtro mostra todas as linhas que batem (texto ou
+    regex); ▲/▼ e Enter saltam entre os matches e destacam a linha no
+    console. Uma linha que já saiu do console abre no modo contexto, com as
+    vizinhas lidas do histórico.
+    """
+
+    def __init__(self, console, parent=None):
+        super().__init__(parent)
+        self.console = console
+        self.historico = console.historico
+        self.consulta = None
+        self.resultados = array("Q")
+        self._ate = 0              # Linhas do histórico já consideradas no filtro
+        self._geracao = self.historico.geracao
+        self.modo_contexto = False
+
+        self.campo = QLineEdit(); self.campo.setPlaceholderText("Buscar no histórico do Output (Enter: próxima)")
+        self.chk_regex = QCheckBox("Regex")
+        self.chk_maiusculas = QCheckBox("Aa"); self.chk_maiusculas.setToolTip("Diferenciar maiúsculas")
+        self.btn_anterior = QPushButton("▲"); self.btn_proxima = QPushButton("▼")
+        self.btn_contexto = QPushButton("Contexto"); self.btn_contexto.setCheckable(True)
+        self.rotulo = QLabel("")
+        estilo = "QPushButton { background: transparent; color: #5c6370; border: 1px solid #1c2b3d; padding: 2px 8px; font-size: 10px; } QPushButton:checked { color: #00ff41; }"
+        for botao in (self.btn_anterior, self.btn_proxima, self.btn_contexto):
+            botao.setStyleSheet(estilo)
+            botao.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.campo.setStyleSheet("background-color: #050a0f; color: #82aaff; border: 1px solid #1c2b3d; padding: 3px;")
+        self.rotulo.setStyleSheet("color: #5c6370; font-size: 10px;")
+        self.chk_regex.setStyleSheet("color: #5c6370; font-size: 10px;")
+        self.chk_maiusculas.setStyleSheet("color: #5c6370; font-size: 10px;")
+
+        self.modelo = ModeloLinhas(self.historico, self)
+        self.lista = QListView()
+        self.lista.setModel(self.modelo)
+        self.lista.setUniformItemSizes(True)   # Milhares de linhas sem medir cada uma
+        self.lista.setFont(QFont("Consolas", 10))
+        self.lista.setStyleSheet("background-color: #050a0f; color: #82aaff; border: none;")
+        self.lista.setMaximumHeight(180)
+
+        barra = QHBoxLayout()
+        for widget in (self.campo, self.chk_regex, self.chk_maiusculas, self.btn_anterior, self.btn_proxima,
+                       self.btn_contexto, self.rotulo):
+            barra.addWidget(widget)
+        layout = QVBoxLayout(self); layout.setContentsMargins(0, 0, 0, 0); layout.setSpacing(2)
+        layout.addLayout(barra); layout.addWidget(self.lista)
+
+        self._atraso = QTimer(self); self._atraso.setSingleShot(True); self._atraso.setInterval(150)
+        self._atraso.timeout.connect(self.buscar)
+        self.campo.textChanged.connect(self._atraso.start)
+        self.chk_regex.toggled.connect(self._atraso.start)
+        self.chk_maiusculas.toggled.connect(self._atraso.start)
+        self.campo.returnPressed.connect(lambda: self.saltar(para_tras=False))
+        self.btn_proxima.clicked.connect(lambda: self.saltar(para_tras=False))
+        self.btn_anterior.clicked.connect(lambda: self.saltar(para_tras=True))
+        self.btn_contexto.toggled.connect(self._alternar_contexto)
+        self.lista.clicked.connect(lambda indice: self.ir_para(self.modelo.linhas[indice.row()]))
+        self.lista.doubleClicked.connect(lambda indice: self.mostrar_contexto(self.modelo.linhas[indice.row()]))
+        self._atualizar = QTimer(self); self._atualizar.setInterval(ATUALIZAR_MS)
+        self._atualizar.timeout.connect(self._linhas_novas)
+        self._atualizar.start()
+
+    def buscar(self):
+        texto = self.campo.text()
+        self.btn_contexto.setChecked(False)
+        if not texto:
+            self.consulta = None
+            self.resultados = array("Q")
+            self.modelo.definir(self.resultados)
+            self.rotulo.setText("")
+            self.console.retomar()
+            return
+        try:
+            self.consulta = Consulta(texto, self.chk_regex.isChecked(), self.chk_maiusculas.isChecked())
+        except re.error as e:
+            self.consulta = None
+            self.rotulo.setText(f"regex inválida: {e}")
+            return
+        inicio = time.perf_counter()
+        self._ate = self.historico.total
+        self._geracao = self.historico.geracao
+        self.resultados = self.historico.buscar(self.consulta)
+        self.modelo.definir(self.resultados)
+        self._mostrar_contagem((time.perf_counter() - inicio) * 1000)
+
+    def _mostrar_contagem(self, ms=None):
+        quantas = f"{len(self.resultados):,}".replace(",", ".") + ("+" if len(self.resultados) >= MAX_RESULTADOS else "")
+        total = f"{self.historico.total:,}".replace(",", ".")
+        self.rotulo.setText(f"{quantas} de {total} linhas" + (f" ({ms:.0f} ms)" if ms is not None else ""))
+
+    def _linhas_novas(self):
+        """Filtro ao vivo: procura só nas linhas que chegaram desde a última vez."""
+        if self.consulta is None or not self.isVisible():
+            return
+        if self.historico.geracao != self._geracao:   # Console limpo (novo Run)
+            self.buscar()
+            return
+        if self.historico.total == self._ate or len(self.resultados) >= MAX_RESULTADOS:
+            return
+        novas = self.historico.buscar(self.consulta, MAX_RESULTADOS - len(self.resultados), inicio=self._ate)
+        self._ate = self.historico.total
+        if self.modo_contexto:
+            self.resultados.extend(novas)
+        else:
+            self.modelo.anexar(novas)   # O modelo compartilha o array de resultados
+        self._mostrar_contagem()
+
+    def atual(self):
+        indice = self.lista.currentIndex()
+        return self.modelo.linhas[indice.row()] if indice.isValid() else -1
+
+    def saltar(self, para_tras=False):
+        if self.consulta is None:
+            return
+        atual = self.atual()
+        if atual < 0 and para_tras:
+            atual = self.historico.total   # Nada escolhido: ▲ começa do fim
+        n = self.historico.proxima(self.consulta, atual, para_tras=para_tras)
+        if n is not None:
+            self.ir_para(n)
+            self._selecionar(n)
+
+    def _selecionar(self, n):
+        linhas = self.modelo.linhas
+        i = bisect_left(linhas, n)
+        if i < len(linhas) and linhas[i] == n:
+            self.lista.setCurrentIndex(self.modelo.index(i))
+
+    def ir_para(self, n):
+        if not self.console.ir_para_linha(n) and not self.modo_contexto:
+            self.rotulo.setText(f"linha {n + 1} já saiu do console: duplo clique mostra o contexto")
+
+    def mostrar_contexto(self, n):
+        self.btn_contexto.blockSignals(True); self.btn_contexto.setChecked(True); self.btn_contexto.blockSignals(False)
+        self.modo_contexto = True
+        inicio = max(self.historico.descartadas, n - LINHAS_CONTEXTO)
+        fim = min(self.historico.total, n + LINHAS_CONTEXTO + 1)
+        self.modelo.definir(array("Q", range(inicio, fim)))
+        self._selecionar(n)
+        self.lista.scrollTo(self.lista.currentIndex(), QListView.ScrollHint.PositionAtCenter)
+
+    def _alternar_contexto(self, ativo):
+        n = self.atual()
+        if ativo and n >= 0:
+            self.mostrar_contexto(n)
+            return
+        self.modo_contexto = False
+        self.btn_contexto.blockSignals(True); self.btn_contexto.setChecked(False); self.btn_contexto.blockSignals(False)
+        self.modelo.definir(self.resultados)
+        if n >= 0:
+            self._selecionar(n)
@@ -1,23 +1,36 @@
+from startup_profile import PERFIL  # Primeiro import: o relógio da partida começa aqui
 import sys
 import subprocess
 import os
 import shutil
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QTextEdit, 
-                             QPushButton, QVBoxLayout, QHBoxLayout, QWidget, 
-                             QSplitter, QPlainTextEdit, QStatusBar, QFileDialog, QLineEdit, QTabWidget, QFrame, QLabel, QComboBox)
-from PyQt6.QtGui import (QFont, QSyntaxHighlighter, QTextCharFormat, QColor, 
-                         QTextCursor, QAction, QIcon)
-from PyQt6.QtCore import Qt, QRegularExpression, QThread, pyqtSignal, QSize, QTimer
-
-from arduino_engine import ArduinoEngineOverlay 
-from firmata_manager import FirmataManager # Importado para o gerenciamento
+import datetime
+import threading
+with PERFIL.medir("import", "PyQt6"):
+    from PyQt6.QtWidgets import (QApplication, QMainWindow, QTextEdit, 
+                                 QPushButton, QVBoxLayout, QHBoxLayout, QWidget, 
+                                 QSplitter, QPlainTextEdit, QStatusBar, QFileDialog, QLineEdit, QTabWidget, QFrame, QLabel, QComboBox,
+                                 QDialog, QFormLayout, QDoubleSpinBox, QDialogButtonBox)
+    from PyQt6.QtGui import (QFont, QSyntaxHighlighter, QTextCharFormat, QColor, 
+                             QTextCursor, QAction, QIcon)
+    from PyQt6.QtCore import Qt, QRegularExpression, QThread, pyqtSignal, QSize, QTimer, QEvent
+
+# arduino_engine, firmata_manager, port_watcher e firmata_ui são importados no
+# primeiro uso (PERFIL.importar), depois que a janela já foi pintada.
 
 # --- "Cérebro visual" do editor ---
-from highlighter import PythonHighlighter
-from highlighter import CodeEditor
-
-
-from firmata_ui import FirmataCardOverlay
+with PERFIL.medir("import", "highlighter + abas"):
+    from highlighter import PythonHighlighter
+    from highlighter import CodeEditor
+    from editor_tabs import EditorTabs
+
+with PERFIL.medir("import", "console_ui + runner"):
+    from console_ui import ConsoleView, CONSOLE_MAX_LINHAS
+    from console_history import HistoricoConsole
+    from stream_reader import ChunkedPipeReader
+    from warm_runner import WarmPythonRunner, ambiente_script
+    from process_supervisor import Limites, Supervisor, comando_python, opcoes_popen, resumo, PRAZO_TERMINO_S
+    from serial_transport import BAUDS, BAUD_PADRAO, FINAIS_LINHA, SerialIndisponivel
+    import cli_daemon
 # --- IMPORTAÇÃO DA CONFIGURAÇÃO EXTERNA ---
 try:
     from config_inicial import inicializar_ambiente_wandi
@@ -26,18 +39,15 @@ except ImportError:
 
 # --- CONFIGURAÇÕES ARDUINO ---
 BOARD = "arduino:avr:uno"
-
-class PortScannerThread(QThread):
-    ports_signal = pyqtSignal(list)
-    def run(self):
-        try:
-            fm = FirmataManager() # Usa o caminho do CLI definido no manager
-            flags = 0x08000000 if os.name == 'nt' else 0
-            output = subprocess.run([fm.cli_path, "board", "list"], capture_output=True, text=True, creationflags=flags)
-            lines = output.stdout.splitlines()
-            ports = [line.split()[0] for line in lines if "COM" in line or "/dev/tty" in line]
-            self.ports_signal.emit(ports)
-        except: self.ports_signal.emit([])
+# Interpretador com pyfirmata2/serial já importados esperando o próximo Run. Desligado
+# por padrão: o script não roda num interpretador novo; o menu Run > Processo pré-aquecido liga
+USAR_RUNNER_AQUECIDO = False
+# Limites de cada Run (None = sem limite); o menu Run > Limites de execução muda na sessão
+LIMITE_CPU_S = None
+LIMITE_MEMORIA_MB = None
+LIMITE_TEMPO_S = None
+# Se a janela não for pintada (ex.: aberta minimizada), os subsistemas sobem mesmo assim
+ATRASO_MAX_SUBSISTEMAS_MS = 1500
 
 # --- CORES ---
 COLOR_BG = "#0b1622"
@@ -49,44 +59,70 @@ COLOR_DEEP_BLUE = "#0d1b2a"
 
 # --- WORKER DE EXECUÇÃO ---
 class ExecutorWorker(QThread):
-    line_received = pyqtSignal(str)
+    # (linhas completas, linha parcial atual) — um sinal por lote, não por linha
+    lote_recebido = pyqtSignal(str, str)
+    relatorio = pyqtSignal(dict)  # Como o Run terminou: código, motivo, tempo, CPU, pico de RSS
     finished = pyqtSignal()
 
-    def __init__(self, codigo):
+    def __init__(self, codigo, runner=None, env_extra=None, limites=None):
         super().__init__()
         self.codigo = codigo
+        self.runner = runner  # WarmPythonRunner opcional (processo pré-aquecido)
+        self.env_extra = env_extra or {}  # Ex.: endereço da gravação de amostras
+        self.limites = limites or Limites()
         self.processo = None
+        self.supervisor = None
+        self._parar = False  # stop() antes do processo existir
+        self.log = None  # LogRotativo opcional: cópia em disco de tudo que o script imprime
 
     def run(self):
-        self.processo = subprocess.Popen(
-            [sys.executable, "-u", "-c", self.codigo],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            stdin=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            creationflags=0x08000000 if os.name == 'nt' else 0
-        )
+        if self.runner:
+            self.processo = self.runner.executar(self.codigo, self.env_extra, self.limites.do_processo())
+        else:
+            # Pipe binário: o ChunkedPipeReader lê em blocos e decodifica aos poucos
+            env = ambiente_script(extra=self.env_extra)
+            self.processo = subprocess.Popen(
+                comando_python(self.codigo, self.limites),  # rlimits aplicados por um prelúdio
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.PIPE,
+                env=env,
+                **opcoes_popen()  # Grupo próprio
+            )
+        # O Supervisor para a árvore inteira: sem isso um filho do script segura o pipe e a porta
+        self.supervisor = Supervisor(self.processo, self.limites)
+        if self._parar:
+            self.supervisor.parar()
         if self.processo.stdout:
-            for linha in self.processo.stdout:
-                self.line_received.emit(linha)
-        self.processo.wait()
+            for texto, previa in ChunkedPipeReader(self.processo.stdout).lotes():
+                if self.log and texto:
+                    self.log.escrever(texto)  # Nesta thread: o log não depende do console acompanhar
+                self.lote_recebido.emit(texto, previa)
+        self.relatorio.emit(self.supervisor.esperar())
         self.finished.emit()
 
     def stop(self):
-        if self.processo:
-            self.processo.terminate()
+        """SIGTERM no grupo do script, SIGKILL depois de PRAZO_TERMINO_S. Não bloqueia."""
+        self._parar = True
+        if self.supervisor:
+            self.supervisor.parar()
 
     def enviar_input(self, texto):
-        if self.processo and self.processo.poll() is None:
+        # supervisor.vivo, não poll(): só o Supervisor recolhe o processo (wait4 traz CPU e RSS)
+        if self.supervisor and self.supervisor.vivo:
             try:
-                self.processo.stdin.write(texto + "\n")
+                self.processo.stdin.write((texto + "\n").encode("utf-8"))
                 self.processo.stdin.flush()
             except Exception as e:
-                self.line_received.emit(f"\nErro de Input: {str(e)}\n")
+                self.lote_recebido.emit(f"\nErro de Input: {str(e)}\n", "")
 
 # --- JANELA PRINCIPAL ---
 class MeuEditor(QMainWindow):
+    # Engine, portas, runner e arquivo padrão já iniciados (depois da primeira pintura)
+    partida_concluida = pyqtSignal()
+    # Erro de disco de um LogRotativo (vem da thread de escrita dele)
+    erro_log_disco = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.caminho_wandi = inicializar_ambiente_wandi()
@@ -100,40 +136,107 @@ class MeuEditor(QMainWindow):
         self.setWindowIcon(QIcon(caminho_icone))
         # ------------------------------------
 
-        self.caminho_arquivo = None
-        
-        # INICIALIZA O GERENCIADOR
-        self.firmata = FirmataManager(BOARD)
-        self.firmata.log_received.connect(self.log_serial_arduino)
+        self.erro_log_disco.connect(lambda texto: self.status_bar.showMessage(texto))
+        self.runner = None
+        self.limites = Limites(LIMITE_CPU_S, LIMITE_MEMORIA_MB, LIMITE_TEMPO_S)
+        self.workers_parando = []        # Runs antigos que não terminaram no prazo (segurados até o fim)
+        self.captura = None
+        self.vista_captura = None
+        self.busca_output = None         # PainelBusca do histórico do Output (criado no primeiro uso)
+        self.plotter = None              # PlotterView (criado ao abrir a aba PLOTTER)
+        self.logs = None                 # {"output": LogRotativo, "serial": LogRotativo} com o log em disco ligado
+        self.serial = None               # SerialThread da conexão direta do Serial Monitor
+        self._serial_emprestada = None   # Porta cedida a um upload/script: reabre quando ele terminar
+        self._dono_serial = None         # Quem está com a porta cedida (só ele a devolve)
+        self._firmata = None
+        self._card_instalar = None
+        self.engine_overlay = None
+        self.port_watcher = None
+        self.ultimo_tipo_compilado = "Standard" 
+        self._subsistemas_iniciados = False
 
         self.init_ui()
-        
-        # Restante da sua lógica original...
-        self.ultimo_tipo_compilado = "Standard" 
-        self.card_instalar = FirmataCardOverlay(self, cores={
-            "bg": COLOR_DEEP_BLUE,
-            "accent": COLOR_ACCENT,
-            "text": "#00ffdd"
-        })
-        self.card_instalar.firmata_selected.connect(self.processar_compilacao_firmata)
         self.criar_menus()
 
+        # Nada pesado antes da primeira pintura: engine, portas, runner e o arquivo
+        # padrão sobem depois, um por vez, quando o event loop estiver ocioso
+        self.centralWidget().installEventFilter(self)
+        QTimer.singleShot(ATRASO_MAX_SUBSISTEMAS_MS, self.iniciar_subsistemas)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not self._subsistemas_iniciados:
+            PERFIL.marcar("primeira pintura")
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.iniciar_subsistemas)
+        return super().eventFilter(obj, event)
+
+    def iniciar_subsistemas(self):
+        if self._subsistemas_iniciados:
+            return
+        self._subsistemas_iniciados = True
+        # Recuperação antes do arquivo padrão: se for o mesmo, fica a versão do autosave
+        etapas = [("recuperação (autosave)", self.recuperar_autosave),
+                  ("arquivo padrão", self.carregar_arquivo_padrao),
+                  ("engine (overlay + worker)", self.iniciar_engine),
+                  ("portas (PortWatcher)", self.iniciar_portas)]
+        if USAR_RUNNER_AQUECIDO:
+            etapas.append(("runner pré-aquecido", self.iniciar_runner))
+        self._proxima_etapa(etapas)
+
+    def _proxima_etapa(self, etapas):
+        # Uma etapa por volta do event loop: a janela continua respondendo entre elas
+        if not etapas:
+            PERFIL.marcar("subsistemas iniciados")
+            self.partida_concluida.emit()
+            return
+        nome, funcao = etapas.pop(0)
+        with PERFIL.medir("subsistemas", nome):
+            funcao()
+        QTimer.singleShot(0, lambda: self._proxima_etapa(etapas))
+
+    def carregar_arquivo_padrao(self):
+        caminho_padrao = os.path.join(self.caminho_wandi, "Wandi.py") if self.caminho_wandi else None
+        if caminho_padrao and os.path.exists(caminho_padrao):
+            self.abas_editor.abrir(caminho_padrao)  # Reaproveita a aba vazia inicial
+
+    def iniciar_engine(self):
+        ArduinoEngineOverlay = PERFIL.importar("arduino_engine").ArduinoEngineOverlay
         self.engine_overlay = ArduinoEngineOverlay(self)
         self.engine_overlay.iniciar()
 
-        self.scanner_thread = PortScannerThread()
-        self.scanner_thread.ports_signal.connect(self.atualizar_lista_portas)
-        self.timer_portas = QTimer()
-        self.timer_portas.timeout.connect(self.scanner_thread.start)
-        self.timer_portas.start(3000)
-        self.scanner_thread.start()
-
-                # No final do __init__ do MeuEditor:
-        caminho_padrao = os.path.join(self.caminho_wandi, "Wandi.py")
-        if os.path.exists(caminho_padrao):
-            with open(caminho_padrao, 'r', encoding='utf-8') as f:
-                self.editor.setPlainText(f.read())
-            self.caminho_arquivo = caminho_padrao
+    def iniciar_portas(self):
+        # Portas por inotify/diff no próprio processo; arduino-cli só para o FQBN
+        PortWatcher = PERFIL.importar("port_watcher").PortWatcher
+        self.port_watcher = PortWatcher(parent=self)
+        self.port_watcher.ports_signal.connect(self.atualizar_lista_portas)
+        self.port_watcher.fqbn_signal.connect(self.placas_detectadas)
+        self.port_watcher.iniciar()
+
+    def iniciar_runner(self):
+        if self.runner is None and self.act_runner_aquecido.isChecked():
+            self.runner = WarmPythonRunner(); self.runner.aquecer()
+
+    @property
+    def firmata(self):
+        """FirmataManager criado no primeiro compile/upload."""
+        if self._firmata is None:
+            FirmataManager = PERFIL.importar("firmata_manager").FirmataManager
+            self._firmata = FirmataManager(BOARD)
+            self._firmata.log_received.connect(self.log_serial_arduino)
+            self._firmata.progress_received.connect(self.mostrar_progresso_hardware)
+        return self._firmata
+
+    @property
+    def card_instalar(self):
+        if self._card_instalar is None:
+            FirmataCardOverlay = PERFIL.importar("firmata_ui").FirmataCardOverlay
+            self._card_instalar = FirmataCardOverlay(self, cores={
+                "bg": COLOR_DEEP_BLUE,
+                "accent": COLOR_ACCENT,
+                "text": "#00ffdd"
+            })
+            self._card_instalar.firmata_selected.connect(self.processar_compilacao_firmata)
+        return self._card_instalar
 
     def atualizar_lista_portas(self, ports):
         current = self.port_dropdown.currentText()
@@ -152,6 +255,11 @@ class MeuEditor(QMainWindow):
                 if current in ports:
                     self.port_dropdown.setCurrentText(current)
 
+    def placas_detectadas(self, fqbns):
+        porta = self.port_dropdown.currentText()
+        if porta in fqbns:
+            self.status_bar.showMessage(f"Placa detectada em {porta}: {fqbns[porta]}")
+
     def executar_compilacao_firmata(self):
         """Abre o card flutuante para escolha do tipo."""
         self.card_instalar.mostrar()
@@ -169,12 +277,54 @@ class MeuEditor(QMainWindow):
             self.adicionar_ao_output("\n❌ Erro: Selecione uma porta USB!\n")
             return
         
-        self.parar_execucao()
+        self.parar_execucao(esperar=True)  # Um filho do script ainda pode estar com a porta
         self.tabs_inferiores.setCurrentIndex(0)
+        emprestada = self.emprestar_serial(porta)
         # Usa o tipo que foi escolhido no card de compilação
-        self.firmata.upload_firmata(porta, self.ultimo_tipo_compilado)
+        thread = self.firmata.upload_firmata(porta, self.ultimo_tipo_compilado)
+        if emprestada: self.ceder_serial(thread)
 
 
+    def executar_upload_lote(self):
+        """Abre a escolha de portas; compila uma vez e grava todas em paralelo."""
+        portas = list(self.port_watcher.portas or []) if self.port_watcher else []
+        if not portas:
+            self.status_bar.showMessage("Nenhuma placa conectada para o upload em lote.")
+            return
+        self.parar_execucao(esperar=True)
+        BatchUploadDialog = PERFIL.importar("firmata_ui").BatchUploadDialog
+        self.dialogo_lote = BatchUploadDialog(portas, self, cores={
+            "bg": COLOR_DEEP_BLUE, "accent": COLOR_ACCENT, "text": "#00ffdd"})
+        self.dialogo_lote.upload_solicitado.connect(self.iniciar_upload_lote)
+        self.dialogo_lote.show()
+
+    def iniciar_upload_lote(self, portas, max_paralelo):
+        self.tabs_inferiores.setCurrentIndex(0)
+        emprestada = self.emprestar_serial()
+        thread = self.firmata.upload_firmata_lote(portas, self.ultimo_tipo_compilado, max_paralelo,
+                                                  ao_status=self.dialogo_lote.atualizar_porta,
+                                                  ao_concluir=self.dialogo_lote.lote_concluido,
+                                                  ao_progresso=self.dialogo_lote.atualizar_progresso)
+        if thread is None:
+            self.dialogo_lote.lote_concluido("sketch não encontrado")
+        if emprestada: self.ceder_serial(thread)
+
+    def mostrar_progresso_hardware(self, origem, evento):
+        """Eventos do compile/upload (já limitados a ~10/s) viram uma linha na status bar."""
+        partes = [f"[{origem}]"] if origem else []
+        if evento.etapa == "compilado":
+            if evento.flash_usada is not None:
+                partes.append(f"Flash {evento.flash_usada} B" + (f" ({evento.percentual}%)" if evento.percentual is not None else ""))
+            if evento.ram_usada is not None:
+                partes.append(f"RAM {evento.ram_usada} B" + (f"/{evento.ram_max} B" if evento.ram_max else ""))
+        else:
+            partes.append(f"{evento.etapa.capitalize()} {evento.percentual or 0}%")
+            if evento.bytes_gravados:
+                partes.append(f"{evento.bytes_gravados} B")
+            if evento.segundos:
+                partes.append(f"{evento.segundos:.2f} s")
+        self.status_bar.showMessage("  ".join(partes))
+
     def limpar_output_sistema(self):
         self.console_output.clear()
         self.status_bar.showMessage("Output do sistema limpo.")
@@ -183,13 +333,169 @@ class MeuEditor(QMainWindow):
         self.serial_log.clear()
         self.status_bar.showMessage("Log Serial limpo.")
 
+    # --- CONEXÃO SERIAL DIRETA ---
+    def alternar_serial(self, ativo):
+        if not ativo:
+            self.desconectar_serial()
+            return
+        porta = self.port_dropdown.currentText()
+        if not porta or porta == "BUSCANDO PLACA":
+            self.status_bar.showMessage("Selecione uma porta para conectar o Serial Monitor.")
+            self._marcar_conectado(False)
+            return
+        self.conectar_serial(porta, int(self.combo_baud.currentText()),
+                             FINAIS_LINHA[self.combo_final_linha.currentText()])
+
+    def conectar_serial(self, porta, baud, final_linha):
+        SerialThread = PERFIL.importar("serial_monitor").SerialThread
+        try:
+            self.serial = SerialThread(porta, baud, final_linha)
+        except SerialIndisponivel as e:
+            self.serial = None
+            self.status_bar.showMessage(str(e))
+            self._marcar_conectado(False)
+            return False
+        self.serial.lote.connect(self.log_serial_arduino)
+        self.serial.log = self.logs["serial"] if self.logs else None
+        self.serial.erro.connect(self.serial_perdida)
+        self.serial.start()
+        self._marcar_conectado(True)
+        self.status_bar.showMessage(f"Serial Monitor conectado em {porta} a {baud} baud.")
+        return True
+
+    def desconectar_serial(self):
+        if self.serial:
+            serial, self.serial = self.serial, None
+            serial.parar()  # Volta só com a porta já fechada
+            self._marcar_conectado(False)
+            self.status_bar.showMessage(f"Serial Monitor desconectado de {serial.porta}.")
+
+    def _marcar_conectado(self, conectado):
+        # Sem emitir toggled: o botão só reflete o estado, não reconecta
+        self.btn_conectar_serial.blockSignals(True)
+        self.btn_conectar_serial.setChecked(conectado)
+        self.btn_conectar_serial.blockSignals(False)
+
+    def serial_perdida(self, mensagem):
+        # Cabo puxado ou placa reiniciada: a porta já foi fechada pelo transporte
+        self.log_serial_arduino(f"\n[SERIAL] {mensagem}\n")
+        self.desconectar_serial()
+
+    def emprestar_serial(self, porta=None):
+        """Fecha a conexão direta para um upload/script usar a porta; True se havia uma.
+
+        Também é True se a porta ainda está cedida a um Run/upload anterior: o
+        próximo dono herda o empréstimo (ceder_serial) e é ele quem devolve.
+        """
+        if self._serial_emprestada and not self.serial:
+            return True
+        if not self.serial or (porta and self.serial.porta != porta):
+            return False
+        t = self.serial.transporte
+        self._serial_emprestada = (t.porta, t.baud, t.final_linha)
+        self.desconectar_serial()
+        return True
+
+    def ceder_serial(self, dono):
+        """A porta emprestada volta quando `dono` (QThread do Run/upload) terminar; None devolve já."""
+        self._dono_serial = dono
+        if dono is None:
+            self.devolver_serial()
+        else:
+            dono.finished.connect(lambda: self.devolver_serial(dono))
+
+    def devolver_serial(self, dono=None):
+        if dono is not None and dono is not self._dono_serial:
+            return  # finished atrasado de um Run/upload que já passou a porta adiante
+        emprestada, self._serial_emprestada, self._dono_serial = self._serial_emprestada, None, None
+        if emprestada and not self.serial:   # Reconectada à mão no meio tempo: fica como está
+            self.conectar_serial(*emprestada)
+
+    def alternar_busca_output(self, ativo):
+        if ativo:
+            if self.busca_output is None:
+                self.busca_output = PERFIL.importar("history_ui").PainelBusca(self.console_output)
+                self.layout_output.insertWidget(self.layout_output.indexOf(self.console_output), self.busca_output)
+            self.busca_output.show()
+            self.busca_output.campo.setFocus()
+        elif self.busca_output:
+            self.busca_output.hide()
+            self.console_output.retomar()
+
+    def alternar_log_disco(self, ativo):
+        output_log = PERFIL.importar("output_log")
+        if ativo:
+            pasta = output_log.pasta_sessao()
+            compressao = output_log.compressao_padrao()
+            self.logs = {nome: output_log.LogRotativo(pasta, nome, compressao=compressao, ao_erro=self.erro_log_disco.emit)
+                         for nome in ("output", "serial")}
+            self.status_bar.showMessage(f"Log em disco ligado ({compressao}): {pasta}")
+        elif self.logs:
+            logs, self.logs = self.logs, None
+            # fechar() espera a compressão do último segmento: fora da thread da interface
+            threading.Thread(target=lambda: [log.fechar() for log in logs.values()], daemon=True).start()
+            self.status_bar.showMessage(f"Log em disco desligado: {logs['output'].pasta}")
+        if hasattr(self, 'worker'):
+            self.worker.log = self.logs["output"] if self.logs else None
+        if self.serial:
+            self.serial.log = self.logs["serial"] if self.logs else None
+
+    def alternar_gravacao(self, ativo):
+        if ativo:
+            captura_ui = PERFIL.importar("capture_ui")
+            if self.vista_captura is None:
+                self.vista_captura = captura_ui.VistaCaptura()
+                self.layout_serial.insertWidget(self.layout_serial.indexOf(self.serial_log), self.vista_captura)
+            self.captura = captura_ui.CapturaThread()
+            self.captura.gravacao_iniciada.connect(self.vista_captura.iniciar)
+            self.captura.balde.connect(self.vista_captura.adicionar_balde)
+            self.captura.log_signal.connect(lambda texto, status: self.log_serial_arduino(texto + "\n"))
+            self.captura.start()
+            self.vista_captura.show()
+            self.status_bar.showMessage("Gravação de amostras ligada: vale para o próximo Run.")
+        elif self.captura:
+            self.captura.parar()
+            pastas = self.captura.receptor.gravacoes
+            self.captura = None
+            self.status_bar.showMessage(f"Gravação desligada. Última captura: {pastas[-1]}" if pastas else "Gravação desligada.")
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        if hasattr(self, 'engine_overlay'):
+        if getattr(self, 'engine_overlay', None):
             self.engine_overlay.posicionar_no_canto()
         # ... seu código de overlay ...
-        if hasattr(self, 'card_instalar') and self.card_instalar.isVisible():
-            self.card_instalar.setGeometry(self.rect())
+        # _card_instalar: a property criaria o card só para checar a visibilidade
+        if getattr(self, '_card_instalar', None) and self._card_instalar.isVisible():
+            self._card_instalar.setGeometry(self.rect())
+
+    def estilizar_editor(self, editor):
+        editor.setFont(QFont("Consolas", 12))
+        
+        # Estilo atualizado com a BARRA DE ROLAGEM (Scrollbar) interativa
+        editor.setStyleSheet(f"""
+            QPlainTextEdit {{
+                background-color: {COLOR_EDITOR}; 
+                color: {COLOR_TEXT}; 
+                border: none; 
+                padding: 10px;
+            }}
+            /* Configuração da Barra Vertical */
+            QScrollBar:vertical {{
+                border: none;
+                background: {COLOR_BG};
+                width: 14px;
+                margin: 0px;
+            }}
+            /* O corpo da barra que o usuário arrasta */
+            QScrollBar::handle:vertical {{
+                background: {COLOR_ACCENT};
+                min-height: 30px;
+                border-radius: 7px;
+            }}
+            QScrollBar::handle:vertical:hover {{
+                background: #4da3ff; /* Cor mais clara ao passar o mouse */
+            }}
+        """)
 
     def init_ui(self):
         central_container = QWidget()
@@ -250,34 +556,15 @@ class MeuEditor(QMainWindow):
 
         splitter_code = QSplitter(Qt.Orientation.Vertical)
 
-        self.editor = CodeEditor()
-        self.editor.setFont(QFont("Consolas", 12))
-        
-        # Estilo atualizado com a BARRA DE ROLAGEM (Scrollbar) interativa
-        self.editor.setStyleSheet(f"""
-            QPlainTextEdit {{
-                background-color: {COLOR_EDITOR}; 
-                color: {COLOR_TEXT}; 
-                border: none; 
-                padding: 10px;
-            }}
-            /* Configuração da Barra Vertical */
-            QScrollBar:vertical {{
-                border: none;
-                background: {COLOR_BG};
-                width: 14px;
-                margin: 0px;
-            }}
-            /* O corpo da barra que o usuário arrasta */
-            QScrollBar::handle:vertical {{
-                background: {COLOR_ACCENT};
-                min-height: 30px;
-                border-radius: 7px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background: #4da3ff; /* Cor mais clara ao passar o mouse */
-            }}
+        # Um CodeEditor por aba; todos compartilham as regras compiladas do highlighter
+        self.abas_editor = EditorTabs(configurar_editor=self.estilizar_editor)
+        self.abas_editor.editor_alterado.connect(self.editor_trocado)
+        self.abas_editor.salvo.connect(self.arquivo_salvo)
+        self.abas_editor.setStyleSheet(f"""
+            QTabBar::tab {{ background: {COLOR_BG}; color: {COLOR_TEXT}; padding: 6px 16px; border: 1px solid #1c2b3d; }}
+            QTabBar::tab:selected {{ background: {COLOR_EDITOR}; border-bottom: 2px solid {COLOR_ACCENT}; }}
         """)
+        self.abas_editor.novo()
 
         # Como o CodeEditor que criamos no highlighter.py já inicializa o 
         # PythonHighlighter internamente, você pode remover ou comentar esta linha:
@@ -294,8 +581,8 @@ class MeuEditor(QMainWindow):
         """)
 
         # Aba Output
-        self.console_output = QPlainTextEdit()
-        self.console_output.setReadOnly(True)
+        # O widget mostra só as últimas linhas; o histórico guarda todas do Run para a busca
+        self.console_output = ConsoleView(capacidade=CONSOLE_MAX_LINHAS, historico=HistoricoConsole())
         self.console_output.setTextInteractionFlags(Qt.TextInteractionFlag.NoTextInteraction)
         self.console_output.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.console_output.setFont(QFont("Consolas", 11))
@@ -308,8 +595,22 @@ class MeuEditor(QMainWindow):
         btn_limpar_out.setCursor(Qt.CursorShape.PointingHandCursor)
         btn_limpar_out.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 5px; font-size: 10px; } QPushButton:hover { color: white; }")
         btn_limpar_out.clicked.connect(self.limpar_output_sistema)
+        # Cópia em disco de Output + Serial (segmentos rotativos); o console guarda só o final
+        self.btn_log_disco = QPushButton("● Log em disco")
+        self.btn_log_disco.setCheckable(True)
+        self.btn_log_disco.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_log_disco.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 5px; font-size: 10px; } QPushButton:checked { color: #e74c3c; }")
+        self.btn_log_disco.toggled.connect(self.alternar_log_disco)
+        self.btn_buscar_output = QPushButton("Buscar")
+        self.btn_buscar_output.setCheckable(True)
+        self.btn_buscar_output.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_buscar_output.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 5px; font-size: 10px; } QPushButton:checked { color: #82aaff; }")
+        self.btn_buscar_output.toggled.connect(self.alternar_busca_output)
+        barra_limpeza.addWidget(self.btn_buscar_output)
+        barra_limpeza.addWidget(self.btn_log_disco)
         barra_limpeza.addWidget(btn_limpar_out)
         layout_output_interno.addLayout(barra_limpeza); layout_output_interno.addWidget(self.console_output)
+        self.layout_output = layout_output_interno  # O PainelBusca entra acima do console quando aberto
         self.tabs_inferiores.addTab(container_output, "OUTPUT")
 
         # Aba Serial Monitor
@@ -320,19 +621,65 @@ class MeuEditor(QMainWindow):
         self.serial_input.setStyleSheet(f"background-color: {COLOR_CONSOLE}; color: #00ff41; border: 1px solid {COLOR_ACCENT}; padding: 5px; font-family: 'Consolas';")
         self.serial_input.returnPressed.connect(self.enviar_comando_serial)
         
-        barra_limpeza_serial = QHBoxLayout(); barra_limpeza_serial.addStretch()
+        barra_limpeza_serial = QHBoxLayout()
+        # Conexão direta com a porta do port_dropdown (sem script rodando)
+        estilo_combo = f"QComboBox {{ background-color: {COLOR_DEEP_BLUE}; color: #00ff41; border: 1px solid #1c2b3d; padding: 1px 6px; font-size: 10px; }}"
+        self.combo_baud = QComboBox(); self.combo_baud.setStyleSheet(estilo_combo)
+        self.combo_baud.addItems([str(b) for b in BAUDS]); self.combo_baud.setCurrentText(str(BAUD_PADRAO))
+        self.combo_final_linha = QComboBox(); self.combo_final_linha.setStyleSheet(estilo_combo)
+        self.combo_final_linha.addItems(list(FINAIS_LINHA)); self.combo_final_linha.setCurrentText("Nova linha (LF)")
+        self.btn_conectar_serial = QPushButton("Conectar")
+        self.btn_conectar_serial.setCheckable(True)
+        self.btn_conectar_serial.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_conectar_serial.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: 1px solid #1c2b3d; padding: 2px 10px; font-size: 10px; } QPushButton:checked { color: #00ff41; border-color: #00ff41; }")
+        self.btn_conectar_serial.toggled.connect(self.alternar_serial)
+        for widget in (self.combo_baud, self.combo_final_linha, self.btn_conectar_serial):
+            barra_limpeza_serial.addWidget(widget)
+        barra_limpeza_serial.addStretch()
         btn_limpar_serial = QPushButton("Limpar Serial")
         btn_limpar_serial.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 2px 10px; font-size: 10px; }")
         btn_limpar_serial.clicked.connect(self.limpar_serial_log)
         barra_limpeza_serial.addWidget(btn_limpar_serial)
-
-        self.serial_log = QPlainTextEdit(); self.serial_log.setReadOnly(True)
+        # Gravação binária de amostras (wandi_amostras): não passa pelo stdout nem pelo console
+        self.btn_gravar = QPushButton("● Gravar amostras")
+        self.btn_gravar.setCheckable(True)
+        self.btn_gravar.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_gravar.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 2px 10px; font-size: 10px; } QPushButton:checked { color: #e74c3c; }")
+        self.btn_gravar.toggled.connect(self.alternar_gravacao)
+        barra_limpeza_serial.addWidget(self.btn_gravar)
+
+        self.serial_log = ConsoleView(capacidade=CONSOLE_MAX_LINHAS)
         self.serial_log.setStyleSheet(f"background-color: {COLOR_CONSOLE}; color: #00ff41; border: none; padding: 5px; font-family: 'Consolas';")
 
         layout_serial.addWidget(self.serial_input); layout_serial.addLayout(barra_limpeza_serial); layout_serial.addWidget(self.serial_log)
+        self.layout_serial = layout_serial  # A VistaCaptura entra acima do log quando a gravação liga
         self.tabs_inferiores.addTab(container_serial, "SERIAL MONITOR")
 
-        splitter_code.addWidget(self.editor); splitter_code.addWidget(self.tabs_inferiores)
+        # Aba Plotter: o PlotterView (NumPy) só é criado quando a aba é aberta pela primeira vez
+        container_plotter = QWidget(); self.layout_plotter = QVBoxLayout(container_plotter)
+        self.layout_plotter.setContentsMargins(0, 0, 0, 0); self.layout_plotter.setSpacing(2)
+        barra_plotter = QHBoxLayout()
+        self.combo_fonte_plotter = QComboBox(); self.combo_fonte_plotter.setStyleSheet(estilo_combo)
+        self.combo_fonte_plotter.addItems(["Output", "Serial Monitor"])
+        self.combo_janela_plotter = QComboBox(); self.combo_janela_plotter.setStyleSheet(estilo_combo)
+        self.combo_janela_plotter.addItems([f"{n:,} pontos".replace(",", ".") for n in (1_000, 10_000, 50_000, 250_000)])
+        self.combo_janela_plotter.setCurrentIndex(1)
+        self.combo_janela_plotter.currentIndexChanged.connect(self.mudar_janela_plotter)
+        self.btn_pausar_plotter = QPushButton("Pausar")
+        self.btn_pausar_plotter.setCheckable(True)
+        self.btn_pausar_plotter.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: 1px solid #1c2b3d; padding: 2px 10px; font-size: 10px; } QPushButton:checked { color: #f1c40f; border-color: #f1c40f; }")
+        self.btn_pausar_plotter.toggled.connect(lambda pausado: self.plotter and self.plotter.pausar(pausado))
+        btn_limpar_plotter = QPushButton("Limpar Plotter")
+        btn_limpar_plotter.setStyleSheet("QPushButton { background: transparent; color: #5c6370; border: none; padding: 2px 10px; font-size: 10px; }")
+        btn_limpar_plotter.clicked.connect(lambda: self.plotter and self.plotter.limpar())
+        for widget in (self.combo_fonte_plotter, self.combo_janela_plotter, self.btn_pausar_plotter):
+            barra_plotter.addWidget(widget)
+        barra_plotter.addStretch(); barra_plotter.addWidget(btn_limpar_plotter)
+        self.layout_plotter.addLayout(barra_plotter)
+        self.aba_plotter = self.tabs_inferiores.addTab(container_plotter, "PLOTTER")
+        self.tabs_inferiores.currentChanged.connect(self.abrir_plotter)
+
+        splitter_code.addWidget(self.abas_editor); splitter_code.addWidget(self.tabs_inferiores)
         splitter_code.setStretchFactor(0, 3); splitter_code.setStretchFactor(1, 1)
         main_layout.addWidget(splitter_code)
 
@@ -345,7 +692,8 @@ class MeuEditor(QMainWindow):
         menubar.setStyleSheet(f"QMenuBar {{ background-color: {COLOR_BG}; color: {COLOR_TEXT}; border-bottom: 1px solid #1c2b3d; }}")
         file_menu = menubar.addMenu("&File")
         file_actions = [("Novo", "Ctrl+N", self.novo_arquivo), ("Abrir...", "Ctrl+O", self.abrir_arquivo), 
-                        ("Salvar", "Ctrl+S", self.salvar_arquivo), (None, None, None), ("Sair", "Alt+F4", self.close)]
+                        ("Salvar", "Ctrl+S", self.salvar_arquivo), ("Fechar aba", "Ctrl+W", self.fechar_aba),
+                        (None, None, None), ("Sair", "Alt+F4", self.close)]
         for nome, atalho, func in file_actions:
             if nome is None: file_menu.addSeparator()
             else:
@@ -354,8 +702,9 @@ class MeuEditor(QMainWindow):
                 act.triggered.connect(func); file_menu.addAction(act)
 
         edit_menu = menubar.addMenu("&Edit")
-        edit_actions = [("Desfazer", "Ctrl+Z", self.editor.undo), ("Refazer", "Ctrl+Y", self.editor.redo), (None, None, None),
-                        ("Recortar", "Ctrl+X", self.editor.cut), ("Copiar", "Ctrl+C", self.editor.copy), ("Colar", "Ctrl+V", self.editor.paste)]
+        # lambda: a ação vale para o editor da aba atual, não para o que existia ao criar o menu
+        edit_actions = [("Desfazer", "Ctrl+Z", lambda: self.editor.undo()), ("Refazer", "Ctrl+Y", lambda: self.editor.redo()), (None, None, None),
+                        ("Recortar", "Ctrl+X", lambda: self.editor.cut()), ("Copiar", "Ctrl+C", lambda: self.editor.copy()), ("Colar", "Ctrl+V", lambda: self.editor.paste())]
         for nome, atalho, func in edit_actions:
             if nome is None: edit_menu.addSeparator()
             else:
@@ -363,7 +712,88 @@ class MeuEditor(QMainWindow):
                 if atalho: act.setShortcut(atalho)
                 act.triggered.connect(func); edit_menu.addAction(act)
 
-    def novo_arquivo(self): self.editor.clear(); self.caminho_arquivo = None; self.status_bar.showMessage("Novo arquivo")
+        run_menu = menubar.addMenu("&Run")
+        self.act_runner_aquecido = QAction("Processo pré-aquecido", self, checkable=True)
+        self.act_runner_aquecido.setChecked(USAR_RUNNER_AQUECIDO)  # O processo sobe em iniciar_runner
+        self.act_runner_aquecido.toggled.connect(self.alternar_runner_aquecido)
+        run_menu.addAction(self.act_runner_aquecido)
+        act = QAction("Reiniciar processo pré-aquecido", self)
+        act.triggered.connect(self.reiniciar_runner); run_menu.addAction(act)
+        act = QAction("Limites de execução...", self)
+        act.triggered.connect(self.configurar_limites); run_menu.addAction(act)
+        run_menu.addSeparator()
+        act = QAction("Upload em lote (várias placas)...", self)
+        act.triggered.connect(self.executar_upload_lote); run_menu.addAction(act)
+        act = QAction("Limpar cache de compilação", self)
+        act.triggered.connect(self.limpar_cache_compilacao); run_menu.addAction(act)
+        self.act_log_completo = QAction("Log completo do arduino-cli", self, checkable=True)
+        self.act_log_completo.toggled.connect(lambda ativo: setattr(self.firmata, "texto_bruto", ativo))
+        run_menu.addAction(self.act_log_completo)
+        self.act_daemon_cli = QAction("Usar daemon do arduino-cli (gRPC)", self, checkable=True)
+        self.act_daemon_cli.setChecked(cli_daemon.ATIVO)
+        self.act_daemon_cli.toggled.connect(self.alternar_daemon_cli)
+        run_menu.addAction(self.act_daemon_cli)
+
+    def alternar_runner_aquecido(self, ativo):
+        if ativo and self.runner is None:
+            self.runner = WarmPythonRunner(); self.runner.aquecer()
+        elif not ativo and self.runner is not None:
+            self.runner.encerrar(); self.runner = None
+
+    def configurar_limites(self):
+        dialogo = QDialog(self); dialogo.setWindowTitle("Limites de execução")
+        form = QFormLayout(dialogo)
+        campos = {}
+        for nome, rotulo, maximo in (("cpu_s", "CPU (s)", 86400), ("memoria_mb", "Memória (MB)", 1 << 20),
+                                     ("tempo_s", "Tempo total (s)", 86400)):
+            campo = campos[nome] = QDoubleSpinBox()
+            campo.setRange(0, maximo); campo.setDecimals(0 if nome == "memoria_mb" else 1)
+            campo.setSpecialValueText("sem limite")  # 0 = sem limite
+            campo.setValue(getattr(self.limites, nome) or 0)
+            form.addRow(rotulo, campo)
+        botoes = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        botoes.accepted.connect(dialogo.accept); botoes.rejected.connect(dialogo.reject)
+        form.addRow(botoes)
+        if dialogo.exec():
+            self.limites = Limites(**{nome: campo.value() or None for nome, campo in campos.items()})
+            self.status_bar.showMessage("Limites valem a partir do próximo Run.")
+
+    def alternar_daemon_cli(self, ativo):
+        # Sobe sob demanda na próxima ação de hardware; desligado, volta ao spawn por comando
+        cli_daemon.ATIVO = ativo
+        if not ativo: cli_daemon.encerrar_todos()
+        self.status_bar.showMessage("Daemon do arduino-cli " + ("ativado." if ativo else "desativado."))
+
+    def limpar_cache_compilacao(self):
+        stats = self.firmata.estatisticas_cache()
+        self.firmata.limpar_cache()
+        self.status_bar.showMessage(f"Cache limpo ({stats['entradas']} builds, {stats['hits']} hits / {stats['misses']} misses).")
+
+    def reiniciar_runner(self):
+        if self.runner:
+            self.runner.reiniciar(); self.status_bar.showMessage("Processo pré-aquecido reiniciado.")
+
+    def novo_arquivo(self): self.abas_editor.novo(); self.status_bar.showMessage("Novo arquivo")
+
+    def fechar_aba(self): self.abas_editor.fechar(self.abas_editor.currentIndex())
+
+    # --- ABAS DO EDITOR ---
+    @property
+    def editor(self):
+        """CodeEditor da aba atual."""
+        return self.abas_editor.editor_atual()
+
+    @property
+    def caminho_arquivo(self):
+        return self.editor.caminho_arquivo
+
+    @caminho_arquivo.setter
+    def caminho_arquivo(self, caminho):
+        self.abas_editor.definir_caminho(self.editor, caminho)
+
+    def editor_trocado(self, editor):
+        if hasattr(self, 'status_bar'):
+            self.status_bar.showMessage(editor.caminho_arquivo or EditorTabs.TITULO_NOVO)
     
     def obter_caminho_padrao_wandi(self):
         """
@@ -389,36 +819,33 @@ class MeuEditor(QMainWindow):
             "Python (*.py);;Todos os Arquivos (*)"
         )
         if caminho:
-            with open(caminho, 'r', encoding='utf-8') as f: 
-                self.editor.setPlainText(f.read())
-            self.caminho_arquivo = caminho
+            self.abas_editor.abrir(caminho)
             self.status_bar.showMessage(f"Aberto: {caminho}")
 
     def salvar_arquivo(self):
+        if self.editor.isReadOnly():
+            # Arquivo grande: o editor só tem a janela visível, nunca o conteúdo inteiro
+            self.status_bar.showMessage("Arquivo grande aberto só para leitura.")
+            return
         if not self.caminho_arquivo:
             caminho_inicial = self.obter_caminho_padrao_wandi()
-            caminho, _ = QFileDialog.getSaveFileName(
-                self, 
-                "Salvar Arquivo", 
-                caminho_inicial, 
-                "Python (*.py);;Todos os Arquivos (*)"
-            )
-            if caminho: 
-                self.caminho_arquivo = caminho
-            else: 
-                return
-        
-        with open(self.caminho_arquivo, 'w', encoding='utf-8') as f: 
-            f.write(self.editor.toPlainText())
-        self.status_bar.showMessage(f"Salvo: {self.caminho_arquivo}")
-
-    def salvar_arquivo(self):
-        if not self.caminho_arquivo:
-            caminho, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", "", "Python (*.py);;Todos os Arquivos (*)")
+            caminho, _ = QFileDialog.getSaveFileName(self, "Salvar Arquivo", caminho_inicial, "Python (*.py);;Todos os Arquivos (*)")
             if caminho: self.caminho_arquivo = caminho
             else: return
-        with open(self.caminho_arquivo, 'w', encoding='utf-8') as f: f.write(self.editor.toPlainText())
-        self.status_bar.showMessage(f"Salvo: {self.caminho_arquivo}")
+        # Gravação atômica fora da thread da interface; o resultado chega em arquivo_salvo
+        self.abas_editor.salvar(self.editor)
+        self.status_bar.showMessage(f"Salvando: {self.caminho_arquivo}...")
+
+    def arquivo_salvo(self, editor, caminho, erro, ms):
+        if erro:
+            self.status_bar.showMessage(f"ERRO ao salvar {caminho}: {erro} (o arquivo anterior foi mantido)")
+        else:
+            self.status_bar.showMessage(f"Salvo: {caminho} ({ms:.0f} ms)")
+
+    def recuperar_autosave(self):
+        recuperados = self.abas_editor.recuperar()
+        if recuperados:
+            self.status_bar.showMessage(f"{recuperados} arquivo(s) com alterações não salvas recuperado(s) do autosave.")
 
     def criar_botao(self, nome_arquivo, func):
         btn = QPushButton()
@@ -429,27 +856,86 @@ class MeuEditor(QMainWindow):
         btn.clicked.connect(func); return btn
 
     def executar(self):
+        if self.editor.isReadOnly():
+            self.status_bar.showMessage("Arquivo grande aberto só para leitura: não dá para executar pelo editor.")
+            return
         codigo = self.editor.toPlainText()
         if not codigo.strip(): return
+        self.parar_execucao(esperar=True)  # O Run anterior (e os filhos dele) solta a porta antes
         self.console_output.clear(); self.status_bar.showMessage("Executando...")
-        self.tabs_inferiores.setCurrentIndex(0); self.worker = ExecutorWorker(codigo)
-        self.worker.line_received.connect(self.adicionar_ao_output); self.worker.start()
-
-    # PONTO SEGURO PARA ALTERAÇÃO: Melhora o scroll do console de sistema
+        env = self.captura.ambiente() if self.captura else None
+        emprestada = self.emprestar_serial()  # O script provavelmente abre a mesma porta
+        self.tabs_inferiores.setCurrentIndex(0); self.worker = ExecutorWorker(codigo, self.runner, env, self.limites)
+        if self.logs:
+            self.logs["output"].escrever(f"\n=== Run {datetime.datetime.now():%Y-%m-%d %H:%M:%S} ===\n")
+            self.worker.log = self.logs["output"]
+        self.worker.lote_recebido.connect(self.adicionar_lote_ao_output)
+        self.worker.relatorio.connect(self.fim_execucao)
+        if emprestada: self.ceder_serial(self.worker)
+        self.worker.start()
+
+    # PONTO SEGURO PARA ALTERAÇÃO: O ConsoleView junta as linhas e desenha uma vez por frame
     def adicionar_ao_output(self, texto):
-        self.console_output.moveCursor(QTextCursor.MoveOperation.End)
-        self.console_output.insertPlainText(texto)
-        self.console_output.moveCursor(QTextCursor.MoveOperation.End)
-
-    def parar_execucao(self):
-        if hasattr(self, 'worker'): self.worker.stop(); self.status_bar.showMessage("Interrompido.")
-
-    # PONTO SEGURO PARA ALTERAÇÃO: Garante o autoscroll no Serial Monitor
+        self.console_output.escrever(texto)
+
+    def adicionar_lote_ao_output(self, texto, previa):
+        if self.sender() is not self.worker:
+            return  # Lote atrasado de um Run anterior (ainda na fila de eventos)
+        # A prévia é a linha ainda sem '\n' (ex.: barra de progresso com '\r')
+        self.console_output.escrever_lote(texto, previa)
+        if self.plotter and texto and self.combo_fonte_plotter.currentIndex() == 0:
+            self.plotter.escrever(texto)
+
+    def abrir_plotter(self, indice):
+        if indice != self.aba_plotter or self.plotter is not None:
+            return
+        try:
+            plotter_ui = PERFIL.importar("plotter_ui")
+        except ImportError:
+            aviso = QLabel("O Plotter precisa do NumPy: pip install numpy")
+            aviso.setAlignment(Qt.AlignmentFlag.AlignCenter); aviso.setStyleSheet("color: #5c6370;")
+            self.layout_plotter.addWidget(aviso)
+            self.plotter = False  # Não tenta importar de novo a cada troca de aba
+            return
+        self.plotter = plotter_ui.PlotterView(janela=plotter_ui.JANELAS[self.combo_janela_plotter.currentIndex()])
+        self.plotter.pausar(self.btn_pausar_plotter.isChecked())
+        self.layout_plotter.addWidget(self.plotter)
+
+    def mudar_janela_plotter(self, indice):
+        if self.plotter:
+            self.plotter.definir_janela(PERFIL.importar("plotter_ui").JANELAS[indice])
+
+    def fim_execucao(self, relatorio):
+        if self.sender() is self.worker:
+            self.status_bar.showMessage(resumo(relatorio))
+
+    def parar_execucao(self, esperar=False):
+        """Para o Run atual com os filhos dele; `esperar`: só volta quando a árvore inteira saiu."""
+        self.workers_parando = [w for w in self.workers_parando if w.isRunning()]
+        worker = getattr(self, 'worker', None)
+        if worker is None or not worker.isRunning():
+            return
+        worker.stop(); self.status_bar.showMessage("Interrompido.")
+        # SIGKILL sai em PRAZO_TERMINO_S; depois disso só um processo que fugiu do grupo segura o pipe
+        if esperar and not worker.wait(int((PRAZO_TERMINO_S + 1) * 1000)):
+            self.workers_parando.append(worker)  # QThread destruída rodando derruba a IDE
+
+    def closeEvent(self, event):
+        self.abas_editor.encerrar()  # Espera um salvamento em andamento terminar
+        self.parar_execucao(esperar=True)  # O script tem grupo próprio: não morre junto com a IDE
+        if self.captura: self.captura.parar()
+        if self.serial: self.serial.parar()
+        if self.logs:
+            for log in self.logs.values(): log.fechar()
+        if self.runner: self.runner.encerrar()
+        cli_daemon.encerrar_todos()
+        super().closeEvent(event)
+
+    # PONTO SEGURO PARA ALTERAÇÃO: Autoscroll e limite de linhas ficam no ConsoleView
     def log_serial_arduino(self, texto):
-        # ATENÇÃO: Move o cursor para o final para garantir que o scroll acompanhe o texto
-        self.serial_log.moveCursor(QTextCursor.MoveOperation.End)
-        self.serial_log.insertPlainText(texto)
-        self.serial_log.moveCursor(QTextCursor.MoveOperation.End)
+        self.serial_log.escrever(texto)
+        if self.plotter and self.combo_fonte_plotter.currentIndex() == 1:
+            self.plotter.escrever(texto)
 
     # PONTO SEGURO PARA ALTERAÇÃO: Melhora a lógica de envio de comandos
     def enviar_comando_serial(self):
@@ -457,14 +943,30 @@ class MeuEditor(QMainWindow):
         if not comando:
             return
 
-        if hasattr(self, 'worker') and self.worker.isRunning():
+        if self.serial:
+            try:
+                self.serial.enviar(comando)
+            except OSError as e:
+                self.status_bar.showMessage(f"Erro ao enviar para {self.serial.porta}: {e}")
+                return
+            self.log_serial_arduino(f"TX >> {comando}\n")
+            self.serial_input.clear()
+        elif hasattr(self, 'worker') and self.worker.isRunning():
             self.worker.enviar_input(comando)
             # Adiciona um marcador visual no log para comandos enviados pelo usuário
             self.log_serial_arduino(f"TX >> {comando}\n")
             self.serial_input.clear()
         else:
-            self.status_bar.showMessage("Erro: O código precisa estar rodando para enviar Serial.")
+            self.status_bar.showMessage("Erro: conecte a porta (Conectar) ou rode um código para enviar Serial.")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv); app.setStyle("Fusion")
-    janela = MeuEditor(); janela.showMaximized(); sys.exit(app.exec())
\ No newline at end of file
+    # --profile-startup: imprime import/init por subsistema quando a partida termina
+    perfil_partida = "--profile-startup" in sys.argv
+    if perfil_partida: sys.argv.remove("--profile-startup")
+    with PERFIL.medir("janela", "QApplication"):
+        app = QApplication(sys.argv); app.setStyle("Fusion")
+    with PERFIL.medir("janela", "MeuEditor (init_ui + menus)"):
+        janela = MeuEditor()
+    if perfil_partida:
+        janela.partida_concluida.connect(lambda: print(PERFIL.relatorio(), flush=True))
+    janela.showMaximized(); sys.exit(app.exec())
\ No newline at end of file
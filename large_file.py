@@ -0,0 +1,142 @@
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left
+
+# O índice guarda quantas quebras de linha existem antes de cada bloco de BLOCO_INDICE
+# bytes (8 bytes por bloco: ~128 KB de índice para 1 GB), e não o offset de cada linha
+BLOCO_INDICE = 64 * 1024
+# Leitura sequencial da indexação (buffer reaproveitado; não passa pelo mmap)
+LEITURA_INDICE = 4 * 1024 * 1024
+# Linhas maiores que isso aparecem cortadas (um arquivo de uma linha só não vira 1 GB de texto)
+MAX_BYTES_LINHA = 16 * 1024
+MARCA_CORTE = " …"
+# As linhas lidas são copiadas para fora do mmap e as páginas tocadas são devolvidas
+# (MADV_DONTNEED) em faixas alinhadas a isto: o kernel pode mapear folios grandes
+# do cache de página de uma vez, e sem isso cada salto somaria ~1 MB ao RSS
+ALINHAMENTO_SOLTAR = 2 * 1024 * 1024
+
+class ArquivoMapeado:
+    """Arquivo aberto por mmap, com índice de linhas montado em segundo plano.
+
+    Nada do conteúdo é carregado: `linhas(inicio, n)` decodifica só o trecho
+    pedido. A indexação lê o arquivo com readinto num buffer fixo (as páginas
+    não entram no RSS do processo); o mmap só é tocado nas janelas exibidas.
+    Pode ser consultado enquanto indexa: `linhas_indexadas` cresce até o total.
+    """
+
+    def __init__(self, caminho, encoding="utf-8"):
+        self.caminho = caminho
+        self.encoding = encoding
+        self.tamanho = os.path.getsize(caminho)
+        self._arquivo = open(caminho, "rb")
+        self.mapa = None
+        if self.tamanho:
+            self.mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self.mapa, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+                self.mapa.madvise(mmap.MADV_RANDOM)  # Sem readahead: só as páginas da janela
+        self._antes = array("Q")   # bloco i -> quebras de linha antes de i * BLOCO_INDICE
+        self.quebras = 0           # Total de '\n' (válido quando `pronto`)
+        self.bytes_indexados = 0
+        self.pronto = threading.Event()
+        self._parar = False
+        self._thread = None
+
+    # --- ÍNDICE ---
+    def indexar(self):
+        """Monta o índice (bloqueante). Chamado pela thread de indexar_em_segundo_plano."""
+        total = 0
+        buffer = bytearray(LEITURA_INDICE)  # Múltiplo de BLOCO_INDICE
+        with open(self.caminho, "rb", buffering=0) as f:
+            while not self._parar:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                for inicio in range(0, n, BLOCO_INDICE):
+                    self._antes.append(total)
+                    total += buffer.count(b"\n", inicio, min(inicio + BLOCO_INDICE, n))
+                self.bytes_indexados += n
+        self.quebras = total
+        if not self._parar:
+            self.pronto.set()
+
+    def indexar_em_segundo_plano(self):
+        self._thread = threading.Thread(target=self.indexar, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def linhas_indexadas(self):
+        """Linhas que já podem ser lidas (o total, depois que o índice fica pronto)."""
+        if self.pronto.is_set():
+            return self.quebras + 1
+        return self._antes[-1] if len(self._antes) > 1 else 0
+
+    @property
+    def progresso(self):
+        return 100 if self.pronto.is_set() else int(self.bytes_indexados * 100 / max(1, self.tamanho))
+
+    def inicio_linha(self, numero):
+        """Offset do primeiro byte da linha `numero` (0 = primeira) ou None."""
+        if self.mapa is None:
+            return 0 if numero == 0 else None  # Arquivo vazio: uma linha vazia
+        if numero <= 0:
+            return 0
+        if numero >= self.linhas_indexadas:
+            return None
+        # Último bloco com menos de `numero` quebras antes dele: a quebra procurada está nele ou adiante
+        bloco = bisect_left(self._antes, numero) - 1
+        pos = bloco * BLOCO_INDICE - 1
+        for _ in range(numero - self._antes[bloco]):
+            pos = self.mapa.find(b"\n", pos + 1)
+            if pos < 0:
+                return None
+        return pos + 1
+
+    # --- LEITURA ---
+    def linhas(self, inicio, quantidade):
+        """Até `quantidade` linhas a partir de `inicio`, decodificadas, sem o '\\n'."""
+        pos = self.inicio_linha(inicio)
+        if pos is None:
+            return []
+        if self.mapa is None:
+            return [""]
+        primeiro, saida = pos, []
+        while len(saida) < quantidade and pos <= self.tamanho:
+            fim = self.mapa.find(b"\n", pos, pos + MAX_BYTES_LINHA)
+            if fim >= 0:
+                saida.append(self._decodificar(self.mapa[pos:fim]))
+                pos = fim + 1
+            elif self.tamanho - pos <= MAX_BYTES_LINHA:
+                saida.append(self._decodificar(self.mapa[pos:self.tamanho]))
+                break  # Última linha (sem '\n' no fim)
+            else:
+                saida.append(self._decodificar(self.mapa[pos:pos + MAX_BYTES_LINHA]) + MARCA_CORTE)
+                fim = self.mapa.find(b"\n", pos + MAX_BYTES_LINHA)
+                if fim < 0:
+                    break
+                pos = fim + 1
+        # A busca da linha começou no máximo um bloco antes do primeiro byte dela
+        self._soltar(primeiro - BLOCO_INDICE, pos)
+        return saida
+
+    def _soltar(self, inicio, fim):
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        inicio = max(0, inicio) // ALINHAMENTO_SOLTAR * ALINHAMENTO_SOLTAR
+        fim = min(self.tamanho, -(-fim // ALINHAMENTO_SOLTAR) * ALINHAMENTO_SOLTAR)
+        if fim > inicio:
+            self.mapa.madvise(mmap.MADV_DONTNEED, inicio, fim - inicio)
+
+    def _decodificar(self, dados):
+        return dados.decode(self.encoding, "replace").rstrip("\r")
+
+    def fechar(self):
+        self._parar = True
+        if self._thread is not None:
+            self._thread.join()
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+        self._arquivo.close()
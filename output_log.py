@@ -0,0 +1,235 @@
+import datetime
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+
+PASTA_LOGS = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "logs")
+TAMANHO_SEGMENTO = 64 * 1024 * 1024   # Gira o arquivo ao passar disso...
+SEGUNDOS_SEGMENTO = None              # ...e/ou depois de tanto tempo (None = só por tamanho)
+BUFFER_ESCRITA = 1024 * 1024          # Buffer do arquivo: poucas chamadas write() mesmo com lotes pequenos
+LIMITE_PENDENTE = 16 * 1024 * 1024    # Caracteres na fila antes de `escrever` esperar o disco
+INTERVALO_DESCARGA_S = 1.0            # flush periódico: um `tail -f` vê o log com no máximo ~1 s de atraso
+NIVEL_GZIP = 1                        # Log repetitivo já comprime bem no nível 1, ~3x mais rápido que o 6
+COMPRESSOES = ("nenhuma", "gzip", "zstd")
+
+def _modulo_zstd():
+    """zstd da biblioteca padrão (Python 3.14+) ou do pacote zstandard; None se nenhum existe."""
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def compressao_padrao():
+    return "zstd" if _modulo_zstd() else "gzip"
+
+def comprimir_segmento(caminho, metodo):
+    """Comprime `caminho` para .gz/.zst (via arquivo temporário) e apaga o original."""
+    if metodo == "zstd":
+        zstd = _modulo_zstd()
+        if zstd is None:
+            metodo = "gzip"
+    destino = caminho + (".zst" if metodo == "zstd" else ".gz")
+    temporario = destino + ".tmp"
+    with open(caminho, "rb") as origem:
+        if metodo == "zstd":
+            if hasattr(zstd, "ZstdCompressor") and hasattr(zstd.ZstdCompressor, "copy_stream"):
+                with open(temporario, "wb") as saida:   # pacote zstandard
+                    zstd.ZstdCompressor().copy_stream(origem, saida)
+            else:
+                with zstd.open(temporario, "wb") as saida:
+                    shutil.copyfileobj(origem, saida, BUFFER_ESCRITA)
+        else:
+            with gzip.open(temporario, "wb", compresslevel=NIVEL_GZIP) as saida:
+                shutil.copyfileobj(origem, saida, BUFFER_ESCRITA)
+    os.replace(temporario, destino)
+    os.remove(caminho)
+    return destino
+
+class LogRotativo:
+    """Grava um fluxo de texto (Output ou Serial) em segmentos rotativos no disco.
+
+    `escrever` só põe o texto numa fila; uma thread de escrita junta o que
+    acumulou e grava com buffer grande, girando para nome-0002.log,
+    nome-0003.log... por tamanho (sempre numa quebra de linha) e/ou tempo.
+    Os segmentos fechados são comprimidos (gzip ou zstd) por uma segunda
+    thread, para a compressão nunca atrasar a escrita. Se o disco não der
+    conta, `escrever` espera: a memória fica limitada a LIMITE_PENDENTE.
+    Um erro de disco (cheio, pendrive removido) encerra o log: o erro fica em
+    `erro`, `ao_erro` é chamado uma vez (na thread de escrita) e `escrever`
+    passa a descartar o texto em vez de esperar por um disco que não volta.
+    """
+
+    def __init__(self, pasta, nome="output", max_bytes=TAMANHO_SEGMENTO, max_segundos=SEGUNDOS_SEGMENTO,
+                 compressao="gzip", max_segmentos=None, limite_pendente=LIMITE_PENDENTE, ao_erro=None):
+        if compressao not in COMPRESSOES:
+            raise ValueError(f"compressão desconhecida: {compressao}")
+        self.pasta = pasta
+        self.nome = nome
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.compressao = compressao
+        self.max_segmentos = max_segmentos   # Segmentos fechados mantidos (None = todos)
+        self.limite_pendente = limite_pendente
+        self.ao_erro = ao_erro
+        self.erro = None        # OSError que parou a thread de escrita
+        os.makedirs(pasta, exist_ok=True)
+        self.segmentos = []     # Segmentos fechados (já com o nome final, comprimido ou não)
+        self.estatisticas = {"bytes": 0, "segmentos": 0, "comprimidos": 0, "bytes_comprimidos": 0, "espera_s": 0.0}
+        self._fila = []
+        self._pendente = 0
+        self._fechando = False
+        self._cond = threading.Condition()
+        self._numero = 0
+        self._arquivo = None
+        self._compressor = None
+        self._para_comprimir = queue.Queue()
+        self._abrir_segmento()
+        self._escritor = threading.Thread(target=self._escrever_em_disco, name=f"log-{nome}", daemon=True)
+        self._escritor.start()
+
+    @property
+    def caminho(self):
+        """Segmento sendo escrito agora."""
+        return os.path.join(self.pasta, f"{self.nome}-{self._numero:04d}.log")
+
+    def escrever(self, texto):
+        if not texto:
+            return
+        with self._cond:
+            if self._fechando or self.erro:
+                return
+            if self._pendente >= self.limite_pendente:
+                inicio = time.perf_counter()
+                while self._pendente >= self.limite_pendente and not self._fechando and not self.erro:
+                    self._cond.wait()
+                if self._fechando or self.erro:
+                    return
+                self.estatisticas["espera_s"] += time.perf_counter() - inicio
+            self._fila.append(texto)
+            self._pendente += len(texto)
+            self._cond.notify_all()
+
+    def fechar(self):
+        """Grava o que falta, fecha o segmento atual e espera as compressões terminarem."""
+        with self._cond:
+            if self._fechando:
+                return
+            self._fechando = True
+            self._cond.notify_all()
+        self._escritor.join()
+        if self._compressor:
+            self._para_comprimir.put(None)
+            self._compressor.join()
+
+    # --- THREAD DE ESCRITA ---
+    def _abrir_segmento(self):
+        self._numero += 1
+        self._arquivo = open(self.caminho, "wb", buffering=BUFFER_ESCRITA)
+        self._tamanho = 0
+        self._aberto_em = time.monotonic()
+
+    def _girar(self):
+        self._arquivo.close()
+        fechado = self.caminho
+        self.estatisticas["segmentos"] += 1
+        self._abrir_segmento()
+        if self.compressao == "nenhuma":
+            self._segmento_fechado(fechado)
+            return
+        if self._compressor is None:
+            self._compressor = threading.Thread(target=self._comprimir, name=f"log-{self.nome}-compressao", daemon=True)
+            self._compressor.start()
+        self._para_comprimir.put(fechado)
+
+    def _gravar(self, dados):
+        while dados:
+            restante = self.max_bytes - self._tamanho
+            if len(dados) <= restante:
+                corte = len(dados)
+            else:
+                # Gira numa quebra de linha; uma linha maior que o segmento inteiro vai sozinha num segmento
+                corte = dados.rfind(b"\n", 0, restante) + 1
+                if corte == 0 and self._tamanho:
+                    self._girar()
+                    continue
+                corte = corte or (dados.find(b"\n", restante) + 1) or len(dados)
+            self._arquivo.write(dados[:corte])
+            self._tamanho += corte
+            self.estatisticas["bytes"] += corte
+            dados = dados[corte:]
+            if dados:
+                self._girar()
+
+    def _escrever_em_disco(self):
+        try:
+            self._laco_escrita()
+        except OSError as e:
+            with self._cond:
+                self.erro = e
+                self._fila, self._pendente = [], 0
+                self._cond.notify_all()   # Quem esperava o disco volta e passa a descartar
+            try:
+                self._arquivo.close()
+            except OSError:
+                pass
+            if self.ao_erro:
+                self.ao_erro(f"Log em disco ({self.nome}) parou: {e}")
+
+    def _laco_escrita(self):
+        ultima_descarga = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._fila and not self._fechando:
+                    self._cond.wait(INTERVALO_DESCARGA_S)
+                lote, self._fila = self._fila, []
+                self._pendente = 0
+                fechando = self._fechando
+                self._cond.notify_all()
+            agora = time.monotonic()
+            if self.max_segundos and self._tamanho and agora - self._aberto_em >= self.max_segundos:
+                self._girar()
+            if lote:
+                self._gravar("".join(lote).encode("utf-8", "replace"))
+            if fechando:
+                self._arquivo.close()
+                return
+            if agora - ultima_descarga >= INTERVALO_DESCARGA_S:
+                self._arquivo.flush()
+                ultima_descarga = agora
+
+    # --- THREAD DE COMPRESSÃO ---
+    def _comprimir(self):
+        while True:
+            caminho = self._para_comprimir.get()
+            if caminho is None:
+                return
+            try:
+                destino = comprimir_segmento(caminho, self.compressao)
+            except OSError:
+                destino = caminho  # Disco cheio etc.: o segmento fica sem comprimir
+            else:
+                self.estatisticas["comprimidos"] += 1
+                self.estatisticas["bytes_comprimidos"] += os.path.getsize(destino)
+            self._segmento_fechado(destino)
+
+    def _segmento_fechado(self, caminho):
+        self.segmentos.append(caminho)
+        if self.max_segmentos and len(self.segmentos) > self.max_segmentos:
+            antigo = self.segmentos.pop(0)
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+def pasta_sessao(base=PASTA_LOGS):
+    """Pasta nova para os logs de uma sessão (Output e Serial lado a lado)."""
+    return os.path.join(base, datetime.datetime.now().strftime("sessao-%Y%m%d-%H%M%S"))
@@ -0,0 +1,175 @@
+import math
+
+import numpy as np
+
+MAX_CANAIS = 8              # Como o Serial Plotter do Arduino IDE
+CAPACIDADE = 1 << 18        # Pontos guardados por canal (~26 s a 10k pontos/s; 8 MB com 8 canais)
+
+class ParserColunas:
+    """Tira colunas numéricas do fluxo de linhas do console.
+
+    Aceita os formatos do Serial Plotter do Arduino: valores separados por
+    espaço, tab ou vírgula ("512 300") e pares com rótulo ("A0:512,A1=300").
+    Linhas sem nenhum número são ignoradas (mensagens, prompts, tracebacks).
+    O texto pode chegar em pedaços: a linha parcial fica guardada até o '\n'.
+    """
+
+    def __init__(self, max_canais=MAX_CANAIS):
+        self.max_canais = max_canais
+        self.nomes = []           # Nome de cada canal, na ordem em que apareceram
+        self._indices = {}        # Rótulo -> canal
+        self.parcial = ""
+        self.linhas_ignoradas = 0
+
+    def _canal(self, rotulo):
+        indice = self._indices.get(rotulo)
+        if indice is None and len(self.nomes) < self.max_canais:
+            indice = self._indices[rotulo] = len(self.nomes)
+            self.nomes.append(rotulo)
+        return indice
+
+    def _linha_rotulada(self, campos):
+        valores = {}
+        posicao = 0
+        rotulo = None
+        for campo in campos:
+            if rotulo is None and campo[-1] in ":=":   # "A0: 512" -> rótulo e valor separados
+                rotulo = campo[:-1]
+                continue
+            separador = max(campo.rfind(":"), campo.rfind("="))
+            if separador > 0:
+                rotulo, campo = campo[:separador], campo[separador + 1:]
+            try:
+                valor = float(campo)
+            except ValueError:
+                rotulo = None
+                continue
+            if rotulo is None:
+                posicao += 1
+                rotulo = str(posicao)
+            indice = self._canal(rotulo)
+            if indice is not None:
+                valores[indice] = valor
+            rotulo = None
+        return valores
+
+    def analisar(self, texto):
+        """Linhas completas de `texto` -> matriz float32 (linhas x canais), NaN onde faltou valor."""
+        linhas = (self.parcial + texto).split("\n")
+        self.parcial = linhas.pop()
+        simples = []      # Caminho rápido: só números, sem rótulo
+        rotuladas = []    # (posição na saída, {canal: valor})
+        for linha in linhas:
+            campos = linha.replace(",", " ").replace("\t", " ").split()
+            if not campos:
+                continue
+            try:
+                valores = [float(c) for c in campos[:self.max_canais]]
+            except ValueError:
+                valores = self._linha_rotulada(campos)
+                if valores:
+                    rotuladas.append((len(simples), valores))
+                    simples.append(None)
+                else:
+                    self.linhas_ignoradas += 1
+                continue
+            for i in range(len(self.nomes), len(valores)):
+                self._canal(str(i + 1))
+            simples.append(valores)
+        if not simples:
+            return np.empty((0, len(self.nomes)), np.float32)
+        canais = len(self.nomes)
+        if not rotuladas and all(len(v) == canais for v in simples):
+            return np.array(simples, np.float32)
+        matriz = np.full((len(simples), canais), np.nan, np.float32)
+        for i, valores in enumerate(simples):
+            if valores is not None:
+                matriz[i, :len(valores)] = valores
+        for i, valores in rotuladas:
+            for canal, valor in valores.items():
+                matriz[i, canal] = valor
+        return matriz
+
+    def limpar(self):
+        self.__init__(self.max_canais)
+
+class AnelColunas:
+    """Buffer circular pré-alocado: uma linha float32 por canal, sem alocar por amostra."""
+
+    def __init__(self, canais=MAX_CANAIS, capacidade=CAPACIDADE):
+        self.valores = np.full((canais, capacidade), np.nan, np.float32)
+        self.capacidade = capacidade
+        self.total = 0    # Pontos recebidos desde o último limpar
+
+    def anexar(self, bloco):
+        """`bloco`: linhas x canais (menos canais que o anel é permitido)."""
+        n = len(bloco)
+        if not n:
+            return
+        if n > self.capacidade:
+            self.total += n - self.capacidade
+            bloco, n = bloco[-self.capacidade:], self.capacidade
+        colunas = bloco.shape[1]
+        inicio = self.total % self.capacidade
+        primeiro = min(n, self.capacidade - inicio)
+        self.valores[:colunas, inicio:inicio + primeiro] = bloco[:primeiro].T
+        self.valores[colunas:, inicio:inicio + primeiro] = np.nan
+        if primeiro < n:
+            self.valores[:colunas, :n - primeiro] = bloco[primeiro:].T
+            self.valores[colunas:, :n - primeiro] = np.nan
+        self.total += n
+
+    def ultimos(self, n):
+        """Os `n` pontos mais recentes de cada canal, em ordem (cópia só quando dá a volta)."""
+        n = min(n, self.total, self.capacidade)
+        fim = self.total % self.capacidade
+        if fim >= n:
+            return self.valores[:, fim - n:fim]
+        return np.concatenate((self.valores[:, self.capacidade - (n - fim):], self.valores[:, :fim]), axis=1)
+
+    def limpar(self):
+        self.valores.fill(np.nan)
+        self.total = 0
+
+def decimar_min_max(valores, largura):
+    """(mínimos, máximos) com no máximo `largura` colunas: uma por pixel.
+
+    Cada coluna resume um grupo igual de pontos consecutivos, então picos de
+    uma amostra continuam visíveis. fmin/fmax ignoram NaN (buracos no canal);
+    uma coluna só fica NaN se o grupo inteiro for NaN.
+    """
+    canais, n = valores.shape
+    if n <= largura:
+        return valores, valores
+    grupo = math.ceil(n / largura)
+    colunas = n // grupo
+    blocos = valores[:, n - colunas * grupo:].reshape(canais, colunas, grupo)
+    return np.fmin.reduce(blocos, axis=2), np.fmax.reduce(blocos, axis=2)
+
+def rasterizar_faixas(imagem, minimos, maximos, y_min, escala, cor):
+    """Pinta em `imagem` (linhas x colunas, uint32) uma faixa vertical por coluna, de min a max.
+
+    Cada faixa é esticada até a borda da faixa anterior para o traço não ter
+    buracos quando o sinal salta. É o mesmo desenho de uma polyline em
+    zigue-zague, mas sai em poucas operações NumPy em vez de milhares de
+    segmentos no QPainter. Colunas NaN ficam em branco.
+    """
+    altura, colunas = imagem.shape
+    validos = ~np.isnan(minimos)
+    # Linha 0 é o topo: o máximo vira a linha de cima
+    topo = np.clip((altura - 1) - (np.nan_to_num(maximos) - y_min) * escala, 0, altura - 1).astype(np.int32)
+    fundo = np.clip((altura - 1) - (np.nan_to_num(minimos) - y_min) * escala, 0, altura - 1).astype(np.int32)
+    ligar = validos[1:] & validos[:-1]
+    ate_anterior_acima = np.where(ligar, np.minimum(topo[1:], fundo[:-1]), topo[1:])
+    fundo[1:] = np.where(ligar, np.maximum(fundo[1:], topo[:-1]), fundo[1:])
+    topo[1:] = ate_anterior_acima
+    tamanhos = np.where(validos, fundo - topo + 1, 0)
+    total = int(tamanhos.sum())
+    if total > imagem.size // 8:
+        # Sinal muito ruidoso (faixas altas): uma máscara tem custo fixo por pixel da imagem
+        linhas = np.arange(altura, dtype=np.int32)[:, None]
+        imagem[(linhas >= topo) & (linhas <= fundo) & validos] = cor
+        return
+    xs = np.repeat(np.arange(colunas, dtype=np.int32), tamanhos)
+    deslocamentos = np.arange(total, dtype=np.int32) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    imagem[np.repeat(topo, tamanhos) + deslocamentos, xs] = cor
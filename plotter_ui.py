@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtGui import QPainter, QColor, QFont, QImage
+
+from plotter import AnelColunas, ParserColunas, decimar_min_max, rasterizar_faixas
+from capture_ui import CORES_CANAIS
+
+JANELAS = (1_000, 10_000, 50_000, 250_000)   # Pontos visíveis por canal
+JANELA_PADRAO = 10_000
+
+FUNDO, GRADE = 0xFF050A0F, 0xFF1C2B3D
+CORES_RGB = [QColor(cor).rgb() for cor in CORES_CANAIS]
+
+class PlotterView(QWidget):
+    """Plotter em tempo real das colunas numéricas que o script/placa imprime.
+
+    `escrever` só guarda o texto; a cada FRAME_MS o texto acumulado é analisado
+    de uma vez para o AnelColunas e, se a aba estiver visível, a janela é
+    decimada (min/max por coluna de pixel) e rasterizada com NumPy numa imagem
+    reaproveitada entre frames. O custo do frame depende do tamanho em pixels,
+    não da taxa de pontos.
+    """
+    FRAME_MS = 16
+
+    def __init__(self, parent=None, janela=JANELA_PADRAO):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.parser = ParserColunas()
+        self.anel = AnelColunas()
+        self.janela = janela
+        self.pausado = False
+        self._pendente = []
+        self._sujo = False
+        self._pixels = None          # Área do gráfico (uint32 ARGB), embrulhada por _imagem
+        self._imagem = None
+        self.tempo_analise = 0.0     # Segundos gastos analisando texto (para o benchmark)
+        self.tempo_desenho = 0.0
+        self.frames = 0
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._frame)
+        self.timer.start(self.FRAME_MS)
+
+    def escrever(self, texto):
+        if not self.pausado:
+            self._pendente.append(texto)
+
+    def definir_janela(self, pontos):
+        self.janela = pontos
+        self._sujo = True
+
+    def pausar(self, pausado):
+        self.pausado = pausado
+
+    def limpar(self):
+        self._pendente.clear()
+        self.parser.limpar()
+        self.anel.limpar()
+        self._sujo = True
+
+    def analisar_pendente(self):
+        if not self._pendente:
+            return
+        inicio = time.perf_counter()
+        texto = "".join(self._pendente)
+        self._pendente.clear()
+        bloco = self.parser.analisar(texto)
+        if len(bloco):
+            self.anel.anexar(bloco)
+            self._sujo = True
+        self.tempo_analise += time.perf_counter() - inicio
+
+    def _area(self, altura, largura):
+        if self._pixels is None or self._pixels.shape != (altura, largura):
+            self._pixels = np.empty((altura, largura), np.uint32)
+            self._imagem = QImage(self._pixels.data, largura, altura, largura * 4, QImage.Format.Format_RGB32)
+        return self._pixels
+
+    def _frame(self):
+        # A análise roda mesmo com a aba escondida: o histórico não pode ter buracos
+        self.analisar_pendente()
+        if self._sujo and self.isVisible():
+            self._sujo = False
+            self.update()
+
+    def paintEvent(self, event):
+        inicio = time.perf_counter()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#050a0f"))
+        painter.setFont(QFont("Consolas", 8))
+        canais = len(self.parser.nomes)
+        if not canais or not self.anel.total:
+            painter.setPen(QColor("#5c6370"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter,
+                             "Imprima números (ex.: print(a0, a1) ou \"A0:512,A1:300\") para plotar.")
+            return
+        margem, topo = 48, 16
+        largura, altura = self.width() - margem - 4, self.height() - topo - 6
+        if largura < 2 or altura < 2:
+            return
+        valores = self.anel.ultimos(self.janela)[:canais]
+        minimos, maximos = decimar_min_max(valores, largura)
+        # Escala comum a todos os canais, como no Serial Plotter
+        y_min, y_max = np.fmin.reduce(minimos, axis=None), np.fmax.reduce(maximos, axis=None)
+        if np.isnan(y_min):
+            return
+        if y_max == y_min:
+            y_min, y_max = y_min - 1, y_max + 1
+        painter.setPen(QColor("#5c6370"))
+        for i in range(5):
+            y = topo + (altura - 1) * i / 4
+            painter.drawText(0, int(y) - 6, margem - 4, 12, Qt.AlignmentFlag.AlignRight,
+                             f"{y_max - (y_max - y_min) * i / 4:.4g}")
+
+        colunas = minimos.shape[1]
+        area = self._area(altura, largura)
+        area.fill(FUNDO)
+        for i in range(5):
+            area[round((altura - 1) * i / 4), :] = GRADE
+        for c in range(canais):
+            rasterizar_faixas(area[:, largura - colunas:], minimos[c], maximos[c], y_min,
+                              (altura - 1) / (y_max - y_min), CORES_RGB[c % len(CORES_RGB)])
+        painter.drawImage(margem, topo, self._imagem)
+
+        x = margem + 4
+        for c, nome in enumerate(self.parser.nomes):
+            painter.setPen(QColor(CORES_CANAIS[c % len(CORES_CANAIS)]))
+            painter.drawText(x, 11, nome)
+            x += painter.fontMetrics().horizontalAdvance(nome) + 12
+        self.frames += 1
+        self.tempo_desenho += time.perf_counter() - inicio
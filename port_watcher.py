@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+from PyQt6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, pyqtSignal
+
+import engine_resolver
+# Enumeração sem Qt; PREFIXOS_TTY_USB e ler_fqbns continuam acessíveis por aqui
+from serial_ports import (PREFIXOS_TTY_USB, listar_portas, listar_portas_arduino_cli,
+                          ler_fqbns, listar_fqbns)
+
+class _CliThread(QThread):
+    resultado = pyqtSignal(object)
+
+    def __init__(self, funcao):
+        super().__init__()
+        self.funcao = funcao
+
+    def run(self):
+        try:
+            self.resultado.emit(self.funcao())
+        except Exception:
+            self.resultado.emit(None)
+
+class PortWatcher(QObject):
+    """Observa as portas seriais no próprio processo e avisa só quando mudam.
+
+    No Linux usa QFileSystemWatcher (inotify) em /dev e re-escaneia; nas outras
+    plataformas faz um diff barato a cada INTERVALO_MS. O arduino-cli só é
+    chamado para descobrir o FQBN de portas novas (ou como último recurso,
+    quando a plataforma não tem enumeração própria).
+    """
+    ports_signal = pyqtSignal(list)
+    fqbn_signal = pyqtSignal(dict)
+
+    INTERVALO_MS = 1000          # Diff periódico quando não há inotify
+    INTERVALO_CLI_MS = 3000      # Polling antigo do arduino-cli (último recurso)
+    ATRASO_HOTPLUG_MS = 150      # Junta a rajada de eventos do udev num único scan
+
+    def __init__(self, cli_path=None, raiz_dev="/dev", raiz_sys="/sys", parent=None):
+        super().__init__(parent)
+        self._cli_path = cli_path
+        self.raiz_dev = raiz_dev
+        self.raiz_sys = raiz_sys
+        self.portas = None
+        self.fqbns = {}
+        self.ultimo_custo_us = 0.0
+        self.scans = 0
+        self._thread_cli = None
+        self._thread_fqbn = None
+        self._fqbn_pendente = False
+        self.watcher = None
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.escanear)
+        self.timer_hotplug = QTimer(self)
+        self.timer_hotplug.setSingleShot(True)
+        self.timer_hotplug.setInterval(self.ATRASO_HOTPLUG_MS)
+        self.timer_hotplug.timeout.connect(self.escanear)
+
+    @property
+    def cli_path(self):
+        # Sem caminho explícito, pergunta ao resolver (memoizado) a cada uso
+        return self._cli_path or engine_resolver.caminho_arduino_cli()
+
+    def iniciar(self):
+        # Um scan só: decide a estratégia e já vira a primeira lista emitida
+        portas = self._listar()
+        if portas is None:
+            self.timer.start(self.INTERVALO_CLI_MS)
+        elif sys.platform.startswith("linux") and os.path.isdir(self.raiz_dev):
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.addPath(self.raiz_dev)
+            self.watcher.directoryChanged.connect(lambda _: self.timer_hotplug.start())
+        else:
+            self.timer.start(self.INTERVALO_MS)
+        self._publicar(portas)
+
+    def parar(self):
+        self.timer.stop()
+        self.timer_hotplug.stop()
+        if self.watcher:
+            self.watcher.removePaths(self.watcher.directories())
+
+    def escanear(self):
+        self._publicar(self._listar())
+
+    def _listar(self):
+        t0 = time.perf_counter_ns()
+        portas = listar_portas(self.raiz_dev, self.raiz_sys)
+        self.ultimo_custo_us = (time.perf_counter_ns() - t0) / 1000
+        self.scans += 1
+        return portas
+
+    def _publicar(self, portas):
+        if portas is None:
+            self._escanear_via_cli()
+            return
+        self._atualizar(portas)
+
+    def _escanear_via_cli(self):
+        if not self.cli_path or (self._thread_cli and self._thread_cli.isRunning()):
+            return
+        self._thread_cli = _CliThread(lambda: listar_portas_arduino_cli(self.cli_path))
+        self._thread_cli.resultado.connect(self._portas_via_cli)
+        self._thread_cli.start()
+
+    def _portas_via_cli(self, portas):
+        self._atualizar(portas or [])
+
+    def _atualizar(self, portas):
+        if portas == self.portas:
+            return
+        novas = set(portas) - set(self.portas or [])
+        self.portas = portas
+        self.fqbns = {p: f for p, f in self.fqbns.items() if p in portas}
+        self.ports_signal.emit(portas)
+        if novas:
+            self.resolver_fqbns()
+
+    def resolver_fqbns(self):
+        """Roda UM `board list --format json` em segundo plano para as portas novas."""
+        if not self.cli_path:
+            return
+        if self._thread_fqbn and self._thread_fqbn.isRunning():
+            self._fqbn_pendente = True
+            return
+        self._thread_fqbn = _CliThread(lambda: listar_fqbns(self.cli_path))
+        self._thread_fqbn.resultado.connect(self._fqbns_resolvidos)
+        self._thread_fqbn.finished.connect(self._thread_fqbn_terminou)
+        self._thread_fqbn.start()
+
+    def _fqbns_resolvidos(self, fqbns):
+        if fqbns:
+            self.fqbns.update(fqbns)
+            self.fqbn_signal.emit(dict(self.fqbns))
+
+    def _thread_fqbn_terminou(self):
+        if self._fqbn_pendente:
+            self._fqbn_pendente = False
+            self.resolver_fqbns()
@@ -0,0 +1,230 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+PRAZO_TERMINO_S = 2.0    # Depois do SIGTERM, quanto o script tem para sair antes do SIGKILL
+FOLGA_CPU_S = 1          # RLIMIT_CPU: SIGXCPU no limite, SIGKILL (limite rígido) um pouco depois
+CREATE_NO_WINDOW = 0x08000000
+CREATE_NEW_PROCESS_GROUP = 0x00000200
+
+# Prelúdio do `python -c` de um script com limites: aplica os rlimits no próprio
+# processo e executa o script (argv[1]) num namespace limpo, como o `-c` faria.
+# Sem preexec_fn: ele não é seguro com o processo pai cheio de threads (a IDE).
+_PRELUDIO = r"""
+import sys
+sys.path.insert(0, {pasta!r})
+from process_supervisor import aplicar_limites
+del sys.path[0]
+aplicar_limites(**{limites!r})
+_codigo = sys.argv.pop(1)
+exec(compile(_codigo, "<string>", "exec"), {{"__name__": "__main__", "__builtins__": __builtins__}})
+"""
+
+class Limites:
+    """Limites opcionais de um Run (None = sem limite).
+
+    `cpu_s` e `memoria_mb` viram rlimits dentro do processo do script (e são
+    herdados pelos filhos dele); `tempo_s` é o tempo de parede, vigiado pelo
+    Supervisor. A memória é a virtual (RLIMIT_AS): o script recebe MemoryError.
+    No Windows só `tempo_s` vale.
+    """
+
+    def __init__(self, cpu_s=None, memoria_mb=None, tempo_s=None):
+        self.cpu_s = cpu_s
+        self.memoria_mb = memoria_mb
+        self.tempo_s = tempo_s
+
+    def do_processo(self):
+        """Os limites que o próprio processo aplica (argumentos de `aplicar_limites`)."""
+        if os.name == 'nt':
+            return {}
+        return {nome: valor for nome, valor in (("cpu_s", self.cpu_s), ("memoria_mb", self.memoria_mb)) if valor}
+
+def aplicar_limites(cpu_s=None, memoria_mb=None):
+    """Aplica os rlimits no processo atual (no filho recém-criado ou no runner aquecido)."""
+    import resource
+
+    def limitar(recurso, suave, rigido):
+        _, atual = resource.getrlimit(recurso)
+        if atual != resource.RLIM_INFINITY:
+            suave, rigido = min(suave, atual), min(rigido, atual)
+        resource.setrlimit(recurso, (suave, rigido))
+
+    if cpu_s:
+        # A CPU já gasta (imports do runner aquecido) não conta contra o script;
+        # o RLIMIT_CPU é em segundos inteiros, daí o arredondamento
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        suave = max(1, round(uso.ru_utime + uso.ru_stime + cpu_s))
+        limitar(resource.RLIMIT_CPU, suave, suave + FOLGA_CPU_S)
+    if memoria_mb:
+        memoria = int(memoria_mb * 1024 * 1024)
+        limitar(resource.RLIMIT_AS, memoria, memoria)
+
+def comando_python(codigo, limites=None):
+    """argv de `python -u -c codigo`; com rlimits, um prelúdio os aplica antes do script."""
+    proprios = limites.do_processo() if limites else {}
+    if not proprios:
+        return [sys.executable, "-u", "-c", codigo]
+    preludio = _PRELUDIO.format(pasta=os.path.dirname(os.path.abspath(__file__)), limites=proprios)
+    return [sys.executable, "-u", "-c", preludio, codigo]
+
+def opcoes_popen():
+    """Argumentos do Popen de um script: grupo de processos próprio.
+
+    O grupo novo é o que permite parar a árvore inteira (filhos e netos do
+    script) com um sinal só, sem atingir a IDE. Os rlimits ficam no argv
+    (`comando_python`).
+    """
+    if os.name == 'nt':
+        return {"creationflags": CREATE_NO_WINDOW | CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+def grupo_vivo(grupo):
+    """True se ainda há algum processo (não zumbi) no grupo `grupo`."""
+    try:
+        os.killpg(grupo, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    if not os.path.isdir("/proc/self"):
+        return True
+    # Linux: zumbis também respondem ao killpg, mas já morreram e não seguram porta nem pipe
+    for nome in os.listdir("/proc"):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f"/proc/{nome}/stat", "rb") as f:
+                campos = f.read().rpartition(b")")[2].split()
+        except OSError:
+            continue
+        if int(campos[2]) == grupo and campos[0] != b"Z":
+            return True
+    return False
+
+class Supervisor:
+    """Vigia um Run: o processo do script e todo o grupo de processos dele.
+
+    O processo precisa ter sido criado com `opcoes_popen` (ou pelo
+    WarmPythonRunner), que o põe num grupo próprio. `parar` manda SIGTERM ao
+    grupo inteiro e, se sobrar alguém depois de `prazo` segundos, SIGKILL.
+    Quando o processo principal termina, o que ele deixou para trás no grupo
+    (filhos, threads presas em board.exit()...) é parado do mesmo jeito: a
+    porta serial e o pipe de saída não ficam presos por órfãos. `esperar`
+    devolve o relatório do Run: código de saída, motivo, tempo, CPU e pico
+    de RSS (do processo principal e dos filhos que ele esperou, via wait4).
+    """
+
+    def __init__(self, processo, limites=None, prazo=PRAZO_TERMINO_S):
+        self.processo = processo
+        self.limites = limites or Limites()
+        self.prazo = prazo
+        self.grupo = processo.pid
+        self.inicio = time.monotonic()
+        self.motivo = None          # Quem parou o Run: "interrompido", "limite de tempo"...
+        self.restos = False         # O script saiu deixando processos no grupo
+        self.relatorio = None
+        self._trava = threading.Lock()
+        self._escalando = False
+        self._forcar = None
+        self._tempo = None
+        if self.limites.tempo_s:
+            self._tempo = threading.Timer(self.limites.tempo_s, self.parar, ("limite de tempo",))
+            self._tempo.daemon = True
+            self._tempo.start()
+        self._vigia = threading.Thread(target=self._vigiar, name=f"supervisor-{processo.pid}", daemon=True)
+        self._vigia.start()
+
+    @property
+    def vivo(self):
+        return self.relatorio is None
+
+    def parar(self, motivo="interrompido"):
+        """SIGTERM no grupo agora, SIGKILL em `prazo` segundos. Não bloqueia."""
+        with self._trava:
+            if self.motivo is None:
+                self.motivo = motivo
+            if self._escalando:
+                return
+            self._escalando = True
+        self._sinalizar(forcar=False)
+        self._forcar = threading.Timer(self.prazo, self._sinalizar, kwargs={"forcar": True})
+        self._forcar.daemon = True
+        self._forcar.start()
+
+    def _sinalizar(self, forcar):
+        if os.name == 'nt':
+            # Sem grupos POSIX: taskkill /T percorre a árvore pelo pid do pai
+            comando = ["taskkill", "/T", "/PID", str(self.grupo)] + (["/F"] if forcar else [])
+            subprocess.run(comando, capture_output=True, creationflags=CREATE_NO_WINDOW)
+            return
+        try:
+            os.killpg(self.grupo, signal.SIGKILL if forcar else signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _vigiar(self):
+        uso = None
+        if os.name == 'nt':
+            codigo = self.processo.wait()
+        else:
+            try:
+                _, status, uso = os.wait4(self.processo.pid, 0)
+                codigo = self.processo.returncode = os.waitstatus_to_exitcode(status)
+            except ChildProcessError:   # Alguém já recolheu o processo (poll() em outra thread)
+                codigo = self.processo.wait()
+        duracao = time.monotonic() - self.inicio
+        if self._tempo:
+            self._tempo.cancel()
+        cpu_s = uso.ru_utime + uso.ru_stime if uso else None
+        if os.name != 'nt':
+            if codigo == -signal.SIGXCPU or (codigo == -signal.SIGKILL and self.limites.cpu_s and cpu_s
+                                              and cpu_s >= self.limites.cpu_s and not self._escalando):
+                self.motivo = self.motivo or "limite de CPU"
+            if not self._escalando and grupo_vivo(self.grupo):
+                self.restos = True
+                self.parar(None)
+        self.relatorio = {
+            "codigo": codigo,
+            "motivo": self.motivo,
+            "duracao_s": duracao,
+            "cpu_s": cpu_s,
+            # ru_maxrss: KB no Linux, bytes no macOS
+            "pico_rss": uso.ru_maxrss * (1 if sys.platform == "darwin" else 1024) if uso else None,
+            "restos": self.restos,
+        }
+
+    def esperar(self, timeout=None):
+        """Espera o processo principal e o resto do grupo; devolve o relatório (None se estourou `timeout`)."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        self._vigia.join(timeout)
+        if self._vigia.is_alive():
+            return None
+        if self._escalando and os.name != 'nt':
+            # No máximo até o SIGKILL fazer efeito
+            fim = time.monotonic() + self.prazo + 1.0
+            if limite is not None:
+                fim = min(fim, limite)
+            while grupo_vivo(self.grupo) and time.monotonic() < fim:
+                time.sleep(0.01)
+            if not grupo_vivo(self.grupo) and self._forcar:
+                self._forcar.cancel()   # O pgid pode ser reaproveitado: não mandar SIGKILL a um grupo novo
+        return self.relatorio
+
+def resumo(relatorio):
+    """Texto curto para a barra de status: como o Run terminou e quanto gastou."""
+    if relatorio["motivo"]:
+        partes = [f"Parado ({relatorio['motivo']})"]
+    else:
+        partes = [f"Finalizado (código {relatorio['codigo']})"]
+    partes.append(f"{relatorio['duracao_s']:.2f} s")
+    if relatorio["cpu_s"] is not None:
+        partes.append(f"CPU {relatorio['cpu_s']:.2f} s")
+    if relatorio["pico_rss"] is not None:
+        partes.append(f"pico de memória {relatorio['pico_rss'] / 1024 ** 2:.0f} MB")
+    if relatorio["restos"]:
+        partes.append("processos filhos encerrados")
+    return " · ".join(partes)
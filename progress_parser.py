@@ -0,0 +1,177 @@
+import json
+import re
+import time
+from collections import deque
+
+# Intervalo mínimo entre dois eventos da mesma etapa (mudança de etapa sai na hora)
+INTERVALO_EVENTOS = 0.1
+# Linhas omitidas guardadas para mostrar quando o comando falhar
+LINHAS_CAUDA = 30
+
+_RE_FLASH = re.compile(r"Sketch uses (\d+) bytes \((\d+)%\) of program storage space\.(?: Maximum is (\d+) bytes)?")
+_RE_RAM = re.compile(r"Global variables use (\d+) bytes \((\d+)%\) of dynamic memory.*?(?:Maximum is (\d+) bytes)?\.?$")
+# avrdude: "Writing | ##########          " enquanto grava, "... | 100% 2.16s" no fim
+_RE_BARRA = re.compile(r"^(Reading|Writing) \| (#*)[ ]*(?:\| (\d+)% ?([\d.]+) ?s)?")
+_RE_TOTAL = re.compile(r"writing flash \((\d+) bytes\)")
+_RE_GRAVADOS = re.compile(r"(\d+) bytes of flash (written|verified)")
+# Linhas que sempre vão para o log, mesmo sem o modo texto bruto
+_RE_IMPORTANTE = re.compile(r"error|erro|warning|fatal|not found|não|not responding|can't open|denied|failed",
+                            re.IGNORECASE)
+
+class EventoProgresso:
+    """Um passo de compile/upload: etapa, percentual e os números que tivermos.
+
+    Etapas: "compilado", "lendo", "gravando", "verificando", "gravado".
+    """
+    __slots__ = ("etapa", "percentual", "bytes_gravados", "bytes_total",
+                 "flash_usada", "flash_max", "ram_usada", "ram_max", "segundos")
+
+    def __init__(self, etapa, percentual=None, **valores):
+        self.etapa = etapa
+        self.percentual = percentual
+        for campo in self.__slots__[2:]:
+            setattr(self, campo, valores.get(campo))
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__ if getattr(self, campo) is not None}
+
+    def __repr__(self):
+        return f"EventoProgresso({self.como_dict()})"
+
+class ProgressParser:
+    """Transforma a saída do arduino-cli/avrdude em EventoProgresso com taxa limitada.
+
+    Aceita tanto o texto normal quanto o documento do `--format json`. Para cada
+    linha devolve as linhas legíveis que devem ir ao log: erros e avisos sempre;
+    o resto só com `bruto=True`. O que ficou de fora vai para `cauda`, para ser
+    mostrado se o comando falhar.
+    """
+
+    def __init__(self, bruto=False, intervalo=INTERVALO_EVENTOS, relogio=time.monotonic):
+        self.bruto = bruto
+        self.intervalo = intervalo
+        self.relogio = relogio
+        self.cauda = deque(maxlen=LINHAS_CAUDA)
+        self.resumo = {}          # Últimos números conhecidos (flash, ram, bytes, segundos)
+        self.linhas = 0
+        self.eventos = 0
+        self.descartados = 0
+        self._etapa = None
+        self._ultimo = 0.0
+        self._pendente = None
+        self._gravou = False
+        self._json = []
+
+    # --- LIMITAÇÃO DE TAXA ---
+    def _evento(self, etapa, percentual=None, **valores):
+        self.resumo.update((k, v) for k, v in valores.items() if v is not None)
+        evento = EventoProgresso(etapa, percentual, **self.resumo)
+        agora = self.relogio()
+        if etapa != self._etapa or percentual == 100 or agora - self._ultimo >= self.intervalo:
+            self._etapa, self._ultimo, self._pendente = etapa, agora, None
+            self.eventos += 1
+            return [evento]
+        if self._pendente is not None:
+            self.descartados += 1
+        self._pendente = evento  # Sai no próximo evento liberado ou no finalizar()
+        return []
+
+    # --- ENTRADA ---
+    def linha(self, texto):
+        """Linha completa -> (eventos, linhas_para_o_log)."""
+        self.linhas += 1
+        texto = texto.rstrip("\r\n")
+        if self._json or texto.startswith("{"):
+            return self._linha_json(texto)
+        return self._interpretar(texto), self._filtrar(texto)
+
+    def _filtrar(self, texto):
+        if self.bruto or _RE_IMPORTANTE.search(texto):
+            return [texto]
+        if texto.strip():
+            self.cauda.append(texto)
+        return []
+
+    def _interpretar(self, texto):
+        m = _RE_BARRA.match(texto.strip())
+        if m:
+            return self._barra(m)
+        m = _RE_FLASH.search(texto)
+        if m:
+            usada, pct, maximo = m.groups()
+            return self._evento("compilado", int(pct), flash_usada=int(usada),
+                                flash_max=int(maximo) if maximo else None)
+        m = _RE_RAM.search(texto)
+        if m:
+            usada, pct, maximo = m.groups()
+            return self._evento("compilado", None, ram_usada=int(usada),
+                                ram_max=int(maximo) if maximo else None)
+        m = _RE_TOTAL.search(texto)
+        if m:
+            self.resumo["bytes_total"] = int(m.group(1))
+            return []
+        m = _RE_GRAVADOS.search(texto)
+        if m:
+            return self._evento("gravado", 100, bytes_gravados=int(m.group(1)))
+        return []
+
+    def parcial(self, texto):
+        """Linha ainda incompleta (ex.: barra do avrdude crescendo) -> eventos."""
+        m = _RE_BARRA.match(texto.strip())
+        return self._barra(m) if m else []
+
+    def finalizar(self):
+        """Fim do processo -> (eventos, linhas): o evento represado e o JSON pendente."""
+        eventos, linhas = self._linha_json("", final=True) if self._json else ([], [])
+        if self._pendente is not None:
+            eventos.append(self._pendente)
+            self._pendente = None
+            self.eventos += 1
+        return eventos, linhas
+
+    # --- FORMATOS ---
+    def _barra(self, m):
+        acao, hashes, pct, segundos = m.groups()
+        if acao == "Writing":
+            etapa = "gravando"
+            self._gravou = True
+        else:
+            etapa = "verificando" if self._gravou else "lendo"
+        percentual = int(pct) if pct else min(100, len(hashes) * 2)
+        valores = {"segundos": float(segundos)} if segundos and etapa == "gravando" else {}
+        if etapa == "gravando" and self.resumo.get("bytes_total"):
+            valores["bytes_gravados"] = self.resumo["bytes_total"] * percentual // 100
+        return self._evento(etapa, percentual, **valores)
+
+    def _linha_json(self, texto, final=False):
+        self._json.append(texto)
+        try:
+            doc = json.loads("\n".join(self._json))
+        except ValueError:
+            if final:
+                # Não era JSON afinal: trata como texto comum
+                linhas, self._json = [l for l in self._json if l], []
+                return [], [l for linha in linhas for l in self._filtrar(linha)]
+            return [], []
+        self._json = []
+        if not isinstance(doc, dict):
+            return [], []
+        eventos, saida = [], []
+        resultado = doc.get("builder_result") or doc
+        secoes = {s.get("name"): s for s in resultado.get("executable_sections_size") or []}
+        if "text" in secoes:
+            flash = secoes["text"]
+            ram = secoes.get("data", {})
+            maximo = flash.get("max_size") or flash.get("maxSize")
+            eventos += self._evento("compilado", int(flash["size"] * 100 / maximo) if maximo else None,
+                                    flash_usada=flash.get("size"), flash_max=maximo,
+                                    ram_usada=ram.get("size"), ram_max=ram.get("max_size") or ram.get("maxSize"))
+        # O texto do compilador vem dentro do JSON: passa pelas mesmas regras
+        for chave in ("compiler_out", "compiler_err"):
+            for linha in (doc.get(chave) or "").splitlines():
+                if "text" not in secoes:  # Tamanhos já vieram estruturados; não conta duas vezes
+                    eventos += self._interpretar(linha)
+                saida += self._filtrar(linha)
+        if doc.get("error"):
+            saida.append(str(doc["error"]))
+        return eventos, saida
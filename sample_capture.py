@@ -0,0 +1,232 @@
+import datetime
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from array import array
+
+from autosave import gravar_atomico
+from wandi_amostras import MAGICA, VERSAO, VARIAVEL_AMBIENTE
+
+PASTA_CAPTURAS = os.path.join(os.path.expanduser("~"), "Documents", "Wandi Studio", "capturas")
+# Cada balde da visão ao vivo resume este intervalo (min/max por canal)
+INTERVALO_BALDE_S = 0.02
+BUFFER_LEITURA = 1024 * 1024
+
+# --- FORMATO EM DISCO ---
+class GravacaoColunar:
+    """Uma gravação = uma pasta com um arquivo binário por coluna.
+
+    t.f64 guarda o tempo (float64, segundos desde o início do script) e cada
+    canal vai em NN-nome.f32 (float32 little-endian). Os lotes chegam do script
+    já em colunas, então gravar é só acrescentar bytes em cada arquivo. O
+    meta.json é reescrito (atomicamente) ao fechar, com o total de amostras.
+    """
+    ARQUIVO_TEMPO = "t.f64"
+
+    def __init__(self, pasta, canais):
+        self.pasta = pasta
+        self.canais = list(canais)
+        self.amostras = 0
+        os.makedirs(pasta, exist_ok=True)
+        self.arquivos_canais = [f"{i:02d}-{self._nome_seguro(nome)}.f32" for i, nome in enumerate(self.canais)]
+        self._tempo = open(os.path.join(pasta, self.ARQUIVO_TEMPO), "wb")
+        self._colunas = [open(os.path.join(pasta, nome), "wb") for nome in self.arquivos_canais]
+        self._inicio = datetime.datetime.now().isoformat(timespec="seconds")
+        self._gravar_meta(concluida=False)
+
+    @staticmethod
+    def _nome_seguro(nome):
+        return "".join(c if c.isalnum() or c in "-_" else "_" for c in nome) or "canal"
+
+    def anexar(self, tempos, colunas, n):
+        """`tempos` e cada item de `colunas` são bytes/memoryview já no formato do arquivo."""
+        self._tempo.write(tempos)
+        for arquivo, coluna in zip(self._colunas, colunas):
+            arquivo.write(coluna)
+        self.amostras += n
+
+    def _gravar_meta(self, concluida):
+        meta = {"versao": VERSAO, "inicio": self._inicio, "amostras": self.amostras, "concluida": concluida,
+                "tempo": {"arquivo": self.ARQUIVO_TEMPO, "tipo": "float64"},
+                "canais": [{"nome": nome, "arquivo": arquivo, "tipo": "float32"}
+                           for nome, arquivo in zip(self.canais, self.arquivos_canais)]}
+        gravar_atomico(os.path.join(self.pasta, "meta.json"), json.dumps(meta, ensure_ascii=False, indent=1))
+
+    def fechar(self):
+        for arquivo in [self._tempo, *self._colunas]:
+            arquivo.close()
+        self._gravar_meta(concluida=True)
+
+def ler_gravacao(pasta):
+    """(meta, tempos, {canal: valores}) com array('d')/array('f') lidos do disco."""
+    with open(os.path.join(pasta, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    def ler(nome, tipo):
+        valores = array(tipo)
+        caminho = os.path.join(pasta, nome)
+        with open(caminho, "rb") as f:
+            valores.frombytes(f.read())
+        return valores
+    tempos = ler(meta["tempo"]["arquivo"], "d")
+    canais = {c["nome"]: ler(c["arquivo"], "f") for c in meta["canais"]}
+    return meta, tempos, canais
+
+# --- VISÃO DECIMADA ---
+class Decimador:
+    """Resume o fluxo em baldes de INTERVALO_BALDE_S: (t, [(min, max), ...], amostras).
+
+    min()/max() rodam em C sobre o lote inteiro de cada canal; a visão ao vivo
+    recebe algumas dezenas de baldes por segundo, seja qual for a taxa de amostragem.
+    """
+
+    def __init__(self, n_canais, intervalo=INTERVALO_BALDE_S):
+        self.n_canais = n_canais
+        self.intervalo = intervalo
+        self._limpar()
+
+    def _limpar(self):
+        self._t = None
+        self._faixas = [None] * self.n_canais
+        self._amostras = 0
+
+    def adicionar(self, tempos, colunas):
+        """Acumula um lote; devolve o balde fechado (ou None se o intervalo não passou)."""
+        if not tempos:
+            return None
+        if self._t is None:
+            self._t = tempos[0]
+        for i, coluna in enumerate(colunas):
+            # Comparações com NaN (valor ausente) são falsas: min/max só erram se o 1º for NaN
+            validos = coluna if coluna[0] == coluna[0] else [v for v in coluna if v == v]
+            if not validos:
+                continue
+            minimo, maximo = min(validos), max(validos)
+            faixa = self._faixas[i]
+            self._faixas[i] = (minimo, maximo) if faixa is None else (min(faixa[0], minimo), max(faixa[1], maximo))
+        self._amostras += len(tempos)
+        if tempos[-1] - self._t >= self.intervalo:
+            return self.fechar_balde()
+        return None
+
+    def fechar_balde(self):
+        if self._t is None:
+            return None
+        balde = (self._t, list(self._faixas), self._amostras)
+        self._limpar()
+        return balde
+
+# --- RECEPTOR ---
+def _ler_exato(arquivo, n):
+    dados = arquivo.read(n)
+    if len(dados) < n:
+        raise EOFError
+    return dados
+
+class ReceptorAmostras:
+    """Servidor local (127.0.0.1, porta livre) que recebe os lotes de wandi_amostras.
+
+    Cada conexão (um Run com a gravação ligada) vira uma GravacaoColunar em
+    `pasta_base`. `ao_inicio(pasta, canais)` avisa uma gravação nova,
+    `ao_balde(balde)` recebe a visão decimada e `ao_log(texto, status)` os
+    eventos; todos são chamados na thread de `servir`.
+    """
+
+    def __init__(self, pasta_base=PASTA_CAPTURAS, ao_inicio=None, ao_balde=None, ao_log=None,
+                 intervalo_balde=INTERVALO_BALDE_S):
+        self.pasta_base = pasta_base
+        self.ao_inicio = ao_inicio or (lambda pasta, canais: None)
+        self.ao_balde = ao_balde or (lambda balde: None)
+        self.ao_log = ao_log or (lambda texto, status="info": None)
+        self.intervalo_balde = intervalo_balde
+        self.servidor = socket.create_server(("127.0.0.1", 0))
+        self.servidor.settimeout(0.2)  # Para `parar` ser atendido sem conexão nova
+        self.endereco = "%s:%d" % self.servidor.getsockname()[:2]
+        self.gravacoes = []      # Pastas gravadas nesta sessão
+        self.estatisticas = {"amostras": 0, "bytes": 0, "lotes": 0, "segundos": 0.0}
+        self._parar = threading.Event()
+        self._conexao = None
+
+    def ambiente(self, env=None):
+        """Variáveis para o processo do script encontrar este receptor."""
+        return dict(env or {}, **{VARIAVEL_AMBIENTE: self.endereco})
+
+    def servir(self):
+        """Bloqueante: atende uma conexão por vez até `parar`."""
+        try:
+            while not self._parar.is_set():
+                try:
+                    conexao, _ = self.servidor.accept()
+                except socket.timeout:
+                    continue
+                self._conexao = conexao
+                with conexao:
+                    self._receber(conexao)
+                self._conexao = None
+        finally:
+            self.servidor.close()
+
+    def parar(self):
+        self._parar.set()
+        conexao = self._conexao
+        if conexao is not None:
+            try:
+                conexao.shutdown(socket.SHUT_RDWR)  # Desbloqueia a leitura com EOF
+            except OSError:
+                pass
+
+    def _nova_pasta(self):
+        base = os.path.join(self.pasta_base, datetime.datetime.now().strftime("captura-%Y%m%d-%H%M%S"))
+        pasta, n = base, 1
+        while os.path.exists(pasta):
+            n += 1
+            pasta = f"{base}-{n}"
+        return pasta
+
+    def _receber(self, conexao):
+        conexao.settimeout(None)
+        arquivo = conexao.makefile("rb", buffering=BUFFER_LEITURA)
+        try:
+            magica = _ler_exato(arquivo, len(MAGICA))
+            versao, tamanho = struct.unpack("<BH", _ler_exato(arquivo, 3))
+            if magica != MAGICA or versao != VERSAO:
+                self.ao_log("Conexão de amostras com formato desconhecido ignorada.", "err")
+                return
+            canais = json.loads(_ler_exato(arquivo, tamanho))["canais"]
+        except (EOFError, OSError, ValueError, KeyError):
+            return
+        gravacao = GravacaoColunar(self._nova_pasta(), canais)
+        self.gravacoes.append(gravacao.pasta)
+        self.ao_inicio(gravacao.pasta, canais)
+        self.ao_log(f"Gravando {len(canais)} canais ({', '.join(canais)}) em {gravacao.pasta}", "proc")
+        decimador = Decimador(len(canais), self.intervalo_balde)
+        inicio = time.perf_counter()
+        try:
+            while not self._parar.is_set():
+                tipo = arquivo.read(1)
+                if tipo != b"B":
+                    break  # Script terminou (EOF) ou fluxo corrompido
+                n, = struct.unpack("<I", _ler_exato(arquivo, 4))
+                bloco = _ler_exato(arquivo, n * (8 + 4 * len(canais)))
+                visao = memoryview(bloco)
+                tempos_bytes = visao[:8 * n]
+                colunas_bytes = [visao[8 * n + 4 * n * i: 8 * n + 4 * n * (i + 1)] for i in range(len(canais))]
+                gravacao.anexar(tempos_bytes, colunas_bytes, n)
+                balde = decimador.adicionar(tempos_bytes.cast("d"), [c.cast("f") for c in colunas_bytes])
+                if balde is not None:
+                    self.ao_balde(balde)
+                e = self.estatisticas
+                e["amostras"] += n
+                e["bytes"] += len(bloco) + 5
+                e["lotes"] += 1
+        except (EOFError, OSError):
+            pass
+        finally:
+            balde = decimador.fechar_balde()
+            if balde is not None:
+                self.ao_balde(balde)
+            gravacao.fechar()
+            self.estatisticas["segundos"] += time.perf_counter() - inicio
+            self.ao_log(f"Gravação concluída: {gravacao.amostras} amostras em {gravacao.pasta}", "ok")
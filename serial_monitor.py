@@ -0,0 +1,37 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from serial_transport import BAUD_PADRAO, TransporteSerial
+
+class SerialThread(QThread):
+    """Roda o laço de leitura de um TransporteSerial; o texto chega em lotes pelo sinal `lote`.
+
+    O construtor abre a porta (e levanta SerialIndisponivel se não der);
+    `parar` só volta depois que a porta foi fechada.
+    """
+    lote = pyqtSignal(str)
+    erro = pyqtSignal(str)
+
+    def __init__(self, porta, baud=BAUD_PADRAO, final_linha="\n"):
+        super().__init__()
+        self.log = None  # LogRotativo opcional (cópia em disco do que a placa envia)
+        self.transporte = TransporteSerial(porta, baud, final_linha,
+                                           ao_lote=self._entregar, ao_erro=self.erro.emit)
+
+    @property
+    def porta(self):
+        return self.transporte.porta
+
+    def _entregar(self, texto):
+        if self.log:
+            self.log.escrever(texto)
+        self.lote.emit(texto)
+
+    def enviar(self, texto):
+        self.transporte.enviar(texto)
+
+    def run(self):
+        self.transporte.executar()
+
+    def parar(self):
+        self.transporte.parar()
+        self.wait()
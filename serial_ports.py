@@ -0,0 +1,94 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import cli_daemon
+
+# Enumeração de portas sem Qt: o PortWatcher da IDE e o wandi_cli usam as mesmas funções
+
+# Prefixos de tty que são placas/adaptadores USB (ttyS* são as seriais da placa-mãe)
+PREFIXOS_TTY_USB = ("ttyACM", "ttyUSB", "ttyAMA", "rfcomm")
+
+def _portas_linux(raiz_dev="/dev", raiz_sys="/sys"):
+    portas = set()
+    # 1. /dev/serial/by-id: links simbólicos criados pelo udev para cada adaptador USB
+    by_id = os.path.join(raiz_dev, "serial", "by-id")
+    if os.path.isdir(by_id):
+        for nome in os.listdir(by_id):
+            alvo = os.path.realpath(os.path.join(by_id, nome))
+            if os.path.exists(alvo):
+                portas.add(os.path.join(raiz_dev, os.path.basename(alvo)))
+    # 2. sysfs: pega também placas sem entrada no by-id (udev ausente / container)
+    classe_tty = os.path.join(raiz_sys, "class", "tty")
+    if os.path.isdir(classe_tty):
+        for nome in os.listdir(classe_tty):
+            if nome.startswith(PREFIXOS_TTY_USB) and \
+                    os.path.exists(os.path.join(classe_tty, nome, "device")) and \
+                    os.path.exists(os.path.join(raiz_dev, nome)):
+                portas.add(os.path.join(raiz_dev, nome))
+    return sorted(portas)
+
+def _portas_windows():
+    import winreg
+    portas = []
+    try:
+        chave = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DEVICEMAP\SERIALCOMM")
+    except OSError:
+        return []  # Chave só existe quando há alguma porta COM
+    with chave:
+        i = 0
+        while True:
+            try:
+                portas.append(winreg.EnumValue(chave, i)[1])
+            except OSError:
+                break
+            i += 1
+    return sorted(portas, key=lambda p: (len(p), p))
+
+def listar_portas(raiz_dev="/dev", raiz_sys="/sys"):
+    """Enumera as portas seriais sem abrir processos. None = plataforma sem suporte."""
+    if sys.platform.startswith("linux"):
+        return _portas_linux(raiz_dev, raiz_sys)
+    if os.name == "nt":
+        return _portas_windows()
+    if sys.platform == "darwin":
+        return sorted(glob.glob(os.path.join(raiz_dev, "cu.usb*")))
+    try:
+        from serial.tools import list_ports
+    except ImportError:
+        return None
+    return sorted(p.device for p in list_ports.comports())
+
+def listar_portas_arduino_cli(cli_path):
+    """Modo antigo: pergunta ao arduino-cli (lento, só como último recurso)."""
+    flags = 0x08000000 if os.name == 'nt' else 0
+    output = subprocess.run([cli_path, "board", "list"], capture_output=True, text=True, creationflags=flags)
+    lines = output.stdout.splitlines()
+    return [line.split()[0] for line in lines if "COM" in line or "/dev/tty" in line]
+
+def ler_fqbns(saida_json):
+    """Mapeia porta -> FQBN a partir do `board list --format json` (formatos 0.x e 1.x)."""
+    dados = json.loads(saida_json or "[]")
+    if isinstance(dados, dict):
+        dados = dados.get("detected_ports", [])
+    fqbns = {}
+    for item in dados:
+        endereco = item.get("port", {}).get("address") or item.get("address")
+        placas = item.get("matching_boards") or item.get("boards") or []
+        if endereco and placas and placas[0].get("fqbn"):
+            fqbns[endereco] = placas[0]["fqbn"]
+    return fqbns
+
+def listar_fqbns(cli_path):
+    """porta -> FQBN das placas conectadas: pelo daemon, se ativo, senão um `board list`."""
+    daemon = cli_daemon.daemon_para(cli_path)
+    if daemon:
+        try:
+            return daemon.board_list()
+        except cli_daemon.ErroDaemon:
+            pass  # Cai no spawn abaixo
+    flags = 0x08000000 if os.name == 'nt' else 0
+    cmd = [cli_path, "board", "list", "--format", "json"]
+    return ler_fqbns(subprocess.run(cmd, capture_output=True, text=True, creationflags=flags).stdout)
@@ -0,0 +1,98 @@
+import codecs
+import os
+import threading
+import time
+
+BAUDS = (300, 1200, 2400, 4800, 9600, 19200, 38400, 57600, 74880, 115200, 230400, 250000, 500000, 1000000, 2000000)
+BAUD_PADRAO = 115200
+# Mesmas opções do Serial Monitor do Arduino IDE
+FINAIS_LINHA = {"Sem final": "", "Nova linha (LF)": "\n", "Retorno (CR)": "\r", "CR + LF": "\r\n"}
+TAMANHO_LEITURA = 64 * 1024   # Maior leitura de uma vez (o que já estiver no buffer do driver)
+INTERVALO_LOTE_S = 0.01       # Junta o que chega nesse intervalo numa única entrega ao console
+
+class SerialIndisponivel(Exception):
+    """pyserial não instalado ou porta que não pôde ser aberta (ocupada, removida...)."""
+
+def abrir_porta(porta, baud):
+    """Abre `porta` com pyserial (importado só aqui: a IDE abre sem ele)."""
+    try:
+        import serial
+    except ImportError:
+        raise SerialIndisponivel("pyserial não está instalado (pip install pyserial).")
+    try:
+        # exclusive: outro processo (upload, script) não abre a porta por cima do monitor
+        return serial.serial_for_url(porta, baudrate=baud, timeout=INTERVALO_LOTE_S, write_timeout=2,
+                                     exclusive=True if os.name != 'nt' else None)
+    except (OSError, ValueError) as e:
+        raise SerialIndisponivel(f"Não foi possível abrir {porta}: {e}")
+
+class TransporteSerial:
+    """Conexão direta da IDE com uma porta serial, sem script rodando.
+
+    `executar` é o laço de leitura (bloqueante, roda numa thread própria): lê o
+    que o driver já tem, até TAMANHO_LEITURA por vez, e entrega o texto
+    decodificado a `ao_lote` no máximo a cada INTERVALO_LOTE_S. Um byte que chega
+    depois de um silêncio, ou uma linha completa sem mais nada no buffer, é
+    entregue na hora. `parar` fecha a porta em até um
+    intervalo, para o upload ou o script poderem abri-la.
+    """
+
+    def __init__(self, porta, baud=BAUD_PADRAO, final_linha="\n", ao_lote=None, ao_erro=None, abrir=abrir_porta):
+        self.porta = porta
+        self.baud = baud
+        self.final_linha = final_linha
+        self.ao_lote = ao_lote or (lambda texto: None)
+        self.ao_erro = ao_erro or (lambda texto: None)
+        self.serial = abrir(porta, baud)
+        self._decodificador = codecs.getincrementaldecoder("utf-8")("replace")
+        self._parar = threading.Event()
+        self._escrita = threading.Lock()
+        self.estatisticas = {"bytes_recebidos": 0, "lotes": 0, "bytes_enviados": 0}
+
+    @property
+    def aberta(self):
+        return self.serial.is_open
+
+    def executar(self):
+        pendente = bytearray()
+        ultima_entrega = 0.0
+        try:
+            while not self._parar.is_set():
+                disponivel = self.serial.in_waiting
+                # Nada no buffer: espera 1 byte por até INTERVALO_LOTE_S (é o que acorda o laço)
+                dados = self.serial.read(min(disponivel, TAMANHO_LEITURA) if disponivel else 1)
+                agora = time.perf_counter()
+                if dados:
+                    pendente += dados
+                    # Linha completa e nada mais no driver: entrega já (é o que o usuário está esperando ver)
+                    linha_fechada = dados.endswith(b"\n") and not self.serial.in_waiting
+                    if not linha_fechada and len(pendente) < TAMANHO_LEITURA and agora - ultima_entrega < INTERVALO_LOTE_S:
+                        continue
+                if pendente:
+                    self._entregar(pendente)
+                    pendente = bytearray()
+                    ultima_entrega = agora
+        except OSError as e:  # SerialException também é OSError (ex.: cabo puxado)
+            if not self._parar.is_set():
+                self.ao_erro(f"Porta {self.porta} fechada: {e}")
+        finally:
+            if pendente:
+                self._entregar(pendente)
+            self.serial.close()
+
+    def _entregar(self, dados):
+        self.estatisticas["bytes_recebidos"] += len(dados)
+        self.estatisticas["lotes"] += 1
+        texto = self._decodificador.decode(bytes(dados))
+        if texto:
+            self.ao_lote(texto)
+
+    def enviar(self, texto):
+        """Envia `texto` + o final de linha configurado."""
+        dados = (texto + self.final_linha).encode("utf-8")
+        with self._escrita:
+            self.serial.write(dados)
+        self.estatisticas["bytes_enviados"] += len(dados)
+
+    def parar(self):
+        self._parar.set()
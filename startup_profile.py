@@ -0,0 +1,60 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+# Referência do relógio: o mais cedo possível (este módulo é o primeiro que interface.py importa)
+_INICIO = time.perf_counter()
+
+class PerfilPartida:
+    """Tempo de import e de inicialização de cada subsistema da IDE.
+
+    `medir(grupo, nome)` cronometra um bloco; `marcar(nome)` registra um instante
+    desde o início do processo (ex.: a primeira pintura da janela). Sempre
+    ligado: custa um perf_counter por etapa; só o relatório é opcional
+    (--profile-startup). Um import feito dentro de uma etapa também conta no
+    tempo dela.
+    """
+
+    def __init__(self, inicio=None):
+        self.inicio = _INICIO if inicio is None else inicio
+        self.etapas = []   # (grupo, nome, segundos)
+        self.marcas = {}   # nome -> segundos desde o início
+
+    @contextmanager
+    def medir(self, grupo, nome):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append((grupo, nome, time.perf_counter() - t0))
+
+    def importar(self, modulo):
+        """importlib.import_module cronometrado (só conta na primeira vez)."""
+        if modulo in sys.modules:
+            return sys.modules[modulo]
+        with self.medir("import", modulo):
+            return importlib.import_module(modulo)
+
+    def marcar(self, nome):
+        self.marcas.setdefault(nome, time.perf_counter() - self.inicio)
+
+    def como_dict(self):
+        return {"etapas": [{"grupo": g, "nome": n, "ms": round(s * 1000, 2)} for g, n, s in self.etapas],
+                "marcas": {n: round(s * 1000, 2) for n, s in self.marcas.items()}}
+
+    def relatorio(self):
+        linhas = ["=== Perfil de partida do Wandi Studio ==="]
+        for grupo in dict.fromkeys(g for g, _, _ in self.etapas):
+            etapas = [(n, s) for g, n, s in self.etapas if g == grupo]
+            linhas.append(f"{grupo} ({sum(s for _, s in etapas) * 1000:.1f} ms)")
+            for nome, segundos in sorted(etapas, key=lambda e: -e[1]):
+                linhas.append(f"  {nome:<32} {segundos * 1000:8.1f} ms")
+        if self.marcas:
+            linhas.append("marcos (desde o início do processo)")
+            for nome, segundos in sorted(self.marcas.items(), key=lambda m: m[1]):
+                linhas.append(f"  {nome:<32} {segundos * 1000:8.1f} ms")
+        return "\n".join(linhas)
+
+# Perfil único do processo da IDE
+PERFIL = PerfilPartida()
@@ -0,0 +1,118 @@
+import codecs
+import os
+import queue
+import threading
+import time
+
+# Tamanho de cada os.read() no pipe do processo filho
+BLOCO_LEITURA = 64 * 1024
+# Janela de agrupamento: tudo que chegar nesse intervalo vira um único lote
+INTERVALO_LOTE = 0.02
+# Linha sem '\n' maior que isso é entregue mesmo assim (evita crescer sem limite)
+MAX_PARCIAL = 64 * 1024
+
+class LineAssembler:
+    """Decodifica bytes aos poucos e monta linhas completas.
+
+    Semântica de terminal para '\\r': "10%\\r20%\\r30%\\n" vira a linha "30%",
+    e "\\r\\n" (Windows) conta como uma quebra de linha normal.
+    """
+
+    def __init__(self, encoding="utf-8"):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.parcial = ""
+
+    @staticmethod
+    def _resolver_cr(linha):
+        if linha.endswith("\r"):
+            linha = linha[:-1]
+        return linha.rsplit("\r", 1)[-1]
+
+    def alimentar(self, dados, final=False):
+        """Recebe bytes e retorna a lista de linhas completas (com '\\n')."""
+        texto = self.parcial + self.decoder.decode(dados, final)
+        partes = texto.split("\n")
+        self.parcial = partes.pop()
+        linhas = [self._resolver_cr(linha) + "\n" for linha in partes]
+
+        # Só o último trecho depois de um '\r' ainda pode aparecer na tela
+        corte = self.parcial.rfind("\r", 0, len(self.parcial) - 1)
+        if corte >= 0:
+            self.parcial = self.parcial[corte + 1:]
+        if len(self.parcial) > MAX_PARCIAL:
+            linhas.append(self._resolver_cr(self.parcial) + "\n")
+            self.parcial = ""
+        return linhas
+
+    def finalizar(self):
+        """Fim do stream: devolve o que sobrou como linha (sem inventar '\\n')."""
+        linhas = self.alimentar(b"", final=True)
+        if self.parcial:
+            linhas.append(self._resolver_cr(self.parcial))
+            self.parcial = ""
+        return linhas
+
+    def previa(self):
+        """Texto da linha ainda incompleta, como um terminal mostraria agora."""
+        for trecho in reversed(self.parcial.split("\r")):
+            if trecho:
+                return trecho
+        return ""
+
+class ChunkedPipeReader:
+    """Lê um pipe em blocos grandes e entrega lotes de linhas.
+
+    Uma thread auxiliar faz os.read() bloqueante (funciona igual no Windows e
+    no Linux) e `lotes()` junta tudo que chegou em INTERVALO_LOTE num único
+    par (texto_das_linhas_completas, previa_da_linha_parcial).
+    """
+
+    def __init__(self, arquivo, tamanho_bloco=BLOCO_LEITURA, intervalo=INTERVALO_LOTE, encoding="utf-8"):
+        self.fd = arquivo.fileno()
+        self.tamanho_bloco = tamanho_bloco
+        self.intervalo = intervalo
+        self.montador = LineAssembler(encoding)
+        self.fila = queue.Queue()
+        self.bytes_lidos = 0
+        self.leituras = 0
+        self.thread = threading.Thread(target=self._ler, daemon=True)
+
+    def _ler(self):
+        while True:
+            try:
+                dados = os.read(self.fd, self.tamanho_bloco)
+            except OSError:
+                dados = b""
+            self.fila.put(dados)
+            if not dados:
+                return
+            self.bytes_lidos += len(dados)
+            self.leituras += 1
+
+    def lotes(self):
+        """Gerador de (texto, previa); termina quando o pipe fecha."""
+        self.thread.start()
+        linhas = []
+        previa = ""
+        prazo = None
+        while True:
+            espera = None if prazo is None else max(0.0, prazo - time.monotonic())
+            try:
+                dados = self.fila.get(timeout=espera)
+            except queue.Empty:
+                nova_previa = self.montador.previa()
+                if linhas or nova_previa != previa:
+                    previa = nova_previa
+                    yield "".join(linhas), previa
+                linhas = []
+                prazo = None
+                continue
+
+            if not dados:
+                linhas.extend(self.montador.finalizar())
+                if linhas or previa:
+                    yield "".join(linhas), ""
+                return
+            linhas.extend(self.montador.alimentar(dados))
+            if prazo is None:
+                prazo = time.monotonic() + self.intervalo
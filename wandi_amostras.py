@@ -0,0 +1,115 @@
+"""Envio de amostras binárias de um script para a gravação do Serial Monitor.
+
+    import wandi_amostras
+    canal = wandi_amostras.abrir(["A0", "A1"])
+    board.analog[0].register_callback(lambda v: canal.amostra(v, board.analog[1].read()))
+
+Só usa a biblioteca padrão. Quando a gravação não está ligada na IDE (ou o
+script roda fora dela) `abrir` devolve um canal que descarta tudo, então o
+mesmo script funciona nos dois casos. Os valores vão em lotes colunares
+(float64 para o tempo, float32 por canal), sem passar pelo stdout.
+"""
+import atexit
+import json
+import os
+import socket
+import struct
+import time
+from array import array
+
+VARIAVEL_AMBIENTE = "WANDI_AMOSTRAS"   # "host:porta" do receptor (definida pela IDE no Run)
+MAGICA = b"WAMS"
+VERSAO = 1
+AMOSTRAS_POR_LOTE = 2048   # Envia quando o lote enche...
+INTERVALO_LOTE_S = 0.05    # ...ou quando o lote mais antigo passa disso (visão ao vivo fluida)
+
+class Canal:
+    """Canal de amostras ligado ao receptor da IDE (ou descartando, se `conexao` for None)."""
+
+    def __init__(self, nomes, conexao=None):
+        self.nomes = list(nomes)
+        self.conexao = conexao
+        self._t0 = time.perf_counter()
+        self._tempos = array("d")
+        self._colunas = [array("f") for _ in self.nomes]
+        self._inicio_lote = None
+        self.enviadas = 0
+        if conexao is not None:
+            cabecalho = json.dumps({"canais": self.nomes}).encode("utf-8")
+            self._enviar(MAGICA + struct.pack("<BH", VERSAO, len(cabecalho)) + cabecalho)
+            atexit.register(self.fechar)
+
+    @property
+    def ativo(self):
+        return self.conexao is not None
+
+    def amostra(self, *valores, t=None):
+        """Uma amostra com um valor por canal (None vira NaN). `t` em segundos; padrão: agora."""
+        if self.conexao is None:
+            return
+        if len(valores) != len(self._colunas):
+            raise ValueError(f"esperados {len(self._colunas)} valores ({', '.join(self.nomes)}), recebidos {len(valores)}")
+        agora = time.perf_counter()
+        self._tempos.append(agora - self._t0 if t is None else t)
+        for coluna, valor in zip(self._colunas, valores):
+            coluna.append(float("nan") if valor is None else valor)
+        if self._inicio_lote is None:
+            self._inicio_lote = agora
+        elif len(self._tempos) >= AMOSTRAS_POR_LOTE or agora - self._inicio_lote >= INTERVALO_LOTE_S:
+            self.enviar_lote()
+
+    def amostras(self, tempos, *colunas):
+        """Várias amostras de uma vez (uma sequência por canal, mesmo tamanho de `tempos`)."""
+        if self.conexao is None:
+            return
+        if len(colunas) != len(self._colunas):
+            raise ValueError(f"esperadas {len(self._colunas)} colunas ({', '.join(self.nomes)}), recebidas {len(colunas)}")
+        # Convertidas antes de mexer no lote: um erro aqui não deixa colunas desalinhadas
+        tempos = array("d", tempos)
+        colunas = [array("f", valores) for valores in colunas]
+        for nome, valores in zip(self.nomes, colunas):
+            if len(valores) != len(tempos):
+                raise ValueError(f"coluna {nome} com {len(valores)} valores, esperados {len(tempos)} (um por tempo)")
+        self._tempos.extend(tempos)
+        for coluna, valores in zip(self._colunas, colunas):
+            coluna.extend(valores)
+        self.enviar_lote()
+
+    def enviar_lote(self):
+        n = len(self._tempos)
+        if not n or self.conexao is None:
+            return
+        partes = [b"B", struct.pack("<I", n), self._tempos.tobytes()]
+        partes.extend(coluna.tobytes() for coluna in self._colunas)
+        self._enviar(b"".join(partes))
+        self.enviadas += n
+        self._tempos = array("d")
+        self._colunas = [array("f") for _ in self.nomes]
+        self._inicio_lote = None
+
+    def _enviar(self, dados):
+        try:
+            self.conexao.sendall(dados)
+        except OSError:
+            self.conexao = None  # Gravação parada na IDE: o script continua sem enviar
+
+    def fechar(self):
+        if self.conexao is None:
+            return
+        self.enviar_lote()
+        conexao, self.conexao = self.conexao, None
+        conexao.close()
+
+def abrir(nomes, endereco=None):
+    """Conecta ao receptor indicado em WANDI_AMOSTRAS; sem ele, devolve um canal inativo."""
+    endereco = endereco or os.environ.get(VARIAVEL_AMBIENTE)
+    if not endereco:
+        return Canal(nomes)
+    host, _, porta = endereco.rpartition(":")
+    try:
+        conexao = socket.create_connection((host, int(porta)), timeout=2)
+    except (OSError, ValueError):
+        return Canal(nomes)
+    conexao.settimeout(None)
+    conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return Canal(nomes, conexao)
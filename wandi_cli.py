@@ -0,0 +1,262 @@
+"""Wandi Studio sem interface: compile, upload, run e bootstrap pela linha de comando.
+
+    python -m wandi_cli compile --tipo Standard
+    python -m wandi_cli upload --porta /dev/ttyACM0 --porta /dev/ttyACM1 --json
+    python -m wandi_cli run robo.py
+
+Não importa Qt. Cada comando só importa o que usa (requests, por exemplo, só
+quando a engine precisa ser baixada), para a partida ficar no orçamento de
+ORCAMENTO_PARTIDA_MS medido em benchmarks.py.
+
+Com --json cada linha do stdout é um objeto: {"tipo": "log" | "progresso" |
+"saida" | "resultado", ...}; o último é sempre o "resultado".
+Códigos de saída: 0 ok, 1 falha, 2 uso incorreto, 3 engine ausente.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+SAIDA_USO = 2          # Mesmo código que o argparse usa para argumentos inválidos
+SAIDA_SEM_ENGINE = 3
+
+# Tempo máximo de `python -m wandi_cli portas --json` (conferido em benchmarks.py)
+ORCAMENTO_PARTIDA_MS = 250
+
+class Saida:
+    """Escreve logs, progresso e o resultado final em texto ou em JSON por linha."""
+
+    def __init__(self, como_json=False, fluxo=None):
+        self.como_json = como_json
+        self.fluxo = fluxo or sys.stdout
+        self._lock = threading.Lock()  # Upload em lote publica de várias threads
+        self._barra = False
+
+    def _escrever(self, texto):
+        with self._lock:
+            if self._barra and not self.como_json:
+                self.fluxo.write("\n")
+                self._barra = False
+            self.fluxo.write(texto)
+            self.fluxo.flush()
+
+    def _objeto(self, tipo, **campos):
+        self._escrever(json.dumps({"tipo": tipo, **campos}, ensure_ascii=False) + "\n")
+
+    def log(self, texto, status="info"):
+        texto = texto.rstrip("\n")
+        if self.como_json:
+            self._objeto("log", texto=texto.strip(), status=status)
+        elif texto.strip():
+            self._escrever(texto + "\n")
+
+    def progresso(self, origem, evento):
+        if self.como_json:
+            self._objeto("progresso", origem=origem, **evento.como_dict())
+        elif self.fluxo.isatty():
+            # Uma linha que se reescreve; logs normais quebram a linha antes
+            pct = "" if evento.percentual is None else f" {evento.percentual}%"
+            with self._lock:
+                self.fluxo.write(f"\r{'[' + origem + '] ' if origem else ''}{evento.etapa}{pct}\x1b[K")
+                self.fluxo.flush()
+                self._barra = True
+
+    def saida(self, texto):
+        """Saída do script do usuário (comando run)."""
+        if self.como_json:
+            self._objeto("saida", texto=texto)
+        else:
+            self._escrever(texto)
+
+    def resultado(self, codigo, **dados):
+        if self.como_json:
+            self._objeto("resultado", ok=codigo == SAIDA_OK, codigo=codigo, **dados)
+        else:
+            for chave, valor in dados.items():
+                if isinstance(valor, (dict, list)):
+                    valor = json.dumps(valor, ensure_ascii=False)
+                self._escrever(f"{chave}: {valor}\n")
+        return codigo
+
+# --- COMANDOS ---
+def _engine(args, saida):
+    import engine_resolver
+    import shutil
+    if args.cli:
+        cli_path = args.cli if os.path.isfile(args.cli) else shutil.which(args.cli)
+    else:
+        cli_path = engine_resolver.caminho_arduino_cli()
+    if not cli_path:
+        saida.log("Engine (arduino-cli) não encontrada. Rode `python -m wandi_cli bootstrap`.", "err")
+    return cli_path
+
+def _sketch(args, saida):
+    if args.sketch:
+        if not os.path.isdir(args.sketch):
+            saida.log(f"Sketch não encontrado: {args.sketch}", "err")
+            return None
+        return os.path.abspath(args.sketch)
+    from firmata_core import caminho_sketch_firmata, preparar_config_wifi
+    caminho = caminho_sketch_firmata(args.tipo, saida.log)
+    if caminho and args.tipo == "Wifi":
+        preparar_config_wifi(caminho, saida.log)
+    return caminho
+
+def _acao(args, saida, cli_path):
+    from build_cache import BuildCache
+    from firmata_core import AcaoHardware
+    cache = BuildCache(args.cache) if args.cache else BuildCache()
+    return AcaoHardware(cli_path, args.fqbn, cache, args.flag, texto_bruto=args.verbose,
+                        log=saida.log, progresso=saida.progresso)
+
+def cmd_compile(args, saida):
+    cli_path = _engine(args, saida)
+    if not cli_path:
+        return saida.resultado(SAIDA_SEM_ENGINE)
+    sketch = _sketch(args, saida)
+    if not sketch:
+        return saida.resultado(SAIDA_FALHA, sketch=args.sketch or args.tipo)
+    entrada = _acao(args, saida, cli_path).compilar(sketch)
+    return saida.resultado(SAIDA_OK if entrada else SAIDA_FALHA, sketch=sketch, binarios=entrada)
+
+def cmd_upload(args, saida):
+    cli_path = _engine(args, saida)
+    if not cli_path:
+        return saida.resultado(SAIDA_SEM_ENGINE)
+    sketch = _sketch(args, saida)
+    if not sketch:
+        return saida.resultado(SAIDA_FALHA, sketch=args.sketch or args.tipo)
+    acao = _acao(args, saida, cli_path)
+    entrada = acao.compilar(sketch)
+    if not entrada:
+        return saida.resultado(SAIDA_FALHA, sketch=sketch, erro="compilação falhou")
+    if len(args.porta) == 1:
+        ok = acao.upload(sketch, entrada, args.porta[0]) == 0
+        return saida.resultado(SAIDA_OK if ok else SAIDA_FALHA, sketch=sketch, portas={args.porta[0]: ok})
+    resultados, metricas = acao.gravar_lote(sketch, entrada, args.porta, args.paralelo)
+    ok = all(r[0] for r in resultados.values())
+    return saida.resultado(SAIDA_OK if ok else SAIDA_FALHA, sketch=sketch,
+                           portas={p: r[0] for p, r in resultados.items()}, metricas=metricas)
+
+def cmd_run(args, saida):
+    import subprocess
+    from stream_reader import ChunkedPipeReader
+    from warm_runner import ambiente_script
+    if not os.path.isfile(args.script):
+        saida.log(f"Script não encontrado: {args.script}", "err")
+        return saida.resultado(SAIDA_FALHA, script=args.script)
+    # Mesmo modo do ExecutorWorker da IDE; o stdin é herdado para o input() do script
+    env = ambiente_script()
+    processo = subprocess.Popen([sys.executable, "-u", args.script, *args.argumentos],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env,
+                                creationflags=0x08000000 if os.name == 'nt' else 0)
+    for texto, _ in ChunkedPipeReader(processo.stdout).lotes():
+        if texto:
+            saida.saida(texto)
+    processo.wait()
+    codigo = processo.returncode
+    return saida.resultado(SAIDA_OK if codigo == 0 else SAIDA_FALHA, script=args.script, retorno=codigo)
+
+def cmd_portas(args, saida):
+    from serial_ports import listar_portas, listar_portas_arduino_cli, listar_fqbns
+    portas = listar_portas()
+    fqbns = {}
+    if portas is None or args.fqbn_placas:
+        cli_path = _engine(args, saida)
+        if not cli_path:
+            return saida.resultado(SAIDA_SEM_ENGINE)
+        if portas is None:
+            portas = listar_portas_arduino_cli(cli_path)
+        if args.fqbn_placas:
+            fqbns = listar_fqbns(cli_path)
+    return saida.resultado(SAIDA_OK, portas=portas, fqbns=fqbns)
+
+def cmd_bootstrap(args, saida):
+    from engine_bootstrap import EngineBootstrap
+    bootstrap = EngineBootstrap(args.cli, log=saida.log)
+    ok = bootstrap.executar()
+    if not bootstrap.cli_path or not os.path.exists(bootstrap.cli_path):
+        codigo = SAIDA_SEM_ENGINE
+    else:
+        codigo = SAIDA_OK if ok else SAIDA_FALHA
+    return saida.resultado(codigo, engine=bootstrap.cli_path,
+                           etapas={k: round(v, 3) for k, v in bootstrap.tempos_etapas.items()})
+
+def cmd_cache(args, saida):
+    from build_cache import BuildCache
+    cache = BuildCache(args.cache) if args.cache else BuildCache()
+    if args.limpar:
+        cache.limpar()
+        saida.log(f"Cache de compilação limpo: {cache.pasta}", "ok")
+    return saida.resultado(SAIDA_OK, pasta=cache.pasta, **cache.estatisticas())
+
+# --- ARGUMENTOS ---
+def criar_parser():
+    # Opções comuns aceitas antes ou depois do subcomando
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--json", action="store_true", default=argparse.SUPPRESS,
+                       help="uma linha JSON por evento; a última é o resultado")
+    comum.add_argument("--cli", default=argparse.SUPPRESS, metavar="CAMINHO",
+                       help="arduino-cli a usar (padrão: o do resolver de engine)")
+    comum.add_argument("--verbose", action="store_true", default=argparse.SUPPRESS,
+                       help="toda a saída do arduino-cli no log")
+
+    parser = argparse.ArgumentParser(prog="python -m wandi_cli", parents=[comum],
+                                     description="Wandi Studio sem interface gráfica.")
+    sub = parser.add_subparsers(dest="comando", metavar="COMANDO", required=True)
+
+    build = argparse.ArgumentParser(add_help=False)
+    build.add_argument("--tipo", default="Standard", choices=["Standard", "Plus", "Configurable", "Wifi"],
+                       help="Firmata a usar quando não há --sketch")
+    build.add_argument("--sketch", metavar="PASTA", help="pasta de um sketch próprio")
+    build.add_argument("--fqbn", default="arduino:avr:uno")
+    build.add_argument("--flag", action="append", default=[], metavar="FLAG",
+                       help="argumento extra para o compile (entra na chave do cache)")
+    build.add_argument("--cache", metavar="PASTA", help="pasta do cache de compilação")
+
+    p = sub.add_parser("compile", parents=[comum, build], help="compila (usando o cache)")
+    p.set_defaults(funcao=cmd_compile)
+
+    p = sub.add_parser("upload", parents=[comum, build], help="compila uma vez e grava em uma ou mais portas")
+    p.add_argument("--porta", action="append", required=True, metavar="PORTA")
+    p.add_argument("--paralelo", type=int, default=4, metavar="N", help="gravações simultâneas no lote")
+    p.set_defaults(funcao=cmd_upload)
+
+    # Tudo depois do script vai para ele: opções do wandi_cli vêm antes
+    p = sub.add_parser("run", parents=[comum], help="executa um script Python como o botão Run")
+    p.add_argument("script")
+    p.add_argument("argumentos", nargs=argparse.REMAINDER)
+    p.set_defaults(funcao=cmd_run)
+
+    p = sub.add_parser("portas", parents=[comum], help="lista as portas seriais")
+    p.add_argument("--fqbn", dest="fqbn_placas", action="store_true", help="identifica as placas (arduino-cli)")
+    p.set_defaults(funcao=cmd_portas)
+
+    p = sub.add_parser("bootstrap", parents=[comum], help="verifica/instala engine, cores e bibliotecas")
+    p.set_defaults(funcao=cmd_bootstrap)
+
+    p = sub.add_parser("cache", parents=[comum], help="estatísticas do cache de compilação")
+    p.add_argument("limpar", nargs="?", choices=["limpar"], help="apaga o cache")
+    p.add_argument("--cache", metavar="PASTA", help="pasta do cache de compilação")
+    p.set_defaults(funcao=cmd_cache)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    for opcao, padrao in (("json", False), ("cli", None), ("verbose", False)):
+        if not hasattr(args, opcao):
+            setattr(args, opcao, padrao)
+    saida = Saida(args.json)
+    try:
+        return args.funcao(args, saida)
+    except KeyboardInterrupt:
+        return saida.resultado(SAIDA_FALHA, erro="interrompido")
+    except Exception as e:
+        saida.log(f"Erro: {str(e)}", "err")
+        return saida.resultado(SAIDA_FALHA, erro=str(e))
+
+if __name__ == "__main__":
+    sys.exit(main())
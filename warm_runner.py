@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+
+from process_supervisor import opcoes_popen
+
+# Pasta da IDE no PYTHONPATH dos scripts: `import wandi_amostras` funciona em qualquer Run
+PASTA_IDE = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos que os scripts dos robôs quase sempre importam (os ausentes são ignorados)
+MODULOS_PESADOS = ["pyfirmata2", "serial", "serial.tools.list_ports"]
+
+# Código do processo reserva: importa os módulos pesados e espera pelo script no
+# stdin no formato "<tamanho em bytes>[ <JSON com env e limites>]\n<código>". O resto
+# do stdin continua sendo o input() do usuário, exatamente como no modo "python -u -c".
+_BOOT = r"""
+import sys, importlib
+for _nome in sys.argv[1:]:
+    try:
+        importlib.import_module(_nome)
+    except Exception:
+        pass
+_cabecalho = sys.stdin.buffer.readline()
+if not _cabecalho.strip():
+    sys.exit(0)
+_tamanho, _, _extra = _cabecalho.partition(b" ")
+if _extra.strip():
+    import json, os
+    _extra = json.loads(_extra)
+    os.environ.update(_extra.get("env") or {})
+    if _extra.get("limites"):
+        from process_supervisor import aplicar_limites
+        aplicar_limites(**_extra["limites"])
+_codigo = sys.stdin.buffer.read(int(_tamanho)).decode("utf-8")
+sys.argv = ["-c"]
+_ns = {"__name__": "__main__", "__builtins__": __builtins__}
+exec(compile(_codigo, "<string>", "exec"), _ns)
+"""
+
+def ambiente_script(env=None, extra=None):
+    """Ambiente de um script do usuário: UTF-8 no pipe e a pasta da IDE no PYTHONPATH."""
+    env = dict(os.environ if env is None else env, PYTHONIOENCODING="utf-8", **(extra or {}))
+    caminhos = env.get("PYTHONPATH", "").split(os.pathsep) if env.get("PYTHONPATH") else []
+    if PASTA_IDE not in caminhos:
+        env["PYTHONPATH"] = os.pathsep.join(caminhos + [PASTA_IDE])
+    return env
+
+class WarmPythonRunner:
+    """Mantém um interpretador já aquecido esperando o próximo "Run".
+
+    Cada execução consome o processo reserva (namespace limpo, nada vaza entre
+    execuções) e um novo reserva é criado logo em seguida, fora do caminho
+    crítico. Parar um script é só matar o processo dele; o reserva não é afetado.
+    """
+
+    def __init__(self, modulos=None, env=None):
+        self.modulos = list(MODULOS_PESADOS if modulos is None else modulos)
+        self.env = ambiente_script(env)
+        self._reserva = None
+
+    def _criar_processo(self):
+        return subprocess.Popen(
+            [sys.executable, "-u", "-c", _BOOT, *self.modulos],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.PIPE,
+            env=self.env,
+            **opcoes_popen()  # Grupo próprio: o Supervisor para o script e os filhos dele juntos
+        )
+
+    def aquecer(self):
+        """Garante que existe um processo reserva vivo."""
+        if self._reserva is None or self._reserva.poll() is not None:
+            self._reserva = self._criar_processo()
+
+    def executar(self, codigo, env=None, limites=None):
+        """Entrega o código ao processo reserva e devolve o Popen dele.
+
+        `env`: variáveis só desta execução (o reserva foi criado antes delas existirem).
+        `limites`: argumentos de process_supervisor.aplicar_limites, aplicados
+        pelo reserva antes de rodar o código.
+        """
+        self.aquecer()
+        processo, self._reserva = self._reserva, None
+        dados = codigo.encode("utf-8")
+        extra = {chave: valor for chave, valor in (("env", env), ("limites", limites)) if valor}
+        cabecalho = f"{len(dados)} {json.dumps(extra)}" if extra else str(len(dados))
+        processo.stdin.write(f"{cabecalho}\n".encode("utf-8") + dados)
+        processo.stdin.flush()
+        self.aquecer()
+        return processo
+
+    def reiniciar(self):
+        """Descarta o reserva atual (ex.: após instalar um módulo) e aquece outro."""
+        self.encerrar()
+        self.aquecer()
+
+    def encerrar(self):
+        if self._reserva is not None:
+            if self._reserva.poll() is None:
+                self._reserva.kill()
+                self._reserva.wait()
+            self._reserva = None